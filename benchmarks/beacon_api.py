@@ -0,0 +1,216 @@
+# Stand-in beacon node API for eth-wizard
+#
+# Serves the beacon node API endpoints used to verify deposits and to compute the join queue
+# (syncing, validators, validator balances and committees) from a synthetic validator set, then
+# runs the local-first verification against it. The validator set has --active active validators
+# and --pending pending ones. The wizard keys are the first --keys pending validators followed by
+# --missing keys that are not in the state yet, those are looked up with beaconcha.in.
+#
+# --not-synced makes the stand-in node report it is syncing so everything falls back to
+# beaconcha.in. --serve only runs the stand-in node.
+#
+# Usage:
+#   python benchmarks/beacon_api.py --active 20000 --pending 300 --keys 250 --missing 0
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ethwizard.constants import (
+    NETWORK_MAINNET,
+    SLOTS_PER_EPOCH,
+    BN_SYNCING_EP,
+    BN_VALIDATORS_EP,
+    BN_VALIDATOR_BALANCES_EP,
+    BN_COMMITTEES_EP
+)
+
+from ethwizard.platforms.common import get_validator_deposits, get_join_queue_info
+
+HEAD_SLOT = 9000000
+
+def make_public_key(index):
+    return '0x' + f'{index:096x}'
+
+class ValidatorSet():
+    def __init__(self, active, pending):
+        self.records = []
+        for index in range(active + pending):
+            status = 'active_ongoing' if index < active else 'pending_queued'
+            self.records.append({
+                'index': str(index),
+                'balance': '32000000000',
+                'status': status,
+                'validator': {
+                    'pubkey': make_public_key(index),
+                    'effective_balance': '32000000000',
+                    'slashed': False
+                }
+            })
+        self.by_key = {record['validator']['pubkey']: record for record in self.records}
+        self.active = active
+
+    def find(self, ids, statuses):
+        if ids:
+            records = []
+            for id in ids:
+                if id.startswith('0x'):
+                    record = self.by_key.get(id.lower())
+                elif int(id) < len(self.records):
+                    record = self.records[int(id)]
+                else:
+                    record = None
+                if record is not None:
+                    records.append(record)
+        else:
+            records = self.records
+
+        if statuses:
+            records = [record for record in records if record['status'] in statuses]
+
+        return records
+
+class BeaconApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def send_json(self, value, status=200):
+        body = json.dumps(value).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length == 0:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        validator_set = self.server.validator_set
+
+        def split_query(name):
+            values = []
+            for value in query.get(name, []):
+                values.extend(value.split(','))
+            return values
+
+        if url.path == BN_SYNCING_EP:
+            self.send_json({'data': {
+                'head_slot': str(HEAD_SLOT),
+                'sync_distance': '0' if self.server.synced else '5000',
+                'is_syncing': not self.server.synced,
+                'is_optimistic': False,
+                'el_offline': False
+            }})
+        elif url.path == BN_VALIDATORS_EP:
+            self.send_json({'data': validator_set.find(split_query('id'),
+                split_query('status'))})
+        elif url.path == BN_VALIDATOR_BALANCES_EP:
+            self.send_json({'data': [{'index': record['index'], 'balance': record['balance']}
+                for record in validator_set.find(split_query('id'), None)]})
+        elif url.path == BN_COMMITTEES_EP:
+            # Spread the active validators over the slots of the epoch
+            slot = int(query.get('slot', [HEAD_SLOT])[0])
+            offset = slot % SLOTS_PER_EPOCH
+            indices = [str(index) for index in range(offset, validator_set.active,
+                SLOTS_PER_EPOCH)]
+            self.send_json({'data': [{'index': '0', 'slot': str(slot), 'validators': indices}]})
+        else:
+            self.send_json({'message': 'Not found'}, status=404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.read_json()
+        validator_set = self.server.validator_set
+        self.server.post_requests += 1
+
+        if url.path == BN_VALIDATORS_EP:
+            body = body or {}
+            self.send_json({'data': validator_set.find(body.get('ids'),
+                body.get('statuses'))})
+        elif url.path == BN_VALIDATOR_BALANCES_EP:
+            self.send_json({'data': [{'index': record['index'], 'balance': record['balance']}
+                for record in validator_set.find(body, None)]})
+        else:
+            self.send_json({'message': 'Not found'}, status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+class BeaconApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, validator_set, synced):
+        super().__init__(address, BeaconApiHandler)
+        self.validator_set = validator_set
+        self.synced = synced
+        self.post_requests = 0
+
+def main():
+    parser = argparse.ArgumentParser(description='eth-wizard stand-in beacon node API')
+    parser.add_argument('--active', type=int, default=20000,
+        help='number of active validators')
+    parser.add_argument('--pending', type=int, default=300,
+        help='number of validators in the join queue')
+    parser.add_argument('--keys', type=int, default=250,
+        help='number of wizard keys in the state')
+    parser.add_argument('--missing', type=int, default=0,
+        help='number of wizard keys not in the state yet')
+    parser.add_argument('--not-synced', action='store_true',
+        help='report the stand-in node as syncing')
+    parser.add_argument('--port', type=int, default=0,
+        help='port for the stand-in node')
+    parser.add_argument('--serve', action='store_true',
+        help='only serve the stand-in node')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    log = logging.getLogger('beacon_api')
+
+    validator_set = ValidatorSet(args.active, args.pending)
+    server = BeaconApiServer(('127.0.0.1', args.port), validator_set, not args.not_synced)
+    bn_base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    if args.serve:
+        print(f'Stand-in beacon node API on {bn_base_url}')
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    public_keys = [make_public_key(args.active + index) for index in range(args.keys)]
+    public_keys.extend(make_public_key(args.active + args.pending + index)
+        for index in range(args.missing))
+
+    start_time = time.perf_counter()
+    join_queue_info = get_join_queue_info(NETWORK_MAINNET, bn_base_url, log)
+    print(f'join queue: {join_queue_info} in {time.perf_counter() - start_time:.3f} s')
+
+    start_time = time.perf_counter()
+    validator_deposits = get_validator_deposits(NETWORK_MAINNET, public_keys, bn_base_url, log)
+    elapsed = time.perf_counter() - start_time
+
+    found = 0 if validator_deposits is False else len(validator_deposits)
+    print(f'deposits: {found} found for {len(public_keys)} keys in {elapsed:.3f} s with '
+        f'{server.post_requests} POST requests')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
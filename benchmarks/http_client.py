@@ -0,0 +1,125 @@
+# HTTP client benchmark for eth-wizard
+#
+# Simulates the verification loops that poll the local execution client JSON-RPC endpoint
+# (eth_syncing on 127.0.0.1:8545) against a local stand-in server. Compares the module-level
+# httpx functions, which open a new connection for each request, with the shared pooled client
+# from ethwizard.platforms.httpclient. The server counts the connections it accepts.
+#
+# --connect-delay adds a delay to each new connection to stand for a TCP and TLS handshake on a
+# remote host.
+#
+# Usage:
+#   python benchmarks/http_client.py --requests 200 --connect-delay 20
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import httpx
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ethwizard.platforms import httpclient
+
+class JsonRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length))
+
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'id': request.get('id', 1),
+            'result': False
+        }).encode('utf8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handler, connect_delay):
+        super().__init__(address, handler)
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        if self.connect_delay > 0:
+            time.sleep(self.connect_delay)
+        super().process_request(request, client_address)
+
+def run_loop(server, post, url, requests):
+    # Poll eth_syncing like the verification loops do and return the latencies in ms
+
+    data = {
+        'jsonrpc': '2.0',
+        'method': 'eth_syncing',
+        'params': [],
+        'id': 1
+    }
+
+    with server.lock:
+        server.connections = 0
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = post(url, json=data)
+        response.json()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    return samples, server.connections
+
+def report(name, samples, connections):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f'{name:<22} connections: {connections:5d}  median: {statistics.median(samples):7.3f} ms'
+        f'  p95: {p95:7.3f} ms  total: {sum(samples):9.1f} ms')
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='eth-wizard HTTP client benchmark')
+    parser.add_argument('--requests', type=int, default=200,
+        help='number of requests per client')
+    parser.add_argument('--connect-delay', type=float, default=0.0,
+        help='delay in ms added to each new connection')
+    args = parser.parse_args()
+
+    server = CountingServer(('127.0.0.1', 0), JsonRpcHandler, args.connect_delay / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    module_samples, module_connections = run_loop(server, httpx.post, url, args.requests)
+    module_median = report('httpx module functions', module_samples, module_connections)
+
+    shared_samples, shared_connections = run_loop(server, httpclient.post, url, args.requests)
+    shared_median = report('shared client', shared_samples, shared_connections)
+
+    if shared_median > 0:
+        print(f'shared client median latency is {module_median / shared_median:.1f}x lower with '
+            f'{module_connections - shared_connections} fewer connections')
+
+    httpclient.close_client()
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Platform detection benchmark for eth-wizard
+#
+# Compares the latency of the different ways supported_platform() can find the Linux
+# distribution: parsing the os-release file, running lsb_release and using the cached result.
+#
+# Usage:
+#   python benchmarks/platform_detection.py --runs 20
+
+import argparse
+import statistics
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ethwizard.platforms import (
+    read_os_release,
+    run_lsb_release,
+    get_distribution_source_signature,
+    load_cached_distribution,
+    save_cached_distribution
+)
+
+def time_function(function, runs):
+    # Return the median latency in milliseconds and the last result of function
+
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    return statistics.median(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description='eth-wizard platform detection benchmark')
+    parser.add_argument('--runs', type=int, default=10, help='number of runs per method')
+    args = parser.parse_args()
+
+    os_release_ms, os_release_result = time_function(read_os_release, args.runs)
+    print(f'os-release:  {os_release_ms:8.3f} ms  {os_release_result}')
+
+    lsb_release_ms, lsb_release_result = time_function(run_lsb_release, args.runs)
+    print(f'lsb_release: {lsb_release_ms:8.3f} ms  {lsb_release_result}')
+
+    distribution = os_release_result or lsb_release_result
+    if distribution is not None and save_cached_distribution(
+        get_distribution_source_signature(), distribution):
+
+        cached_ms, cached_result = time_function(
+            lambda: load_cached_distribution(get_distribution_source_signature()), args.runs)
+        print(f'cached:      {cached_ms:8.3f} ms  {cached_result}')
+    else:
+        print('cached:      unavailable (cannot write the cache file)')
+
+    if os_release_result is not None and lsb_release_result is not None and os_release_ms > 0:
+        print(f'os-release is {lsb_release_ms / os_release_ms:.0f}x faster than lsb_release')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# Segmented download benchmark for eth-wizard
+#
+# Serves a synthetic release archive from a local stand-in server that limits the throughput of
+# each connection, like the Github release CDN does, then downloads it with
+# download_file_segmented for each segment count. One segment is the single connection
+# download_file path. The SHA-256 of every download is checked against the served file.
+#
+# Usage:
+#   python benchmarks/segmented_download.py --size 128 --rate 16 --segments 1,2,4,8
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ethwizard.platforms import httpclient
+from ethwizard.platforms.download import download_file_segmented
+
+CHUNK_SIZE = 64 * 1024
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        data = self.server.data
+        size = len(data)
+        start = 0
+        end = size - 1
+
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        result = re.match(r'bytes=(\d+)-(\d*)$', range_header or '')
+        if result and (if_range is None or if_range == self.server.etag):
+            start = int(result.group(1))
+            if result.group(2):
+                end = min(int(result.group(2)), size - 1)
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+
+        self.send_header('ETag', self.server.etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        # Limit the throughput of this connection to rate bytes each second
+        started_at = time.perf_counter()
+        sent = 0
+        position = start
+        while position <= end:
+            chunk = data[position:min(position + CHUNK_SIZE, end + 1)]
+            self.wfile.write(chunk)
+            position += len(chunk)
+            sent += len(chunk)
+            delay = sent / self.server.rate - (time.perf_counter() - started_at)
+            if delay > 0:
+                time.sleep(delay)
+
+    def log_message(self, format, *args):
+        pass
+
+class ArchiveServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data, rate):
+        super().__init__(address, ArchiveHandler)
+        self.data = data
+        self.rate = rate
+        self.etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+
+def main():
+    parser = argparse.ArgumentParser(description='eth-wizard segmented download benchmark')
+    parser.add_argument('--size', type=int, default=128,
+        help='size of the archive in MiB')
+    parser.add_argument('--rate', type=float, default=16.0,
+        help='throughput limit of each connection in MiB/s')
+    parser.add_argument('--segments', default='1,2,4,8',
+        help='comma separated segment counts')
+    args = parser.parse_args()
+
+    data = os.urandom(args.size * 1024 * 1024)
+    expected = hashlib.sha256(data).hexdigest()
+
+    server = ArchiveServer(('127.0.0.1', 0), data, args.rate * 1024 * 1024)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{server.server_address[1]}/teku.zip'
+    download_path = Path(tempfile.mkdtemp(prefix='ethwizard-segmented-'))
+
+    try:
+        baseline = None
+        for segments in [int(value) for value in args.segments.split(',')]:
+            file_path = download_path.joinpath(f'teku-{segments}.zip')
+
+            start_time = time.perf_counter()
+            file_hash = download_file_segmented(url, file_path, segments=segments)
+            elapsed = time.perf_counter() - start_time
+
+            if file_hash.hexdigest() != expected:
+                print(f'{segments} segments: checksum mismatch')
+                return
+
+            if baseline is None:
+                baseline = elapsed
+
+            throughput = args.size / elapsed
+            print(f'{segments:2d} segments: {elapsed:7.2f} s  {throughput:7.1f} MiB/s  '
+                f'speedup: {baseline / elapsed:4.1f}x')
+
+            file_path.unlink()
+    finally:
+        shutil.rmtree(download_path, ignore_errors=True)
+        httpclient.close_client()
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Startup benchmark for eth-wizard
+#
+# Measures the time it takes to import the modules loaded before the first dialog and the
+# resident memory of the interpreter afterward. Each measurement runs in a fresh interpreter
+# with bytecode caching disabled to mimic the first launch of a zipapp bundle.
+#
+# Usage:
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --ref baseline     (compare against a git revision)
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+
+PROJECT_PATH = Path(__file__).resolve().parent.parent
+
+MEASURE_SCRIPT = '''
+import json
+import resource
+import time
+
+start = time.perf_counter()
+import ethwizard.constants
+constants_time = time.perf_counter() - start
+
+import ethwizard.platforms.ubuntu.common
+import ethwizard.wizard
+total_time = time.perf_counter() - start
+
+print(json.dumps({
+    'constants_ms': constants_time * 1000.0,
+    'total_ms': total_time * 1000.0,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+}))
+'''
+
+def measure(tree_path, runs):
+    # Measure import time and memory usage for the eth-wizard tree found in tree_path
+
+    env = os.environ.copy()
+    env['PYTHONPATH'] = str(tree_path)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    samples = []
+    for _ in range(runs):
+        process_result = subprocess.run([sys.executable, '-B', '-c', MEASURE_SCRIPT],
+            capture_output=True, text=True, env=env, cwd=str(tree_path))
+        if process_result.returncode != 0:
+            raise RuntimeError(f'Measure script failed for {tree_path}:\n'
+                f'{process_result.stderr}')
+        samples.append(json.loads(process_result.stdout))
+
+    return {
+        key: statistics.median(sample[key] for sample in samples)
+        for key in samples[0].keys()
+    }
+
+def export_ref(ref, target_path):
+    # Export the ethwizard package from a git revision into target_path
+
+    archive = subprocess.run(['git', 'archive', ref, 'ethwizard'], capture_output=True,
+        cwd=str(PROJECT_PATH), check=True)
+    subprocess.run(['tar', 'x', '-C', str(target_path)], input=archive.stdout, check=True)
+
+def print_result(label, result):
+    print(f'{label:>10}: constants {result["constants_ms"]:8.1f} ms, '
+        f'total {result["total_ms"]:8.1f} ms, max RSS {result["maxrss_kb"] / 1024.0:7.1f} MiB')
+
+def main():
+    parser = argparse.ArgumentParser(description='eth-wizard startup benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs per tree')
+    parser.add_argument('--ref', help='git revision to compare against')
+    args = parser.parse_args()
+
+    current = measure(PROJECT_PATH, args.runs)
+
+    if args.ref is None:
+        print_result('current', current)
+        return
+
+    temp_path = Path(tempfile.mkdtemp(prefix='ethwizard-bench-'))
+    try:
+        export_ref(args.ref, temp_path)
+        reference = measure(temp_path, args.runs)
+    finally:
+        shutil.rmtree(temp_path)
+
+    print_result(args.ref, reference)
+    print_result('current', current)
+
+    for key, label in (('total_ms', 'import time'), ('maxrss_kb', 'max RSS')):
+        if reference[key] > 0:
+            change = (current[key] - reference[key]) / reference[key] * 100.0
+            print(f'{label} change: {change:+.1f}%')
+
+if __name__ == '__main__':
+    main()
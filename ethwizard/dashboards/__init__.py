@@ -0,0 +1,12 @@
+import gzip
+import pkgutil
+
+def load_grafana_dashboard(name: str) -> str:
+    # Load a Grafana dashboard from the compressed JSON files shipped with this package.
+    # Dashboards are only needed when installing Grafana so they are not kept in memory.
+
+    data = pkgutil.get_data(__name__, f'{name}.json.gz')
+    if data is None:
+        raise FileNotFoundError(f'Grafana dashboard {name} not found in {__name__}')
+
+    return gzip.decompress(data).decode('utf8')
@@ -6,9 +6,18 @@ import ctypes
 import sys
 import codecs
 import base64
+import importlib
+import json
+import threading
 
 from packaging import version
 
+from ethwizard.constants import (
+    LINUX_SAVE_DIRECTORY,
+    PLATFORM_CACHE_FILE,
+    OS_RELEASE_PATHS
+)
+
 PLATFORM_UBUNTU = 'Ubuntu'
 PLATFORM_WINDOWS10 = 'Windows10'
 
@@ -21,38 +30,22 @@ def supported_platform():
         uname.machine.lower() == 'x86_64'):
         # We are on Linux amd64
 
-        # Obtain distribution information with lsb_release
-        process_result = subprocess.run([
-            'lsb_release', '-a'
-            ], capture_output=True, text=True)
-        
-        if process_result.returncode != 0:
-            print(f'Unable to run lsb_release. Return code {process_result.returncode}')
-            print(f'{process_result.stdout}\n{process_result.stderr}')
+        distribution = get_linux_distribution()
+        if distribution is None:
             return False
-        
-        process_output = process_result.stdout
 
-        lsb_distributor_id = None
-        lsb_release = None
-
-        result = re.search(r'Distributor ID:\s*(.+)', process_output)
-        if result:
-            lsb_distributor_id = result.group(1).strip()
-        result = re.search(r'Release:\s*(.+)', process_output)
-        if result:
-            lsb_release = result.group(1).strip()
-        
-        if lsb_distributor_id is None or lsb_release is None:
-            print('Unable to parse Distributor ID or Release from lsb_release output.')
-            print(f'{process_output}')
-            return False
+        distributor_id, release = distribution
 
-        if lsb_distributor_id == 'Ubuntu':
+        # os-release uses lowercase ids (ubuntu) while lsb_release uses Ubuntu
+        if distributor_id.lower() == 'ubuntu':
             base_version = version.parse('20.04')
 
-            if version.parse(lsb_release) >= base_version:
-                return PLATFORM_UBUNTU
+            try:
+                if version.parse(release) >= base_version:
+                    return PLATFORM_UBUNTU
+            except version.InvalidVersion:
+                print(f'Unable to parse distribution release {release}.')
+                return False
     elif (
         uname.system == 'Windows' and
         (uname.release == '10' or uname.release == '11') and
@@ -62,6 +55,153 @@ def supported_platform():
 
     return False
 
+def get_linux_distribution():
+    # Return the (distributor id, release) tuple for the current Linux distribution.
+    # The os-release file is used first. lsb_release is only used when it is missing or
+    # incomplete. The result is cached next to the wizard state file.
+
+    source_signature = get_distribution_source_signature()
+
+    cached_distribution = load_cached_distribution(source_signature)
+    if cached_distribution is not None:
+        return cached_distribution
+
+    distribution = read_os_release()
+    if distribution is None:
+        distribution = run_lsb_release()
+    if distribution is None:
+        return None
+
+    save_cached_distribution(source_signature, distribution)
+
+    return distribution
+
+def get_distribution_source_signature():
+    # Return a signature of the files describing the distribution. The cached result is only
+    # valid while this signature is unchanged (OS upgrade, etc.)
+
+    signature = []
+    for source_path in OS_RELEASE_PATHS + ['/etc/lsb-release']:
+        try:
+            source_stat = os.stat(source_path)
+            signature.append([source_path, source_stat.st_mtime_ns, source_stat.st_size])
+        except OSError:
+            signature.append([source_path, None, None])
+
+    return signature
+
+def load_cached_distribution(source_signature):
+    # Load the cached distribution if it still matches the source signature
+
+    cache_path = os.path.join(LINUX_SAVE_DIRECTORY, PLATFORM_CACHE_FILE)
+
+    try:
+        with open(cache_path, 'r', encoding='utf8') as cache_file:
+            cached_data = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        type(cached_data) is not dict or
+        cached_data.get('signature') != source_signature or
+        not cached_data.get('distributor_id') or
+        not cached_data.get('release')
+    ):
+        return None
+
+    return cached_data['distributor_id'], cached_data['release']
+
+def save_cached_distribution(source_signature, distribution):
+    # Save the detected distribution in the cache file. We might not have the permissions to
+    # write there yet (before the super user check) and that is fine.
+
+    distributor_id, release = distribution
+
+    cache_data = {
+        'signature': source_signature,
+        'distributor_id': distributor_id,
+        'release': release
+    }
+
+    try:
+        os.makedirs(LINUX_SAVE_DIRECTORY, exist_ok=True)
+        cache_path = os.path.join(LINUX_SAVE_DIRECTORY, PLATFORM_CACHE_FILE)
+        temp_path = cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf8') as cache_file:
+            json.dump(cache_data, cache_file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        return False
+
+    return True
+
+def read_os_release():
+    # Obtain distribution information from the os-release file
+
+    for os_release_path in OS_RELEASE_PATHS:
+        try:
+            with open(os_release_path, 'r', encoding='utf8') as os_release_file:
+                os_release_content = os_release_file.read()
+        except OSError:
+            continue
+
+        os_release = {}
+        for line in os_release_content.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+                value = value[1:-1]
+            os_release[key.strip()] = value
+
+        distributor_id = os_release.get('ID')
+        release = os_release.get('VERSION_ID')
+
+        if not distributor_id or not release:
+            # Incomplete file, try the next one
+            continue
+
+        return distributor_id, release
+
+    return None
+
+def run_lsb_release():
+    # Obtain distribution information with lsb_release
+
+    try:
+        process_result = subprocess.run([
+            'lsb_release', '-a'
+            ], capture_output=True, text=True)
+    except FileNotFoundError:
+        print('Unable to find lsb_release.')
+        return None
+
+    if process_result.returncode != 0:
+        print(f'Unable to run lsb_release. Return code {process_result.returncode}')
+        print(f'{process_result.stdout}\n{process_result.stderr}')
+        return None
+    
+    process_output = process_result.stdout
+
+    lsb_distributor_id = None
+    lsb_release = None
+
+    result = re.search(r'Distributor ID:\s*(.+)', process_output)
+    if result:
+        lsb_distributor_id = result.group(1).strip()
+    result = re.search(r'Release:\s*(.+)', process_output)
+    if result:
+        lsb_release = result.group(1).strip()
+    
+    if lsb_distributor_id is None or lsb_release is None:
+        print('Unable to parse Distributor ID or Release from lsb_release output.')
+        print(f'{process_output}')
+        return None
+
+    return lsb_distributor_id, lsb_release
+
 def has_su_perm(platform):
     # Check to see if the script has super user (root, sudo or elevated) permissions
 
@@ -175,4 +315,68 @@ def enter_maintenance(platform, context):
             enter_maintenance as windows10_enter_maintenance )
         return windows10_enter_maintenance(context)
     
-    return False
\ No newline at end of file
+    return False
+
+def preload_platform_modules(platform):
+    # Import the large platform modules in a background thread. The first dialog can be shown
+    # without waiting for them and they are usually ready once the user answers it. The
+    # preloaded modules must not share any module with the dialogs that is not imported yet.
+
+    module_names = ['ethwizard.platforms.common']
+
+    if platform == PLATFORM_UBUNTU:
+        module_names.extend([
+            'ethwizard.platforms.ubuntu.install',
+            'ethwizard.platforms.ubuntu.maintain'
+        ])
+
+    elif platform == PLATFORM_WINDOWS10:
+        module_names.extend([
+            'ethwizard.platforms.windows.install',
+            'ethwizard.platforms.windows.maintain'
+        ])
+
+    else:
+        return False
+
+    # A dialog imports the terminal input and output modules the first time it runs. They are
+    # imported here, before the preload starts, so the dialog shown while the platform modules
+    # are preloaded never imports a module for the first time concurrently with the preload.
+    ui_module_names = [
+        'prompt_toolkit.shortcuts',
+        'prompt_toolkit.key_binding.bindings.search',
+        'prompt_toolkit.patch_stdout'
+    ]
+
+    if os.name == 'nt':
+        ui_module_names.extend([
+            'prompt_toolkit.input.win32',
+            'prompt_toolkit.output.win32',
+            'prompt_toolkit.output.windows10',
+            'prompt_toolkit.output.conemu'
+        ])
+    else:
+        ui_module_names.extend([
+            'prompt_toolkit.input.vt100',
+            'prompt_toolkit.output.vt100'
+        ])
+
+    for module_name in ui_module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+    def preload():
+        for module_name in module_names:
+            try:
+                importlib.import_module(module_name)
+            except Exception:
+                # Any import error will be raised again when the module is really needed
+                return
+
+    preload_thread = threading.Thread(target=preload, name='preload_platform_modules',
+        daemon=True)
+    preload_thread.start()
+
+    return preload_thread
@@ -0,0 +1,499 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+from secrets import token_hex
+
+from pathlib import Path
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from ethwizard.platforms.download import (
+    download_file,
+    download_file_segmented,
+    iter_download,
+    DownloadError,
+    DownloadCancelled
+)
+
+from ethwizard.platforms.metrics import get_current_metrics, use_metrics
+
+from ethwizard.platforms.progress import (
+    get_current_reporter,
+    use_reporter,
+    track_download,
+    record_stored_artifact
+)
+
+from ethwizard.constants import (
+    ARTIFACT_STORE_DIRECTORY,
+    ARTIFACT_STORE_INDEX_FILE,
+    ARTIFACT_STORE_MAX_SIZE,
+    ASSET_DOWNLOAD_CONCURRENCY
+)
+
+# Local artifact store shared by the install and the upgrade functions. Downloaded release files
+# are stored once by SHA-256 content hash under objects/ and found with a key made of the release
+# tag and the file name. The index keeps the key entries with their size and last use time. The
+# least recently used artifacts are evicted when the store grows over its maximum size.
+#
+# Artifacts are copied out of the store rather than linked since callers extract, move, chmod or
+# remove their downloaded files. The copy is hashed and checked against the object hash so a
+# damaged object is never used. Archives extracted while they are downloaded are read from the
+# store, or added to it once verified, with iter_artifact. The assets of a release are
+# downloaded together with download_assets. Files failing their checksum or signature
+# verification are removed from the store with discard_artifact or discard_assets.
+#
+# Every download is tracked with track_download so its progress reaches the current reporter and
+# its numbers are recorded in the download metrics of the current step.
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def get_artifact_key(url: str, release_tag: Optional[str]) -> str:
+    # Without a release tag the URL must point to a versioned file
+    if release_tag is None:
+        return url
+    file_name = url.rstrip('/').split('/')[-1]
+    return f'{release_tag}/{file_name}'
+
+def copy_and_hash(source: Path, destination: Path):
+    # Copy source to destination and return the SHA-256 hash object of the copied bytes
+
+    file_hash = hashlib.sha256()
+    temp_path = destination.with_name(destination.name + '.tmp')
+
+    with open(source, 'rb') as input_file, open(temp_path, 'wb') as output_file:
+        while True:
+            data = input_file.read(COPY_BUFFER_SIZE)
+            if not data:
+                break
+            output_file.write(data)
+            file_hash.update(data)
+
+    os.replace(temp_path, destination)
+    return file_hash
+
+class ArtifactStore():
+
+    def __init__(self, root: Path, max_size: int = ARTIFACT_STORE_MAX_SIZE):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.index_path = self.root.joinpath(ARTIFACT_STORE_INDEX_FILE)
+        self._entries = None
+        self._lock = threading.RLock()
+
+    def get_object_path(self, sha256: str) -> Path:
+        return self.root.joinpath('objects', sha256[:2], sha256)
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is not None:
+            return self._entries
+
+        entries = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf8') as index_file:
+                index = json.load(index_file)
+            if isinstance(index, dict) and isinstance(index.get('entries'), dict):
+                entries = index['entries']
+        except (OSError, ValueError):
+            pass
+
+        self._entries = entries
+        return entries
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf8') as index_file:
+            json.dump({'entries': self._entries}, index_file)
+        os.replace(temp_path, self.index_path)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            if not self.get_object_path(entry['sha256']).is_file():
+                self._remove_entry(key)
+                self._save()
+                return None
+            return entry
+
+    def take(self, key: str, file_path: Path):
+        # Copy the artifact for key to file_path and return its SHA-256 hash object. Return None
+        # when the artifact is not stored or when the stored object is damaged.
+
+        with self._lock:
+            entry = self.get(key)
+            if entry is None:
+                return None
+
+            object_path = self.get_object_path(entry['sha256'])
+            file_hash = copy_and_hash(object_path, file_path)
+
+            if file_hash.hexdigest() != entry['sha256']:
+                file_path.unlink()
+                self.discard(key)
+                return None
+
+            self.touch(key)
+            return file_hash
+
+    def put(self, key: str, url: str, file_path: Path, sha256: str):
+        # Store file_path, whose SHA-256 hex digest is sha256, for key
+
+        with self._lock:
+            object_path = self.get_object_path(sha256)
+            if not object_path.is_file():
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                file_hash = copy_and_hash(file_path, object_path)
+                if file_hash.hexdigest() != sha256:
+                    object_path.unlink()
+                    return
+
+            self._add_entry(key, url, sha256)
+
+    def get_temp_path(self) -> Path:
+        # Path for an object being written, on the same file system as the objects
+        temp_directory = self.root.joinpath('tmp')
+        temp_directory.mkdir(parents=True, exist_ok=True)
+        return temp_directory.joinpath(token_hex(8))
+
+    def add_object(self, key: str, url: str, temp_path: Path, sha256: str):
+        # Move temp_path, a complete file whose SHA-256 hex digest is sha256, in the store
+
+        with self._lock:
+            object_path = self.get_object_path(sha256)
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, object_path)
+            self._add_entry(key, url, sha256)
+
+    def touch(self, key: str):
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                entry['last_used'] = time.time()
+                self._save()
+
+    def discard(self, key: str):
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                self._remove_entry(key)
+                self._remove_unused_object(entry['sha256'])
+                self._save()
+
+    def _add_entry(self, key: str, url: str, sha256: str):
+        self._load()[key] = {
+            'sha256': sha256,
+            'size': self.get_object_path(sha256).stat().st_size,
+            'url': url,
+            'last_used': time.time()
+        }
+
+        self._evict(keep=key)
+        self._save()
+
+    def get_size(self) -> int:
+        # Total size of the stored objects, an object shared by several keys counts once
+        with self._lock:
+            return sum({entry['sha256']: entry['size']
+                for entry in self._load().values()}.values())
+
+    def _evict(self, keep: Optional[str] = None):
+        # Remove the least recently used artifacts until the store fits in its maximum size
+
+        entries = self._load()
+        for key in sorted(entries, key=lambda key: entries[key]['last_used']):
+            if self.get_size() <= self.max_size:
+                break
+            if key == keep:
+                continue
+            sha256 = entries[key]['sha256']
+            self._remove_entry(key)
+            self._remove_unused_object(sha256)
+
+    def _remove_entry(self, key: str):
+        self._load().pop(key, None)
+
+    def _remove_unused_object(self, sha256: str):
+        if any(entry['sha256'] == sha256 for entry in self._load().values()):
+            return
+        try:
+            self.get_object_path(sha256).unlink()
+        except OSError:
+            # Missing, or open for reading on Windows
+            pass
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_artifact_store(download_path: Path) -> ArtifactStore:
+    # Return the artifact store kept in the downloads directory download_path
+
+    root = Path(download_path).joinpath(ARTIFACT_STORE_DIRECTORY)
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = ArtifactStore(root)
+            _stores[root] = store
+        return store
+
+def download_artifact(url: str, file_path, log=None, release_tag: Optional[str] = None,
+    download_path: Optional[Path] = None, segmented: bool = False, **kwargs):
+    # Put the release file at url in file_path and return its SHA-256 hash object. The file is
+    # taken from the artifact store when it was already downloaded for release_tag, otherwise it
+    # is downloaded with download_file (or download_file_segmented when segmented is true) and
+    # added to the store. Without release_tag, url must point to a versioned file. The store is
+    # in download_path, the directory of file_path by default. Raise DownloadError on failure.
+
+    file_path = Path(file_path)
+    if download_path is None:
+        download_path = file_path.parent
+
+    store = get_artifact_store(download_path)
+    key = get_artifact_key(url, release_tag)
+
+    start_time = time.monotonic()
+    try:
+        file_hash = store.take(key, file_path)
+    except OSError as exception:
+        if log is not None:
+            log.warning(f'Unable to use the artifact store for {file_path.name}. {exception}')
+        file_hash = None
+
+    if file_hash is not None:
+        if log is not None:
+            log.info(f'Using {file_path.name} from the artifact store.')
+        record_stored_artifact(file_path.name, url, file_path.stat().st_size, start_time)
+        return file_hash
+
+    progress = kwargs.pop('progress', None)
+    with track_download(file_path.name, url, log, progress=progress) as download_progress:
+        if segmented:
+            file_hash = download_file_segmented(url, file_path, log=log,
+                progress=download_progress.update, **kwargs)
+        else:
+            file_hash = download_file(url, file_path, log=log,
+                progress=download_progress.update, **kwargs)
+
+    try:
+        store.put(key, url, file_path, file_hash.hexdigest())
+    except OSError as exception:
+        if log is not None:
+            log.warning(f'Unable to add {file_path.name} to the artifact store. {exception}')
+
+    return file_hash
+
+class AssetGroupCancel():
+    # Cancellation flag of an asset group, set when one of its downloads failed or when the
+    # caller cancelled event is set
+
+    def __init__(self, cancelled: Optional[threading.Event] = None):
+        self._event = threading.Event()
+        self._cancelled = cancelled
+
+    def set(self):
+        self._event.set()
+
+    def is_set(self) -> bool:
+        if self._cancelled is not None and self._cancelled.is_set():
+            return True
+        return self._event.is_set()
+
+def download_assets(assets: Dict[str, dict], download_path: Path, log=None,
+    release_tag: Optional[str] = None, cancelled: Optional[threading.Event] = None,
+    segmented: Iterable[str] = (), artifact_path: Optional[Path] = None,
+    **kwargs) -> Tuple[Dict[str, Path], Dict[str, object]]:
+    # Download the assets of a release group (binary, checksums, signature, ...) concurrently
+    # with download_artifact. assets is a dict of role to asset dict ({'file_name': ...,
+    # 'file_url': ...}). The files are put in download_path and the artifact store in
+    # artifact_path, download_path by default. The roles in segmented are downloaded with
+    # segments. Return the dicts of file paths and SHA-256 hash objects by role. When one asset
+    # fails, the other downloads are cancelled and the first error is raised as DownloadError.
+
+    download_path = Path(download_path)
+    if artifact_path is None:
+        artifact_path = download_path
+
+    stop = AssetGroupCancel(cancelled)
+    segmented = set(segmented)
+
+    # The downloads run on other threads, they report to the metrics and the reporter of this
+    # one
+    metrics = get_current_metrics()
+    reporter = get_current_reporter()
+
+    files = {
+        role: download_path.joinpath(asset['file_name'])
+        for role, asset in assets.items()
+    }
+
+    def download_asset(role):
+        asset = assets[role]
+        if stop.is_set():
+            raise DownloadCancelled(f'Download of {asset["file_url"]} cancelled')
+
+        if log is not None:
+            log.info(f'Downloading {asset["file_name"]} from {asset["file_url"]} ...')
+
+        with use_metrics(metrics), use_reporter(reporter):
+            return download_artifact(asset['file_url'], files[role], log,
+                release_tag=release_tag, download_path=artifact_path,
+                segmented=role in segmented, cancelled=stop, **kwargs)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(assets), ASSET_DOWNLOAD_CONCURRENCY)),
+            thread_name_prefix='download-asset') as executor:
+            futures = {role: executor.submit(download_asset, role) for role in assets}
+
+            done, not_done = wait(futures.values(), return_when=FIRST_EXCEPTION)
+            if len(not_done) > 0:
+                # Stop the other downloads once one of them failed
+                stop.set()
+                wait(not_done)
+
+            for future in futures.values():
+                exception = future.exception()
+                if exception is not None and not isinstance(exception, DownloadCancelled):
+                    raise exception
+            if stop.is_set():
+                raise DownloadCancelled('Download of the release assets cancelled')
+
+            hashes = {role: future.result() for role, future in futures.items()}
+    except BaseException:
+        for file_path in files.values():
+            try:
+                file_path.unlink()
+            except FileNotFoundError:
+                pass
+        raise
+
+    return files, hashes
+
+class ArtifactChunks():
+    # Bytes of a release file returned by iter_artifact. A downloaded file is only added to the
+    # artifact store with commit(), once the caller has verified it. discard() drops it, and
+    # removes it from the store when it was taken from there, after a failed verification.
+    # close() drops a downloaded file without touching the store.
+
+    def __init__(self, url: str, download_path: Path, log=None,
+        release_tag: Optional[str] = None, **kwargs):
+        self.url = url
+        self.log = log
+        self.kwargs = kwargs
+        self.store = get_artifact_store(download_path)
+        self.key = get_artifact_key(url, release_tag)
+        self.file_name = url.rstrip('/').split('/')[-1]
+        self.from_store = False
+        self._temp_path = None
+        self._hexdigest = None
+
+    def __iter__(self):
+        entry = self.store.get(self.key)
+        if entry is not None:
+            self.from_store = True
+            yield from self._iter_stored(entry)
+            return
+
+        yield from self._iter_download()
+
+    def _iter_stored(self, entry: dict):
+        if self.log is not None:
+            self.log.info(f'Using {self.file_name} from the artifact store.')
+
+        file_hash = hashlib.sha256()
+        with track_download(self.file_name, self.url, source='store') as download_progress:
+            download_progress.update(0, entry['size'])
+            with open(self.store.get_object_path(entry['sha256']), 'rb') as object_file:
+                while True:
+                    data = object_file.read(COPY_BUFFER_SIZE)
+                    if not data:
+                        break
+                    file_hash.update(data)
+                    yield data
+                    download_progress.update(download_progress.done + len(data))
+
+            if file_hash.hexdigest() != entry['sha256']:
+                self.store.discard(self.key)
+                raise DownloadError(f'The stored artifact for {self.url} is damaged.')
+
+    def _iter_download(self):
+        kwargs = dict(self.kwargs)
+        self._temp_path = self.store.get_temp_path()
+        try:
+            file_hash = hashlib.sha256()
+            progress = kwargs.pop('progress', None)
+            with track_download(self.file_name, self.url, self.log,
+                progress=progress) as download_progress:
+                with open(self._temp_path, 'wb') as temp_file:
+                    for data in iter_download(self.url, log=self.log,
+                        progress=download_progress.update, **kwargs):
+                        temp_file.write(data)
+                        file_hash.update(data)
+                        yield data
+        except BaseException:
+            self.close()
+            raise
+
+        self._hexdigest = file_hash.hexdigest()
+
+    def commit(self):
+        # The file was verified, keep it in the store
+        try:
+            if self.from_store:
+                self.store.touch(self.key)
+            elif self._hexdigest is not None:
+                self.store.add_object(self.key, self.url, self._temp_path, self._hexdigest)
+                self._hexdigest = None
+        except OSError as exception:
+            if self.log is not None:
+                self.log.warning(f'Unable to add {self.file_name} to the artifact store. '
+                    f'{exception}')
+        self.close()
+
+    def discard(self):
+        # The file failed its verification, never use it again
+        self.close()
+        if self.from_store:
+            self.store.discard(self.key)
+
+    def close(self):
+        self._hexdigest = None
+        if self._temp_path is not None:
+            try:
+                self._temp_path.unlink()
+            except FileNotFoundError:
+                pass
+            self._temp_path = None
+
+def iter_artifact(url: str, download_path: Path, log=None, release_tag: Optional[str] = None,
+    **kwargs) -> ArtifactChunks:
+    # Return the bytes of the release file at url without writing it in the downloads
+    # directory. The bytes come from the artifact store in download_path when the file was
+    # already downloaded for release_tag, from url otherwise. A downloaded file is added to the
+    # store by commit() once it is verified, extract_archive ties it to the StagedExtraction
+    # commit() and abort(). Iterating raises DownloadError on failure.
+
+    return ArtifactChunks(url, download_path, log, release_tag=release_tag, **kwargs)
+
+def discard_artifact(url: str, download_path: Path, release_tag: Optional[str] = None):
+    # Remove the release file at url from the artifact store in download_path after it failed
+    # its verification (checksum or signature) so it is downloaded again next time
+
+    try:
+        get_artifact_store(download_path).discard(get_artifact_key(url, release_tag))
+    except OSError:
+        pass
+
+def discard_assets(assets: Dict[str, dict], download_path: Path,
+    release_tag: Optional[str] = None):
+    # Remove the assets of a release group downloaded with download_assets from the artifact
+    # store in download_path after one of them failed its verification
+
+    for asset in assets.values():
+        discard_artifact(asset['file_url'], download_path, release_tag=release_tag)
@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+import httpx
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.constants import (
+    BATCH_MAX_CONCURRENCY,
+    BATCH_RETRY_COUNT,
+    BATCH_BACKOFF_BASE,
+    BATCH_BACKOFF_MAX
+)
+
+# Batch lookup engine for APIs taking many keys per request, like the beaconcha.in validator
+# endpoints. Keys are split in API sized chunks and chunks are fetched concurrently. Requests go
+# through a token bucket so the API rate limit is respected, and failed chunks are retried with
+# an exponential backoff and full jitter. The results of every chunk are merged in a single dict
+# keyed by lookup key.
+
+class BatchRetryError(Exception):
+    # Raised by a fetch function for a failure worth retrying. retry_after is the delay
+    # requested by the server, if any.
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class BatchLookupError(Exception):
+    pass
+
+class TokenBucket():
+    # Asynchronous token bucket. rate tokens are added each second up to capacity.
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1.0:
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1.0
+
+def get_backoff_delay(attempt: int, base: float = BATCH_BACKOFF_BASE,
+    maximum: float = BATCH_BACKOFF_MAX) -> float:
+    # Exponential backoff with full jitter for the attempt (starting at 0)
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+def get_retry_after(response: httpx.Response) -> Optional[float]:
+    # Delay in seconds from the Retry-After header, only the delta seconds form is supported
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def split_chunks(keys: List[Any], chunk_size: int) -> List[List[Any]]:
+    return [keys[index:index + chunk_size] for index in range(0, len(keys), chunk_size)]
+
+def run_batch_lookup(keys: List[Any],
+    fetch_chunk: Callable[[httpx.AsyncClient, List[Any]], Awaitable[Dict[Any, Any]]],
+    chunk_size: int, rate: float, burst: float, log,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    retry_count: int = BATCH_RETRY_COUNT) -> Dict[Any, Any]:
+    # Look up keys in chunks of chunk_size with fetch_chunk and return the merged results.
+    # fetch_chunk is called with the async client and a chunk of keys. It returns a dict with
+    # the results for the chunk and raises BatchRetryError when the chunk should be retried.
+    # rate is the number of requests allowed each second and burst the bucket capacity. Raise
+    # BatchLookupError when a chunk still fails after retry_count retries.
+
+    chunks = split_chunks(list(keys), chunk_size)
+
+    if len(chunks) == 0:
+        return {}
+
+    async def lookup_all():
+        bucket = TokenBucket(rate, burst)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def lookup_chunk(client, chunk_index, chunk):
+            attempt = 0
+            while True:
+                async with semaphore:
+                    await bucket.acquire()
+                    try:
+                        return await fetch_chunk(client, chunk)
+                    except BatchRetryError as exception:
+                        error = exception
+
+                if attempt >= retry_count:
+                    raise BatchLookupError(f'Chunk {chunk_index + 1} of {len(chunks)} failed '
+                        f'after {retry_count} retries. {error}')
+
+                delay = get_backoff_delay(attempt)
+                if error.retry_after is not None:
+                    delay = max(delay, error.retry_after)
+
+                attempt = attempt + 1
+                log.warning(f'Chunk {chunk_index + 1} of {len(chunks)} failed. {error} We will '
+                    f'retry in {delay:.1f} seconds (retry index = {attempt})')
+
+                await asyncio.sleep(delay)
+
+        async with httpclient.get_async_client() as client:
+            tasks = [asyncio.ensure_future(lookup_chunk(client, chunk_index, chunk))
+                for chunk_index, chunk in enumerate(chunks)]
+            try:
+                chunk_results = await asyncio.gather(*tasks)
+            except BaseException:
+                # Do not keep retrying the other chunks once one of them failed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        results = {}
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return results
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(lookup_all())
+    finally:
+        loop.close()
@@ -0,0 +1,243 @@
+import httpx
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.batch import (
+    run_batch_lookup,
+    BatchRetryError,
+    BatchLookupError
+)
+
+from ethwizard.constants import (
+    BN_SYNCING_EP,
+    BN_VALIDATORS_EP,
+    BN_VALIDATOR_BALANCES_EP,
+    BN_COMMITTEES_EP,
+    BN_API_CHUNK_SIZE,
+    BN_API_RETRY_COUNT,
+    BN_PENDING_VALIDATOR_STATUSES,
+    SLOTS_PER_EPOCH,
+    EPOCHS_PER_DAY,
+    MIN_PER_EPOCH_CHURN_LIMIT,
+    MAX_PER_EPOCH_ACTIVATION_CHURN_LIMIT,
+    CHURN_LIMIT_QUOTIENT
+)
+
+# Queries on a beacon node, usually the local one, with the standard beacon node API. Lookups
+# for many validators are batched with the batch lookup engine. A local node has no rate limit,
+# the rate only keeps it from being flooded.
+
+LOCAL_BN_API_RATE = 100.0
+
+headers = {
+    'accept': 'application/json'
+}
+
+def get_sync_status(bn_base_url, log):
+    # Return the syncing data from the beacon node or None
+
+    bn_query_url = bn_base_url + BN_SYNCING_EP
+
+    try:
+        response = httpclient.get(bn_query_url, headers=headers)
+    except httpx.RequestError as exception:
+        log.warning(f'Cannot connect to the beacon node on {bn_base_url}. {exception}')
+        return None
+
+    if response.status_code != 200:
+        log.warning(f'Unexpected status code {response.status_code} from {bn_query_url}.')
+        return None
+
+    try:
+        response_json = response.json()
+    except ValueError:
+        log.warning(f'Unexpected response from {bn_query_url}.')
+        return None
+
+    if not isinstance(response_json, dict) or not isinstance(response_json.get('data'), dict):
+        log.warning(f'Unexpected response from {bn_query_url}.')
+        return None
+
+    return response_json['data']
+
+def is_synced(sync_status):
+    # Return true if the beacon node is synced and can be trusted for the head state
+    return (
+        sync_status is not None and
+        sync_status.get('is_syncing') is False and
+        not sync_status.get('is_optimistic', False) and
+        not sync_status.get('el_offline', False)
+    )
+
+def _get_response_data(response, bn_query_url, allow_not_found=False):
+    if allow_not_found and response.status_code == 404:
+        return []
+
+    if response.status_code != 200:
+        raise BatchRetryError(f'Unexpected status code {response.status_code} from '
+            f'{bn_query_url}.')
+
+    try:
+        response_json = response.json()
+    except ValueError:
+        raise BatchRetryError(f'Unexpected response from {bn_query_url}.')
+
+    if not isinstance(response_json, dict) or not isinstance(response_json.get('data'), list):
+        raise BatchRetryError(f'Unexpected response from {bn_query_url}.')
+
+    return response_json['data']
+
+def get_validators(bn_base_url, ids, log, statuses=None):
+    # Return a dict with the validator records in the head state by public key (lower case).
+    # ids are public keys or validator indices. Validators that are not in the state yet are
+    # absent. Return False when the beacon node cannot be queried.
+
+    bn_query_url = bn_base_url + BN_VALIDATORS_EP
+
+    async def fetch_chunk(client, chunk):
+        body = {'ids': [str(id) for id in chunk]}
+        if statuses is not None:
+            body['statuses'] = statuses
+
+        try:
+            response = await client.post(bn_query_url, json=body, headers=headers)
+
+            if response.status_code == 405:
+                # Beacon nodes older than the POST endpoint only support GET
+                params = {'id': ','.join(body['ids'])}
+                if statuses is not None:
+                    params['status'] = ','.join(statuses)
+                response = await client.get(bn_query_url, params=params, headers=headers)
+        except httpx.RequestError as exception:
+            raise BatchRetryError(f'Exception {exception} when querying {bn_query_url}.')
+
+        data = _get_response_data(response, bn_query_url, allow_not_found=True)
+
+        return {
+            record['validator']['pubkey'].lower(): record
+            for record in data
+            if isinstance(record, dict) and 'validator' in record
+        }
+
+    try:
+        return run_batch_lookup(ids, fetch_chunk, BN_API_CHUNK_SIZE, LOCAL_BN_API_RATE,
+            LOCAL_BN_API_RATE, log, retry_count=BN_API_RETRY_COUNT)
+    except BatchLookupError as exception:
+        log.error(f'Unable to get the validators from the beacon node. {exception}')
+        return False
+
+def get_validator_balances(bn_base_url, indices, log):
+    # Return a dict with the balance in Gwei for each validator index. Return False when the
+    # beacon node cannot be queried.
+
+    bn_query_url = bn_base_url + BN_VALIDATOR_BALANCES_EP
+
+    async def fetch_chunk(client, chunk):
+        body = [str(index) for index in chunk]
+
+        try:
+            response = await client.post(bn_query_url, json=body, headers=headers)
+
+            if response.status_code == 405:
+                response = await client.get(bn_query_url, params={'id': ','.join(body)},
+                    headers=headers)
+        except httpx.RequestError as exception:
+            raise BatchRetryError(f'Exception {exception} when querying {bn_query_url}.')
+
+        data = _get_response_data(response, bn_query_url, allow_not_found=True)
+
+        return {
+            int(item['index']): int(item['balance'])
+            for item in data
+            if isinstance(item, dict) and 'index' in item and 'balance' in item
+        }
+
+    try:
+        return run_batch_lookup(indices, fetch_chunk, BN_API_CHUNK_SIZE, LOCAL_BN_API_RATE,
+            LOCAL_BN_API_RATE, log, retry_count=BN_API_RETRY_COUNT)
+    except BatchLookupError as exception:
+        log.error(f'Unable to get the validator balances from the beacon node. {exception}')
+        return False
+
+def get_active_validator_count(bn_base_url, head_slot, log):
+    # Estimate the number of active validators from the committees of a single slot. Every
+    # active validator is in exactly one committee per epoch, so the validators assigned to a
+    # slot are close to the active count divided by the slots per epoch. This avoids
+    # downloading the whole validator set.
+
+    bn_query_url = bn_base_url + BN_COMMITTEES_EP
+
+    try:
+        response = httpclient.get(bn_query_url, params={'slot': str(head_slot)},
+            headers=headers)
+    except httpx.RequestError as exception:
+        log.warning(f'Exception {exception} when querying {bn_query_url}.')
+        return None
+
+    try:
+        committees = _get_response_data(response, bn_query_url)
+    except BatchRetryError as exception:
+        log.warning(str(exception))
+        return None
+
+    slot_validators = sum(len(committee.get('validators', [])) for committee in committees
+        if isinstance(committee, dict))
+
+    if slot_validators == 0:
+        return None
+
+    return slot_validators * SLOTS_PER_EPOCH
+
+def get_churn_limit(active_validators):
+    # Validator activation churn limit for each epoch
+    churn_limit = max(MIN_PER_EPOCH_CHURN_LIMIT, active_validators // CHURN_LIMIT_QUOTIENT)
+    return min(churn_limit, MAX_PER_EPOCH_ACTIVATION_CHURN_LIMIT)
+
+def get_join_queue(bn_base_url, log, sync_status=None):
+    # Compute the join queue from the head state of a synced beacon node. Return a dict with
+    # validators_entering, active_validators, churn_limit and waiting_days or None.
+
+    if sync_status is None:
+        sync_status = get_sync_status(bn_base_url, log)
+
+    if not is_synced(sync_status):
+        return None
+
+    # The pending validators are filtered by status only, there is no list of ids to batch
+    bn_query_url = bn_base_url + BN_VALIDATORS_EP
+
+    try:
+        response = httpclient.post(bn_query_url, json={'statuses': BN_PENDING_VALIDATOR_STATUSES},
+            headers=headers)
+
+        if response.status_code == 405:
+            response = httpclient.get(bn_query_url,
+                params={'status': ','.join(BN_PENDING_VALIDATOR_STATUSES)}, headers=headers)
+    except httpx.RequestError as exception:
+        log.warning(f'Exception {exception} when querying {bn_query_url}.')
+        return None
+
+    try:
+        pending_validators = _get_response_data(response, bn_query_url)
+    except BatchRetryError as exception:
+        log.warning(str(exception))
+        return None
+
+    try:
+        head_slot = int(sync_status['head_slot'])
+    except (KeyError, ValueError):
+        return None
+
+    active_validators = get_active_validator_count(bn_base_url, head_slot, log)
+    if active_validators is None:
+        return None
+
+    validators_entering = len(pending_validators)
+    churn_limit = get_churn_limit(active_validators)
+
+    return {
+        'validators_entering': validators_entering,
+        'active_validators': active_validators,
+        'churn_limit': churn_limit,
+        'waiting_days': validators_entering / (churn_limit * EPOCHS_PER_DAY)
+    }
@@ -7,26 +7,67 @@ import time
 import humanize
 import asyncio
 import re
+import threading
+import math
 
 from rfc3986 import urlparse, builder as urlbuilder
 
 from datetime import timedelta
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+from copy import deepcopy
+
+from functools import partial
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from pathlib import Path
 
+from ethwizard.platforms import httpclient
+
 from ethwizard.constants import *
 
 from ethwizard.utils.CompactFIPS202 import Keccak_256
 
+from ethwizard.platforms.metrics import (
+    StepMetrics,
+    measure_step,
+    add_step_metrics,
+    get_current_metrics,
+    use_metrics
+)
+
+from ethwizard.platforms.progress import DownloadReporter, use_reporter
+
+from ethwizard.platforms.download import DownloadCancelled
+
+from ethwizard.platforms.releases import github_release_cache, ReleaseCacheError
+
+from ethwizard.platforms import beacon
+
+from ethwizard.platforms.batch import (
+    run_batch_lookup,
+    get_retry_after,
+    BatchRetryError,
+    BatchLookupError
+)
+
 from asyncio import get_running_loop
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import radiolist_dialog, button_dialog, input_dialog, checkboxlist_dialog
+from ethwizard.platforms.headless import (
+    radiolist_dialog,
+    button_dialog,
+    input_dialog,
+    checkboxlist_dialog,
+    is_headless,
+    emit_progress,
+    HeadlessProgressLogDialog
+)
 from prompt_toolkit.shortcuts.dialogs import _return_none, _create_app
 
-from typing import Optional, Callable, List
+from typing import Optional, Callable, List, Tuple
 
 from prompt_toolkit.application import Application
 from prompt_toolkit.application.current import get_app
@@ -50,15 +91,32 @@ from prompt_toolkit.widgets import (
     ValidationToolbar,
 )
 
-from yaml import safe_load
+from ethwizard.utils.lazy import lazy_callable
+
+safe_load = lazy_callable('yaml', 'safe_load')
 from secrets import choice
 
 
+class StepError(Exception):
+    # Raised by a step that failed. Background steps raise it instead of quitting since they
+    # do not run on the UI thread. The step sequence stops once it is raised.
+    pass
+
 @dataclass
 class Step():
     step_id: str
     display_name: str
     exc_function: Callable[[Step, dict, StepSequence], dict]
+    # Context keys this step reads and writes. A step without these declarations is a barrier:
+    # it waits for every previous step and every following step waits for it.
+    reads: Optional[List[str]] = None
+    writes: Optional[List[str]] = None
+    # Non-interactive steps with declarations can run on a worker thread while interactive
+    # steps keep running in order on the UI thread.
+    interactive: bool = True
+
+    def is_declared(self) -> bool:
+        return self.reads is not None and self.writes is not None
 
 
 @dataclass
@@ -66,6 +124,7 @@ class StepSequence():
     steps: List[Step]
     save_state: Callable[[str, dict], bool]
     context_factory: Optional[Callable[[], dict]] = None
+    max_workers: int = 4
     _steps_index: Optional[dict] = None
 
     def run_from_start(self, context: Optional[dict] = None) -> bool:
@@ -118,16 +177,266 @@ class StepSequence():
             else:
                 context = self.context_factory()
 
-        for index in range(step_index, len(self.steps)):
-            current_step = self.steps[index]
-            self.save_state(current_step.step_id, context)
+        steps = self.steps[step_index:]
 
-            context = current_step.exc_function(current_step, context, self)
+        try:
+            if any(not step.interactive and step.is_declared() for step in steps):
+                scheduler = StepScheduler(sequence=self, steps=steps)
+                context = scheduler.run(context)
+            else:
+                for current_step in steps:
+                    self.save_state(current_step.step_id, context)
+
+                    emit_step_started(current_step)
+                    with measure_step() as metrics:
+                        context = current_step.exc_function(current_step, context, self)
+                    
+                    self._record_step_metrics(current_step, metrics, context)
+        except StepError:
+            # The failing step already reported its error. The saved state points to the
+            # first step that is not completed so the installation can be resumed.
+            return False
 
         self.save_state(WIZARD_COMPLETED_STEP_ID, context)
+        emit_progress({'event': 'completed'})
 
         return True
 
+    def _record_step_metrics(self, step: Step, metrics: StepMetrics, context: dict):
+        # Keep the step metrics alongside the context so they are saved in the state file
+        step_metrics = context.setdefault(CTX_STEP_METRICS, {})
+        add_step_metrics(step_metrics, step.step_id, step.display_name, metrics)
+
+        if len(metrics.downloads) > 0:
+            download_metrics = context.setdefault(CTX_DOWNLOAD_METRICS, {})
+            for name, values in metrics.downloads.items():
+                download_metrics[name] = dict(values, step_id=step.step_id)
+
+        emit_progress({'event': 'step_completed', 'step_id': step.step_id,
+            'display_name': step.display_name, 'metrics': metrics.as_dict()})
+
+def emit_step_started(step: Step):
+    emit_progress({'event': 'step_started', 'step_id': step.step_id,
+        'display_name': step.display_name})
+
+def get_step_dependencies(steps: List[Step]) -> List[set]:
+    # Build the dependency graph (DAG) for a list of steps. Each entry is the set of indexes of
+    # previous steps that must be completed before the step at that index can start.
+
+    dependencies = []
+
+    for index, step in enumerate(steps):
+        step_dependencies = set()
+
+        for previous_index in range(index):
+            previous_step = steps[previous_index]
+
+            if not step.is_declared() or not previous_step.is_declared():
+                # Barrier
+                step_dependencies.add(previous_index)
+                continue
+
+            if step.interactive and previous_step.interactive:
+                # Interactive steps keep their order
+                step_dependencies.add(previous_index)
+                continue
+
+            previous_writes = set(previous_step.writes)
+            if (
+                previous_writes & set(step.reads) or
+                previous_writes & set(step.writes) or
+                set(step.writes) & set(previous_step.reads)
+            ):
+                step_dependencies.add(previous_index)
+
+        dependencies.append(step_dependencies)
+
+    return dependencies
+
+class StepScheduler():
+    # Run steps following the dependencies they declare. Interactive steps and steps without
+    # declarations run in order on the calling (UI) thread. Other steps run on a worker pool as
+    # soon as their dependencies are completed. Background steps work on a copy of the context
+    # and only their declared writes are merged back.
+    #
+    # The saved state always points to the first step that is not completed yet so that
+    # run_from_step can resume from it. Steps are expected to be safe to run again, which is
+    # already the case when resuming.
+
+    def __init__(self, sequence: StepSequence, steps: List[Step]):
+        self.sequence = sequence
+        self.steps = steps
+        self.dependencies = get_step_dependencies(steps)
+        self.completed = set()
+        self._lock = threading.Lock()
+        self._context_snapshot = {}
+        self._background_progress = {}
+
+    def run(self, context: dict) -> dict:
+        pending = list(range(len(self.steps)))
+        running = {}
+
+        self._update_snapshot(context)
+
+        executor = ThreadPoolExecutor(max_workers=self.sequence.max_workers,
+            thread_name_prefix='step')
+
+        try:
+            while len(self.completed) < len(self.steps):
+
+                # Merge the background steps completed since the last iteration. A failed
+                # background step stops the sequence before the next foreground step starts.
+                done = [future for future in running if future.done()]
+                if len(done) > 0:
+                    context = self._merge_background_steps(done, running, context)
+                    continue
+
+                # Start every background step that is ready
+                for index in list(pending):
+                    step = self.steps[index]
+                    if step.interactive or not step.is_declared():
+                        continue
+                    if not self.dependencies[index] <= self.completed:
+                        continue
+
+                    pending.remove(index)
+                    future = executor.submit(self._run_background_step, index,
+                        deepcopy(context))
+                    running[future] = index
+
+                # Run the next foreground step if it is ready
+                foreground_index = None
+                for index in pending:
+                    step = self.steps[index]
+                    if step.interactive or not step.is_declared():
+                        foreground_index = index
+                        break
+
+                if (
+                    foreground_index is not None and
+                    self.dependencies[foreground_index] <= self.completed
+                ):
+                    pending.remove(foreground_index)
+                    context = self._run_foreground_step(foreground_index, context)
+                    continue
+
+                if len(running) == 0:
+                    # This should not happen with dependencies only on previous steps
+                    raise RuntimeError('No step can run. The step dependencies are invalid.')
+
+                # Wait for a background step to complete and merge its writes
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                context = self._merge_background_steps(done, running, context)
+        except BaseException:
+            # Steps that did not start yet are cancelled. Running steps cannot be interrupted
+            # and their results are ignored.
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=False)
+            raise
+
+        executor.shutdown(wait=True)
+
+        return context
+
+    def _merge_background_steps(self, done, running: dict, context: dict) -> dict:
+        for future in done:
+            index = running.pop(future)
+            step = self.steps[index]
+
+            try:
+                step_context, metrics = future.result()
+            except StepError as exception:
+                emit_progress({'event': 'step_failed', 'step_id': step.step_id,
+                    'display_name': step.display_name, 'error': str(exception)})
+                self._save_progress()
+                raise
+
+            for key in step.writes:
+                if key in step_context:
+                    context[key] = step_context[key]
+                else:
+                    context.pop(key, None)
+
+            self.sequence._record_step_metrics(step, metrics, context)
+
+            with self._lock:
+                self._background_progress.pop(index, None)
+                self.completed.add(index)
+            self._update_snapshot(context)
+            self._save_progress()
+
+        return context
+
+    def _run_foreground_step(self, index: int, context: dict) -> dict:
+        step = self.steps[index]
+
+        self._update_snapshot(context)
+        self._save_progress()
+
+        step_sequence = replace(self.sequence,
+            save_state=partial(self._foreground_save_state, index))
+        emit_step_started(step)
+        with measure_step() as metrics:
+            context = step.exc_function(step, context, step_sequence)
+
+        self.sequence._record_step_metrics(step, metrics, context)
+
+        with self._lock:
+            self.completed.add(index)
+        self._update_snapshot(context)
+        self._save_progress()
+
+        return context
+
+    def _run_background_step(self, index: int, context: dict) -> Tuple[dict, StepMetrics]:
+        step = self.steps[index]
+
+        step_sequence = replace(self.sequence,
+            save_state=partial(self._background_save_state, index))
+        emit_step_started(step)
+        with measure_step() as metrics:
+            context = step.exc_function(step, context, step_sequence)
+
+        return context, metrics
+
+    def _foreground_save_state(self, index: int, step_id: str, context: dict) -> bool:
+        # Called by foreground steps saving their progress
+        self._update_snapshot(context)
+        return self._save_progress()
+
+    def _background_save_state(self, index: int, step_id: str, context: dict) -> bool:
+        # Called by background steps saving their progress. Only their declared writes are
+        # kept until the step is completed and merged.
+        step = self.steps[index]
+        progress = {key: deepcopy(context[key]) for key in step.writes if key in context}
+        with self._lock:
+            self._background_progress[index] = progress
+        return self._save_progress()
+
+    def _update_snapshot(self, context: dict):
+        snapshot = deepcopy(context)
+        with self._lock:
+            self._context_snapshot = snapshot
+
+    def _save_progress(self) -> bool:
+        # Save the state with the first step that is not completed yet
+        with self._lock:
+            resume_index = None
+            for index in range(len(self.steps)):
+                if index not in self.completed:
+                    resume_index = index
+                    break
+
+            if resume_index is None:
+                return True
+
+            state_context = dict(self._context_snapshot)
+            for progress in self._background_progress.values():
+                state_context.update(progress)
+
+            return self.sequence.save_state(self.steps[resume_index].step_id, state_context)
+
 def is_completed_state(state):
     return (
         state is not None and
@@ -150,7 +459,7 @@ def select_network(log):
     }
 
     async def network_joining_validators(network):
-        async with httpx.AsyncClient() as client:
+        async with httpclient.get_async_client() as client:
             beaconcha_in_queue_query_url = (
                 BEACONCHA_IN_URLS[network] + BEACONCHA_VALIDATOR_QUEUE_API_URL)
             try:
@@ -174,8 +483,7 @@ def select_network(log):
                 validators_entering = int(response_json['data']['beaconchain_entering'])
                 active_validators = int(response_json['data'].get('validatorscount', 1))
 
-                churn_limit = max(MIN_PER_EPOCH_CHURN_LIMIT, active_validators // CHURN_LIMIT_QUOTIENT)
-                churn_limit_per_day = churn_limit * EPOCHS_PER_DAY
+                churn_limit_per_day = beacon.get_churn_limit(active_validators) * EPOCHS_PER_DAY
 
                 waiting_td = timedelta(days=validators_entering / churn_limit_per_day)
 
@@ -389,7 +697,7 @@ Having a consensus checkpoint provider is highly recommended for your
 beacon node. It makes it possible to get a fully synced beacon in just a
 few minutes compared to having to wait hours or days.
 
-We can select a random community checkpoint sync endpoint for you from
+We can select the fastest community checkpoint sync endpoint for you from
 https://eth-clients.github.io/checkpoint-sync-endpoints/ .
 
 If you have access to a custom beacon node, you can enter your own URL to
@@ -416,7 +724,7 @@ Do you want add a consensus checkpoint provider?
             checkpoint_endpoints = []
 
             try:
-                response = httpx.get(checkpoint_yaml_file, follow_redirects=True)
+                response = httpclient.get(checkpoint_yaml_file, follow_redirects=True)
 
                 if response.status_code != 200:
                     log.error(f'Checkpoint YAML file returned an unexpected status code from {checkpoint_yaml_file}: {response.status_code}')
@@ -432,35 +740,25 @@ Do you want add a consensus checkpoint provider?
                 log.error(f'No endpoint found in checkpoint YAML file from {checkpoint_yaml_file}')
                 return False
 
-            is_invalid = True
-
             # Filter out endpoints that do not provide verification
             checkpoint_endpoints = list(filter(lambda x: (bool(x.get('verification', False))),
                 checkpoint_endpoints))
 
             log.info(f'{len(checkpoint_endpoints)} checkpoint sync endpoints to choose from.')
 
-            # Select a random endpoint from the YAML file
-            while is_invalid:
-                if len(checkpoint_endpoints) <= 0:
-                    log.error(f'No suitable checkpoint sync endpoint left to choose from.')
-                    return False
-                endpoint_details = choice(checkpoint_endpoints)
-                checkpoint_endpoints.remove(endpoint_details)
+            # Probe all the endpoints and select the fastest healthy one
+            ranked_endpoints = rank_checkpoint_endpoints(network, checkpoint_endpoints, log)
 
-                endpoint_name = endpoint_details.get('name', UNKNOWN_VALUE)
-                endpoint_url = endpoint_details.get('endpoint', '')
+            if len(ranked_endpoints) <= 0:
+                log.error(f'No suitable checkpoint sync endpoint left to choose from.')
+                return False
 
-                log.info(f'Random endpoint selected: {endpoint_name} at {endpoint_url}')
+            endpoint_details = ranked_endpoints[0]
 
-                if endpoint_url == '':
-                    log.error(f'Endpoint does not have an URL. Skipping.')
-                    continue
+            log.info(f'Fastest endpoint selected: {endpoint_details["name"]} at '
+                f'{endpoint_details["endpoint"]}')
 
-                # Test if the endpoint works, select another one if not
-                is_invalid = not beacon_node_url_validator(network, endpoint_url, log)
-                if not is_invalid:
-                    initial_state_url = endpoint_url
+            initial_state_url = endpoint_details['endpoint']
 
         elif result == 2:
             # Custom
@@ -523,53 +821,196 @@ def beacon_node_url_validator(network, url, log):
     }
 
     try:
-        response = httpx.get(deposit_contract_url, headers=headers, follow_redirects=True)
+        response = httpclient.get(deposit_contract_url, headers=headers, follow_redirects=True)
+    except httpx.RequestError as exception:
+        log.error(f'Exception during request to beacon node: {exception}')
+        return False
 
-        if response.status_code != 200:
-            log.error(f'Beacon node returned an unexpected status code: {response.status_code}')
-            return False
-        
+    error = get_deposit_contract_error(network, response)
+    if error is not None:
+        log.error(error)
+        return False
+
+    return True
+
+def get_deposit_contract_error(network, response):
+    # Return an error message when the deposit contract response from a beacon node is not for
+    # network, None otherwise
+
+    if response.status_code != 200:
+        return f'Beacon node returned an unexpected status code: {response.status_code}'
+
+    try:
         response_json = response.json()
+    except ValueError:
+        return 'Unexpected response from beacon node.'
 
-        if not response_json:
-            log.error(f'Unexpected response from beacon node.')
-            return False
+    if not response_json:
+        return 'Unexpected response from beacon node.'
 
-        if (
-            'data' not in response_json or
-            'chain_id' not in response_json['data'] or
-            'address' not in response_json['data']
-        ):
-            log.error('Unexpected response from beacon node.')
-            return False
-        
-        chain_id = response_json['data']['chain_id']
-        deposit_contract = response_json['data']['address']
+    if (
+        not isinstance(response_json, dict) or
+        'data' not in response_json or
+        'chain_id' not in response_json['data'] or
+        'address' not in response_json['data']
+    ):
+        return 'Unexpected response from beacon node.'
 
-        if int(chain_id) != BN_CHAIN_IDS[network]:
-            log.error(f'Unexpected chain_id ({chain_id}) from beacon node. We expected another '
-                f'value ({BN_CHAIN_IDS[network]}) for this network ({network}).')
-            return False
-        
-        if deposit_contract.lower() != BN_DEPOSIT_CONTRACTS[network].lower():
-            log.error(f'Unexpected deposit contract address ({deposit_contract}) from beacon '
-                f'node. We expected another value ({BN_DEPOSIT_CONTRACTS[network]}) for this '
-                f'network ({network}).')
-            return False
-        
-    except httpx.RequestError as exception:
-        log.error(f'Exception during request to beacon node: {exception}')
-        return False
+    chain_id = response_json['data']['chain_id']
+    deposit_contract = response_json['data']['address']
 
-    return True
+    if int(chain_id) != BN_CHAIN_IDS[network]:
+        return (f'Unexpected chain_id ({chain_id}) from beacon node. We expected another '
+            f'value ({BN_CHAIN_IDS[network]}) for this network ({network}).')
+
+    if deposit_contract.lower() != BN_DEPOSIT_CONTRACTS[network].lower():
+        return (f'Unexpected deposit contract address ({deposit_contract}) from beacon '
+            f'node. We expected another value ({BN_DEPOSIT_CONTRACTS[network]}) for this '
+            f'network ({network}).')
+
+    return None
+
+def rank_checkpoint_endpoints(network, checkpoint_endpoints, log):
+    # Probe every checkpoint sync endpoint concurrently and return the healthy ones, fastest
+    # first. Each endpoint must return the deposit contract for network. Then the time to first
+    # byte and a short throughput sample of the finalized state are measured, at most
+    # CHECKPOINT_PROBE_MAX_SAMPLES at the same time. The rank is based on the estimated time to
+    # download a state of CHECKPOINT_REFERENCE_STATE_SIZE.
+
+    headers = {
+        'Content-Type': 'application/json'
+    }
 
-def select_eth1_fallbacks(network):
+    state_headers = {
+        'Accept': 'application/octet-stream'
+    }
+
+    async def probe_endpoint(client, sample_semaphore, endpoint_details):
+        endpoint_url = endpoint_details.get('endpoint', '')
+
+        result = {
+            'name': endpoint_details.get('name', UNKNOWN_VALUE),
+            'endpoint': endpoint_url,
+            'healthy': False,
+            'error': None,
+            'ttfb': None,
+            'throughput': None,
+            'score': None
+        }
+
+        if not uri_validator(endpoint_url):
+            result['error'] = 'Invalid endpoint URL.'
+            return result
+
+        base_url = urlbuilder.URIBuilder.from_uri(endpoint_url)
+        deposit_contract_url = base_url.add_path(BN_DEPOSIT_CONTRACT_URL).finalize().unsplit()
+        finalized_state_url = base_url.add_path(BN_FINALIZED_STATE_URL).finalize().unsplit()
+
+        async def check_deposit_contract():
+            response = await client.get(deposit_contract_url, headers=headers,
+                follow_redirects=True)
+
+            result['error'] = get_deposit_contract_error(network, response)
+
+        async def sample_state():
+            start_time = time.perf_counter()
+            first_byte_time = None
+            last_byte_time = None
+            sample_bytes = 0
+
+            async with client.stream('GET', finalized_state_url, headers=state_headers,
+                follow_redirects=True) as response:
+
+                if response.status_code != 200:
+                    result['error'] = (f'Unexpected status code for the finalized state: '
+                        f'{response.status_code}')
+                    return
+
+                async for chunk in response.aiter_raw():
+                    last_byte_time = time.perf_counter()
+                    if first_byte_time is None:
+                        first_byte_time = last_byte_time
+                    sample_bytes += len(chunk)
+
+                    if (sample_bytes >= CHECKPOINT_PROBE_SAMPLE_SIZE or
+                        last_byte_time - first_byte_time >= CHECKPOINT_PROBE_SAMPLE_TIME):
+                        break
+
+            if sample_bytes == 0:
+                result['error'] = 'Empty finalized state.'
+                return
+
+            sample_time = max(last_byte_time - first_byte_time, 0.001)
+
+            result['ttfb'] = first_byte_time - start_time
+            result['throughput'] = sample_bytes / sample_time
+            result['score'] = result['ttfb'] + (
+                CHECKPOINT_REFERENCE_STATE_SIZE / result['throughput'])
+            result['healthy'] = True
+
+        try:
+            await asyncio.wait_for(check_deposit_contract(), CHECKPOINT_PROBE_TIMEOUT)
+
+            # Only a few throughput samples are taken at the same time so they do not share
+            # the bandwidth and skew each other. Waiting for a turn is not part of the timeout.
+            if result['error'] is None:
+                async with sample_semaphore:
+                    await asyncio.wait_for(sample_state(), CHECKPOINT_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            result['error'] = f'No answer within {CHECKPOINT_PROBE_TIMEOUT} seconds.'
+        except httpx.HTTPError as exception:
+            result['error'] = f'Exception during request to beacon node: {exception}'
+        except ValueError as exception:
+            result['error'] = f'Unexpected response from beacon node: {exception}'
+
+        return result
+
+    async def probe_all():
+        sample_semaphore = asyncio.Semaphore(CHECKPOINT_PROBE_MAX_SAMPLES)
+        async with httpclient.get_async_client() as client:
+            return await asyncio.gather(*[
+                probe_endpoint(client, sample_semaphore, endpoint_details)
+                for endpoint_details in checkpoint_endpoints])
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(probe_all())
+    finally:
+        loop.close()
+
+    healthy_results = sorted([result for result in results if result['healthy']],
+        key=lambda result: result['score'])
+    unhealthy_results = [result for result in results if not result['healthy']]
+
+    # Ranking report
+
+    report_lines = [f'Checkpoint sync endpoints ranking for {network} '
+        f'({len(healthy_results)} healthy out of {len(results)}):']
+
+    for rank, result in enumerate(healthy_results, start=1):
+        report_lines.append(f'{rank:3d}. {result["name"]} at {result["endpoint"]}: '
+            f'TTFB {result["ttfb"] * 1000:.0f} ms, '
+            f'{humanize.naturalsize(result["throughput"], binary=True)}/s, '
+            f'estimated {result["score"]:.1f} seconds for '
+            f'{humanize.naturalsize(CHECKPOINT_REFERENCE_STATE_SIZE, binary=True)}')
+
+    for result in unhealthy_results:
+        report_lines.append(f'  -  {result["name"]} at {result["endpoint"]}: {result["error"]}')
+
+    log.info('\n'.join(report_lines))
+
+    emit_progress({'event': 'checkpoint_ranking', 'network': network, 'ranking': [
+        {key: result[key] for key in ('name', 'endpoint', 'ttfb', 'throughput', 'score')}
+        for result in healthy_results]})
+
+    return healthy_results
+
+def select_eth1_fallbacks(network, log):
     # Prompt the user for ethereum execution fallback nodes
     eth1_fallbacks = []
 
     add_more_fallbacks = True
     eth1_network_name = ETH1_NETWORK_NAME[network]
-    eth1_network_chainid = ETH1_NETWORK_CHAINID[network]
 
     while add_more_fallbacks:
         skip_done_button_label = 'Skip'
@@ -646,33 +1087,22 @@ you should keep secret if you used a service that requires an account.
             continue
 
         # Verify if the endpoint is working properly and is on the correct chainId
-        request_json = {
-            'jsonrpc': '2.0',
-            'method': 'eth_chainId',
-            'id': 1
-        }
-        headers = {
-            'Content-Type': 'application/json'
-        }
+        probe_result = probe_eth1_endpoints(network, [eth1_fallback], log)[0]
 
-        try:
-            response = httpx.post(eth1_fallback, json=request_json, headers=headers,
-                follow_redirects=True)
-        except httpx.RequestError as exception:
+        if not probe_result['healthy']:
             result = button_dialog(
-                title='Cannot connect to execution fallback endpoint',
+                title=ETH1_PROBE_ERROR_TITLES[probe_result['error_kind']],
                 text=(
 f'''
-We could not connect to this execution fallback endpoint. Here are
-some details for this last test we tried to perform:
+We could not use this execution fallback endpoint. Here are some details
+for this last test we tried to perform:
 
 URL: {eth1_fallback}
 Method: POST
-Headers: {headers}
-JSON payload: {json.dumps(request_json)}
-Exception: {exception}
+Error: {probe_result['error']}
 
-Make sure you enter your endpoint correctly.
+Make sure you enter your endpoint correctly and that it's a working
+execution endpoint on the ethereum network: {eth1_network_name}
 '''         ),
                 buttons=[
                     ('Retry', False)
@@ -681,90 +1111,162 @@ Make sure you enter your endpoint correctly.
 
             continue
 
+        eth1_fallbacks.append(eth1_fallback)
+
+    if len(eth1_fallbacks) > 1:
+        # Probe all the fallbacks together and order them by latency
+        eth1_fallbacks = rank_eth1_endpoints(network, eth1_fallbacks, log)
+
+    return eth1_fallbacks
+
+def probe_eth1_endpoints(network, endpoints, log):
+    # Probe the execution endpoints concurrently with eth_chainId, eth_syncing and
+    # eth_blockNumber. The latency is the average round trip time of the last two calls, the
+    # first one opens the connection. The head lag is the number of blocks behind the highest
+    # block number of the endpoints. Return a result dict for each endpoint in the same order.
+
+    eth1_network_chainid = ETH1_NETWORK_CHAINID[network]
+
+    headers = {
+        'Content-Type': 'application/json'
+    }
+
+    class ProbeError(Exception):
+        def __init__(self, kind, message):
+            super().__init__(message)
+            self.kind = kind
+
+    async def call(client, endpoint, method):
+        request_json = {
+            'jsonrpc': '2.0',
+            'method': method,
+            'params': [],
+            'id': 1
+        }
+
+        start_time = time.perf_counter()
+
+        try:
+            response = await client.post(endpoint, json=request_json, headers=headers,
+                follow_redirects=True)
+        except httpx.HTTPError as exception:
+            raise ProbeError('connection', f'{method}: {exception}')
+
+        round_trip_time = time.perf_counter() - start_time
+
         if response.status_code != 200:
-            result = button_dialog(
-                title='Cannot connect to execution fallback endpoint',
-                text=(
-f'''
-We could not connect to this execution fallback endpoint. Here are some
-details for this last test we tried to perform:
+            raise ProbeError('status', f'{method}: Status code {response.status_code}')
 
-URL: {eth1_fallback}
-Method: POST
-Headers: {headers}
-JSON payload: {json.dumps(request_json)}
-Status code: {response.status_code}
+        try:
+            response_json = response.json()
+        except ValueError:
+            raise ProbeError('response', f'{method}: Invalid JSON response {response.text}')
+
+        if not isinstance(response_json, dict) or 'result' not in response_json:
+            raise ProbeError('response', f'{method}: Unexpected response '
+                f'{json.dumps(response_json)}')
+
+        return response_json['result'], round_trip_time
+
+    async def probe_endpoint(client, endpoint):
+        result = {
+            'endpoint': endpoint,
+            'healthy': False,
+            'error': None,
+            'error_kind': None,
+            'chain_id': None,
+            'syncing': None,
+            'block_number': None,
+            'head_lag': None,
+            'latency': None
+        }
 
-Make sure you enter your endpoint correctly.
-'''         ),
-                buttons=[
-                    ('Retry', False)
-                ]
-            ).run()
+        async def measure():
+            chain_id, _ = await call(client, endpoint, 'eth_chainId')
+            if not chain_id or type(chain_id) is not str:
+                raise ProbeError('response', f'eth_chainId: Unexpected result {chain_id}')
 
-            continue
+            result['chain_id'] = int(chain_id, base=16)
+            if result['chain_id'] != eth1_network_chainid:
+                raise ProbeError('chain', f'Unexpected chain id {result["chain_id"]}, we '
+                    f'expected {eth1_network_chainid}')
 
-        response_json = response.json()
+            syncing, syncing_time = await call(client, endpoint, 'eth_syncing')
+            block_number, block_number_time = await call(client, endpoint, 'eth_blockNumber')
 
-        if (
-            not response_json or
-            'result' not in response_json or
-            not response_json['result'] or
-            type(response_json['result']) is not str
-        ):
-            # We could not get a proper result from the Ethereum execution endpoint
-            result = button_dialog(
-                title='Unexpected response from execution fallback endpoint',
-                text=(
-f'''
-We received an unexpected response from this execution fallback endpoint.
-Here are some details for this last test we tried to perform:
+            if type(block_number) is not str:
+                raise ProbeError('response', f'eth_blockNumber: Unexpected result '
+                    f'{block_number}')
 
-URL: {eth1_fallback}
-Method: POST
-Headers: {headers}
-JSON payload: {json.dumps(request_json)}
-Response: {json.dumps(response_json)}
+            result['syncing'] = syncing is not False
+            result['block_number'] = int(block_number, base=16)
+            result['latency'] = (syncing_time + block_number_time) / 2.0
+            result['healthy'] = True
 
-Make sure you enter your endpoint correctly and that it's a working
-execution endpoint.
-'''         ),
-                buttons=[
-                    ('Retry', False)
-                ]
-            ).run()
+        try:
+            await asyncio.wait_for(measure(), ETH1_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            result['error_kind'] = 'connection'
+            result['error'] = f'No answer within {ETH1_PROBE_TIMEOUT} seconds'
+        except ProbeError as exception:
+            result['error_kind'] = exception.kind
+            result['error'] = str(exception)
+        except ValueError as exception:
+            result['error_kind'] = 'response'
+            result['error'] = f'Unexpected value: {exception}'
 
-            continue
-        
-        eth1_fallback_chainid = int(response_json['result'], base=16)
+        return result
 
-        if eth1_fallback_chainid != eth1_network_chainid:
-            result = button_dialog(
-                title='Unexpected chain id from execution fallback endpoint',
-                text=(
-f'''
-We received an unexpected chain id response from this execution fallback
-endpoint. Here are some details for this:
+    async def probe_all():
+        async with httpclient.get_async_client() as client:
+            return await asyncio.gather(*[
+                probe_endpoint(client, endpoint) for endpoint in endpoints])
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(probe_all())
+    finally:
+        loop.close()
 
-Expected chain id: {eth1_network_chainid}
-Received chain id: {eth1_fallback_chainid}
+    block_numbers = [result['block_number'] for result in results if result['healthy']]
+    if len(block_numbers) > 0:
+        head = max(block_numbers)
+        for result in results:
+            if result['healthy']:
+                result['head_lag'] = head - result['block_number']
 
-Did you select an execution endpoint with the proper network? It should be the
-ethereum network: {eth1_network_name}
+    return results
 
-Make sure you enter your endpoint network is matching the network you
-selected at the beginning of this wizard.
-'''         ),
-                buttons=[
-                    ('Retry', False)
-                ]
-            ).run()
+def rank_eth1_endpoints(network, endpoints, log):
+    # Return the endpoints ordered by latency. Endpoints that are syncing or lagging more than
+    # ETH1_MAX_HEAD_LAG blocks come after the others. Endpoints that failed the probe come last
+    # and endpoints on another chain are removed.
 
-            continue
+    results = probe_eth1_endpoints(network, endpoints, log)
 
-        eth1_fallbacks.append(eth1_fallback)
+    def sort_key(result):
+        is_behind = result['syncing'] or result['head_lag'] > ETH1_MAX_HEAD_LAG
+        return (is_behind, result['latency'])
 
-    return eth1_fallbacks
+    healthy_results = sorted([result for result in results if result['healthy']],
+        key=sort_key)
+    unhealthy_results = [result for result in results if not result['healthy']]
+
+    report_lines = [f'Execution fallback endpoints ranking ({len(healthy_results)} healthy out '
+        f'of {len(results)}):']
+
+    for rank, result in enumerate(healthy_results, start=1):
+        report_lines.append(f'{rank:3d}. {get_url_host(result["endpoint"])}: '
+            f'{result["latency"] * 1000:.0f} ms, block {result["block_number"]} '
+            f'(lag {result["head_lag"]}), syncing: {result["syncing"]}')
+
+    for result in unhealthy_results:
+        report_lines.append(f'  -  {get_url_host(result["endpoint"])}: {result["error"]}')
+
+    log.info('\n'.join(report_lines))
+
+    return [result['endpoint'] for result in healthy_results + unhealthy_results
+        if result['error_kind'] != 'chain']
 
 def uri_validator(uri):
     try:
@@ -788,6 +1290,10 @@ def input_dialog_default(
     Display a text input box.
     Return the given text, or None when cancelled.
     """
+    if is_headless():
+        return input_dialog(title=title, text=text, ok_text=ok_text, cancel_text=cancel_text,
+            completer=completer, validator=validator, password=password, style=style,
+            default=default_input_text)
 
     def accept(buf: Buffer) -> bool:
         get_app().layout.focus(ok_button)
@@ -842,6 +1348,9 @@ def progress_log_dialog(
     :param run_callback: A function that receives as input a `set_percentage`
         function and it does the work.
     """
+    if is_headless():
+        return HeadlessProgressLogDialog(title, run_callback, with_skip=with_skip)
+
     try:
         loop = get_running_loop()
     except RuntimeError:
@@ -938,6 +1447,46 @@ def progress_log_dialog(
 
     return app
 
+def run_download_dialog(title: AnyFormattedText, text: AnyFormattedText,
+    download: Callable[[threading.Event], object]):
+    # Run download, a function downloading one or more files, in a progress dialog showing the
+    # bytes done, the throughput and the time left of each download. download is called with
+    # an event set when the user quits the dialog, to pass as cancelled to the download
+    # functions. Return the result of download or raise its exception, DownloadCancelled when
+    # the user quit. Background steps cannot show a dialog, their downloads are logged instead.
+
+    cancelled = threading.Event()
+
+    if threading.current_thread() is not threading.main_thread():
+        return download(cancelled)
+
+    metrics = get_current_metrics()
+    outcome = {}
+    done = threading.Event()
+
+    def run_download(set_percentage, log_text, change_status, set_result, get_exited):
+        reporter = DownloadReporter(set_percentage=set_percentage, log_text=log_text,
+            change_status=change_status)
+        try:
+            with use_metrics(metrics), use_reporter(reporter):
+                outcome['result'] = download(cancelled)
+        except BaseException as exception:
+            outcome['exception'] = exception
+        finally:
+            done.set()
+
+    progress_log_dialog(title=title, text=text, run_callback=run_download).run()
+
+    # The dialog was closed with quit, stop the downloads still running
+    cancelled.set()
+    done.wait()
+
+    if 'exception' in outcome:
+        raise outcome['exception']
+    if 'result' not in outcome:
+        raise DownloadCancelled('Download cancelled')
+    return outcome['result']
+
 def search_for_generated_keys(validator_keys_path):
     # Search for keys
 
@@ -968,69 +1517,191 @@ def search_for_generated_keys(validator_keys_path):
         'password_paths': password_paths
     }
 
+def get_validator_deposits(network, public_keys, bn_base_url, log):
+    # Return the validator deposits, looking first at the head state of the local beacon node
+    # when it is synced. A new deposit only shows up in the beacon state after some time, so the
+    # public keys that are not found locally are looked up with the beaconcha.in API. Deposits
+    # found locally have the validator index, status and balance (amount) in Gwei.
+
+    validator_deposits = []
+    remaining_keys = list(public_keys)
+
+    sync_status = beacon.get_sync_status(bn_base_url, log)
+
+    if beacon.is_synced(sync_status):
+        validators = beacon.get_validators(bn_base_url, public_keys, log)
+
+        if validators:
+            balances = beacon.get_validator_balances(bn_base_url,
+                [int(record['index']) for record in validators.values()], log)
+            if not balances:
+                balances = {}
+
+            for public_key in public_keys:
+                record = validators.get(public_key.lower())
+                if record is None:
+                    continue
+
+                validator_index = int(record['index'])
+                validator_deposits.append({
+                    'publickey': public_key,
+                    'validator_index': validator_index,
+                    'status': record.get('status', UNKNOWN_VALUE),
+                    'amount': balances.get(validator_index, int(record.get('balance', 0)))
+                })
+                remaining_keys.remove(public_key)
+
+        log.info(f'{len(validator_deposits)} of {len(public_keys)} validator(s) found on the '
+            f'local beacon node.')
+    else:
+        log.info('The local beacon node is not synced. Using beaconcha.in to find the '
+            'validator deposits.')
+
+    if len(remaining_keys) == 0:
+        return validator_deposits
+
+    bc_validator_deposits = get_bc_validator_deposits(network, remaining_keys, log)
+    if bc_validator_deposits is False:
+        if len(validator_deposits) > 0:
+            return validator_deposits
+        return False
+
+    return validator_deposits + bc_validator_deposits
+
+def get_join_queue_info(network, bn_base_url, log):
+    # Return a description of the join queue, computed from the local beacon node when it is
+    # synced or from beaconcha.in. Return None when the join queue is unknown.
+
+    join_queue = beacon.get_join_queue(bn_base_url, log)
+
+    if join_queue is None:
+        log.info('Using beaconcha.in for the join queue information.')
+        join_queue = get_bc_join_queue(network, log)
+
+    if join_queue is None:
+        return None
+
+    waiting_td = timedelta(days=join_queue['waiting_days'])
+
+    return (
+        f'{join_queue["validators_entering"]} validators waiting to join '
+        f'[{humanize.naturaldelta(waiting_td)}]'
+    )
+
+def get_bc_join_queue(network, log):
+    # Return the join queue from the beaconcha.in API or None
+
+    headers = {
+        'accept': 'application/json'
+    }
+
+    beaconcha_in_queue_query_url = (
+        BEACONCHA_IN_URLS[network] + BEACONCHA_VALIDATOR_QUEUE_API_URL)
+    try:
+        response = httpclient.get(beaconcha_in_queue_query_url, headers=headers,
+            follow_redirects=True)
+    except httpx.RequestError as exception:
+        log.error(f'Exception: {exception} while querying beaconcha.in.')
+        return None
+
+    if response.status_code != 200:
+        log.error(f'Status code: {response.status_code} while querying beaconcha.in.')
+        return None
+
+    try:
+        response_json = response.json()
+    except ValueError:
+        log.error('Unexpected response while querying beaconcha.in.')
+        return None
+
+    if not (
+        response_json and
+        'data' in response_json and
+        'beaconchain_entering' in response_json['data']):
+        return None
+
+    validators_entering = int(response_json['data']['beaconchain_entering'])
+    active_validators = int(response_json['data'].get('validatorscount', 1))
+    churn_limit = beacon.get_churn_limit(active_validators)
+
+    return {
+        'validators_entering': validators_entering,
+        'active_validators': active_validators,
+        'churn_limit': churn_limit,
+        'waiting_days': validators_entering / (churn_limit * EPOCHS_PER_DAY)
+    }
+
 def get_bc_validator_deposits(network, public_keys, log):
     # Return the validator deposits from the beaconcha.in API
 
-    pubkey_arg = ','.join(public_keys)
-    bc_api_query_url = (BEACONCHA_IN_URLS[network] +
-        BEACONCHA_VALIDATOR_DEPOSITS_API_URL.format(indexOrPubkey=pubkey_arg))
-    headers = {'accept': 'application/json'}
+    deposits_by_key = get_bc_validator_deposits_by_key(network, public_keys, log)
+    if deposits_by_key is False:
+        return False
 
-    keep_retrying = True
+    validator_deposits = []
+    for public_key in public_keys:
+        validator_deposits.extend(deposits_by_key.get(public_key.lower(), []))
 
-    retry_index = 0
-    retry_count = 5
-    retry_delay = 30
+    return validator_deposits
+
+def get_bc_validator_deposits_by_key(network, public_keys, log):
+    # Return a dict with the list of deposits from the beaconcha.in API for each public key
+    # (lower case) with at least one deposit. Keys are queried in chunks, concurrently and
+    # within the API rate limit.
+
+    headers = {'accept': 'application/json'}
+
+    async def fetch_chunk(client, chunk):
+        pubkey_arg = ','.join(chunk)
+        bc_api_query_url = (BEACONCHA_IN_URLS[network] +
+            BEACONCHA_VALIDATOR_DEPOSITS_API_URL.format(indexOrPubkey=pubkey_arg))
 
-    while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(bc_api_query_url, headers=headers, follow_redirects=True)
+            response = await client.get(bc_api_query_url, headers=headers,
+                follow_redirects=True)
         except httpx.RequestError as exception:
-            log.error(f'Exception {exception} when trying to get {bc_api_query_url}')
-
-            retry_index = retry_index + 1
-            log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
-            time.sleep(retry_delay)
-            continue
+            raise BatchRetryError(f'Exception {exception} when trying to get the deposits of '
+                f'{len(chunk)} validators.')
 
         if response.status_code != 200:
-            log.error(f'Error code {response.status_code} when trying to get {bc_api_query_url}')
-            
-            retry_index = retry_index + 1
-            log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
-            time.sleep(retry_delay)
-            continue
-        
-        response_json = response.json()
+            raise BatchRetryError(f'Error code {response.status_code} when trying to get the '
+                f'deposits of {len(chunk)} validators.', retry_after=get_retry_after(response))
+
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = None
 
         if (
+            not isinstance(response_json, dict) or
             'status' not in response_json or
             response_json['status'] != 'OK' or
             'data' not in response_json
             ):
-            log.error(f'Unexpected response data or structure from {bc_api_query_url}: '
+            raise BatchRetryError(f'Unexpected response data or structure from beaconcha.in: '
                 f'{response_json}')
-            
-            retry_index = retry_index + 1
-            log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
-            time.sleep(retry_delay)
-            continue
-        
-        keep_retrying = False
-    
-    if keep_retrying:
-        log.error(f'We failed to get the validator deposits from the beaconcha.in API after '
-            f'{retry_count} retries.')
-        time.sleep(5)
-        return False
-    
-    validator_deposits = response_json['data']
-    # beaconcha.in API does not return a list for a single validator so
-    # we make it a list for ease of use
-    if type(validator_deposits) is not list:
-        validator_deposits = [validator_deposits]
 
-    return validator_deposits
+        validator_deposits = response_json['data']
+        # beaconcha.in API does not return a list for a single validator so
+        # we make it a list for ease of use
+        if type(validator_deposits) is not list:
+            validator_deposits = [validator_deposits]
+
+        deposits_by_key = {}
+        for deposit in validator_deposits:
+            if not isinstance(deposit, dict) or 'publickey' not in deposit:
+                continue
+            deposits_by_key.setdefault(deposit['publickey'].lower(), []).append(deposit)
+
+        return deposits_by_key
+
+    try:
+        return run_batch_lookup(public_keys, fetch_chunk, BEACONCHA_IN_API_CHUNK_SIZE,
+            BEACONCHA_IN_API_REQUESTS_PER_MINUTE / 60.0, BEACONCHA_IN_API_BURST, log)
+    except BatchLookupError as exception:
+        log.error(f'We failed to get the validator deposits from the beaconcha.in API. '
+            f'{exception}')
+        return False
 
 def test_open_ports(ports, log):
     # Test the selected ports to make sure they are opened and exposed to the internet
@@ -1048,7 +1719,7 @@ def test_open_ports(ports, log):
     while not all_ports_opened:
         try:
             log.info('Connecting to StakeHouse Port Checker...')
-            response = httpx.get(STAKEHOUSE_PORT_CHECKER_URL, params=params,
+            response = httpclient.get(STAKEHOUSE_PORT_CHECKER_URL, params=params,
                 follow_redirects=True)
 
             if response.status_code != 200:
@@ -1443,11 +2114,47 @@ def is_address(address):
     else:
         return is_checksum_address(address)
 
-def show_whats_next(network, public_keys):
+def format_step_metrics(step_metrics, slowest_count=3):
+    # Format a short summary of the time and resources used by the installation steps
+
+    if not step_metrics:
+        return ''
+
+    total_wall_time = sum(value.get('wall_time', 0) for value in step_metrics.values())
+    total_cpu_time = sum(
+        value.get('cpu_time', 0) + value.get('children_cpu_time', 0)
+        for value in step_metrics.values())
+    total_http_bytes = sum(value.get('http_bytes', 0) for value in step_metrics.values())
+    total_http_requests = sum(value.get('http_requests', 0) for value in step_metrics.values())
+    total_subprocesses = sum(value.get('subprocesses', 0) for value in step_metrics.values())
+
+    slowest_steps = sorted(step_metrics.values(), key=lambda value: value.get('wall_time', 0),
+        reverse=True)[:slowest_count]
+
+    slowest_lines = '\n'.join(
+        f'- {value["display_name"]}: '
+        f'{humanize.naturaldelta(timedelta(seconds=value.get("wall_time", 0)))}'
+        for value in slowest_steps)
+
+    return (
+        f'Installation time: '
+        f'{humanize.naturaldelta(timedelta(seconds=total_wall_time))} '
+        f'(CPU time: {humanize.naturaldelta(timedelta(seconds=total_cpu_time))})\n'
+        f'Downloaded {humanize.naturalsize(total_http_bytes)} in {total_http_requests} HTTP '
+        f'requests and ran {total_subprocesses} commands\n'
+        f'Longest steps:\n'
+        f'{slowest_lines}'
+    )
+
+def show_whats_next(network, public_keys, step_metrics=None):
     # Show what's next including wait time
 
     beaconcha_in_url = BEACONCHA_IN_URLS[network]
 
+    step_metrics_section = ''
+    if step_metrics:
+        step_metrics_section = f'\n{format_step_metrics(step_metrics)}\n'
+
     button_dialog(
         title='Installation completed',
         text=(
@@ -1465,7 +2172,7 @@ to get in touch with the ethstaker community on:
 
 * Discord: dsc.gg/ethstaker
 * Reddit: reddit.com/r/ethstaker
-'''     ),
+{step_metrics_section}'''     ),
         buttons=[
             ('Quit', False)
         ]
@@ -1515,7 +2222,7 @@ def get_geth_running_version(log):
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+        response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Geth. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1551,22 +2258,12 @@ def get_geth_latest_version(log):
 
     log.info('Getting Geth latest version...')
 
-    geth_gh_release_url = GITHUB_REST_API_URL + GETH_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(geth_gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for Geth. {exception}')
+        release_json = github_release_cache.get_release(GETH_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for Geth. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for Geth. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for Geth.')
@@ -1599,7 +2296,7 @@ def get_nethermind_running_version(log):
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers,
+        response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers,
             timeout=30)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Nethermind. Exception: {exception}')
@@ -1636,22 +2333,12 @@ def get_nethermind_latest_version(log):
 
     log.info('Getting Nethermind latest version...')
 
-    nethermind_gh_release_url = GITHUB_REST_API_URL + NETHERMIND_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(nethermind_gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for Nethermind. {exception}')
+        release_json = github_release_cache.get_release(NETHERMIND_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for Nethermind. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for Nethermind. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for Nethermind.')
@@ -1674,22 +2361,12 @@ def get_lighthouse_latest_version(log):
 
     log.info('Getting Lighthouse latest version...')
 
-    lighthouse_gh_release_url = GITHUB_REST_API_URL + LIGHTHOUSE_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(lighthouse_gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for Lighthouse. {exception}')
+        release_json = github_release_cache.get_release(LIGHTHOUSE_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for Lighthouse. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for Lighthouse. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for Lighthouse.')
@@ -1712,22 +2389,12 @@ def get_mevboost_latest_version(log):
 
     log.info('Getting MEV-Boost latest version...')
 
-    gh_release_url = GITHUB_REST_API_URL + MEVBOOST_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for MEV-Boost. {exception}')
+        release_json = github_release_cache.get_release(MEVBOOST_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for MEV-Boost. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for MEV-Boost. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for MEV-Boost.')
@@ -1750,22 +2417,12 @@ def get_nimbus_latest_version(log):
 
     log.info('Getting Nimbus latest version...')
 
-    gh_release_url = GITHUB_REST_API_URL + NIMBUS_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for Nimbus. {exception}')
+        release_json = github_release_cache.get_release(NIMBUS_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for Nimbus. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for Nimbus. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for Nimbus.')
@@ -1872,7 +2529,7 @@ def select_mev_relays(network, log):
     # Obtain relays list from EthStaker
 
     try:
-        response = httpx.get(ETHSTAKER_RELAY_LIST_URL, follow_redirects=True)
+        response = httpclient.get(ETHSTAKER_RELAY_LIST_URL, follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while obtaining EthStaker MEV relay list from '
             f'{ETHSTAKER_RELAY_LIST_URL}. {exception}')
@@ -1921,7 +2578,15 @@ def select_mev_relays(network, log):
             f'{ETHSTAKER_RELAY_LIST_URL}.')
         return False
     
-    relay_bundles = RELAY_BUNDLES[network]
+    # Benchmark the relays from this machine
+
+    benchmark = benchmark_mev_relays([item['url'] for item in relay_list], log)
+
+    relay_bundles = dict(RELAY_BUNDLES[network])
+
+    low_latency_relays = get_relays_within_budget(benchmark)
+    if len(low_latency_relays) > 0:
+        relay_bundles[MEV_RELAY_LOW_LATENCY_BUNDLE] = low_latency_relays
 
     bundles_description = {}
 
@@ -1932,7 +2597,10 @@ def select_mev_relays(network, log):
         for url in relay_bundles[key]:
             if url in relay_url_to_item:
                 item = relay_url_to_item[url]
-                names.append(item['name'])
+                name = item['name']
+                if url in benchmark:
+                    name = name + f' ({format_relay_latency(benchmark[url])})'
+                names.append(name)
         
         if len(names) > 0:
             description = ', '.join(names)
@@ -1966,6 +2634,9 @@ There is a good list on https://ethstaker.cc/mev-relay-list .
 We are suggesting these bundles if you don't know which one to choose:
 {bundles_text}
 
+The latencies were measured from this machine. The {MEV_RELAY_LOW_LATENCY_BUNDLE} bundle has
+every relay with a p95 latency under {MEV_RELAY_LATENCY_BUDGET * 1000:.0f} ms.
+
 Which relays do you want to use?
 '''     ),
         buttons=buttons
@@ -1980,7 +2651,17 @@ Which relays do you want to use?
     elif result == 1:
         # Custom relay selection
 
-        values = [(key, key) for key in relay_name_to_item.keys()]
+        values = []
+        default_values = []
+
+        for key, item in relay_name_to_item.items():
+            label = key
+            stats = benchmark.get(item['url'])
+            if stats is not None:
+                label = f'{key} ({format_relay_latency(stats)})'
+                if stats['within_budget']:
+                    default_values.append(key)
+            values.append((key, label))
 
         selected_relays = []
 
@@ -1998,6 +2679,7 @@ least 1 relay.
 '''
                 ),
                 values=values,
+                default_values=default_values,
                 ok_text='Use these',
                 cancel_text='Quit'
             ).run()
@@ -2017,6 +2699,160 @@ least 1 relay.
 
     return return_list
 
+def get_relay_base_url(relay_url):
+    # Return the relay URL without the relay public key
+
+    result = urlparse(relay_url)
+    base_url = f'{result.scheme}://{result.host}'
+    if result.port:
+        base_url = base_url + f':{result.port}'
+    return base_url
+
+def get_url_host(url):
+    # Return the host of url, it does not include any secret in the path or the user info
+    try:
+        return urlparse(url).host or url
+    except Exception:
+        return url
+
+def get_configured_relays(argv):
+    # Return the relays from the MEV-Boost arguments. Both -relay for each relay and -relays with
+    # a comma separated list are supported.
+
+    relays = []
+
+    for index, arg in enumerate(argv):
+        arg = arg.strip('"\'')
+        name, equal, value = arg.partition('=')
+        name = name.lstrip('-').lower()
+
+        if name not in ('relay', 'relays'):
+            continue
+
+        if not equal:
+            if index + 1 >= len(argv):
+                continue
+            value = argv[index + 1].strip('"\'')
+
+        for relay in value.split(','):
+            relay = relay.strip()
+            if relay != '' and relay not in relays:
+                relays.append(relay)
+
+    return relays
+
+def get_percentile(sorted_values, percentile):
+    # Nearest rank percentile
+    if len(sorted_values) == 0:
+        return None
+    rank = max(1, math.ceil(percentile / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def benchmark_mev_relays(relay_urls, log, samples=MEV_RELAY_BENCHMARK_SAMPLES):
+    # Call the status endpoint of each relay samples times and return the latency statistics by
+    # relay URL. Relays are benchmarked concurrently. Requests to a relay are done one after the
+    # other on a kept alive connection, like MEV-Boost does, after a first request used to open
+    # the connection that is not counted.
+
+    async def benchmark_relay(client, relay_url):
+        stats = {
+            'samples': 0,
+            'errors': 0,
+            'error_rate': 1.0,
+            'p50': None,
+            'p95': None,
+            'within_budget': False
+        }
+
+        try:
+            status_url = get_relay_base_url(relay_url) + MEV_RELAY_STATUS_EP
+        except Exception as exception:
+            log.error(f'Invalid relay URL {relay_url}. {exception}')
+            return relay_url, stats
+
+        async def request_status():
+            start_time = time.perf_counter()
+            try:
+                response = await client.get(status_url, timeout=MEV_RELAY_BENCHMARK_TIMEOUT)
+            except httpx.HTTPError:
+                return None
+            if response.status_code != 200:
+                return None
+            return time.perf_counter() - start_time
+
+        await request_status()
+
+        latencies = []
+        for _ in range(samples):
+            latency = await request_status()
+            if latency is None:
+                stats['errors'] += 1
+            else:
+                latencies.append(latency)
+
+        latencies.sort()
+
+        stats['samples'] = samples
+        stats['error_rate'] = stats['errors'] / samples if samples > 0 else 1.0
+        stats['p50'] = get_percentile(latencies, 50)
+        stats['p95'] = get_percentile(latencies, 95)
+        stats['within_budget'] = (
+            stats['p95'] is not None and
+            stats['p95'] <= MEV_RELAY_LATENCY_BUDGET and
+            stats['error_rate'] <= MEV_RELAY_MAX_ERROR_RATE)
+
+        return relay_url, stats
+
+    async def benchmark_all():
+        async with httpclient.get_async_client() as client:
+            return await asyncio.gather(*[
+                benchmark_relay(client, relay_url) for relay_url in relay_urls])
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = dict(loop.run_until_complete(benchmark_all()))
+    finally:
+        loop.close()
+
+    log.info('MEV relay benchmark:\n' + format_relay_benchmark(results))
+
+    return results
+
+def format_relay_latency(stats):
+    if stats['p50'] is None:
+        return 'all requests failed'
+
+    text = f'p50 {stats["p50"] * 1000:.0f} ms, p95 {stats["p95"] * 1000:.0f} ms'
+    if stats['errors'] > 0:
+        text = text + f', {stats["error_rate"]:.0%} errors'
+    if not stats['within_budget']:
+        text = text + ', over budget'
+    return text
+
+def format_relay_benchmark(benchmark, relay_names=None):
+    # Return the benchmark results as text lines, fastest relays first
+
+    if relay_names is None:
+        relay_names = {}
+
+    lines = []
+    for relay_url, stats in sorted_relays_by_latency(benchmark):
+        name = relay_names.get(relay_url, get_url_host(relay_url))
+        lines.append(f'{name}: {format_relay_latency(stats)}')
+    return '\n'.join(lines)
+
+def sorted_relays_by_latency(benchmark):
+    # Return the (relay_url, stats) items, relays within the latency budget first and then by
+    # median latency
+    def sort_key(item):
+        stats = item[1]
+        return (not stats['within_budget'], stats['p50'] is None, stats['p50'] or 0)
+    return sorted(benchmark.items(), key=sort_key)
+
+def get_relays_within_budget(benchmark):
+    return [relay_url for relay_url, stats in sorted_relays_by_latency(benchmark)
+        if stats['within_budget']]
+
 def select_consensus_client(consensus_clients_available):
 
     result = radiolist_dialog(
@@ -0,0 +1,597 @@
+import os
+import json
+import re
+import time
+import hashlib
+import threading
+import httpx
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+from pathlib import Path
+
+from typing import Callable, Optional
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.batch import get_backoff_delay
+
+from ethwizard.constants import (
+    DOWNLOAD_PARTIAL_SUFFIX,
+    DOWNLOAD_METADATA_SUFFIX,
+    DOWNLOAD_CHECKPOINT_SIZE,
+    DOWNLOAD_ATTEMPTS,
+    DOWNLOAD_SEGMENTS,
+    DOWNLOAD_SEGMENT_MIN_SIZE
+)
+
+# Resumable download engine. A download is written to a partial file next to its destination
+# with a metadata file holding the URL, the validators (ETag and Last-Modified) and a checkpoint:
+# the number of bytes safely written and the SHA-256 of those bytes. An interrupted download is
+# resumed with a Range request. If-Range makes the server send the whole file again when it
+# changed since the partial file was started.
+#
+# The SHA-256 is computed while downloading. The running hash object is kept between resumes in
+# the same process. hashlib states cannot be saved, so a download resumed by another process
+# hashes the partial file again and compares it with the checkpoint before going on.
+#
+# Large files can be downloaded in segments: byte ranges fetched over several connections and
+# written at their offset in a preallocated partial file. The SHA-256 is computed over the
+# assembled file once every segment is written.
+
+class DownloadError(Exception):
+    pass
+
+class DownloadCancelled(DownloadError):
+    pass
+
+class DownloadStatusError(DownloadError):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+    def is_retryable(self) -> bool:
+        return self.status_code == 429 or self.status_code >= 500
+
+def get_partial_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + DOWNLOAD_PARTIAL_SUFFIX)
+
+def get_metadata_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + DOWNLOAD_METADATA_SUFFIX)
+
+def load_metadata(metadata_path: Path) -> Optional[dict]:
+    try:
+        with open(metadata_path, 'r', encoding='utf8') as metadata_file:
+            metadata = json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(metadata, dict):
+        return None
+    return metadata
+
+def save_metadata(metadata_path: Path, metadata: dict):
+    temp_path = metadata_path.with_name(metadata_path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf8') as metadata_file:
+        json.dump(metadata, metadata_file)
+    os.replace(temp_path, metadata_path)
+
+def remove_partial(file_path: Path):
+    for path in (get_partial_path(file_path), get_metadata_path(file_path)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+def hash_file_prefix(path: Path, size: int):
+    # Return the SHA-256 hash object of the first size bytes of path
+    file_hash = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as input_file:
+        while remaining > 0:
+            data = input_file.read(min(remaining, 1024 * 1024))
+            if not data:
+                break
+            file_hash.update(data)
+            remaining -= len(data)
+    return file_hash
+
+class ResumableDownload():
+    # State of a download, kept between the attempts of download_file
+
+    def __init__(self, url: str, file_path: Path):
+        self.url = url
+        self.file_path = Path(file_path)
+        self.partial_path = get_partial_path(self.file_path)
+        self.metadata_path = get_metadata_path(self.file_path)
+        self.metadata = None
+        self.file_hash = None
+        self.offset = 0
+
+    def restore(self, log=None):
+        # Restore a partial download left by an earlier attempt or process
+
+        metadata = load_metadata(self.metadata_path)
+        if (
+            metadata is None or
+            metadata.get('url') != self.url or
+            not self.partial_path.is_file() or
+            not (metadata.get('etag') or metadata.get('last_modified'))
+        ):
+            self.reset()
+            return
+
+        offset = int(metadata.get('offset', 0))
+        if self.partial_path.stat().st_size < offset:
+            self.reset()
+            return
+
+        # Bytes written after the last checkpoint are downloaded again
+        with open(self.partial_path, 'r+b') as partial_file:
+            partial_file.truncate(offset)
+
+        file_hash = hash_file_prefix(self.partial_path, offset)
+        if file_hash.hexdigest() != metadata.get('sha256'):
+            if log is not None:
+                log.warning(f'Partial download {self.partial_path} does not match its '
+                    f'checkpoint. Starting over.')
+            self.reset()
+            return
+
+        if log is not None:
+            log.info(f'Resuming download of {self.file_path.name} at {offset} bytes.')
+
+        self.metadata = metadata
+        self.file_hash = file_hash
+        self.offset = offset
+
+    def reset(self):
+        remove_partial(self.file_path)
+        self.metadata = None
+        self.file_hash = hashlib.sha256()
+        self.offset = 0
+
+    def get_headers(self) -> dict:
+        headers = {}
+        if self.offset > 0 and self.metadata is not None:
+            headers['Range'] = f'bytes={self.offset}-'
+            headers['If-Range'] = self.metadata.get('etag') or self.metadata.get('last_modified')
+        return headers
+
+    def checkpoint(self, partial_file):
+        # Make the written bytes durable before recording them in the metadata
+        partial_file.flush()
+        os.fsync(partial_file.fileno())
+        self.metadata['offset'] = self.offset
+        self.metadata['sha256'] = self.file_hash.hexdigest()
+        save_metadata(self.metadata_path, self.metadata)
+
+    def start(self, response: httpx.Response):
+        # Check the response to a (range) request and return the file mode to write with
+
+        if response.status_code == 206 and self.offset > 0:
+            content_range = response.headers.get('Content-Range', '')
+            if not content_range.startswith(f'bytes {self.offset}-'):
+                raise DownloadError(f'Unexpected Content-Range {content_range} for {self.url}')
+            return 'ab'
+
+        if response.status_code != 200:
+            raise DownloadStatusError(f'Status code {response.status_code} for {self.url}',
+                response.status_code)
+
+        # Full response: first request, server without range support or changed file
+        self.file_hash = hashlib.sha256()
+        self.offset = 0
+
+        total_size = response.headers.get('Content-Length')
+        if response.headers.get('Content-Encoding'):
+            total_size = None
+
+        self.metadata = {
+            'url': self.url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': int(total_size) if total_size is not None else None,
+            'offset': 0,
+            'sha256': self.file_hash.hexdigest()
+        }
+        return 'wb'
+
+    def is_resumable(self) -> bool:
+        # A server without ETag or Last-Modified cannot be resumed safely with If-Range
+        return self.metadata is not None and bool(
+            self.metadata.get('etag') or self.metadata.get('last_modified'))
+
+    def complete(self):
+        os.replace(self.partial_path, self.file_path)
+        try:
+            self.metadata_path.unlink()
+        except FileNotFoundError:
+            pass
+
+def download_file(url: str, file_path, log=None, cancelled=None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    attempts: int = DOWNLOAD_ATTEMPTS, **kwargs):
+    # Download url into file_path and return the SHA-256 hash object of the complete file.
+    # Interrupted transfers are resumed up to attempts times and a partial file left by another
+    # process is resumed too. cancelled is an optional threading.Event checked between chunks.
+    # progress is called with the downloaded bytes and the total size, None when unknown. Other
+    # arguments are passed to the HTTP client. Raise DownloadError on failure.
+
+    kwargs.setdefault('follow_redirects', True)
+    extra_headers = kwargs.pop('headers', None) or {}
+
+    download = ResumableDownload(url, Path(file_path))
+    download.restore(log)
+
+    attempt = 0
+
+    while True:
+        if cancelled is not None and cancelled.is_set():
+            raise DownloadCancelled(f'Download of {url} cancelled')
+
+        # Ranges are on the stored bytes, content encodings would change them
+        headers = {'Accept-Encoding': 'identity'}
+        headers.update(extra_headers)
+        headers.update(download.get_headers())
+
+        try:
+            with httpclient.stream('GET', url, headers=headers, **kwargs) as http_stream:
+                if http_stream.status_code == 416 and download.offset > 0:
+                    # The partial file is no longer a prefix of this file
+                    download.reset()
+                    raise DownloadError(f'Range not satisfiable for {url}')
+
+                mode = download.start(http_stream)
+                total_size = download.metadata.get('size')
+                last_checkpoint = download.offset
+
+                if progress is not None:
+                    progress(download.offset, total_size)
+
+                with open(download.partial_path, mode) as partial_file:
+                    try:
+                        for data in http_stream.iter_bytes():
+                            if cancelled is not None and cancelled.is_set():
+                                raise DownloadCancelled(f'Download of {url} cancelled')
+
+                            partial_file.write(data)
+                            download.file_hash.update(data)
+                            download.offset += len(data)
+
+                            if (download.is_resumable() and
+                                download.offset - last_checkpoint >= DOWNLOAD_CHECKPOINT_SIZE):
+                                download.checkpoint(partial_file)
+                                last_checkpoint = download.offset
+
+                            if progress is not None:
+                                progress(download.offset, total_size)
+                    finally:
+                        if download.is_resumable():
+                            download.checkpoint(partial_file)
+
+                if total_size is not None and download.offset != total_size:
+                    raise httpx.ReadError(f'Incomplete download, {download.offset} of '
+                        f'{total_size} bytes')
+
+            download.complete()
+            return download.file_hash
+
+        except DownloadCancelled:
+            remove_partial(download.file_path)
+            raise
+
+        except DownloadStatusError as exception:
+            if not exception.is_retryable():
+                raise
+            error = exception
+
+        except (httpx.TransportError, DownloadError) as exception:
+            error = exception
+
+        attempt = attempt + 1
+
+        if attempt >= attempts:
+            raise DownloadError(f'Download of {url} failed after {attempt} attempts. {error}')
+
+        if not download.is_resumable():
+            download.reset()
+
+        delay = get_backoff_delay(attempt - 1)
+        if log is not None:
+            log.warning(f'Download of {download.file_path.name} interrupted at '
+                f'{download.offset} bytes. {error} We will retry in {delay:.1f} seconds.')
+        time.sleep(delay)
+
+def get_range_support(url: str, client: httpx.Client, **kwargs):
+    # Ask for the first byte of url. Return the size of the file and its validator (ETag or
+    # Last-Modified) when the server supports ranges, None otherwise.
+
+    headers = {'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'}
+
+    with client.stream('GET', url, headers=headers, **kwargs) as http_stream:
+        if http_stream.status_code != 206:
+            return None
+
+        result = re.match(r'bytes 0-0/(?P<size>\d+)$',
+            http_stream.headers.get('Content-Range', ''))
+        validator = http_stream.headers.get('ETag') or http_stream.headers.get('Last-Modified')
+        if result is None or validator is None:
+            return None
+
+        return int(result.group('size')), validator
+
+def split_segments(size: int, segments: int):
+    # Split size bytes in segments (start, end) inclusive ranges of about the same length
+    segment_size = -(-size // segments)
+    return [(start, min(start + segment_size, size) - 1)
+        for start in range(0, size, segment_size)]
+
+class SegmentWriter():
+    # Write segments at their offset in a preallocated file. os.pwrite is used when available,
+    # other platforms (Windows) seek and write under a lock.
+
+    def __init__(self, path: Path, size: int):
+        self.file = open(path, 'wb')
+        self.fileno = self.file.fileno()
+        self.lock = threading.Lock()
+
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.fileno, 0, size)
+            except OSError:
+                self.file.truncate(size)
+        else:
+            self.file.truncate(size)
+
+    def write(self, data: bytes, offset: int):
+        if hasattr(os, 'pwrite'):
+            view = memoryview(data)
+            while len(view) > 0:
+                written = os.pwrite(self.fileno, view, offset)
+                view = view[written:]
+                offset += written
+        else:
+            with self.lock:
+                self.file.seek(offset)
+                self.file.write(data)
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.fileno)
+        self.file.close()
+
+def _download_segment(client: httpx.Client, url: str, validator: str, writer: SegmentWriter,
+    segment, stop: threading.Event, on_data: Callable[[int], None], attempts: int, log, **kwargs):
+    # Download the segment byte range, resuming from the last written byte after an error
+
+    start, end = segment
+    position = start
+    attempt = 0
+
+    while position <= end:
+        if stop.is_set():
+            raise DownloadCancelled(f'Download of {url} cancelled')
+
+        headers = {
+            'Range': f'bytes={position}-{end}',
+            'If-Range': validator,
+            'Accept-Encoding': 'identity'
+        }
+
+        try:
+            with client.stream('GET', url, headers=headers, **kwargs) as http_stream:
+                if http_stream.status_code == 200:
+                    raise DownloadError(f'{url} changed during the download')
+                if http_stream.status_code != 206:
+                    raise DownloadStatusError(f'Status code {http_stream.status_code} for {url}',
+                        http_stream.status_code)
+
+                for data in http_stream.iter_bytes():
+                    if stop.is_set():
+                        raise DownloadCancelled(f'Download of {url} cancelled')
+                    if position + len(data) > end + 1:
+                        raise DownloadError(f'Segment {start}-{end} of {url} is too long')
+
+                    writer.write(data, position)
+                    position += len(data)
+                    on_data(len(data))
+
+            if position <= end:
+                raise httpx.ReadError(f'Incomplete segment, {position - start} of '
+                    f'{end - start + 1} bytes')
+
+        except DownloadStatusError as exception:
+            if not exception.is_retryable():
+                raise
+            error = exception
+
+        except httpx.TransportError as exception:
+            error = exception
+
+        else:
+            continue
+
+        attempt = attempt + 1
+        if attempt >= attempts:
+            raise DownloadError(f'Segment {start}-{end} of {url} failed after {attempt} '
+                f'attempts. {error}')
+
+        delay = get_backoff_delay(attempt - 1)
+        if log is not None:
+            log.warning(f'Segment {start}-{end} interrupted at {position} bytes. {error} We will '
+                f'retry in {delay:.1f} seconds.')
+        time.sleep(delay)
+
+def download_file_segmented(url: str, file_path, log=None, cancelled=None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    segments: int = DOWNLOAD_SEGMENTS, attempts: int = DOWNLOAD_ATTEMPTS, **kwargs):
+    # Download url into file_path with segments connections and return the SHA-256 hash object
+    # of the complete file. Small files, servers without range support and partial files left by
+    # download_file use download_file instead. Arguments are the same as download_file. Raise
+    # DownloadError on failure.
+
+    kwargs.setdefault('follow_redirects', True)
+
+    file_path = Path(file_path)
+
+    metadata = load_metadata(get_metadata_path(file_path))
+    if metadata is not None and metadata.get('url') == url:
+        # Resume the single connection download started earlier
+        return download_file(url, file_path, log=log, cancelled=cancelled, progress=progress,
+            attempts=attempts, **kwargs)
+
+    client = httpclient.get_segment_client()
+
+    try:
+        range_support = get_range_support(url, client, **kwargs)
+    except httpx.TransportError:
+        range_support = None
+
+    if segments <= 1 or range_support is None or range_support[0] < DOWNLOAD_SEGMENT_MIN_SIZE:
+        return download_file(url, file_path, log=log, cancelled=cancelled, progress=progress,
+            attempts=attempts, **kwargs)
+
+    if cancelled is not None and cancelled.is_set():
+        raise DownloadCancelled(f'Download of {url} cancelled')
+
+    size, validator = range_support
+    remove_partial(file_path)
+    partial_path = get_partial_path(file_path)
+
+    if log is not None:
+        log.info(f'Downloading {file_path.name} ({size} bytes) in {segments} segments...')
+
+    stop = threading.Event()
+    downloaded = 0
+    downloaded_lock = threading.Lock()
+
+    def on_data(length):
+        nonlocal downloaded
+        with downloaded_lock:
+            downloaded += length
+            current = downloaded
+        if progress is not None:
+            progress(current, size)
+        if cancelled is not None and cancelled.is_set():
+            stop.set()
+
+    writer = SegmentWriter(partial_path, size)
+    if progress is not None:
+        progress(0, size)
+
+    try:
+        with ThreadPoolExecutor(max_workers=segments,
+            thread_name_prefix='download-segment') as executor:
+            futures = [executor.submit(_download_segment, client, url, validator, writer,
+                segment, stop, on_data, attempts, log, **kwargs)
+                for segment in split_segments(size, segments)]
+
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            if len(not_done) > 0:
+                # Stop the other segments once one of them failed
+                stop.set()
+                wait(not_done)
+
+            for future in futures:
+                exception = future.exception()
+                if exception is not None and not isinstance(exception, DownloadCancelled):
+                    raise exception
+            if stop.is_set():
+                raise DownloadCancelled(f'Download of {url} cancelled')
+    except BaseException:
+        writer.file.close()
+        remove_partial(file_path)
+        raise
+
+    writer.close()
+
+    file_hash = hash_file_prefix(partial_path, size)
+    os.replace(partial_path, file_path)
+    return file_hash
+
+def iter_download(url: str, log=None, cancelled=None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    attempts: int = DOWNLOAD_ATTEMPTS, **kwargs):
+    # Yield the bytes of url in order without writing them to disk, for consumers like the
+    # archive extraction pipeline. Interrupted transfers are resumed with Range and If-Range. A
+    # file that changed since the start cannot be resumed since the earlier bytes are already
+    # consumed. cancelled and progress are the same as download_file. Raise DownloadError on
+    # failure.
+
+    kwargs.setdefault('follow_redirects', True)
+    extra_headers = kwargs.pop('headers', None) or {}
+
+    offset = 0
+    total_size = None
+    validator = None
+    attempt = 0
+
+    while True:
+        if cancelled is not None and cancelled.is_set():
+            raise DownloadCancelled(f'Download of {url} cancelled')
+
+        headers = {'Accept-Encoding': 'identity'}
+        headers.update(extra_headers)
+        if offset > 0:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
+
+        try:
+            with httpclient.stream('GET', url, headers=headers, **kwargs) as http_stream:
+                if offset > 0:
+                    if http_stream.status_code == 200:
+                        raise DownloadError(f'{url} changed during the download')
+                    content_range = http_stream.headers.get('Content-Range', '')
+                    if (http_stream.status_code != 206 or
+                        not content_range.startswith(f'bytes {offset}-')):
+                        raise DownloadStatusError(f'Status code {http_stream.status_code} for '
+                            f'{url}', http_stream.status_code)
+                else:
+                    if http_stream.status_code != 200:
+                        raise DownloadStatusError(f'Status code {http_stream.status_code} for '
+                            f'{url}', http_stream.status_code)
+                    total_size = http_stream.headers.get('Content-Length')
+                    if total_size is not None:
+                        total_size = int(total_size)
+                    validator = (http_stream.headers.get('ETag') or
+                        http_stream.headers.get('Last-Modified'))
+
+                    if progress is not None:
+                        progress(0, total_size)
+
+                for data in http_stream.iter_bytes():
+                    if cancelled is not None and cancelled.is_set():
+                        raise DownloadCancelled(f'Download of {url} cancelled')
+
+                    offset += len(data)
+                    yield data
+
+                    if progress is not None:
+                        progress(offset, total_size)
+
+                if total_size is not None and offset != total_size:
+                    raise httpx.ReadError(f'Incomplete download, {offset} of {total_size} bytes')
+
+            return
+
+        except DownloadStatusError as exception:
+            if not exception.is_retryable():
+                raise
+            error = exception
+
+        except httpx.TransportError as exception:
+            error = exception
+
+        if offset > 0 and validator is None:
+            raise DownloadError(f'Download of {url} interrupted and it cannot be resumed. {error}')
+
+        attempt = attempt + 1
+        if attempt >= attempts:
+            raise DownloadError(f'Download of {url} failed after {attempt} attempts. {error}')
+
+        delay = get_backoff_delay(attempt - 1)
+        if log is not None:
+            log.warning(f'Download of {url} interrupted at {offset} bytes. {error} We will retry '
+                f'in {delay:.1f} seconds.')
+        time.sleep(delay)
@@ -0,0 +1,447 @@
+import io
+import os
+import shutil
+import struct
+import hashlib
+import subprocess
+import tarfile
+import zlib
+
+from pathlib import Path, PurePosixPath
+
+from secrets import token_hex
+
+from typing import Callable, Iterable, List, Optional
+
+from ethwizard.platforms.artifacts import ArtifactChunks
+
+# Streaming download, verify and extract pipeline for release archives (.tar.gz and .zip). The
+# archive bytes are hashed, optionally passed to a signature verifier and decompressed in a
+# single pass as they arrive. The archive is never written whole to the downloads directory.
+#
+# Members are written to a staging directory next to their destination, on the same file
+# system. Nothing is installed until the caller has checked the checksum or the signature and
+# calls commit(), which moves the staged files in place with atomic renames. abort() removes
+# the staged files. When the archive bytes come from iter_artifact, commit() also adds the
+# archive to the artifact store and abort() removes it from there.
+#
+# Zip archives are read sequentially from their local file headers since the stream cannot be
+# seeked to the central directory. Stored and deflated members are supported.
+
+STAGING_PREFIX = '.staged-'
+COPY_BUFFER_SIZE = 1024 * 1024
+
+ZIP_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+ZIP_CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+ZIP_END_SIGNATURES = (b'PK\x05\x06', b'PK\x06\x06', b'PK\x06\x07')
+ZIP_DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+ZIP_LOCAL_HEADER = struct.Struct('<HHHHHIIIHH')
+ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+ZIP_FLAG_UTF8 = 0x800
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_EXTRA_ID = 0x0001
+ZIP64_LIMIT = 0xFFFFFFFF
+
+class ExtractError(Exception):
+    pass
+
+class ArchiveStream(io.RawIOBase):
+    # Readable file object over an iterable of archive chunks. Every chunk is hashed and passed
+    # to the tee functions as it is read.
+
+    def __init__(self, chunks: Iterable[bytes], tee: List[Callable[[bytes], None]]):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+        self._tee = tee
+        self.file_hash = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def _fill(self) -> bool:
+        for data in self._chunks:
+            if not data:
+                continue
+            self.file_hash.update(data)
+            self.size += len(data)
+            for function in self._tee:
+                function(data)
+            self._buffer += data
+            return True
+        return False
+
+    def read(self, size=-1) -> bytes:
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            size = len(self._buffer)
+
+        while len(self._buffer) < size:
+            if not self._fill():
+                break
+
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise ExtractError('Unexpected end of archive.')
+        return data
+
+    def unread(self, data: bytes):
+        self._buffer = data + self._buffer
+
+    def drain(self):
+        # Consume the rest of the stream so the hash covers the whole archive
+        self._buffer = b''
+        while self._fill():
+            self._buffer = b''
+
+def strip_components(count: int) -> Callable[[str], Optional[str]]:
+    # Member selection removing the first count path components, like tar --strip-components.
+    # A leading . counts as a component, as it does for tar.
+    def select(name: str) -> Optional[str]:
+        parts = [part for part in name.split('/') if part != ''][count:]
+        if len(parts) == 0:
+            return None
+        return str(PurePosixPath(*parts))
+    return select
+
+def select_names(names: dict) -> Callable[[str], Optional[str]]:
+    # Member selection keeping the members whose file name is in names, renamed to the value
+    def select(name: str) -> Optional[str]:
+        return names.get(PurePosixPath(name).name)
+    return select
+
+def get_safe_relative_path(name: str) -> Optional[PurePosixPath]:
+    path = PurePosixPath(name.replace('\\', '/'))
+    if path.is_absolute() or '..' in path.parts or len(path.parts) == 0:
+        return None
+    return path
+
+class StagedExtraction():
+    # Members of an archive extracted in a staging directory and waiting to be committed
+
+    def __init__(self, destination: Path, replace_destination: bool):
+        self.destination = Path(destination)
+        self.replace_destination = replace_destination
+        self.staging_path = self.destination.parent.joinpath(
+            f'{STAGING_PREFIX}{self.destination.name}-{token_hex(4)}')
+        self.files = []
+        self.file_hash = None
+        self.size = 0
+        # Archive bytes from iter_artifact, kept in the artifact store only when committed
+        self.artifact = None
+
+    def get_hexdigest(self) -> str:
+        return self.file_hash.hexdigest().lower()
+
+    def write_member(self, relative_path: PurePosixPath, source, mode: Optional[int]):
+        staged_path = self.staging_path.joinpath(*relative_path.parts)
+        staged_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(staged_path, 'wb') as staged_file:
+            shutil.copyfileobj(source, staged_file, COPY_BUFFER_SIZE)
+
+        if mode:
+            os.chmod(staged_path, mode & 0o777)
+
+        self.files.append(relative_path)
+
+    def commit(self):
+        # Move the staged files in place. With replace_destination, the destination directory is
+        # replaced as a whole, otherwise each file replaces its counterpart in the destination.
+
+        if self.replace_destination:
+            old_path = None
+            if self.destination.exists():
+                old_path = self.destination.parent.joinpath(
+                    f'{STAGING_PREFIX}{self.destination.name}-old-{token_hex(4)}')
+                os.replace(self.destination, old_path)
+            self.staging_path.mkdir(parents=True, exist_ok=True)
+            os.replace(self.staging_path, self.destination)
+            if old_path is not None:
+                shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            for relative_path in self.files:
+                staged_path = self.staging_path.joinpath(*relative_path.parts)
+                final_path = self.destination.joinpath(*relative_path.parts)
+                final_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_path, final_path)
+
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+
+        if self.artifact is not None:
+            self.artifact.commit()
+
+    def abort(self):
+        # The archive failed its verification, it is removed from the artifact store
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+        if self.artifact is not None:
+            self.artifact.discard()
+
+def _extract_tar(stream: ArchiveStream, staged: StagedExtraction,
+    select: Callable[[str], Optional[str]]):
+
+    try:
+        with tarfile.open(fileobj=stream, mode='r|*') as tar_file:
+            for member in tar_file:
+                if not member.isfile():
+                    continue
+                name = select(member.name)
+                relative_path = get_safe_relative_path(name) if name is not None else None
+                if relative_path is None:
+                    continue
+                staged.write_member(relative_path, tar_file.extractfile(member), member.mode)
+    except tarfile.TarError as exception:
+        raise ExtractError(f'Unable to read tar archive. {exception}')
+
+def _get_zip64_sizes(extra: bytes, compressed_size: int, uncompressed_size: int):
+    # Read the sizes overflowing 32 bits from the ZIP64 extended information extra field
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, data_size = struct.unpack_from('<HH', extra, position)
+        data = extra[position + 4:position + 4 + data_size]
+        if header_id == ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from(f'<{len(data) // 8}Q', data))
+            if uncompressed_size == ZIP64_LIMIT and values:
+                uncompressed_size = values.pop(0)
+            if compressed_size == ZIP64_LIMIT and values:
+                compressed_size = values.pop(0)
+            return compressed_size, uncompressed_size, True
+        position += 4 + data_size
+    return compressed_size, uncompressed_size, False
+
+class ZipMemberReader(io.RawIOBase):
+    # Readable file object for the data of the current zip member in the stream
+
+    def __init__(self, stream: ArchiveStream, method: int, compressed_size: Optional[int]):
+        self._stream = stream
+        self._method = method
+        self._remaining = compressed_size
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == ZIP_DEFLATED else None
+        self._output = b''
+        self.crc = 0
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def _next_input(self) -> bytes:
+        size = COPY_BUFFER_SIZE
+        if self._remaining is not None:
+            size = min(size, self._remaining)
+            if size == 0:
+                return b''
+        data = self._stream.read(size)
+        if self._remaining is not None:
+            if len(data) != size:
+                raise ExtractError('Unexpected end of archive.')
+            self._remaining -= len(data)
+        return data
+
+    def _read_chunk(self) -> bytes:
+        if self._method == ZIP_STORED:
+            return self._next_input()
+
+        while not self._decompressor.eof:
+            data = self._next_input()
+            if not data:
+                raise ExtractError('Unexpected end of deflate data.')
+            output = self._decompressor.decompress(data)
+            if self._decompressor.eof and self._decompressor.unused_data:
+                # Bytes after the deflate data belong to the next record
+                self._stream.unread(self._decompressor.unused_data)
+                if self._remaining is not None:
+                    self._remaining += len(self._decompressor.unused_data)
+            if output:
+                return output
+        return b''
+
+    def read(self, size=-1) -> bytes:
+        data = self._read_chunk()
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        if self._output == b'':
+            self._output = self.read()
+        data = self._output[:len(buffer)]
+        self._output = self._output[len(data):]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def finish(self):
+        # Read the member data left when it was not selected
+        while self.read():
+            pass
+
+def _extract_zip(stream: ArchiveStream, staged: StagedExtraction,
+    select: Callable[[str], Optional[str]]):
+
+    while True:
+        signature = stream.read(4)
+        if signature in (ZIP_CENTRAL_HEADER_SIGNATURE, ) + ZIP_END_SIGNATURES or signature == b'':
+            return
+        if signature != ZIP_LOCAL_HEADER_SIGNATURE:
+            raise ExtractError('Unexpected zip record.')
+
+        (_version, flags, method, _time, _date, crc, compressed_size, uncompressed_size,
+            name_length, extra_length) = ZIP_LOCAL_HEADER.unpack(
+            stream.read_exact(ZIP_LOCAL_HEADER.size))
+
+        raw_name = stream.read_exact(name_length)
+        name = raw_name.decode('utf8' if flags & ZIP_FLAG_UTF8 else 'cp437')
+        extra = stream.read_exact(extra_length)
+
+        compressed_size, uncompressed_size, is_zip64 = _get_zip64_sizes(extra, compressed_size,
+            uncompressed_size)
+        has_descriptor = bool(flags & ZIP_FLAG_DATA_DESCRIPTOR)
+
+        if method not in (ZIP_STORED, ZIP_DEFLATED):
+            raise ExtractError(f'Unsupported compression method {method} for {name}.')
+        if method == ZIP_STORED and has_descriptor:
+            raise ExtractError(f'Cannot stream stored member {name} without its size.')
+
+        # Deflate data ends by itself, the size is only known without a data descriptor
+        reader = ZipMemberReader(stream, method,
+            None if has_descriptor else compressed_size)
+
+        selected_name = select(name) if not name.endswith('/') else None
+        relative_path = get_safe_relative_path(selected_name) if selected_name else None
+        if relative_path is not None:
+            staged.write_member(relative_path, reader, None)
+        reader.finish()
+
+        if has_descriptor:
+            descriptor = stream.read_exact(4)
+            if descriptor == ZIP_DATA_DESCRIPTOR_SIGNATURE:
+                descriptor = stream.read_exact(4)
+            crc = struct.unpack('<I', descriptor)[0]
+            stream.read_exact(16 if is_zip64 else 8)
+
+        if reader.crc != crc:
+            raise ExtractError(f'CRC mismatch for {name} in zip archive.')
+
+def extract_archive(chunks: Iterable[bytes], archive_name: str, destination: Path,
+    select: Optional[Callable[[str], Optional[str]]] = None, replace_destination: bool = False,
+    tee: Optional[List[Callable[[bytes], None]]] = None) -> StagedExtraction:
+    # Extract the archive named archive_name, whose bytes are chunks, in a staging directory for
+    # destination and return the StagedExtraction with the archive SHA-256. select maps each
+    # member name to its path relative to destination, or None to skip it. tee functions get
+    # the archive bytes as they are read. Raise ExtractError when the archive cannot be read.
+    # The DownloadError raised by chunks is passed through. The staged files are removed on
+    # failure.
+
+    if select is None:
+        select = lambda name: name
+    if tee is None:
+        tee = []
+
+    staged = StagedExtraction(destination, replace_destination)
+    stream = ArchiveStream(chunks, tee)
+
+    try:
+        staged.staging_path.mkdir(parents=True)
+        if archive_name.endswith('.zip'):
+            _extract_zip(stream, staged, select)
+        else:
+            _extract_tar(stream, staged, select)
+        stream.drain()
+    except zlib.error as exception:
+        staged.abort()
+        discard_artifact_chunks(chunks, True)
+        raise ExtractError(f'Unable to decompress {archive_name}. {exception}')
+    except ExtractError:
+        staged.abort()
+        discard_artifact_chunks(chunks, True)
+        raise
+    except BaseException:
+        staged.abort()
+        discard_artifact_chunks(chunks, False)
+        raise
+
+    if isinstance(chunks, ArtifactChunks):
+        staged.artifact = chunks
+    staged.file_hash = stream.file_hash
+    staged.size = stream.size
+    return staged
+
+def discard_artifact_chunks(chunks: Iterable[bytes], damaged: bool):
+    # Drop the archive bytes of a failed extraction. A damaged archive is removed from the
+    # artifact store, a cancelled or failed download leaves the store untouched.
+    if not isinstance(chunks, ArtifactChunks):
+        return
+    if damaged:
+        chunks.discard()
+    else:
+        chunks.close()
+
+def iter_file(file_path: Path) -> Iterable[bytes]:
+    # Chunks of a file already downloaded, like a prefetched archive, for extract_archive
+    with open(file_path, 'rb') as input_file:
+        while True:
+            data = input_file.read(COPY_BUFFER_SIZE)
+            if not data:
+                break
+            yield data
+
+class SignatureVerifier():
+    # Verify a detached PGP signature with gpg while the signed file is streamed to its standard
+    # input. Use update as a tee function of extract_archive, then verify. gpg_arguments are
+    # added before --verify, like the keyring arguments. The gpg output is captured, logged
+    # with log by verify and kept in stdout and stderr.
+
+    def __init__(self, signature_path: Path, gpg_binary: str = 'gpg',
+        gpg_arguments: Optional[List[str]] = None, log=None):
+
+        if gpg_arguments is None:
+            gpg_arguments = []
+        self.log = log
+        self.stdout = ''
+        self.stderr = ''
+        # gpg only writes a few lines before its standard input is closed, they fit in the pipe
+        # buffers
+        self._process = subprocess.Popen([str(gpg_binary)] + gpg_arguments +
+            ['--verify', str(signature_path), '-'], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._broken = False
+
+    def update(self, data: bytes):
+        if self._broken:
+            return
+        try:
+            self._process.stdin.write(data)
+        except OSError:
+            # gpg stopped reading, verify reports its result
+            self._broken = True
+
+    def verify(self) -> bool:
+        # Close the standard input of gpg and return True when the signature is good
+        stdout, stderr = self._process.communicate()
+        self.stdout = stdout.decode('utf8', errors='replace')
+        self.stderr = stderr.decode('utf8', errors='replace')
+
+        verified = self._process.returncode == 0 and not self._broken
+        if self.log is not None:
+            if verified:
+                self.log.info(f'gpg signature verification output:\n{self.stderr}')
+            else:
+                self.log.error(f'Unable to verify the signature with gpg. Return code '
+                    f'{self._process.returncode}.\nStdOut: {self.stdout}\nStdErr: {self.stderr}')
+        return verified
+
+    def cancel(self):
+        self._process.kill()
+        self._process.communicate()
@@ -0,0 +1,298 @@
+import json
+import sys
+import time
+import threading
+
+from pathlib import Path
+
+from prompt_toolkit.document import Document
+from prompt_toolkit.formatted_text import to_plain_text
+from prompt_toolkit.validation import ValidationError
+from prompt_toolkit import shortcuts
+
+from ethwizard.utils.lazy import lazy_callable
+
+safe_load = lazy_callable('yaml', 'safe_load')
+
+# Headless mode replaces every dialog with an answer from an answers file. Answers are keyed by
+# the dialog title. When a dialog has no answer, a non-interactive default is used:
+#
+# * button dialogs: the first button that does not quit
+# * radio list dialogs: the dialog default or the first value
+# * checkbox list dialogs: the dialog default values
+# * input dialogs: the dialog default text, it must pass the dialog validator
+# * progress dialogs: no timeout, they run until their work is done
+#
+# Progress is written as JSON lines to the progress stream instead of being displayed.
+
+# A dialog shown more often than this is in a loop that the answers cannot get out of
+MAX_DIALOG_REPEATS = 10
+
+class HeadlessError(Exception):
+    pass
+
+class HeadlessSession():
+    def __init__(self, answers: dict, progress_stream):
+        self.answers = answers
+        self.progress_stream = progress_stream
+        self.completed = False
+        self.dialog_counts = {}
+        self._lock = threading.Lock()
+
+    def get_answer(self, title):
+        return self.answers.get(to_plain_text(title).strip())
+
+    def emit(self, event: dict):
+        if event.get('event') == 'completed':
+            self.completed = True
+
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self.progress_stream.write(line + '\n')
+            self.progress_stream.flush()
+
+_session = None
+
+def load_answers(answers_path):
+    # Load the answers file. JSON files are detected by their extension, anything else is
+    # read as YAML.
+
+    answers_path = Path(answers_path)
+
+    with open(answers_path, 'r', encoding='utf8') as answers_file:
+        try:
+            if answers_path.suffix.lower() == '.json':
+                answers = json.load(answers_file)
+            else:
+                answers = safe_load(answers_file)
+        except Exception as exception:
+            raise HeadlessError(f'Unable to parse the answers file {answers_path}. {exception}')
+
+    if answers is None:
+        answers = {}
+
+    if not isinstance(answers, dict):
+        raise HeadlessError(f'The answers file {answers_path} does not contain a mapping.')
+
+    answers = answers.get('answers', answers)
+    if not isinstance(answers, dict):
+        raise HeadlessError(f'The answers in {answers_path} are not a mapping of dialog '
+            f'titles to answers.')
+
+    return answers
+
+def enable_headless(answers_path=None, progress_path=None):
+    # Enable headless mode. The progress stream is stdout when progress_path is None or -.
+
+    global _session
+
+    answers = {}
+    if answers_path is not None:
+        answers = load_answers(answers_path)
+
+    if progress_path is None or progress_path == '-':
+        progress_stream = sys.stdout
+    else:
+        progress_stream = open(progress_path, 'a', encoding='utf8')
+
+    _session = HeadlessSession(answers, progress_stream)
+
+def is_headless():
+    return _session is not None
+
+def emit_progress(event: dict):
+    # Write an event on the progress stream. Does nothing when not in headless mode.
+    if _session is not None:
+        _session.emit(event)
+
+def headless_exit_code():
+    # Exit code for a headless run: 0 when the installation was completed
+    if _session is None or _session.completed:
+        return 0
+    return 1
+
+class HeadlessDialog():
+    # Stand-in for the prompt_toolkit Application returned by the dialog functions
+
+    def __init__(self, kind, title, resolve):
+        self.kind = kind
+        self.title = to_plain_text(title)
+        self.resolve = resolve
+
+    def run(self):
+        count = _session.dialog_counts.get(self.title, 0) + 1
+        _session.dialog_counts[self.title] = count
+        if count > MAX_DIALOG_REPEATS:
+            _session.emit({'event': 'dialog_error', 'kind': self.kind, 'title': self.title,
+                'error': f'Dialog shown {count} times, the answers do not allow the '
+                    f'installation to go on.'})
+            sys.exit(headless_exit_code())
+
+        answer = _session.get_answer(self.title)
+        source = 'default' if answer is None else 'answers'
+
+        try:
+            result = self.resolve(answer)
+        except HeadlessError as exception:
+            _session.emit({'event': 'dialog_error', 'kind': self.kind, 'title': self.title,
+                'error': str(exception)})
+            return None
+
+        _session.emit({'event': 'dialog', 'kind': self.kind, 'title': self.title,
+            'source': source, 'result': result})
+
+        return result
+
+def _match_value(answer, values):
+    # Match an answer with the value or the label of a list of (value, label) pairs
+    for value, label in values:
+        if answer == value:
+            return value
+    for value, label in values:
+        if str(answer).lower() == to_plain_text(label).strip().lower():
+            return value
+    raise HeadlessError(f'{answer} is not one of the possible choices: '
+        f'{", ".join(str(value) for value, label in values)}')
+
+def button_dialog(title='', text='', buttons=[], style=None):
+    if _session is None:
+        return shortcuts.button_dialog(title=title, text=text, buttons=buttons, style=style)
+
+    def resolve(answer):
+        if answer is not None:
+            return _match_value(answer, [(value, label) for label, value in buttons])
+
+        for label, value in buttons:
+            if value:
+                return value
+        return buttons[0][1] if len(buttons) > 0 else None
+
+    return HeadlessDialog('button', title, resolve)
+
+def radiolist_dialog(title='', text='', ok_text='Ok', cancel_text='Cancel', values=None,
+    default=None, style=None):
+    if _session is None:
+        return shortcuts.radiolist_dialog(title=title, text=text, ok_text=ok_text,
+            cancel_text=cancel_text, values=values, default=default, style=style)
+
+    def resolve(answer):
+        if answer is not None:
+            return _match_value(answer, values)
+
+        if default is not None:
+            return default
+        return values[0][0] if values else None
+
+    return HeadlessDialog('radiolist', title, resolve)
+
+def checkboxlist_dialog(title='', text='', ok_text='Ok', cancel_text='Cancel', values=None,
+    default_values=None, style=None):
+    if _session is None:
+        return shortcuts.checkboxlist_dialog(title=title, text=text, ok_text=ok_text,
+            cancel_text=cancel_text, values=values, default_values=default_values, style=style)
+
+    def resolve(answer):
+        if answer is not None:
+            if not isinstance(answer, list):
+                answer = [answer]
+            return [_match_value(item, values) for item in answer]
+
+        return list(default_values or [])
+
+    return HeadlessDialog('checkboxlist', title, resolve)
+
+def input_dialog(title='', text='', ok_text='OK', cancel_text='Cancel', completer=None,
+    validator=None, password=False, style=None, default=''):
+    if _session is None:
+        return shortcuts.input_dialog(title=title, text=text, ok_text=ok_text,
+            cancel_text=cancel_text, completer=completer, validator=validator,
+            password=password, style=style, default=default)
+
+    def resolve(answer):
+        value = default if answer is None else str(answer)
+
+        if validator is not None:
+            try:
+                validator.validate(Document(value))
+            except ValidationError as exception:
+                raise HeadlessError(f'Invalid answer {value!r}. {exception.message}')
+
+        return value
+
+    return HeadlessDialog('input', title, resolve)
+
+class HeadlessProgressLogDialog():
+    # Stand-in for progress_log_dialog. The callback runs in the calling thread and its
+    # updates are written on the progress stream. The answer of a progress dialog is a timeout
+    # in seconds, or a mapping with a timeout key. Once it has elapsed, the dialog is exited
+    # as if the skip button, or the quit button without skip, had been used.
+
+    def __init__(self, title, run_callback, with_skip=False):
+        self.title = to_plain_text(title)
+        self.run_callback = run_callback
+        self.with_skip = with_skip
+
+    def get_timeout(self):
+        answer = _session.get_answer(self.title)
+        if isinstance(answer, dict):
+            answer = answer.get('timeout')
+        if answer is None:
+            return None
+
+        try:
+            timeout = float(answer)
+        except (TypeError, ValueError):
+            raise HeadlessError(f'Invalid timeout {answer!r} for a progress dialog.')
+        if timeout < 0:
+            raise HeadlessError(f'Invalid timeout {answer!r} for a progress dialog.')
+
+        return timeout
+
+    def run(self):
+        try:
+            timeout = self.get_timeout()
+        except HeadlessError as exception:
+            _session.emit({'event': 'dialog_error', 'kind': 'progress', 'title': self.title,
+                'error': str(exception)})
+            return None
+
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        state = {
+            'result': None,
+            'exited': False
+        }
+
+        def set_percentage(value):
+            emit_progress({'event': 'progress', 'title': self.title, 'percentage': int(value)})
+
+        def log_text(text):
+            emit_progress({'event': 'log', 'title': self.title, 'text': text})
+
+        def change_status(text):
+            emit_progress({'event': 'status', 'title': self.title,
+                'text': to_plain_text(text)})
+
+        def set_result(new_result):
+            state['result'] = new_result
+
+        def get_exited():
+            if not state['exited'] and deadline is not None and time.monotonic() >= deadline:
+                state['exited'] = True
+                if self.with_skip:
+                    state['result'] = {
+                        'skipping': True
+                    }
+                _session.emit({'event': 'dialog_error', 'kind': 'progress',
+                    'title': self.title, 'error': 'timeout', 'timeout': timeout})
+            return state['exited']
+
+        result = self.run_callback(set_percentage, log_text, change_status, set_result,
+            get_exited)
+
+        if state['exited']:
+            # Like an exited progress_log_dialog, the result is the last one set
+            return state['result']
+        return result
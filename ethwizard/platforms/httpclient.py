@@ -0,0 +1,112 @@
+import atexit
+import threading
+import httpx
+
+from importlib.util import find_spec
+
+from ethwizard.constants import (
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_URL_PATTERNS
+)
+
+# A single managed HTTP client shared by every module. Connections are pooled per host and kept
+# alive between requests, so polling loops and repeated API calls reuse their connection
+# instead of opening a new one (and doing a new TLS handshake) on each request. HTTP/2 is used
+# for the hosts in HTTP2_URL_PATTERNS when the optional h2 package is installed.
+#
+# get, post and stream accept the same arguments as the httpx module-level functions.
+
+_client = None
+_segment_client = None
+_client_lock = threading.Lock()
+
+def is_http2_available():
+    return find_spec('h2') is not None
+
+def get_timeout():
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+def get_limits():
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+
+def create_client():
+    mounts = None
+
+    if is_http2_available():
+        mounts = {
+            pattern: httpx.HTTPTransport(http2=True, limits=get_limits())
+            for pattern in HTTP2_URL_PATTERNS
+        }
+
+    return httpx.Client(timeout=get_timeout(), limits=get_limits(), mounts=mounts)
+
+def get_client():
+    # Return the shared client, creating it on first use
+
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_client()
+
+    return _client
+
+def get_segment_client():
+    # Return the shared client for segmented downloads, creating it on first use. It only uses
+    # HTTP/1.1 so each segment gets its own connection instead of sharing a single HTTP/2
+    # connection and its throughput limit.
+
+    global _segment_client
+
+    if _segment_client is None:
+        with _client_lock:
+            if _segment_client is None:
+                _segment_client = httpx.Client(timeout=get_timeout(), limits=get_limits())
+
+    return _segment_client
+
+def close_client():
+    global _client, _segment_client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        if _segment_client is not None:
+            _segment_client.close()
+            _segment_client = None
+
+atexit.register(close_client)
+
+def get_async_client():
+    # Return a new async client with the shared settings. Async clients are bound to the event
+    # loop they are used in, so they are not shared. Use it with async with.
+
+    mounts = None
+
+    if is_http2_available():
+        mounts = {
+            pattern: httpx.AsyncHTTPTransport(http2=True, limits=get_limits())
+            for pattern in HTTP2_URL_PATTERNS
+        }
+
+    return httpx.AsyncClient(timeout=get_timeout(), limits=get_limits(), mounts=mounts)
+
+def request(method, url, **kwargs):
+    return get_client().request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+def stream(method, url, **kwargs):
+    return get_client().stream(method, url, **kwargs)
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import httpx
+
+from pathlib import Path
+
+from typing import Dict, List, Optional
+
+from urllib.parse import urlsplit
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.batch import get_backoff_delay
+
+from ethwizard.constants import (
+    PGP_KEY_SERVERS,
+    PGP_KEYRING_FILE,
+    PGP_KEYSERVER_HEALTH_FILE,
+    PGP_KEYSERVER_TIMEOUT,
+    PGP_KEYSERVER_STAGGER,
+    PGP_KEYSERVER_MIN_SCORE,
+    PGP_KEYSERVER_SCORE_WEIGHT,
+    PGP_KEY_FETCH_ROUNDS
+)
+
+# PGP key fetch engine and persistent wizard keyring. The keys used to verify the client
+# releases are kept in a keyring owned by the wizard, so later installs and upgrades find them
+# without any keyserver lookup. A key found in the default gpg keyring, where older versions
+# imported it, is copied in the wizard keyring.
+#
+# Missing keys are looked up on every keyserver concurrently with HKP requests. The first answer
+# holding a key whose fingerprint matches the key ID wins and the other lookups are cancelled.
+# Each answer is checked in a temporary gpg home before the key is imported. A health score is
+# kept for every keyserver: healthy servers are queried first and servers with a low score only
+# start after PGP_KEYSERVER_STAGGER seconds, so dead servers never delay a lookup.
+
+HKP_DEFAULT_PORT = 11371
+
+class PGPKeyError(Exception):
+    pass
+
+def get_lookup_url(key_server: str, key_id: str) -> str:
+    # HKP lookup URL for key_id on key_server (hkp://, hkps:// or http(s)://)
+
+    parts = urlsplit(key_server)
+    scheme = parts.scheme
+    netloc = parts.netloc
+
+    if scheme == 'hkps':
+        scheme = 'https'
+    elif scheme == 'hkp':
+        scheme = 'http'
+        if parts.port is None:
+            netloc = f'{netloc}:{HKP_DEFAULT_PORT}'
+
+    return f'{scheme}://{netloc}/pks/lookup?op=get&options=mr&search=0x{key_id}'
+
+def is_matching_fingerprint(fingerprint: str, key_id: str) -> bool:
+    # A key ID is the full fingerprint or its last 16 (long) or 8 (short) hex digits
+    return fingerprint.upper().endswith(key_id.upper())
+
+class KeyServerHealth():
+    # Health scores of the keyservers, kept in a JSON file. The score is a moving average of the
+    # lookup results, 1.0 for a valid key and 0.0 for a failure.
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._servers = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._servers is not None:
+            return self._servers
+
+        servers = {}
+        try:
+            with open(self.path, 'r', encoding='utf8') as health_file:
+                health = json.load(health_file)
+            if isinstance(health, dict) and isinstance(health.get('servers'), dict):
+                servers = health['servers']
+        except (OSError, ValueError):
+            pass
+
+        self._servers = servers
+        return servers
+
+    def save(self):
+        with self._lock:
+            servers = self._load()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.path.with_name(self.path.name + '.tmp')
+                with open(temp_path, 'w', encoding='utf8') as health_file:
+                    json.dump({'servers': servers}, health_file)
+                os.replace(temp_path, self.path)
+            except OSError:
+                # Health scores are a hint, losing them is harmless
+                pass
+
+    def get_score(self, key_server: str) -> float:
+        with self._lock:
+            server = self._load().get(key_server)
+            if server is None:
+                # Unknown servers get a neutral score so they are tried with the healthy ones
+                return 0.5
+            return server['score']
+
+    def record(self, key_server: str, success: bool, latency: Optional[float] = None):
+        with self._lock:
+            servers = self._load()
+            server = servers.setdefault(key_server, {
+                'score': 0.5,
+                'successes': 0,
+                'failures': 0
+            })
+
+            value = 1.0 if success else 0.0
+            server['score'] = ((1.0 - PGP_KEYSERVER_SCORE_WEIGHT) * server['score'] +
+                PGP_KEYSERVER_SCORE_WEIGHT * value)
+            if success:
+                server['successes'] = server['successes'] + 1
+                server['latency'] = latency
+            else:
+                server['failures'] = server['failures'] + 1
+            server['updated_at'] = time.time()
+
+    def order(self, key_servers: List[str]) -> List[str]:
+        # Healthiest servers first, the configured order breaks ties
+        return sorted(key_servers, key=lambda key_server: -self.get_score(key_server))
+
+class PGPKeyring():
+
+    def __init__(self, directory: Path, gpg_binary='gpg'):
+        self.directory = Path(directory)
+        self.gpg_binary = str(gpg_binary)
+        self.keyring_path = self.directory.joinpath(PGP_KEYRING_FILE)
+        self.health = KeyServerHealth(self.directory.joinpath(PGP_KEYSERVER_HEALTH_FILE))
+
+    def get_gpg_arguments(self) -> List[str]:
+        # gpg arguments to use the wizard keyring, for --verify
+        return ['--no-default-keyring', '--keyring', str(self.keyring_path)]
+
+    def _run_gpg(self, arguments: List[str], input: Optional[bytes] = None,
+        homedir: Optional[Path] = None) -> subprocess.CompletedProcess:
+
+        command_line = [self.gpg_binary, '--batch']
+        if homedir is not None:
+            command_line.extend(['--homedir', str(homedir)])
+        command_line.extend(arguments)
+        return subprocess.run(command_line, input=input, capture_output=True)
+
+    def _list_fingerprints(self, arguments: List[str], key_id: str,
+        homedir: Optional[Path] = None) -> List[str]:
+
+        process_result = self._run_gpg(arguments + ['--with-colons', '--list-keys', key_id],
+            homedir=homedir)
+        if process_result.returncode != 0:
+            return []
+
+        fingerprints = []
+        for line in process_result.stdout.decode('utf8', 'replace').splitlines():
+            fields = line.split(':')
+            if len(fields) > 9 and fields[0] == 'fpr':
+                fingerprints.append(fields[9])
+        return fingerprints
+
+    def has_key(self, key_id: str) -> bool:
+        if not self.keyring_path.is_file():
+            return False
+        return any(is_matching_fingerprint(fingerprint, key_id)
+            for fingerprint in self._list_fingerprints(self.get_gpg_arguments(), key_id))
+
+    def _import(self, key_data: bytes) -> bool:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        process_result = self._run_gpg(self.get_gpg_arguments() + ['--import'], input=key_data)
+        return process_result.returncode == 0
+
+    def import_from_default(self, key_id: str) -> bool:
+        # Copy key_id from the default gpg keyring, if it is there
+
+        if not any(is_matching_fingerprint(fingerprint, key_id)
+            for fingerprint in self._list_fingerprints([], key_id)):
+            return False
+
+        process_result = self._run_gpg(['--export', key_id])
+        if process_result.returncode != 0 or len(process_result.stdout) == 0:
+            return False
+
+        return self._import(process_result.stdout) and self.has_key(key_id)
+
+    def validate_key(self, key_data: bytes, key_id: str) -> Optional[bytes]:
+        # Import key_data in a temporary gpg home and return the export of key_id when a key
+        # with a matching fingerprint is found, None otherwise
+
+        homedir = Path(tempfile.mkdtemp(prefix='ethwizard-gpg-'))
+        try:
+            process_result = self._run_gpg(['--import'], input=key_data, homedir=homedir)
+            if process_result.returncode != 0:
+                return None
+
+            if not any(is_matching_fingerprint(fingerprint, key_id)
+                for fingerprint in self._list_fingerprints([], key_id, homedir=homedir)):
+                return None
+
+            process_result = self._run_gpg(['--export', key_id], homedir=homedir)
+            if process_result.returncode != 0 or len(process_result.stdout) == 0:
+                return None
+
+            return process_result.stdout
+        finally:
+            shutil.rmtree(homedir, ignore_errors=True)
+
+    def fetch_key(self, key_id: str, key_servers: List[str] = PGP_KEY_SERVERS,
+        log=None) -> bytes:
+        # Look up key_id on key_servers concurrently and return the first valid key. Raise
+        # PGPKeyError when no keyserver has it.
+
+        ordered_servers = self.health.order(key_servers)
+
+        async def lookup(client: httpx.AsyncClient, key_server: str, delay: float):
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            start_time = time.monotonic()
+            try:
+                response = await client.get(get_lookup_url(key_server, key_id),
+                    timeout=PGP_KEYSERVER_TIMEOUT, follow_redirects=True)
+            except httpx.HTTPError as exception:
+                self.health.record(key_server, False)
+                raise PGPKeyError(f'{key_server}: {exception}')
+
+            if response.status_code != 200:
+                self.health.record(key_server, False)
+                raise PGPKeyError(f'{key_server}: status code {response.status_code}')
+
+            loop = asyncio.get_event_loop()
+            key_data = await loop.run_in_executor(None, self.validate_key, response.content,
+                key_id)
+            if key_data is None:
+                self.health.record(key_server, False)
+                raise PGPKeyError(f'{key_server}: no valid key for {key_id}')
+
+            self.health.record(key_server, True, time.monotonic() - start_time)
+            return key_server, key_data
+
+        async def race():
+            async with httpclient.get_async_client() as client:
+                tasks = [
+                    asyncio.ensure_future(lookup(client, key_server,
+                        0.0 if self.health.get_score(key_server) >= PGP_KEYSERVER_MIN_SCORE
+                        else PGP_KEYSERVER_STAGGER))
+                    for key_server in ordered_servers
+                ]
+
+                errors = []
+                try:
+                    pending = set(tasks)
+                    while pending:
+                        done, pending = await asyncio.wait(pending,
+                            return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            if task.exception() is None:
+                                return task.result()
+                            errors.append(str(task.exception()))
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+                raise PGPKeyError('; '.join(errors))
+
+        loop = asyncio.new_event_loop()
+        try:
+            key_server, key_data = loop.run_until_complete(race())
+        finally:
+            loop.close()
+            self.health.save()
+
+        if log is not None:
+            log.info(f'Found PGP key {key_id} on {key_server}.')
+
+        return key_data
+
+    def ensure_key(self, key_id: str, log=None, key_servers: List[str] = PGP_KEY_SERVERS,
+        rounds: int = PGP_KEY_FETCH_ROUNDS) -> bool:
+        # Make sure key_id is in the wizard keyring. Return False when it cannot be found.
+
+        if self.has_key(key_id):
+            return True
+
+        if self.import_from_default(key_id):
+            if log is not None:
+                log.info(f'Copied PGP key {key_id} from the default keyring.')
+            return True
+
+        for attempt in range(rounds):
+            if log is not None:
+                log.info(f'Downloading PGP key {key_id} from {len(key_servers)} keyservers...')
+
+            try:
+                key_data = self.fetch_key(key_id, key_servers, log)
+            except PGPKeyError as exception:
+                if attempt + 1 >= rounds:
+                    if log is not None:
+                        log.error(f'No keyserver returned PGP key {key_id}. {exception}')
+                    return False
+
+                delay = get_backoff_delay(attempt)
+                if log is not None:
+                    log.warning(f'No keyserver returned PGP key {key_id}. We will retry in '
+                        f'{delay:.1f} seconds (retry index = {attempt + 1})')
+                time.sleep(delay)
+                continue
+
+            if self._import(key_data) and self.has_key(key_id):
+                return True
+
+            if log is not None:
+                log.error(f'Unable to import PGP key {key_id} in the wizard keyring '
+                    f'{self.keyring_path}.')
+            return False
+
+        return False
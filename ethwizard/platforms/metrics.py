@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import threading
+import httpx
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+_current = threading.local()
+
+# Probes can record in the metrics of the step that started them from other threads
+_record_lock = threading.Lock()
+
+_hooks_lock = threading.Lock()
+_hooks_installed = False
+
+@dataclass
+class StepMetrics():
+    # Measures for a single run of a step. CPU time is the time spent by the thread running the
+    # step. Children CPU time includes every subprocess completed during the step, it is always
+    # 0 on Windows.
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    children_cpu_time: float = 0.0
+    http_requests: int = 0
+    http_bytes: int = 0
+    subprocesses: int = 0
+    # Download metrics of the artifacts downloaded during the step, by artifact name
+    downloads: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+def get_current_metrics():
+    return getattr(_current, 'metrics', None)
+
+def record_http_response(num_bytes: int):
+    metrics = get_current_metrics()
+    if metrics is not None:
+        with _record_lock:
+            metrics.http_requests += 1
+            metrics.http_bytes += num_bytes
+
+def record_download(name: str, values: dict):
+    metrics = get_current_metrics()
+    if metrics is not None:
+        with _record_lock:
+            metrics.downloads[name] = values
+
+def record_subprocess():
+    metrics = get_current_metrics()
+    if metrics is not None:
+        with _record_lock:
+            metrics.subprocesses += 1
+
+def _audit_hook(event, args):
+    if event == 'subprocess.Popen':
+        record_subprocess()
+
+def install_hooks():
+    # Install the hooks used to count HTTP bytes and subprocesses. httpx closes every response
+    # once its body is consumed, streamed or not, so closing is where the downloaded bytes are
+    # counted. Audit hooks cannot be removed, they are only installed once.
+
+    global _hooks_installed
+
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+
+        sys.addaudithook(_audit_hook)
+
+        original_close = httpx.Response.close
+        original_aclose = httpx.Response.aclose
+
+        def close(self):
+            if not self.is_closed:
+                record_http_response(self.num_bytes_downloaded)
+            original_close(self)
+
+        async def aclose(self):
+            if not self.is_closed:
+                record_http_response(self.num_bytes_downloaded)
+            await original_aclose(self)
+
+        httpx.Response.close = close
+        httpx.Response.aclose = aclose
+
+        _hooks_installed = True
+
+def get_children_cpu_time():
+    times = os.times()
+    return times.children_user + times.children_system
+
+@contextmanager
+def measure_step():
+    # Measure the code running in this block on the current thread
+
+    install_hooks()
+
+    metrics = StepMetrics()
+    previous_metrics = get_current_metrics()
+    _current.metrics = metrics
+
+    start_wall_time = time.monotonic()
+    start_cpu_time = time.thread_time()
+    start_children_cpu_time = get_children_cpu_time()
+
+    try:
+        yield metrics
+    finally:
+        metrics.wall_time = time.monotonic() - start_wall_time
+        metrics.cpu_time = time.thread_time() - start_cpu_time
+        metrics.children_cpu_time = get_children_cpu_time() - start_children_cpu_time
+
+        _current.metrics = previous_metrics
+
+@contextmanager
+def use_metrics(metrics):
+    # Record the HTTP requests and subprocesses of this block, running on another thread, in
+    # metrics. Only the wall and CPU times of the thread measuring the step are kept.
+
+    previous_metrics = get_current_metrics()
+    _current.metrics = metrics
+
+    try:
+        yield metrics
+    finally:
+        _current.metrics = previous_metrics
+
+def add_step_metrics(step_metrics: dict, step_id: str, display_name: str,
+    metrics: StepMetrics):
+    # Add the metrics of a step run into the step metrics dict kept in the context. Runs of the
+    # same step, for instance after resuming, are accumulated.
+
+    values = metrics.as_dict()
+    # The downloads are kept per artifact in the download metrics
+    del values['downloads']
+
+    step_value = step_metrics.get(step_id)
+    if step_value is None:
+        step_value = {'display_name': display_name, 'runs': 0}
+        step_value.update(dict.fromkeys(values, 0))
+        step_metrics[step_id] = step_value
+
+    step_value['display_name'] = display_name
+    step_value['runs'] = step_value.get('runs', 0) + 1
+
+    for key, value in values.items():
+        step_value[key] = step_value.get(key, 0) + value
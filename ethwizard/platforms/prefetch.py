@@ -0,0 +1,279 @@
+import shutil
+import tempfile
+import threading
+import httpx
+
+from dataclasses import dataclass, field
+
+from pathlib import Path
+
+from typing import Callable, Dict, Optional
+
+from ethwizard.platforms.download import DownloadError, DownloadCancelled
+
+from ethwizard.platforms.artifacts import download_assets, discard_assets
+
+from ethwizard.platforms.progress import RelayReporter, get_current_reporter, use_reporter
+
+from ethwizard.platforms.releases import ReleaseCache, ReleaseCacheError, github_release_cache
+
+class PrefetchError(Exception):
+    pass
+
+class PrefetchCancelled(Exception):
+    pass
+
+@dataclass
+class PrefetchSpec():
+    name: str
+    # Github release path (for instance /repos/flashbots/mev-boost/releases/latest)
+    release_path: str
+    # Return the assets to download as a dict of role (binary, checksums, signature, ...) to
+    # asset dict ({'file_name': ..., 'file_url': ...}). Raise PrefetchError when missing.
+    select_assets: Callable[[dict, dict], Dict[str, dict]]
+    # Verify the downloaded files using their paths and their SHA256 hexdigests. Raise
+    # PrefetchError when the verification fails.
+    verify: Optional[Callable[[Dict[str, Path], Dict[str, str]], None]] = None
+    # Only one spec of a group is kept when selecting a choice (e.g. consensus clients)
+    group: Optional[str] = None
+
+@dataclass
+class PrefetchResult():
+    name: str
+    release_json: Optional[dict] = None
+    assets: Dict[str, dict] = field(default_factory=dict)
+    files: Dict[str, Path] = field(default_factory=dict)
+    hexdigests: Dict[str, str] = field(default_factory=dict)
+    path: Optional[Path] = None
+    error: Optional[str] = None
+
+@dataclass
+class PrefetchJob():
+    spec: PrefetchSpec
+    options: dict
+    path: Optional[Path] = None
+    thread: Optional[threading.Thread] = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[PrefetchResult] = None
+    # Progress of the job downloads, relayed to the thread taking the files
+    reporter: RelayReporter = field(default_factory=RelayReporter)
+
+class Prefetcher():
+    # Download release files in the background while the user is answering prompts. The
+    # install functions take the downloaded and verified files with take(). When nothing was
+    # prefetched, or when the prefetch failed, take() downloads the files in the calling thread.
+    #
+    # Background downloads never log since the console is used by the dialogs. Errors are kept
+    # in the result and reported by the caller. Their progress is shown by the reporter of the
+    # thread taking the files, once it waits for them, and their download metrics are recorded
+    # in the metrics of that thread.
+    #
+    # Release files are taken from the artifact store in artifact_path when they were already
+    # downloaded, by default the parent of download_path. The releases are obtained through the
+    # release cache, github_release_cache by default.
+
+    def __init__(self, download_path: Path, artifact_path: Optional[Path] = None,
+        release_cache: Optional[ReleaseCache] = None):
+        self.download_path = Path(download_path)
+        if artifact_path is None:
+            artifact_path = self.download_path.parent
+        self.artifact_path = Path(artifact_path)
+        if release_cache is None:
+            release_cache = github_release_cache
+        self.release_cache = release_cache
+        self.specs = {}
+        self._jobs = {}
+        self._lock = threading.RLock()
+
+    def register(self, spec: PrefetchSpec):
+        self.specs[spec.name] = spec
+
+    def start(self, name: str, options: Optional[dict] = None):
+        # Start prefetching the release files for name if not already started with the same
+        # options
+
+        if options is None:
+            options = {}
+
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is not None:
+                if job.options == options and not job.cancelled.is_set():
+                    return
+                self._cancel_job(job)
+
+            job = PrefetchJob(spec=self.specs[name], options=dict(options))
+            job.thread = threading.Thread(target=self._run_job, args=(job, ), daemon=True,
+                name=f'prefetch-{name}')
+            self._jobs[name] = job
+
+        job.thread.start()
+
+    def select(self, name: str, options: Optional[dict] = None):
+        # Start prefetching name and cancel the other choices of the same group
+
+        group = self.specs[name].group
+        if group is not None:
+            for spec in self.specs.values():
+                if spec.group == group and spec.name != name:
+                    self.cancel(spec.name)
+
+        self.start(name, options)
+
+    def cancel(self, name: str):
+        # Cancel a prefetch and remove its files
+
+        with self._lock:
+            job = self._jobs.pop(name, None)
+            if job is not None:
+                self._cancel_job(job)
+
+    def cancel_all(self):
+        with self._lock:
+            for job in self._jobs.values():
+                self._cancel_job(job)
+            self._jobs = {}
+
+    def wait(self, timeout: Optional[float] = None):
+        # Wait for the running prefetches to complete
+
+        with self._lock:
+            jobs = list(self._jobs.values())
+
+        for job in jobs:
+            job.done.wait(timeout)
+
+    def take(self, name: str, options: Optional[dict] = None,
+        cancelled: Optional[threading.Event] = None) -> PrefetchResult:
+        # Take the prefetched files for name. The caller owns the files after this call.
+        # cancelled is an optional event cancelling the downloads when set.
+
+        if options is None:
+            options = {}
+
+        with self._lock:
+            job = self._jobs.pop(name, None)
+            if job is not None and job.options != options:
+                self._cancel_job(job)
+                job = None
+
+        if job is not None:
+            job.reporter.attach(get_current_reporter())
+            while not job.done.wait(1.0):
+                if cancelled is not None and cancelled.is_set():
+                    self._cancel_job(job)
+            job.reporter.attach(None)
+            job.reporter.record_metrics()
+
+            if job.result is not None and job.result.error is None:
+                return job.result
+            if cancelled is not None and cancelled.is_set():
+                return job.result
+
+        # Nothing usable was prefetched, download in this thread
+        job = PrefetchJob(spec=self.specs[name], options=dict(options))
+        if cancelled is not None:
+            job.cancelled = cancelled
+        job.reporter.attach(get_current_reporter())
+        self._run_job(job)
+        job.reporter.record_metrics()
+        return job.result
+
+    def discard(self, result: PrefetchResult):
+        # Remove the files of a taken result once they are no longer needed
+
+        if result.path is not None:
+            shutil.rmtree(result.path, ignore_errors=True)
+
+    def reject(self, result: PrefetchResult):
+        # Remove the files of a taken result that failed a verification done by the caller,
+        # from the artifact store as well
+
+        tag_name = None
+        if result.release_json is not None:
+            tag_name = result.release_json.get('tag_name')
+        discard_assets(result.assets, self.artifact_path, release_tag=tag_name)
+        self.discard(result)
+
+    def _cancel_job(self, job: PrefetchJob):
+        job.cancelled.set()
+
+        if job.done.is_set():
+            self._remove_files(job)
+
+    def _run_job(self, job: PrefetchJob):
+        result = PrefetchResult(name=job.spec.name)
+        job.result = result
+
+        try:
+            with use_reporter(job.reporter):
+                self._fetch(job, result)
+        except PrefetchError as exception:
+            result.error = str(exception)
+        except PrefetchCancelled:
+            result.error = 'Prefetch was cancelled.'
+        except httpx.RequestError as exception:
+            result.error = f'Exception while downloading {job.spec.name} release files. {exception}'
+        except OSError as exception:
+            result.error = f'Unable to write {job.spec.name} release files. {exception}'
+        except Exception as exception:
+            # Unexpected release data or a failing select or verify function. The job must
+            # still fail so take() falls back to a download in the calling thread.
+            result.error = f'Unexpected error while prefetching {job.spec.name}. {exception!r}'
+        finally:
+            with self._lock:
+                if result.error is not None or job.cancelled.is_set():
+                    self._remove_files(job)
+                job.done.set()
+
+    def _fetch(self, job: PrefetchJob, result: PrefetchResult):
+        spec = job.spec
+
+        try:
+            release_json = self.release_cache.get_release(spec.release_path)
+        except ReleaseCacheError as exception:
+            raise PrefetchError(f'Unable to get the latest {spec.name} release from Github. '
+                f'{exception}')
+
+        if 'assets' not in release_json:
+            raise PrefetchError(f'No assets in Github release for {spec.name}.')
+
+        result.release_json = release_json
+        result.assets = spec.select_assets(release_json, job.options)
+
+        # Each job has its own directory so a cancelled job never touches the files of a newer
+        # job for the same release
+        self.download_path.mkdir(parents=True, exist_ok=True)
+        job.path = Path(tempfile.mkdtemp(prefix=f'{spec.name}-', dir=self.download_path))
+        result.path = job.path
+
+        if job.cancelled.is_set():
+            raise PrefetchCancelled()
+
+        try:
+            result.files, hashes = download_assets(result.assets, job.path,
+                release_tag=release_json.get('tag_name'), cancelled=job.cancelled,
+                artifact_path=self.artifact_path)
+        except DownloadCancelled:
+            raise PrefetchCancelled()
+        except DownloadError as exception:
+            raise PrefetchError(f'Error while downloading {spec.name} release files from '
+                f'Github. {exception}')
+
+        result.hexdigests = {
+            role: file_hash.hexdigest().lower() for role, file_hash in hashes.items()
+        }
+
+        if spec.verify is not None:
+            try:
+                spec.verify(result.files, result.hexdigests)
+            except PrefetchError:
+                # Files failing their verification must not be taken from the store again
+                discard_assets(result.assets, self.artifact_path,
+                    release_tag=release_json.get('tag_name'))
+                raise
+
+    def _remove_files(self, job: PrefetchJob):
+        if job.path is not None:
+            shutil.rmtree(job.path, ignore_errors=True)
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import Future
+
+from dataclasses import dataclass
+
+from typing import Any, Callable, Dict, Optional, Union
+
+from ethwizard.platforms.metrics import get_current_metrics, use_metrics
+
+from ethwizard.constants import (
+    UNKNOWN_VALUE,
+    PROBE_TIMEOUT
+)
+
+# Probe engine used to run independent blocking probes (systemctl or nssm queries, --version
+# subprocesses, local JSON-RPC and beacon API calls, package manager queries and GitHub
+# lookups) concurrently. An asyncio event loop drives the probes and enforces a timeout for each
+# of them. Every probe runs in its own daemon thread, so a probe that hangs past its timeout is
+# left behind with its default value instead of blocking the caller.
+#
+# Probes sharing a resource, like apt, run one at a time. A probe that times out while waiting
+# for its resource is never started.
+
+@dataclass
+class Probe():
+    function: Callable[[], Any]
+    timeout: Optional[float] = None
+    default: Any = UNKNOWN_VALUE
+    resource: Optional[str] = None
+
+    def get_timeout(self) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        return PROBE_TIMEOUT
+
+class ProbeAbandoned(Exception):
+    pass
+
+_resource_locks = {}
+_resource_locks_lock = threading.Lock()
+
+def get_resource_lock(resource: str) -> threading.Lock:
+    with _resource_locks_lock:
+        lock = _resource_locks.get(resource)
+        if lock is None:
+            lock = threading.Lock()
+            _resource_locks[resource] = lock
+        return lock
+
+def _run_in_thread(probe: Probe, future: Future, abandoned: threading.Event, metrics):
+    if not future.set_running_or_notify_cancel():
+        return
+
+    try:
+        with use_metrics(metrics):
+            if probe.resource is None:
+                result = probe.function()
+            else:
+                with get_resource_lock(probe.resource):
+                    if abandoned.is_set():
+                        raise ProbeAbandoned()
+                    result = probe.function()
+    except BaseException as exception:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+async def _run_probe(name: str, probe: Probe, metrics, log):
+    future = Future()
+    abandoned = threading.Event()
+
+    thread = threading.Thread(target=_run_in_thread, args=(probe, future, abandoned, metrics),
+        name=f'probe-{name}', daemon=True)
+    thread.start()
+
+    timeout = probe.get_timeout()
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        abandoned.set()
+        if log is not None:
+            log.warning(f'Probe {name} did not complete within {timeout} seconds.')
+        return probe.default
+    except Exception as exception:
+        if log is not None:
+            log.error(f'Probe {name} failed. Exception: {exception}')
+        return probe.default
+
+def run_probes(probes: Dict[str, Union[Probe, Callable[[], Any]]], log=None) -> dict:
+    # Run the probes concurrently and return a dict with the result of each probe by name. A
+    # probe that fails or times out gets its default value. probes values can be Probe
+    # instances or functions without arguments that use the default probe settings.
+    #
+    # It must be called from synchronous code. It can be called from a probe to run nested
+    # probes.
+
+    probes = {
+        name: probe if isinstance(probe, Probe) else Probe(probe)
+        for name, probe in probes.items()
+    }
+
+    if len(probes) == 0:
+        return {}
+
+    metrics = get_current_metrics()
+
+    async def run_all():
+        results = await asyncio.gather(*[
+            _run_probe(name, probe, metrics, log) for name, probe in probes.items()])
+        return dict(zip(probes.keys(), results))
+
+    start_time = time.monotonic()
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(run_all())
+    finally:
+        loop.close()
+
+    if log is not None:
+        log.info(f'Ran {len(probes)} probes ({", ".join(probes.keys())}) in '
+            f'{time.monotonic() - start_time:.1f} seconds.')
+
+    return results
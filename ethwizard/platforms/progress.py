@@ -0,0 +1,395 @@
+import math
+import time
+import threading
+import humanize
+
+from collections import deque
+
+from contextlib import contextmanager
+
+from datetime import timedelta
+
+from typing import Callable, Optional
+
+from ethwizard.platforms.download import DownloadCancelled
+
+from ethwizard.platforms.metrics import record_download
+
+from ethwizard.constants import (
+    DOWNLOAD_PROGRESS_INTERVAL,
+    DOWNLOAD_PROGRESS_LOG_INTERVAL,
+    DOWNLOAD_THROUGHPUT_SAMPLE_INTERVAL,
+    DOWNLOAD_THROUGHPUT_WINDOW,
+    DOWNLOAD_THROUGHPUT_TIME_CONSTANT
+)
+
+# Download progress reporting. Each artifact download is tracked with a DownloadProgress fed by
+# the progress callback of the download engine. It measures the bytes done, an instantaneous
+# throughput over a short window, a smoothed throughput and the time left when the total size
+# is known from Content-Length.
+#
+# The progress is sent to the reporter of the current thread, set with use_reporter. The
+# reporter used by run_download_dialog feeds a progress_log_dialog. Without one, the progress
+# is written in the log from time to time. The final numbers of each download are recorded as
+# download metrics in the metrics of the current step.
+
+_current = threading.local()
+
+def get_current_reporter():
+    return getattr(_current, 'reporter', None)
+
+@contextmanager
+def use_reporter(reporter):
+    # Send the progress of the downloads started in this block, on this thread, to reporter
+
+    previous_reporter = get_current_reporter()
+    _current.reporter = reporter
+
+    try:
+        yield reporter
+    finally:
+        _current.reporter = previous_reporter
+
+def format_size(size: float) -> str:
+    return humanize.naturalsize(size)
+
+def format_throughput(throughput: Optional[float]) -> str:
+    if throughput is None:
+        return 'unknown speed'
+    return f'{humanize.naturalsize(throughput)}/s'
+
+def format_duration(seconds: float) -> str:
+    return humanize.naturaldelta(timedelta(seconds=seconds))
+
+class DownloadProgress():
+    # Progress and throughput of a single artifact download
+
+    def __init__(self, name: str, url: Optional[str] = None, source: str = 'network',
+        reporter=None):
+
+        self.name = name
+        self.url = url
+        self.source = source
+        self.reporter = reporter
+        self.done = 0
+        self.total = None
+        self.transferred = 0
+        self.start_time = time.monotonic()
+        self.end_time = None
+        self.smoothed_throughput = None
+        self.peak_throughput = None
+        self.status = 'running'
+        self.error = None
+        self._samples = deque()
+        self._last_time = None
+        self._lock = threading.Lock()
+
+    def update(self, done: int, total: Optional[int] = None):
+        # Progress callback of the download functions, called with the bytes done and the total
+        # size. It can be called from several threads (segmented downloads).
+
+        with self._lock:
+            now = time.monotonic()
+
+            if self._last_time is not None and done >= self.done:
+                self.transferred = self.transferred + done - self.done
+            else:
+                # First call, with the resume offset, or the download started over. Only the
+                # bytes after this point are transferred.
+                self._samples.clear()
+                self._samples.append((now, done))
+
+            self.done = done
+            if total is not None:
+                self.total = total
+            self._last_time = now
+
+            sample_time, sample_done = self._samples[-1]
+            elapsed = now - sample_time
+            if elapsed >= DOWNLOAD_THROUGHPUT_SAMPLE_INTERVAL:
+                # Chunks arrive in bursts, the throughput is only sampled over longer intervals
+                rate = (done - sample_done) / elapsed
+                if self.smoothed_throughput is None:
+                    self.smoothed_throughput = rate
+                else:
+                    # Exponential moving average weighted by the time between two samples
+                    weight = 1.0 - math.exp(-elapsed / DOWNLOAD_THROUGHPUT_TIME_CONSTANT)
+                    self.smoothed_throughput = (self.smoothed_throughput +
+                        weight * (rate - self.smoothed_throughput))
+
+                self._samples.append((now, done))
+                while (len(self._samples) > 2 and
+                    now - self._samples[1][0] >= DOWNLOAD_THROUGHPUT_WINDOW):
+                    self._samples.popleft()
+
+                throughput = self._get_window_throughput()
+                if throughput is not None and (
+                    self.peak_throughput is None or throughput > self.peak_throughput):
+                    self.peak_throughput = throughput
+
+        if self.reporter is not None:
+            self.reporter.update(self)
+
+    def _get_window_throughput(self) -> Optional[float]:
+        if len(self._samples) < 2:
+            return None
+        first_time, first_done = self._samples[0]
+        last_time, last_done = self._samples[-1]
+        if last_time <= first_time:
+            return None
+        return (last_done - first_done) / (last_time - first_time)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        # Instantaneous throughput, over the last DOWNLOAD_THROUGHPUT_WINDOW seconds
+        with self._lock:
+            return self._get_window_throughput()
+
+    @property
+    def wall_time(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.monotonic()
+        return end_time - self.start_time
+
+    @property
+    def average_throughput(self) -> Optional[float]:
+        wall_time = self.wall_time
+        if wall_time <= 0:
+            return None
+        return self.transferred / wall_time
+
+    @property
+    def percentage(self) -> Optional[int]:
+        if not self.total:
+            return None
+        return min(100, int(self.done * 100 / self.total))
+
+    @property
+    def eta(self) -> Optional[float]:
+        # Seconds left at the smoothed throughput, None when the total size is unknown
+        if self.total is None or not self.smoothed_throughput:
+            return None
+        return max(0, self.total - self.done) / self.smoothed_throughput
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.end_time = time.monotonic()
+        if error is None:
+            self.status = 'completed'
+        elif isinstance(error, (DownloadCancelled, GeneratorExit)):
+            self.status = 'cancelled'
+        else:
+            self.status = 'failed'
+            self.error = str(error)
+
+        if self.reporter is not None:
+            self.reporter.finish(self)
+
+    def format(self) -> str:
+        # Single line with the current progress of this download
+
+        if self.total:
+            text = (f'{self.name}: {format_size(self.done)} of {format_size(self.total)} '
+                f'({self.percentage}%)')
+        else:
+            text = f'{self.name}: {format_size(self.done)}'
+
+        if self.smoothed_throughput is not None:
+            text = (f'{text}, {format_throughput(self.throughput)} (smoothed '
+                f'{format_throughput(self.smoothed_throughput)})')
+
+        eta = self.eta
+        if eta is not None:
+            text = f'{text}, {format_duration(eta)} left'
+
+        return text
+
+    def format_summary(self) -> str:
+        # Single line describing the finished download
+
+        if self.status == 'completed':
+            return (f'Downloaded {self.name} ({format_size(self.done)}) in '
+                f'{format_duration(self.wall_time)} at '
+                f'{format_throughput(self.average_throughput)}.')
+        elif self.status == 'cancelled':
+            return f'Download of {self.name} cancelled after {format_size(self.done)}.'
+        return f'Download of {self.name} failed after {format_size(self.done)}. {self.error}'
+
+    def as_metrics(self) -> dict:
+        metrics = {
+            'url': self.url,
+            'source': self.source,
+            'status': self.status,
+            'bytes': self.done,
+            'size': self.total,
+            'transferred': self.transferred,
+            'wall_time': self.wall_time,
+            'average_throughput': self.average_throughput,
+            'smoothed_throughput': self.smoothed_throughput,
+            'peak_throughput': self.peak_throughput,
+            'completed_at': time.time()
+        }
+        if self.error is not None:
+            metrics['error'] = self.error
+        return metrics
+
+class DownloadReporter():
+    # Send the progress of downloads to a progress_log_dialog (set_percentage, log_text and
+    # change_status) or to log. Updates are sent at most every interval seconds. Several
+    # downloads can run at the same time, the percentage covers all of them.
+
+    def __init__(self, set_percentage: Optional[Callable[[int], None]] = None,
+        log_text: Optional[Callable[[str], None]] = None,
+        change_status: Optional[Callable[[str], None]] = None, log=None,
+        interval: float = DOWNLOAD_PROGRESS_INTERVAL):
+
+        self.set_percentage = set_percentage
+        self.log_text = log_text
+        self.change_status = change_status
+        self.log = log
+        self.interval = interval
+        self._active = []
+        self._finished = []
+        self._last_report = None
+        self._lock = threading.Lock()
+
+    def start(self, progress: DownloadProgress):
+        with self._lock:
+            self._active.append(progress)
+        self._report(force=True)
+
+    def update(self, progress: DownloadProgress):
+        self._report()
+
+    def finish(self, progress: DownloadProgress):
+        with self._lock:
+            if progress in self._active:
+                self._active.remove(progress)
+            self._finished.append(progress)
+
+        if progress.source == 'network':
+            if self.log_text is not None:
+                self.log_text(progress.format_summary() + '\n')
+            elif self.log is not None:
+                self.log.info(progress.format_summary())
+
+        self._report(force=True)
+
+    def _report(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_report is not None and (
+                now - self._last_report < self.interval):
+                return
+            self._last_report = now
+
+            active = list(self._active)
+            tracked = active + self._finished
+
+        if self.set_percentage is not None:
+            done = sum(progress.done for progress in tracked if progress.total)
+            total = sum(progress.total for progress in tracked if progress.total)
+            if total > 0:
+                self.set_percentage(min(100, int(done * 100 / total)))
+
+        if self.change_status is not None:
+            self.change_status('\n'.join(progress.format() for progress in active))
+        elif self.log is not None and not force:
+            for progress in active:
+                self.log.info(progress.format())
+
+class RelayReporter():
+    # Reporter for downloads running on another thread, like the prefetch downloads. Their
+    # progress is relayed to the reporter attached to it, once there is one. The finished
+    # downloads are kept so their metrics can be recorded by the thread taking the files.
+
+    def __init__(self):
+        self.target = None
+        self.finished = []
+        self._active = []
+        self._lock = threading.Lock()
+
+    def attach(self, target):
+        with self._lock:
+            self.target = target
+            active = list(self._active)
+        if target is not None:
+            for progress in active:
+                target.start(progress)
+
+    def start(self, progress: DownloadProgress):
+        with self._lock:
+            self._active.append(progress)
+            target = self.target
+        if target is not None:
+            target.start(progress)
+
+    def update(self, progress: DownloadProgress):
+        target = self.target
+        if target is not None:
+            target.update(progress)
+
+    def finish(self, progress: DownloadProgress):
+        with self._lock:
+            if progress in self._active:
+                self._active.remove(progress)
+            self.finished.append(progress)
+            target = self.target
+        if target is not None:
+            target.finish(progress)
+
+    def record_metrics(self):
+        # Record the metrics of the finished downloads in the metrics of the current step
+        for progress in self.finished:
+            record_download(progress.name, progress.as_metrics())
+
+def record_stored_artifact(name: str, url: Optional[str], size: int, start_time: float):
+    # Record the download metrics of an artifact copied from the artifact store, start_time is
+    # the time.monotonic() value when the copy started
+
+    reporter = get_current_reporter()
+
+    download_progress = DownloadProgress(name, url, source='store', reporter=reporter)
+    download_progress.start_time = start_time
+    download_progress.done = size
+    download_progress.total = size
+    download_progress.transferred = size
+    download_progress.finish()
+
+    if not isinstance(reporter, RelayReporter):
+        record_download(name, download_progress.as_metrics())
+
+@contextmanager
+def track_download(name: str, url: Optional[str] = None, log=None, source: str = 'network',
+    progress: Optional[Callable[[int, Optional[int]], None]] = None):
+    # Track the download of the artifact name. Yield the DownloadProgress whose update method is
+    # the progress callback to pass to the download functions. progress is an extra callback
+    # called with the same arguments. The progress goes to the reporter of the current thread,
+    # or to log every DOWNLOAD_PROGRESS_LOG_INTERVAL seconds. The final numbers are recorded as
+    # download metrics of the current step.
+
+    reporter = get_current_reporter()
+    if reporter is None and log is not None:
+        reporter = DownloadReporter(log=log, interval=DOWNLOAD_PROGRESS_LOG_INTERVAL)
+
+    download_progress = DownloadProgress(name, url, source, reporter)
+    if progress is not None:
+        update = download_progress.update
+
+        def chained_update(done, total=None):
+            update(done, total)
+            progress(done, total)
+
+        download_progress.update = chained_update
+
+    if reporter is not None:
+        reporter.start(download_progress)
+
+    try:
+        yield download_progress
+    except BaseException as exception:
+        download_progress.finish(exception)
+        raise
+    else:
+        download_progress.finish()
+    finally:
+        if not isinstance(reporter, RelayReporter):
+            record_download(name, download_progress.as_metrics())
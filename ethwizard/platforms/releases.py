@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import threading
+import httpx
+
+from pathlib import Path
+
+from typing import Optional
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.constants import (
+    GITHUB_REST_API_URL,
+    GITHUB_API_VERSION,
+    LINUX_SAVE_DIRECTORY,
+    RELEASE_CACHE_FILE,
+    RELEASE_CACHE_TTL,
+    RELEASE_CACHE_TTL_ENV,
+    GITHUB_TOKEN_ENVS
+)
+
+class ReleaseCacheError(Exception):
+    pass
+
+def get_cache_directory() -> Optional[Path]:
+    # Return the directory where the wizard keeps its state for this platform
+
+    if os.name == 'nt':
+        app_data = Path(os.getenv('LOCALAPPDATA', os.getenv('APPDATA', '')))
+        if not app_data.is_dir():
+            return None
+        return app_data.joinpath('eth-wizard')
+
+    return Path(LINUX_SAVE_DIRECTORY)
+
+def get_github_token() -> Optional[str]:
+    for env_name in GITHUB_TOKEN_ENVS:
+        token = os.getenv(env_name)
+        if token:
+            return token
+    return None
+
+def get_cache_ttl() -> float:
+    ttl = os.getenv(RELEASE_CACHE_TTL_ENV)
+    if ttl is not None:
+        try:
+            return float(ttl)
+        except ValueError:
+            pass
+    return RELEASE_CACHE_TTL
+
+class ReleaseCache():
+    # Persistent cache for the GitHub release API responses, keyed by release path (for
+    # instance /repos/ethereum/go-ethereum/releases/latest).
+    #
+    # Fresh entries (younger than the TTL) are served without any request. Older entries are
+    # revalidated with If-None-Match and If-Modified-Since. A 304 Not Modified answer does not
+    # count against the GitHub rate limit. When GitHub cannot be reached or the rate limit is
+    # hit, the cached release is served even if it is stale.
+    #
+    # A token from GITHUB_TOKEN_ENVS is used when available for a higher rate limit.
+
+    def __init__(self, cache_path: Optional[Path] = None, ttl: Optional[float] = None):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._data = None
+
+    def get_cache_path(self) -> Optional[Path]:
+        if self.cache_path is not None:
+            return Path(self.cache_path)
+
+        cache_directory = get_cache_directory()
+        if cache_directory is None:
+            return None
+        return cache_directory.joinpath(RELEASE_CACHE_FILE)
+
+    def get_ttl(self) -> float:
+        if self.ttl is not None:
+            return self.ttl
+        return get_cache_ttl()
+
+    def get_release(self, release_path: str) -> dict:
+        # Return the release JSON for release_path. Raise ReleaseCacheError when the release
+        # cannot be obtained from GitHub or from the cache. The lock is not held during the
+        # request so a slow Github answer does not delay the lookups of other releases.
+
+        with self._lock:
+            data = self._load()
+            entry = data['releases'].get(release_path)
+
+            if entry is not None and time.time() - entry.get('fetched_at', 0) < self.get_ttl():
+                self._count('hits')
+                return entry['release']
+
+            headers = {'Accept': GITHUB_API_VERSION}
+
+            token = get_github_token()
+            if token is not None:
+                headers['Authorization'] = f'Bearer {token}'
+
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = httpclient.get(GITHUB_REST_API_URL + release_path, headers=headers,
+                follow_redirects=True)
+        except httpx.RequestError as exception:
+            with self._lock:
+                return self._stale_or_raise(entry, f'Exception while querying Github. {exception}')
+
+        release_json = None
+        parse_error = None
+        if response.status_code == 200:
+            try:
+                release_json = response.json()
+            except ValueError as exception:
+                parse_error = exception
+
+        with self._lock:
+            if response.status_code == 304 and entry is not None:
+                entry['fetched_at'] = time.time()
+                self._count('revalidated')
+                self._save()
+                return entry['release']
+
+            if response.status_code != 200:
+                return self._stale_or_raise(entry, f'HTTP error while querying Github. Status '
+                    f'code {response.status_code}')
+
+            if parse_error is not None:
+                return self._stale_or_raise(entry, f'Unable to parse Github response. '
+                    f'{parse_error}')
+
+            data['releases'][release_path] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+                'release': release_json
+            }
+            self._count('misses')
+            self._save()
+
+            return release_json
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._load()['stats'])
+
+    def get_hit_rate(self) -> Optional[float]:
+        # Ratio of lookups answered without downloading the release again
+
+        stats = self.get_stats()
+        total = sum(stats.values())
+        if total == 0:
+            return None
+        return (stats['hits'] + stats['revalidated'] + stats['stale']) / total
+
+    def format_stats(self) -> str:
+        stats = self.get_stats()
+        hit_rate = self.get_hit_rate()
+        hit_rate_text = 'n/a' if hit_rate is None else f'{hit_rate:.0%}'
+        return (f'Github release cache hit rate: {hit_rate_text} (hits: {stats["hits"]}, '
+            f'revalidated: {stats["revalidated"]}, stale: {stats["stale"]}, '
+            f'misses: {stats["misses"]}, errors: {stats["errors"]})')
+
+    def _stale_or_raise(self, entry: Optional[dict], message: str) -> dict:
+        if entry is not None:
+            self._count('stale')
+            self._save()
+            return entry['release']
+
+        self._count('errors')
+        self._save()
+        raise ReleaseCacheError(message)
+
+    def _count(self, name: str):
+        stats = self._data['stats']
+        stats[name] = stats.get(name, 0) + 1
+
+    def _load(self) -> dict:
+        if self._data is not None:
+            return self._data
+
+        data = None
+
+        cache_path = self.get_cache_path()
+        if cache_path is not None:
+            try:
+                with open(cache_path, 'r', encoding='utf8') as cache_file:
+                    data = json.load(cache_file)
+            except (OSError, ValueError):
+                data = None
+
+        if not isinstance(data, dict) or not isinstance(data.get('releases'), dict):
+            data = {'releases': {}}
+
+        stats = data.get('stats')
+        if not isinstance(stats, dict):
+            stats = {}
+        for name in ('hits', 'revalidated', 'stale', 'misses', 'errors'):
+            stats.setdefault(name, 0)
+        data['stats'] = stats
+
+        self._data = data
+        return data
+
+    def _save(self) -> bool:
+        # Save the cache with a temporary file and an atomic replace. The cache is only an
+        # optimization so errors are ignored.
+
+        cache_path = self.get_cache_path()
+        if cache_path is None:
+            return False
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(cache_path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf8') as cache_file:
+                json.dump(self._data, cache_file)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            return False
+
+        return True
+
+github_release_cache = ReleaseCache()
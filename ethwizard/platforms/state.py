@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+
+from pathlib import Path
+
+from typing import Optional
+
+from ethwizard.constants import (
+    STATE_FILE,
+    STATE_JOURNAL_FILE,
+    STATE_JOURNAL_COMPACT_THRESHOLD,
+    WIZARD_COMPLETED_STEP_ID
+)
+
+class StateStore():
+    # Crash safe store for the wizard state.
+    #
+    # The state is kept in two files inside save_directory:
+    #
+    # * STATE_FILE (wizardstate.json) is a snapshot of the full state in the same format as
+    #   older versions: {"step": ..., "context": {...}}. It is only replaced atomically
+    #   (temporary file, fsync, rename).
+    # * STATE_JOURNAL_FILE is an append only journal of changes since that snapshot. Each line
+    #   is a JSON object with the current step, the context keys that were set and the
+    #   context keys that were removed.
+    #
+    # Loading reads the snapshot and replays the journal on top of it. A torn line at the end
+    # of the journal (power loss during an append) is ignored. The journal is compacted into a
+    # new snapshot once it grows past STATE_JOURNAL_COMPACT_THRESHOLD entries or when the
+    # wizard is completed.
+
+    def __init__(self, save_directory: Path,
+        compact_threshold: int = STATE_JOURNAL_COMPACT_THRESHOLD):
+
+        self.save_directory = Path(save_directory)
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._last_state = None
+        self._journal_entries = 0
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.save_directory.joinpath(STATE_FILE)
+
+    @property
+    def journal_path(self) -> Path:
+        return self.save_directory.joinpath(STATE_JOURNAL_FILE)
+
+    def save(self, step_id: str, context: dict) -> bool:
+        # Save the current step and context, only writing what changed since the last save
+
+        # Copy through JSON so later in place changes to context do not affect our copy
+        state = {
+            'step': step_id,
+            'context': json.loads(json.dumps(context))
+        }
+
+        with self._lock:
+            if self._last_state is None:
+                self._last_state = self._read()
+
+            if self._last_state is None:
+                return self.compact(state)
+
+            last_context = self._last_state['context']
+            new_context = state['context']
+
+            context_set = {
+                key: value for key, value in new_context.items()
+                if key not in last_context or last_context[key] != value
+            }
+            context_unset = [key for key in last_context.keys() if key not in new_context]
+
+            if (
+                self._last_state['step'] == step_id and
+                len(context_set) == 0 and
+                len(context_unset) == 0
+            ):
+                # Nothing changed
+                return True
+
+            entry = {
+                'step': step_id,
+                'set': context_set,
+                'unset': context_unset
+            }
+
+            self.save_directory.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, 'a', encoding='utf8') as journal_file:
+                journal_file.write(json.dumps(entry) + '\n')
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+            self._last_state = state
+            self._journal_entries = self._journal_entries + 1
+
+            if (
+                self._journal_entries >= self.compact_threshold or
+                step_id == WIZARD_COMPLETED_STEP_ID
+            ):
+                return self.compact(state)
+
+        return True
+
+    def load(self) -> Optional[dict]:
+        # Load the state from the snapshot and the journal
+
+        with self._lock:
+            state = self._read()
+            self._last_state = state
+            if state is None:
+                return None
+
+            return json.loads(json.dumps(state))
+
+    def compact(self, state: Optional[dict] = None) -> bool:
+        # Write the full state as a new snapshot and clear the journal
+
+        with self._lock:
+            if state is None:
+                state = self._read()
+                if state is None:
+                    return False
+
+            self.save_directory.mkdir(parents=True, exist_ok=True)
+
+            temp_path = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf8') as snapshot_file:
+                json.dump(state, snapshot_file)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            self._fsync_directory()
+
+            # Replaying the old journal on top of the new snapshot gives the same state, so a
+            # crash before this point is harmless.
+            if self.journal_path.is_file():
+                self.journal_path.unlink()
+                self._fsync_directory()
+
+            self._last_state = json.loads(json.dumps(state))
+            self._journal_entries = 0
+
+        return True
+
+    def _read(self) -> Optional[dict]:
+        # Rebuild the state from the snapshot and the journal
+
+        state = None
+
+        if self.snapshot_path.is_file():
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf8') as snapshot_file:
+                    state = json.load(snapshot_file)
+            except ValueError:
+                state = None
+
+            if (
+                type(state) is not dict or
+                'step' not in state or
+                type(state.get('context')) is not dict
+            ):
+                state = None
+
+        journal_entries = 0
+
+        if self.journal_path.is_file():
+            valid_size = 0
+            torn_journal = False
+
+            with open(self.journal_path, 'rb') as journal_file:
+                for line in journal_file:
+                    entry = None
+                    if line.endswith(b'\n'):
+                        try:
+                            entry = json.loads(line.decode('utf8'))
+                        except ValueError:
+                            entry = None
+
+                    if type(entry) is not dict or 'step' not in entry:
+                        # Torn write at the end of the journal
+                        torn_journal = True
+                        break
+
+                    valid_size = valid_size + len(line)
+
+                    if state is None:
+                        state = {'step': None, 'context': {}}
+
+                    state['step'] = entry['step']
+                    state['context'].update(entry.get('set', {}))
+                    for key in entry.get('unset', []):
+                        state['context'].pop(key, None)
+
+                    journal_entries = journal_entries + 1
+
+            if torn_journal:
+                # Drop the torn entry so that the next appends are readable
+                try:
+                    os.truncate(self.journal_path, valid_size)
+                except OSError:
+                    pass
+
+        self._journal_entries = journal_entries
+
+        return state
+
+    def _fsync_directory(self):
+        # Make the rename or unlink durable. This is not supported on Windows.
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        try:
+            directory_fd = os.open(self.save_directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
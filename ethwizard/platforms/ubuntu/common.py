@@ -1,5 +1,4 @@
 import sys
-import json
 import subprocess
 import re
 import os
@@ -18,30 +17,25 @@ from ethwizard import __version__
 
 from ethwizard.constants import (
     LINUX_SAVE_DIRECTORY,
-    STATE_FILE,
     LINUX_JWT_TOKEN_DIRECTORY,
-    LINUX_JWT_TOKEN_FILE_PATH
+    LINUX_JWT_TOKEN_FILE_PATH,
+    PGP_KEYRING_DIRECTORY
 )
 
-log = logging.getLogger(__name__)
+from ethwizard.platforms.state import StateStore
 
-def save_state(step_id: str, context: dict) -> bool:
-    # Save wizard state
+from ethwizard.platforms.keyring import PGPKeyring
 
-    data_to_save = {
-        'step': step_id,
-        'context': context
-    }
+from ethwizard.platforms.headless import is_headless, headless_exit_code
 
-    save_directory = Path(LINUX_SAVE_DIRECTORY)
-    if not save_directory.is_dir():
-        save_directory.mkdir(parents=True, exist_ok=True)
-    save_file = save_directory.joinpath(STATE_FILE)
+log = logging.getLogger(__name__)
 
-    with open(str(save_file), 'w', encoding='utf8') as output_file:
-        json.dump(data_to_save, output_file)
+state_store = StateStore(Path(LINUX_SAVE_DIRECTORY))
 
-    return True
+def save_state(step_id: str, context: dict) -> bool:
+    # Save wizard state
+
+    return state_store.save(step_id, context)
 
 def load_state() -> Optional[dict]:
     # Load wizard state
@@ -49,22 +43,15 @@ def load_state() -> Optional[dict]:
     save_directory = Path(LINUX_SAVE_DIRECTORY)
     if not save_directory.is_dir():
         return None
-    save_file = save_directory.joinpath(STATE_FILE)
-    if not save_file.is_file():
-        return None
-    
-    loaded_data = None
 
-    try:
-        with open(str(save_file), 'r', encoding='utf8') as input_file:
-            loaded_data = json.load(input_file)
-    except ValueError:
-        return None
-    
-    return loaded_data
+    return state_store.load()
 
 def quit_app():
     log.info(f'Quitting eth-wizard')
+
+    if is_headless():
+        sys.exit(headless_exit_code())
+
     quit()
 
 def handle_exception(exc_type, exc_value, exc_traceback):
@@ -120,6 +107,10 @@ def get_systemd_service_details(service):
 
     return service_details
 
+def get_keyring() -> PGPKeyring:
+    # Return the wizard PGP keyring located in the save directory
+    return PGPKeyring(Path(LINUX_SAVE_DIRECTORY, PGP_KEYRING_DIRECTORY))
+
 def is_package_installed(package):
     process_result = subprocess.run(['apt', '-qq', 'list', '--installed', package],
         capture_output=True, text=True)
@@ -1,21 +1,33 @@
 import os
 import subprocess
 import httpx
-import hashlib
 import shutil
 import time
-import humanize
 import stat
 import json
 import re
 
-from datetime import timedelta
-
 from pathlib import Path
 
 from packaging.version import parse as parse_version
 
-from yaml import safe_load
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.download import download_file, DownloadError
+
+from ethwizard.platforms.progress import track_download
+
+from ethwizard.platforms.extract import (
+    extract_archive,
+    iter_file,
+    strip_components,
+    ExtractError,
+    SignatureVerifier
+)
+
+from ethwizard.utils.lazy import lazy_callable
+
+safe_load = lazy_callable('yaml', 'safe_load')
 
 from ethwizard.constants import *
 
@@ -27,32 +39,254 @@ from ethwizard.platforms.common import (
     select_eth1_fallbacks,
     select_consensus_checkpoint_provider,
     progress_log_dialog,
+    run_download_dialog,
     search_for_generated_keys,
     select_consensus_client,
     select_execution_client,
     select_keys_directory,
     select_fee_recipient_address,
     select_withdrawal_address,
-    get_bc_validator_deposits,
+    get_validator_deposits,
+    get_join_queue_info,
     test_open_ports,
     show_whats_next,
     show_public_keys,
     Step,
+    StepError,
     test_context_variable,
     format_for_terminal
 )
 
+from ethwizard.platforms.prefetch import (
+    Prefetcher,
+    PrefetchSpec,
+    PrefetchError
+)
+
 from ethwizard.platforms.ubuntu.common import (
     log,
     quit_app,
     get_systemd_service_details,
     is_package_installed,
     is_adx_supported,
-    setup_jwt_token_file
+    setup_jwt_token_file,
+    get_keyring
 )
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import button_dialog
+from ethwizard.platforms.headless import button_dialog
+
+def select_mevboost_assets(release_json, options):
+    binary_asset = None
+    checksums_asset = None
+
+    archive_filename_comp = 'linux_amd64.tar.gz'
+    checksums_filename = 'checksums.txt'
+
+    for asset in release_json['assets']:
+        if 'name' not in asset:
+            continue
+        if 'browser_download_url' not in asset:
+            continue
+    
+        file_name = asset['name']
+        file_url = asset['browser_download_url']
+
+        if file_name.endswith(archive_filename_comp):
+            binary_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+        elif file_name == checksums_filename:
+            checksums_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+
+    if binary_asset is None or checksums_asset is None:
+        raise PrefetchError('Could not find binary or checksums asset in Github release.')
+
+    return {
+        'binary': binary_asset,
+        'checksums': checksums_asset
+    }
+
+def verify_mevboost_checksums(files, hexdigests):
+    binary_file_name = files['binary'].name
+
+    with open(files['checksums'], 'r') as checksums_file:
+        for line in checksums_file:
+            result = re.search(r'(?P<hash>[a-fA-F0-9]+)\s+' + re.escape(binary_file_name), line)
+            if result:
+                checksum = result.group('hash').lower()
+                binary_hexdigest = hexdigests['binary']
+
+                if checksum != binary_hexdigest:
+                    # SHA256 checksum failed
+                    raise PrefetchError(f'SHA256 checksum failed on MEV-Boost binary from '
+                        f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
+                        f'stop here to protect you.')
+
+                return
+
+    raise PrefetchError(f'We could not find the SHA256 checksum for MEV-Boost binary '
+        f'({binary_file_name}) in the {files["checksums"].name} file. We will stop here to '
+        f'protect you.')
+
+def select_lighthouse_assets(release_json, options):
+    binary_asset = None
+    signature_asset = None
+
+    archive_filename_comp = 'x86_64-unknown-linux-gnu.tar.gz'
+    if options.get('portable', False):
+        archive_filename_comp = 'x86_64-unknown-linux-gnu-portable.tar.gz'
+
+    archive_filename_sig_comp = archive_filename_comp + '.asc'
+
+    for asset in release_json['assets']:
+        if 'name' not in asset:
+            continue
+        if 'browser_download_url' not in asset:
+            continue
+    
+        file_name = asset['name']
+        file_url = asset['browser_download_url']
+
+        if file_name.endswith(archive_filename_comp):
+            binary_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+        elif file_name.endswith(archive_filename_sig_comp):
+            signature_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+
+    if binary_asset is None or signature_asset is None:
+        raise PrefetchError('Could not find binary or signature asset in Github release.')
+
+    return {
+        'binary': binary_asset,
+        'signature': signature_asset
+    }
+
+def select_nimbus_assets(release_json, options):
+    binary_asset = None
+
+    archive_filename_comp = 'nimbus-eth2_Linux_amd64'
+
+    for asset in release_json['assets']:
+        if 'name' not in asset:
+            continue
+        if 'browser_download_url' not in asset:
+            continue
+    
+        file_name = asset['name']
+        file_url = asset['browser_download_url']
+
+        if file_name.startswith(archive_filename_comp):
+            binary_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+
+    if binary_asset is None:
+        raise PrefetchError('Could not find binary in Github release.')
+
+    return {
+        'binary': binary_asset
+    }
+
+def select_staking_deposit_cli_assets(release_json, options):
+    binary_asset = None
+    checksum_asset = None
+
+    for asset in release_json['assets']:
+        if 'name' not in asset:
+            continue
+        if 'browser_download_url' not in asset:
+            continue
+    
+        file_name = asset['name']
+        file_url = asset['browser_download_url']
+
+        if file_name.endswith('linux-amd64.tar.gz'):
+            binary_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+        elif file_name.endswith('linux-amd64.sha256'):
+            checksum_asset = {
+                'file_name': file_name,
+                'file_url': file_url
+            }
+    
+    if binary_asset is None:
+        raise PrefetchError('No staking-deposit-cli binary found in Github release')
+
+    assets = {
+        'binary': binary_asset
+    }
+
+    if checksum_asset is not None:
+        assets['checksum'] = checksum_asset
+
+    return assets
+
+def verify_staking_deposit_cli_checksum(files, hexdigests):
+    if 'checksum' not in files:
+        return
+
+    binary_hexdigest = hexdigests['binary']
+
+    with open(files['checksum'], 'r') as checksum_file:
+        checksum = checksum_file.read(1024).strip().lower()
+        if binary_hexdigest != checksum:
+            # SHA256 checksum failed
+            raise PrefetchError(f'SHA256 checksum failed on staking-deposit-cli binary from '
+                f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
+                f'stop here to protect you.')
+
+# Release files are downloaded in the background while the user is answering prompts
+prefetcher = Prefetcher(Path(Path.home(), 'ethwizard', 'downloads', PREFETCH_DIRECTORY))
+
+prefetcher.register(PrefetchSpec(
+    name=PREFETCH_MEVBOOST,
+    release_path=MEVBOOST_LATEST_RELEASE,
+    select_assets=select_mevboost_assets,
+    verify=verify_mevboost_checksums
+))
+prefetcher.register(PrefetchSpec(
+    name=CONSENSUS_CLIENT_LIGHTHOUSE,
+    release_path=LIGHTHOUSE_LATEST_RELEASE,
+    select_assets=select_lighthouse_assets,
+    group=PREFETCH_CONSENSUS_GROUP
+))
+prefetcher.register(PrefetchSpec(
+    name=CONSENSUS_CLIENT_NIMBUS,
+    release_path=NIMBUS_LATEST_RELEASE,
+    select_assets=select_nimbus_assets,
+    group=PREFETCH_CONSENSUS_GROUP
+))
+prefetcher.register(PrefetchSpec(
+    name=PREFETCH_STAKING_DEPOSIT_CLI,
+    release_path=SDC_LATEST_RELEASE,
+    select_assets=select_staking_deposit_cli_assets,
+    verify=verify_staking_deposit_cli_checksum
+))
+
+def get_consensus_prefetch_options(consensus_client):
+    # Options used to select the consensus client release files
+
+    if consensus_client == CONSENSUS_CLIENT_LIGHTHOUSE:
+        use_optimized_binary = is_adx_supported()
+        if not use_optimized_binary:
+            log.warning('CPU does not support ADX instructions. '
+                'Using the portable version for Lighthouse.')
+        return {'portable': not use_optimized_binary}
+
+    return {}
 
 def installation_steps():
 
@@ -61,9 +295,7 @@ def installation_steps():
         selected_network = CTX_SELECTED_NETWORK
         want_to_test = CTX_WANT_TO_TEST
         disk_size_tested = CTX_DISK_SIZE_TESTED
-        disk_speed_tested = CTX_DISK_SPEED_TESTED
         available_ram_tested = CTX_AVAILABLE_RAM_TESTED
-        internet_speed_tested = CTX_INTERNET_SPEED_TESTED
 
         if not (
             test_context_variable(context, selected_network, log)
@@ -90,14 +322,6 @@ def installation_steps():
                 
                 context[disk_size_tested] = True
                 step_sequence.save_state(step.step_id, context)
-
-            if not context.get(disk_speed_tested, False):
-                if not test_disk_speed():
-                    # User asked to quit
-                    quit_app()
-                
-                context[disk_speed_tested] = True
-                step_sequence.save_state(step.step_id, context)
             
             if not context.get(available_ram_tested, False):
                 if not test_available_ram():
@@ -107,20 +331,89 @@ def installation_steps():
                 context[available_ram_tested] = True
                 step_sequence.save_state(step.step_id, context)
 
-            if not context.get(internet_speed_tested, False):
-                if not test_internet_speed():
-                    # User asked to quit
-                    quit_app()
-                
-                context[internet_speed_tested] = True
-                step_sequence.save_state(step.step_id, context)
-        
         return context
 
     test_system_step = Step(
         step_id=TEST_SYSTEM_STEP_ID,
         display_name='Testing your system',
-        exc_function=test_system_function
+        exc_function=test_system_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_WANT_TO_TEST, CTX_DISK_SIZE_TESTED,
+            CTX_AVAILABLE_RAM_TESTED],
+        writes=[CTX_WANT_TO_TEST, CTX_DISK_SIZE_TESTED, CTX_AVAILABLE_RAM_TESTED]
+    )
+
+    def measure_disk_speed_function(step, context, step_sequence):
+        # Context variables
+        want_to_test = CTX_WANT_TO_TEST
+        disk_speed_tested = CTX_DISK_SPEED_TESTED
+        disk_speed_results = CTX_DISK_SPEED_RESULTS
+
+        if (
+            context.get(want_to_test) == 1 and
+            not context.get(disk_speed_tested, False) and
+            disk_speed_results not in context
+            ):
+            context[disk_speed_results] = measure_disk_speed()
+
+        return context
+
+    # This step does not need the user. The disk speed test takes a few minutes and it runs in
+    # the background while the user answers the next prompts. The results are shown before
+    # installing the clients.
+    measure_disk_speed_step = Step(
+        step_id=MEASURE_DISK_SPEED_STEP_ID,
+        display_name='Measure disk speed',
+        exc_function=measure_disk_speed_function,
+        reads=[CTX_WANT_TO_TEST, CTX_DISK_SPEED_TESTED, CTX_DISK_SPEED_RESULTS],
+        writes=[CTX_DISK_SPEED_RESULTS, RESOURCE_APT],
+        interactive=False
+    )
+
+    def show_system_test_results_function(step, context, step_sequence):
+        # Context variables
+        want_to_test = CTX_WANT_TO_TEST
+        disk_speed_tested = CTX_DISK_SPEED_TESTED
+        disk_speed_results = CTX_DISK_SPEED_RESULTS
+        internet_speed_tested = CTX_INTERNET_SPEED_TESTED
+
+        if context.get(want_to_test) != 1:
+            return context
+
+        if not context.get(disk_speed_tested, False):
+            if disk_speed_results not in context:
+                # Resuming from this step without the measured results
+                context[disk_speed_results] = measure_disk_speed()
+
+            if not test_disk_speed(context[disk_speed_results]):
+                # User asked to quit or error
+                del context[disk_speed_results]
+                step_sequence.save_state(step.step_id, context)
+
+                quit_app()
+            
+            context[disk_speed_tested] = True
+            del context[disk_speed_results]
+            step_sequence.save_state(step.step_id, context)
+
+        # The internet speed test runs in the foreground since any other download would skew
+        # its results
+        if not context.get(internet_speed_tested, False):
+            if not test_internet_speed():
+                # User asked to quit
+                quit_app()
+            
+            context[internet_speed_tested] = True
+            step_sequence.save_state(step.step_id, context)
+        
+        return context
+
+    show_system_test_results_step = Step(
+        step_id=SHOW_SYSTEM_TEST_RESULTS_STEP_ID,
+        display_name='System test results',
+        exc_function=show_system_test_results_function,
+        reads=[CTX_WANT_TO_TEST, CTX_DISK_SPEED_TESTED, CTX_DISK_SPEED_RESULTS,
+            CTX_INTERNET_SPEED_TESTED, RESOURCE_APT],
+        writes=[CTX_DISK_SPEED_TESTED, CTX_DISK_SPEED_RESULTS, CTX_INTERNET_SPEED_TESTED]
     )
 
     def select_network_function(step, context, step_sequence):
@@ -128,6 +421,11 @@ def installation_steps():
         selected_network = CTX_SELECTED_NETWORK
 
         if selected_network not in context:
+            # Release files that do not depend on the user choices can be fetched while the
+            # user is selecting a network
+            prefetcher.start(PREFETCH_MEVBOOST)
+            prefetcher.start(PREFETCH_STAKING_DEPOSIT_CLI)
+
             context[selected_network] = select_network(log)
             step_sequence.save_state(step.step_id, context)
 
@@ -143,7 +441,9 @@ def installation_steps():
     select_network_step = Step(
         step_id=SELECT_NETWORK_STEP_ID,
         display_name='Network selection',
-        exc_function=select_network_function
+        exc_function=select_network_function,
+        reads=[CTX_SELECTED_NETWORK],
+        writes=[CTX_SELECTED_NETWORK]
     )
 
     def select_custom_ports_function(step, context, step_sequence):
@@ -181,7 +481,9 @@ def installation_steps():
     select_custom_ports_step = Step(
         step_id=SELECT_CUSTOM_PORTS_STEP_ID,
         display_name='Open ports configuration',
-        exc_function=select_custom_ports_function
+        exc_function=select_custom_ports_function,
+        reads=[CTX_SELECTED_PORTS, CTX_SELECTED_CONSENSUS_CLIENT, CTX_SELECTED_EXECUTION_CLIENT],
+        writes=[CTX_SELECTED_PORTS]
     )
 
     def install_execution_function(step, context, step_sequence):
@@ -217,13 +519,38 @@ def installation_steps():
     install_execution_step = Step(
         step_id=INSTALL_EXECUTION_STEP_ID,
         display_name='Execution client installation',
-        exc_function=install_execution_function
+        exc_function=install_execution_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_SELECTED_PORTS, CTX_SELECTED_EXECUTION_CLIENT],
+        writes=[RESOURCE_APT]
+    )
+
+    def download_execution_package_function(step, context, step_sequence):
+        # Context variables
+        selected_execution_client = CTX_SELECTED_EXECUTION_CLIENT
+
+        if selected_execution_client in context:
+            # The packages are only put in the apt cache. Any error is ignored here and it will
+            # happen again in the execution client installation where it is reported.
+            download_execution_package(context[selected_execution_client])
+
+        return context
+
+    # This step does not need the user. The execution client packages are downloaded in the
+    # background so installing them later is quick.
+    download_execution_package_step = Step(
+        step_id=DOWNLOAD_EXECUTION_PACKAGE_STEP_ID,
+        display_name='Download execution client package',
+        exc_function=download_execution_package_function,
+        reads=[CTX_SELECTED_EXECUTION_CLIENT],
+        writes=[RESOURCE_APT],
+        interactive=False
     )
 
     def install_mevboost_function(step, context, step_sequence):
         # Context variables
         selected_network = CTX_SELECTED_NETWORK
         mevboost_installed = CTX_MEVBOOST_INSTALLED
+        mevboost_started = CTX_MEVBOOST_STARTED
 
         if not (
             test_context_variable(context, selected_network, log)
@@ -238,13 +565,45 @@ def installation_steps():
             quit_app()
         
         context[mevboost_installed] = installed_value.get('installed', False)
+        context[mevboost_started] = installed_value.get('started', True)
         
         return context
     
     install_mevboost_step = Step(
         step_id=INSTALL_MEVBOOST_STEP_ID,
         display_name='MEV-Boost installation',
-        exc_function=install_mevboost_function
+        exc_function=install_mevboost_function,
+        reads=[CTX_SELECTED_NETWORK],
+        writes=[CTX_MEVBOOST_INSTALLED, CTX_MEVBOOST_STARTED]
+    )
+
+    def start_mevboost_function(step, context, step_sequence):
+        # Context variables
+        mevboost_installed = CTX_MEVBOOST_INSTALLED
+        mevboost_started = CTX_MEVBOOST_STARTED
+
+        if not (
+            test_context_variable(context, mevboost_installed, log)
+            ):
+            # We are missing context variables, we cannot continue
+            raise StepError(f'Missing {mevboost_installed} context variable.')
+
+        if context[mevboost_installed] and not context.get(mevboost_started, True):
+            start_mevboost()
+            context[mevboost_started] = True
+
+        return context
+
+    # This step does not need the user. The MEV-Boost service is started and verified in the
+    # background while the user answers the next prompts. The consensus client installation
+    # waits for it.
+    start_mevboost_step = Step(
+        step_id=START_MEVBOOST_STEP_ID,
+        display_name='Start MEV-Boost service',
+        exc_function=start_mevboost_function,
+        reads=[CTX_MEVBOOST_INSTALLED, CTX_MEVBOOST_STARTED],
+        writes=[CTX_MEVBOOST_STARTED],
+        interactive=False
     )
 
     def detect_merge_ready_function(step, context, step_sequence):
@@ -273,7 +632,10 @@ def installation_steps():
     detect_merge_ready_step = Step(
         step_id=DETECT_MERGE_READY_STEP_ID,
         display_name='Detect merge ready network',
-        exc_function=detect_merge_ready_function
+        exc_function=detect_merge_ready_function,
+        reads=[CTX_SELECTED_NETWORK],
+        writes=[CTX_MERGE_READY_NETWORK],
+        interactive=False
     )
 
     def select_eth1_fallbacks_function(step, context, step_sequence):
@@ -291,7 +653,7 @@ def installation_steps():
 
         if not context[merge_ready_network]:
             if selected_eth1_fallbacks not in context:
-                context[selected_eth1_fallbacks] = select_eth1_fallbacks(context[selected_network])
+                context[selected_eth1_fallbacks] = select_eth1_fallbacks(context[selected_network], log)
                 step_sequence.save_state(step.step_id, context)
 
             if (
@@ -310,7 +672,9 @@ def installation_steps():
     select_eth1_fallbacks_step = Step(
         step_id=SELECT_ETH1_FALLBACKS_STEP_ID,
         display_name='Adding execution fallback nodes',
-        exc_function=select_eth1_fallbacks_function
+        exc_function=select_eth1_fallbacks_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_MERGE_READY_NETWORK, CTX_SELECTED_ETH1_FALLBACKS],
+        writes=[CTX_SELECTED_ETH1_FALLBACKS]
     )
 
     def select_consensus_checkpoint_url_function(step, context, step_sequence):
@@ -343,7 +707,9 @@ def installation_steps():
     select_consensus_checkpoint_url_step = Step(
         step_id=SELECT_CONSENSUS_CHECKPOINT_URL_STEP_ID,
         display_name='Adding consensus checkpoint state',
-        exc_function=select_consensus_checkpoint_url_function
+        exc_function=select_consensus_checkpoint_url_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_SELECTED_CONSENSUS_CHECKPOINT_URL],
+        writes=[CTX_SELECTED_CONSENSUS_CHECKPOINT_URL]
     )
 
     def install_consensus_function(step, context, step_sequence):
@@ -389,7 +755,11 @@ def installation_steps():
     install_consensus_step = Step(
         step_id=INSTALL_CONSENSUS_STEP_ID,
         display_name='Consensus client installation',
-        exc_function=install_consensus_function
+        exc_function=install_consensus_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_SELECTED_PORTS, CTX_SELECTED_ETH1_FALLBACKS,
+            CTX_SELECTED_CONSENSUS_CHECKPOINT_URL, CTX_SELECTED_CONSENSUS_CLIENT,
+            CTX_MEVBOOST_INSTALLED, CTX_MEVBOOST_STARTED],
+        writes=[RESOURCE_APT]
     )
 
     def test_open_ports_function(step, context, step_sequence):
@@ -411,7 +781,9 @@ def installation_steps():
     test_open_ports_step = Step(
         step_id=TEST_OPEN_PORTS_STEP_ID,
         display_name='Testing open ports',
-        exc_function=test_open_ports_function
+        exc_function=test_open_ports_function,
+        reads=[CTX_SELECTED_PORTS],
+        writes=[]
     )
 
     def obtain_keys_function(step, context, step_sequence):
@@ -433,6 +805,9 @@ def installation_steps():
             context[obtained_keys] = obtain_keys(context[selected_network], consensus_client)
             step_sequence.save_state(step.step_id, context)
 
+            # Remove the staking-deposit-cli prefetched files if they were not used
+            prefetcher.cancel(PREFETCH_STAKING_DEPOSIT_CLI)
+
         if not context[obtained_keys]:
             # User asked to quit
             del context[obtained_keys]
@@ -445,7 +820,9 @@ def installation_steps():
     obtain_keys_step = Step(
         step_id=OBTAIN_KEYS_STEP_ID,
         display_name='Importing or generating keys',
-        exc_function=obtain_keys_function
+        exc_function=obtain_keys_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_SELECTED_CONSENSUS_CLIENT, CTX_OBTAINED_KEYS],
+        writes=[CTX_OBTAINED_KEYS]
     )
 
     def select_fee_recipient_address_function(step, context, step_sequence):
@@ -478,7 +855,9 @@ def installation_steps():
     select_fee_recipient_address_step = Step(
         step_id=SELECT_FEE_RECIPIENT_ADDRESS_STEP_ID,
         display_name='Select your fee recipient address',
-        exc_function=select_fee_recipient_address_function
+        exc_function=select_fee_recipient_address_function,
+        reads=[CTX_MERGE_READY_NETWORK, CTX_SELECTED_FEE_RECIPIENT_ADDRESS],
+        writes=[CTX_SELECTED_FEE_RECIPIENT_ADDRESS]
     )
 
     def install_validator_function(step, context, step_sequence):
@@ -526,12 +905,25 @@ def installation_steps():
     install_validator_step = Step(
         step_id=INSTALL_VALIDATOR_STEP_ID,
         display_name='Validator client installation',
-        exc_function=install_validator_function
+        exc_function=install_validator_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_OBTAINED_KEYS, CTX_SELECTED_FEE_RECIPIENT_ADDRESS,
+            CTX_MEVBOOST_INSTALLED, CTX_SELECTED_CONSENSUS_CLIENT],
+        writes=[CTX_PUBLIC_KEYS]
     )
 
     def install_chrony_function(step, context, step_sequence):
-        if not install_chrony():
-            # User asked to quit or error
+        # Context variables
+        chrony_selected = CTX_CHRONY_SELECTED
+
+        if chrony_selected not in context:
+            context[chrony_selected] = select_chrony()
+            step_sequence.save_state(step.step_id, context)
+
+        if not context[chrony_selected]:
+            # User asked to quit
+            del context[chrony_selected]
+            step_sequence.save_state(step.step_id, context)
+
             quit_app()
 
         return context
@@ -539,7 +931,38 @@ def installation_steps():
     install_chrony_step = Step(
         step_id=INSTALL_CHRONY_STEP_ID,
         display_name='Install chrony',
-        exc_function=install_chrony_function
+        exc_function=install_chrony_function,
+        reads=[CTX_CHRONY_SELECTED],
+        writes=[CTX_CHRONY_SELECTED]
+    )
+
+    def install_chrony_package_function(step, context, step_sequence):
+        # Context variables
+        chrony_selected = CTX_CHRONY_SELECTED
+
+        if not (
+            test_context_variable(context, chrony_selected, log)
+            ):
+            # We are missing context variables, we cannot continue
+            raise StepError(f'Missing {chrony_selected} context variable.')
+
+        if context[chrony_selected].get('install', False):
+            if not install_chrony_package():
+                # Error
+                raise StepError('Unable to install chrony.')
+
+        return context
+
+    # This step does not need the user. It runs in the background while the keys are obtained
+    # and the validator client is installed. The deposit waits for it so a failure stops the
+    # installation before the deposit.
+    install_chrony_package_step = Step(
+        step_id=INSTALL_CHRONY_PACKAGE_STEP_ID,
+        display_name='Install chrony package',
+        exc_function=install_chrony_package_function,
+        reads=[CTX_CHRONY_SELECTED],
+        writes=[RESOURCE_APT],
+        interactive=False
     )
 
     def initiate_deposit_function(step, context, step_sequence):
@@ -568,13 +991,17 @@ def installation_steps():
     initiate_deposit_step = Step(
         step_id=INITIATE_DEPOSIT_STEP_ID,
         display_name='Deposit on the launchpad',
-        exc_function=initiate_deposit_function
+        exc_function=initiate_deposit_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_OBTAINED_KEYS, CTX_SELECTED_CONSENSUS_CLIENT,
+            RESOURCE_APT],
+        writes=[]
     )
 
     def show_whats_next_function(step, context, step_sequence):
         # Context variables
         selected_network = CTX_SELECTED_NETWORK
         public_keys = CTX_PUBLIC_KEYS
+        step_metrics = CTX_STEP_METRICS
 
         if not (
             test_context_variable(context, selected_network, log) and
@@ -583,14 +1010,17 @@ def installation_steps():
             # We are missing context variables, we cannot continue
             quit_app()
 
-        show_whats_next(context[selected_network], context[public_keys])
+        show_whats_next(context[selected_network], context[public_keys],
+            context.get(step_metrics))
 
         return context
     
     show_whats_next_step = Step(
         step_id=SHOW_WHATS_NEXT_STEP_ID,
         display_name='Installation completed',
-        exc_function=show_whats_next_function
+        exc_function=show_whats_next_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_PUBLIC_KEYS, CTX_STEP_METRICS],
+        writes=[]
     )
 
     def show_public_keys_function(step, context, step_sequence):
@@ -612,7 +1042,9 @@ def installation_steps():
     show_public_keys_step = Step(
         step_id=SHOW_PUBLIC_KEYS_STEP_ID,
         display_name='Show public keys',
-        exc_function=show_public_keys_function
+        exc_function=show_public_keys_function,
+        reads=[CTX_SELECTED_NETWORK, CTX_PUBLIC_KEYS],
+        writes=[]
     )
 
     def select_consensus_client_function(step, context, step_sequence):
@@ -626,12 +1058,18 @@ def installation_steps():
         
         context[selected_consensus_client] = consensus_client
 
+        # Start fetching the selected consensus client release files and cancel any previous
+        # choice
+        prefetcher.select(consensus_client, get_consensus_prefetch_options(consensus_client))
+
         return context
     
     select_consensus_client_step = Step(
         step_id=SELECT_CONSENSUS_CLIENT_STEP_ID,
         display_name='Select consensus client',
-        exc_function=select_consensus_client_function
+        exc_function=select_consensus_client_function,
+        reads=[],
+        writes=[CTX_SELECTED_CONSENSUS_CLIENT]
     )
 
     def select_execution_client_function(step, context, step_sequence):
@@ -650,7 +1088,9 @@ def installation_steps():
     select_execution_client_step = Step(
         step_id=SELECT_EXECUTION_CLIENT_STEP_ID,
         display_name='Select execution client',
-        exc_function=select_execution_client_function
+        exc_function=select_execution_client_function,
+        reads=[],
+        writes=[CTX_SELECTED_EXECUTION_CLIENT]
     )
 
     def check_os_requirements_function(step, context, step_sequence):
@@ -673,7 +1113,9 @@ def installation_steps():
     check_os_requirements_step = Step(
         step_id=CHECK_OS_REQUIREMENTS_STEP_ID,
         display_name='Check OS requirements',
-        exc_function=check_os_requirements_function
+        exc_function=check_os_requirements_function,
+        reads=[CTX_SELECTED_CONSENSUS_CLIENT],
+        writes=[]
     )
 
     return [
@@ -682,18 +1124,23 @@ def installation_steps():
         select_execution_client_step,
         check_os_requirements_step,
         test_system_step,
+        measure_disk_speed_step,
+        download_execution_package_step,
         install_mevboost_step,
+        start_mevboost_step,
         select_custom_ports_step,
         detect_merge_ready_step,
         select_consensus_checkpoint_url_step,
         select_eth1_fallbacks_step,
+        show_system_test_results_step,
         install_consensus_step,
         install_execution_step,
         test_open_ports_step,
+        install_chrony_step,
+        install_chrony_package_step,
         obtain_keys_step,
         select_fee_recipient_address_step,
         install_validator_step,
-        install_chrony_step,
         # TODO: Monitoring setup
         initiate_deposit_step,
         show_whats_next_step,
@@ -789,26 +1236,26 @@ enough</b></style> to be a fully working validator. Here are your results:
 
     return result
 
-def test_disk_speed():
-    # Test disk speed using fio tool
+def measure_disk_speed():
+    # Measure disk speed using fio tool. This runs in the background while dialogs are
+    # displayed so nothing is logged and the apt output is captured. Return the results or the
+    # error in a dict.
 
     # Install fio using APT
     fio_package_installed = False
     try:
         fio_package_installed = is_package_installed('fio')
-    except Exception:
-        return False
+    except Exception as exception:
+        return {'error': f'Unable to check if fio is installed. {exception}'}
     
     if not fio_package_installed:
-        log.info('Installing fio to test disk speed...')
-
         env = os.environ.copy()
         env['DEBIAN_FRONTEND'] = 'noninteractive'
 
         subprocess.run([
-            'apt', '-y', 'update'])
+            'apt', '-y', 'update'], capture_output=True)
         subprocess.run([
-            'apt', '-y', 'install', 'fio'], env=env)
+            'apt', '-y', 'install', 'fio'], env=env, capture_output=True)
     
     # Run fio test
     fio_path = Path(Path.home(), 'ethwizard', 'fio')
@@ -820,19 +1267,20 @@ def test_disk_speed():
     fio_target_path = Path(fio_path, fio_target_filename)
     fio_output_path = Path(fio_path, fio_output_filename)
 
-    log.info('Executing fio to test disk speed...')
-
-    process_result = subprocess.run([
-        'fio', '--randrepeat=1', '--ioengine=libaio', '--direct=1', '--gtod_reduce=1',
-        '--name=test', '--filename=' + fio_target_filename, '--bs=4k', '--iodepth=64',
-        '--size=4G', '--readwrite=randrw', '--rwmixread=75', '--output=' + fio_output_filename,
-        '--output-format=json'
-        ], cwd=fio_path)
+    try:
+        process_result = subprocess.run([
+            'fio', '--randrepeat=1', '--ioengine=libaio', '--direct=1', '--gtod_reduce=1',
+            '--name=test', '--filename=' + fio_target_filename, '--bs=4k', '--iodepth=64',
+            '--size=4G', '--readwrite=randrw', '--rwmixread=75', '--output=' + fio_output_filename,
+            '--output-format=json'
+            ], cwd=fio_path, capture_output=True, text=True)
+    except FileNotFoundError:
+        return {'error': 'Unable to find fio. It could not be installed.'}
 
     if process_result.returncode != 0:
-        log.error(f'Error while running fio disk test. Return code {process_result.returncode}\n'
-            f'StdOut: {process_result.stdout}\nStdErr: {process_result.stderr}')
-        return False
+        return {'error': f'Error while running fio disk test. Return code '
+            f'{process_result.returncode}\nStdOut: {process_result.stdout}\n'
+            f'StdErr: {process_result.stderr}'}
     
     # Remove test file
     fio_target_path.unlink()
@@ -846,12 +1294,10 @@ def test_disk_speed():
     fio_output_path.unlink()
 
     if results_json is None:
-        log.error('Could not read the results from fio output file.')
-        return False
+        return {'error': 'Could not read the results from fio output file.'}
     
     if 'jobs' not in results_json or type(results_json['jobs']) is not list:
-        log.error('Unexpected structure from fio output file. No jobs list.')
-        return False
+        return {'error': 'Unexpected structure from fio output file. No jobs list.'}
     
     jobs = results_json['jobs']
 
@@ -859,16 +1305,14 @@ def test_disk_speed():
     test_job = None
     for job in jobs:
         if 'jobname' not in job:
-            log.error('Unexpected structure from fio output file. No jobname in a job.')
-            return False
+            return {'error': 'Unexpected structure from fio output file. No jobname in a job.'}
         jobname = job['jobname']
         if jobname == 'test':
             test_job = job
             break
 
     if test_job is None:
-        log.error('Unable to find our test job in fio output file.')
-        return False
+        return {'error': 'Unable to find our test job in fio output file.'}
     
     if not (
         'read' in test_job and
@@ -877,11 +1321,22 @@ def test_disk_speed():
         'write' in test_job and
         'iops' in test_job['write'] and
         type(test_job['write']['iops']) is float):
-        log.error('Unexpected structure from fio output file. No read or write iops.')
-        return False
+        return {'error': 'Unexpected structure from fio output file. No read or write iops.'}
     
-    k_read_iops = test_job['read']['iops'] / 1000.0
-    k_write_iops = test_job['write']['iops'] / 1000.0
+    return {
+        'k_read_iops': test_job['read']['iops'] / 1000.0,
+        'k_write_iops': test_job['write']['iops'] / 1000.0
+    }
+
+def test_disk_speed(results):
+    # Show the disk speed results measured with measure_disk_speed
+
+    if 'error' in results:
+        log.error(results['error'])
+        return False
+
+    k_read_iops = results['k_read_iops']
+    k_write_iops = results['k_write_iops']
 
     # Test if disk speed is above minimal values
     if not (
@@ -931,6 +1386,10 @@ be a fully working validator. Here are your results:
 def test_internet_speed():
     # Test for internet speed
 
+    # Release files prefetched in the background would skew the results
+    log.info('Waiting for release files being downloaded in the background...')
+    prefetcher.wait()
+
     # Downloading speedtest script
     log.info('Downloading speedtest-cli script to test internet speed...')
     download_path = Path(Path.home(), 'ethwizard', 'downloads')
@@ -939,15 +1398,10 @@ def test_internet_speed():
     script_path = Path(download_path, 'speedtest-cli.py')
 
     try:
-        with open(script_path, 'wb') as binary_file:
-            with httpx.stream('GET', SPEEDTEST_SCRIPT_URL, follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error('HTTP error while downloading speedtest-cli script. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        with track_download(script_path.name, SPEEDTEST_SCRIPT_URL, log) as download_progress:
+            download_file(SPEEDTEST_SCRIPT_URL, script_path, log,
+                progress=download_progress.update)
+    except DownloadError as exception:
         log.error(f'Exception while downloading speedtest-cli script. {exception}')
         return False
     
@@ -1246,6 +1700,7 @@ Do you want to keep the current MEV-Boost service?
     # Don't try to install mevboost if it's not supported on this network
     if network not in MEVBOOST_SERVICE_DEFINITION:
         log.info(f'No MEV-Boost support for {ETH1_NETWORK_NAME[network]} network.')
+        prefetcher.cancel(PREFETCH_MEVBOOST)
         return installed_value
 
     result = button_dialog(
@@ -1276,6 +1731,7 @@ automatically start MEV-Boost on reboot or if it crashes.
         return result
     
     if result == 2:
+        prefetcher.cancel(PREFETCH_MEVBOOST)
         return installed_value
     
     # Check if mev-boost is already installed
@@ -1332,148 +1788,35 @@ Do you want to skip installing the MEV-Boost binary?
             return result
         
         install_mevboost_binary = (result == 2)
+        if not install_mevboost_binary:
+            prefetcher.cancel(PREFETCH_MEVBOOST)
 
     if install_mevboost_binary:
-        # Getting latest mev-boost release files
-        mevboost_gh_release_url = GITHUB_REST_API_URL + MEVBOOST_LATEST_RELEASE
-        headers = {'Accept': GITHUB_API_VERSION}
-        try:
-            response = httpx.get(mevboost_gh_release_url, headers=headers,
-                follow_redirects=True)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading MEV-Boost binary. {exception}')
+        # Getting latest MEV-Boost release files, they might already have been prefetched
+        prefetched = run_download_dialog(
+            title='Downloading MEV-Boost',
+            text='Getting the latest MEV-Boost release files...',
+            download=lambda cancelled: prefetcher.take(PREFETCH_MEVBOOST, cancelled=cancelled))
+        if prefetched.error is not None:
+            log.error(f'Unable to get MEV-Boost release files from Github. {prefetched.error}')
             return False
 
-        if response.status_code != 200:
-            log.error(f'HTTP error while downloading MEV-Boost binary. '
-                f'Status code {response.status_code}')
-            return False
-        
-        release_json = response.json()
-
-        if 'assets' not in release_json:
-            log.error('No assets in Github release for MEV-Boost.')
-            return False
-        
-        binary_asset = None
-        checksums_asset = None
-
-        archive_filename_comp = 'linux_amd64.tar.gz'
-        checksums_filename = 'checksums.txt'
-
-        for asset in release_json['assets']:
-            if 'name' not in asset:
-                continue
-            if 'browser_download_url' not in asset:
-                continue
-        
-            file_name = asset['name']
-            file_url = asset['browser_download_url']
-
-            if file_name.endswith(archive_filename_comp):
-                binary_asset = {
-                    'file_name': file_name,
-                    'file_url': file_url
-                }
-            elif file_name == checksums_filename:
-                checksums_asset = {
-                    'file_name': file_name,
-                    'file_url': file_url
-                }
-
-        if binary_asset is None or checksums_asset is None:
-            log.error('Could not find binary or checksums asset in Github release.')
-            return False
-        else:
-            archive_filename = binary_asset['file_name']
-            log.info(f'Found {archive_filename} asset in Github release.')
-        
-        # Downloading latest MEV-Boost release files
-        download_path = Path(Path.home(), 'ethwizard', 'downloads')
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        binary_path = Path(download_path, binary_asset['file_name'])
-        binary_hash = hashlib.sha256()
+        binary_path = prefetched.files['binary']
+        log.info(f'Good SHA256 checksum for MEV-Boost binary ({binary_path.name}).')
 
+        # Extracting the MEV-Boost binary archive
         try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading MEV-Boost binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-
-                    archive_filename = binary_asset['file_name']
-                    archive_url = binary_asset['file_url']
-                    log.info(f'Downloading {archive_filename} from {archive_url} ...')
-
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-                        binary_hash.update(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading MEV-Boost binary from Github. {exception}')
+            staged = extract_archive(iter_file(binary_path), binary_path.name,
+                Path(MEVBOOST_INSTALLED_DIRECTORY))
+        except (ExtractError, OSError) as exception:
+            prefetcher.discard(prefetched)
+            log.error(f'Unable to extract the MEV-Boost binary archive. {exception}')
             return False
-        
-        checksums_path = Path(download_path, checksums_asset['file_name'])
-
-        try:
-            with open(checksums_path, 'wb') as checksums_file:
-                with httpx.stream('GET', checksums_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading MEV-Boost checksums from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    
-                    archive_filename = checksums_asset['file_name']
-                    archive_url = checksums_asset['file_url']
-                    log.info(f'Downloading {archive_filename} from {archive_url} ...')
 
-                    for data in http_stream.iter_bytes():
-                        checksums_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading MEV-Boost checksums from Github. {exception}')
-            return False
+        staged.commit()
 
-        # Verify checksum
-
-        hash_found = False
-        with open(checksums_path, 'r') as checksums_file:
-            for line in checksums_file:
-                result = re.search(r'(?P<hash>[a-fA-F0-9]+)\s+' +
-                    re.escape(binary_asset['file_name']), line)
-                if result:
-                    hash_found = True
-                    checksum = result.group('hash').lower()
-
-                    binary_hexdigest = binary_hash.hexdigest().lower()
-
-                    if checksum != binary_hexdigest:
-                        # SHA256 checksum failed
-                        log.error(f'SHA256 checksum failed on MEV-Boost binary from '
-                            f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
-                            f'stop here to protect you.')
-                        return False
-                    
-                    log.info('Good SHA256 checksum for MEV-Boost binary.')
-
-                    break
-        
-        if not hash_found:
-            archive_filename = binary_asset['file_name']
-            log.error(f'We could not find the SHA256 checksum for MEV-Boost binary '
-                f'({archive_filename}) in the {checksums_filename} file. We will stop here to '
-                f'protect you.')
-            return False
-        
-        # Extracting the MEV-Boost binary archive
-        subprocess.run([
-            'tar', 'xvf', binary_path, '--directory', MEVBOOST_INSTALLED_DIRECTORY])
-        
         # Remove download leftovers
-        binary_path.unlink()
-        checksums_path.unlink()
+        prefetcher.discard(prefetched)
 
         # Get MEV-Boost version
         try:
@@ -1534,14 +1877,28 @@ Do you want to skip installing the MEV-Boost binary?
         service_file.write(MEVBOOST_SERVICE_DEFINITION[network].format(addparams=addparams_string))
     subprocess.run([
         'systemctl', 'daemon-reload'])
+
+    log.info(f'MEV-Boost version {mevboost_version} is installed. Its service will be started '
+        f'and verified in the background.')
+
+    # The service is started and verified by start_mevboost in the background
+    installed_value['installed'] = True
+    installed_value['started'] = False
+    return installed_value
+
+def start_mevboost():
+    # Start the MEV-Boost service and verify that it is running properly. This runs in the
+    # background while dialogs are displayed. Raise StepError when the service is not running.
+
+    mevboost_service_name = MEVBOOST_SYSTEMD_SERVICE_NAME
+
     subprocess.run([
-        'systemctl', 'start', mevboost_service_name])
+        'systemctl', 'start', mevboost_service_name], capture_output=True)
     subprocess.run([
-        'systemctl', 'enable', mevboost_service_name])
+        'systemctl', 'enable', mevboost_service_name], capture_output=True)
     
     # Wait a little before checking for MEV-Boost
     delay = 6
-    log.info(f'We are giving MEV-Boost {delay} seconds to start before testing it.')
     time.sleep(delay)
 
     # Verify proper MEV-Boost service installation
@@ -1552,10 +1909,7 @@ Do you want to skip installing the MEV-Boost binary?
         service_details['ActiveState'] == 'active' and
         service_details['SubState'] == 'running'
     ):
-
-        result = button_dialog(
-            title='MEV-Boost service not running properly',
-            text=(
+        message = (
 f'''
 The MEV-Boost service we just created seems to have issues. Here are some
 details found:
@@ -1571,31 +1925,52 @@ We cannot proceed if the MEV-Boost service cannot be started properly.
 Make sure to check the logs and fix any issue found there. You can see
 the logs with:
 
-$ sudo journalctl -ru {mevboost_service_name}
-'''         ),
-            buttons=[
-                ('Quit', False)
-            ]
-        ).run()
-
-        log.info(
-f'''
-To examine your MEV-Boost service logs, type the following command:
-
 $ sudo journalctl -ru {mevboost_service_name}
 '''
         )
+        log.error(message)
+        raise StepError('The MEV-Boost service is not running properly.')
 
+    return True
+
+def download_execution_package(execution_client):
+    # Add the execution client PPA and download its packages in the apt cache without
+    # installing them. This runs in the background while dialogs are displayed so the apt output
+    # is captured.
+
+    if execution_client not in LINUX_EXECUTION_CLIENT_PPA:
         return False
-    
-    log.info(
-f'''
-MEV-Boost version {mevboost_version} is installed and working properly.
-''' )
-    time.sleep(5)
 
-    installed_value['installed'] = True
-    return installed_value
+    packages = LINUX_EXECUTION_CLIENT_PACKAGES[execution_client]
+
+    try:
+        if all(is_package_installed(package) for package in packages):
+            return True
+        spc_package_installed = is_package_installed('software-properties-common')
+    except Exception:
+        return False
+
+    env = os.environ.copy()
+    env['DEBIAN_FRONTEND'] = 'noninteractive'
+
+    if not spc_package_installed:
+        subprocess.run([
+            'apt', '-y', 'update'], capture_output=True)
+        subprocess.run([
+            'apt', '-y', 'install', 'software-properties-common'], env=env, capture_output=True)
+
+    process_result = subprocess.run([
+        'add-apt-repository', '-y', LINUX_EXECUTION_CLIENT_PPA[execution_client]],
+        capture_output=True)
+    if process_result.returncode != 0:
+        return False
+
+    subprocess.run([
+        'apt', '-y', 'update'], capture_output=True)
+    process_result = subprocess.run([
+        'apt', '-y', 'install', '--download-only'] + packages, env=env, capture_output=True)
+
+    return process_result.returncode == 0
 
 def install_geth(network, ports):
     # Install Geth for the selected network
@@ -1977,7 +2352,7 @@ $ sudo journalctl -ru {geth_service_name}
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+        response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Geth',
@@ -2132,7 +2507,7 @@ $ sudo journalctl -ru {geth_service_name}
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+                response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Geth.')
                 continue
@@ -2155,7 +2530,7 @@ $ sudo journalctl -ru {geth_service_name}
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+                response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Geth.')
                 continue
@@ -2641,7 +3016,7 @@ $ sudo journalctl -ru {nethermind_service_name}
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers)
+        response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Nethermind',
@@ -2796,7 +3171,7 @@ $ sudo journalctl -ru {nethermind_service_name}
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_nethermind_jsonrpc_url, json=request_json,
+                response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json,
                     headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nethermind.')
@@ -2820,7 +3195,7 @@ $ sudo journalctl -ru {nethermind_service_name}
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_nethermind_jsonrpc_url, json=request_json,
+                response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json,
                     headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nethermind.')
@@ -2867,7 +3242,7 @@ $ sudo journalctl -ru {nethermind_service_name}
             local_nethermind_health_url = 'http://127.0.0.1:8545/health'
 
             try:
-                response = httpx.post(local_nethermind_health_url)
+                response = httpclient.post(local_nethermind_health_url)
                 if response.status_code not in (200, 503):
                     log_text(
                         f'Status code: {response.status_code} while querying Nethermind Health.')
@@ -3136,101 +3511,23 @@ Do you want to skip installing the lighthouse binary?
             return result
         
         install_lighthouse_binary = (result == 2)
+        if not install_lighthouse_binary:
+            prefetcher.cancel(CONSENSUS_CLIENT_LIGHTHOUSE)
     
     if install_lighthouse_binary:
-        # Getting latest Lighthouse release files
-        lighthouse_gh_release_url = GITHUB_REST_API_URL + LIGHTHOUSE_LATEST_RELEASE
-        headers = {'Accept': GITHUB_API_VERSION}
-        try:
-            response = httpx.get(lighthouse_gh_release_url, headers=headers,
-                follow_redirects=True)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading lighthouse binary. {exception}')
+        # Getting latest Lighthouse release files, they might already have been prefetched
+        prefetched = run_download_dialog(
+            title='Downloading Lighthouse',
+            text='Getting the latest Lighthouse release files...',
+            download=lambda cancelled: prefetcher.take(CONSENSUS_CLIENT_LIGHTHOUSE,
+                get_consensus_prefetch_options(CONSENSUS_CLIENT_LIGHTHOUSE),
+                cancelled=cancelled))
+        if prefetched.error is not None:
+            log.error(f'Unable to get Lighthouse release files from Github. {prefetched.error}')
             return False
 
-        if response.status_code != 200:
-            log.error(f'HTTP error while downloading lighthouse binary. '
-                f'Status code {response.status_code}')
-            return False
-        
-        release_json = response.json()
-
-        if 'assets' not in release_json:
-            log.error('No assets in Github release for lighthouse.')
-            return False
-        
-        binary_asset = None
-        signature_asset = None
-
-        archive_filename_comp = 'x86_64-unknown-linux-gnu.tar.gz'
-
-        use_optimized_binary = is_adx_supported()
-        if not use_optimized_binary:
-            log.warning('CPU does not support ADX instructions. '
-                'Using the portable version for Lighthouse.')
-            archive_filename_comp = 'x86_64-unknown-linux-gnu-portable.tar.gz'
-        
-        archive_filename_sig_comp = archive_filename_comp + '.asc'
-
-        for asset in release_json['assets']:
-            if 'name' not in asset:
-                continue
-            if 'browser_download_url' not in asset:
-                continue
-        
-            file_name = asset['name']
-            file_url = asset['browser_download_url']
-
-            if file_name.endswith(archive_filename_comp):
-                binary_asset = {
-                    'file_name': file_name,
-                    'file_url': file_url
-                }
-            elif file_name.endswith(archive_filename_sig_comp):
-                signature_asset = {
-                    'file_name': file_name,
-                    'file_url': file_url
-                }
-
-        if binary_asset is None or signature_asset is None:
-            log.error('Could not find binary or signature asset in Github release.')
-            return False
-        
-        # Downloading latest Lighthouse release files
-        download_path = Path(Path.home(), 'ethwizard', 'downloads')
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        binary_path = Path(download_path, binary_asset['file_name'])
-
-        try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Lighthouse binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
-            return False
-        
-        signature_path = Path(download_path, signature_asset['file_name'])
-
-        try:
-            with open(signature_path, 'wb') as signature_file:
-                with httpx.stream('GET', signature_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Lighthouse signature from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        signature_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading Lighthouse signature from Github. {exception}')
-            return False
+        binary_path = prefetched.files['binary']
+        signature_path = prefetched.files['signature']
 
         # Test if gpg is already installed
         gpg_is_installed = False
@@ -3251,60 +3548,40 @@ Do you want to skip installing the lighthouse binary?
 
         # Verify PGP signature
 
-        command_line = ['gpg', '--list-keys', '--with-colons', LIGHTHOUSE_PRIME_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
-        pgp_key_found = process_result.returncode == 0
-
-        if not pgp_key_found:
-
-            retry_index = 0
-            retry_count = 15
-
-            key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-            log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-            command_line = ['gpg', '--keyserver', key_server, '--recv-keys',
-                LIGHTHOUSE_PRIME_PGP_KEY_ID]
-            process_result = subprocess.run(command_line)
-
-            if process_result.returncode != 0:
-                # GPG failed to download Sigma Prime's PGP key, let's wait and retry a few times
-                while process_result.returncode != 0 and retry_index < retry_count:
-                    retry_index = retry_index + 1
-                    delay = 5
-                    log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                        f'and try again from a different server.')
-                    time.sleep(delay)
-
-                    key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                    log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-                    command_line = ['gpg', '--keyserver', key_server, '--recv-keys',
-                        LIGHTHOUSE_PRIME_PGP_KEY_ID]
-
-                    process_result = subprocess.run(command_line)
-
-            if process_result.returncode != 0:
-                log.error(
-f'''
+        keyring = get_keyring()
+        if not keyring.ensure_key(LIGHTHOUSE_PRIME_PGP_KEY_ID, log):
+            log.error(
+'''
 We failed to download the Sigma Prime's PGP key to verify the lighthouse
-binary after {retry_count} retries.
+binary.
 '''
-                )
-                return False
-        
-        process_result = subprocess.run([
-            'gpg', '--verify', signature_path])
-        if process_result.returncode != 0:
+            )
+            return False
+
+        # Verifying and extracting the Lighthouse binary archive in a single pass
+        verifier = SignatureVerifier(signature_path, gpg_arguments=keyring.get_gpg_arguments(),
+            log=log)
+        try:
+            staged = extract_archive(iter_file(binary_path), binary_path.name,
+                Path(LIGHTHOUSE_INSTALLED_DIRECTORY), tee=[verifier.update])
+        except (ExtractError, OSError) as exception:
+            verifier.cancel()
+            prefetcher.discard(prefetched)
+            log.error(f'Unable to extract the Lighthouse binary archive. {exception}')
+            return False
+
+        if not verifier.verify():
+            staged.abort()
+            prefetcher.reject(prefetched)
             log.error('The lighthouse binary signature is wrong. '
                 'We will stop here to protect you.')
             return False
-        
-        # Extracting the Lighthouse binary archive
-        subprocess.run([
-            'tar', 'xvf', binary_path, '--directory', LIGHTHOUSE_INSTALLED_DIRECTORY])
-        
+
+        # Moving the verified Lighthouse binary in place
+        staged.commit()
+
         # Remove download leftovers
-        binary_path.unlink()
-        signature_path.unlink()
+        prefetcher.discard(prefetched)
 
         # Get Lighthouse version
         try:
@@ -3520,7 +3797,7 @@ $ sudo journalctl -ru {lighthouse_bn_service_name}
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(lighthouse_bn_query_url, headers=headers)
+            response = httpclient.get(lighthouse_bn_query_url, headers=headers)
         except httpx.RequestError as exception:
             last_exception = exception
 
@@ -3709,7 +3986,7 @@ $ sudo journalctl -ru {lighthouse_bn_service_name}
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(lighthouse_bn_query_url, headers=headers)
+                response = httpclient.get(lighthouse_bn_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Lighthouse beacon node.')
                 continue
@@ -3729,7 +4006,7 @@ $ sudo journalctl -ru {lighthouse_bn_service_name}
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(lighthouse_bn_query_url, headers=headers)
+                response = httpclient.get(lighthouse_bn_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Lighthouse beacon node.')
                 continue
@@ -3999,117 +4276,50 @@ Do you want to skip installing the Nimbus binary?
             return result
         
         install_nimbus_binary = (result == 2)
+        if not install_nimbus_binary:
+            prefetcher.cancel(CONSENSUS_CLIENT_NIMBUS)
     
     if install_nimbus_binary:
-        # Getting latest Nimbus release files
-        nimbus_gh_release_url = GITHUB_REST_API_URL + NIMBUS_LATEST_RELEASE
-        headers = {'Accept': GITHUB_API_VERSION}
-        try:
-            response = httpx.get(nimbus_gh_release_url, headers=headers,
-                follow_redirects=True)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading Nimbus binary. {exception}')
+        # Getting latest Nimbus release files, they might already have been prefetched
+        prefetched = run_download_dialog(
+            title='Downloading Nimbus',
+            text='Getting the latest Nimbus release files...',
+            download=lambda cancelled: prefetcher.take(CONSENSUS_CLIENT_NIMBUS,
+                cancelled=cancelled))
+        if prefetched.error is not None:
+            log.error(f'Unable to get Nimbus release files from Github. {prefetched.error}')
             return False
 
-        if response.status_code != 200:
-            log.error(f'HTTP error while downloading Nimbus binary. '
-                f'Status code {response.status_code}')
-            return False
-        
-        release_json = response.json()
+        binary_path = prefetched.files['binary']
 
-        if 'assets' not in release_json:
-            log.error('No assets in Github release for Nimbus.')
-            return False
-        
-        binary_asset = None
-
-        archive_filename_comp = 'nimbus-eth2_Linux_amd64'
+        # Extracting the Nimbus binaries from the archive
+        nimbus_binaries = ['nimbus_beacon_node', 'nimbus_validator_client']
 
-        for asset in release_json['assets']:
-            if 'name' not in asset:
-                continue
-            if 'browser_download_url' not in asset:
-                continue
-        
-            file_name = asset['name']
-            file_url = asset['browser_download_url']
-
-            if file_name.startswith(archive_filename_comp):
-                binary_asset = {
-                    'file_name': file_name,
-                    'file_url': file_url
-                }
-
-        if binary_asset is None:
-            log.error('Could not find binary in Github release.')
-            return False
-        
-        # Downloading latest Nimbus release files
-        download_path = Path(Path.home(), 'ethwizard', 'downloads')
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        binary_path = Path(download_path, binary_asset['file_name'])
+        def select_nimbus_binary(name):
+            # Only keep the binaries from the build directory
+            parts = Path(name).parts
+            if len(parts) < 2 or parts[-2] != 'build' or parts[-1] not in nimbus_binaries:
+                return None
+            return parts[-1]
 
         try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Nimbus binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading Nimbus binary from Github. {exception}')
-            return False
-        
-        extract_directory = download_path.joinpath('nimbus')
-        if extract_directory.is_dir():
-            shutil.rmtree(extract_directory)
-        elif extract_directory.is_file():
-            os.unlink(extract_directory)
-        extract_directory.mkdir(parents=True, exist_ok=True)
-        
-        # Extracting the Lighthouse binary archive
-        subprocess.run([
-            'tar', 'xvf', binary_path, '--directory', extract_directory])
-        
-        # Remove download leftovers
-        binary_path.unlink()
-
-        # Find the Nimbus binaries and copy them in their installed location
-        build_path = None
-
-        with os.scandir(extract_directory) as it:
-            for entry in it:
-                if entry.name.startswith('.'):
-                    continue
-
-                if entry.is_dir():
-                    if entry.name == 'build':
-                        build_path = entry.path
-                    else:
-                        build_path = os.path.join(entry.path, 'build')
-                    break
-        
-        if build_path is None:
-            log.error('Cannot find the correct directory in the extracted Nimbus archive.')
+            staged = extract_archive(iter_file(binary_path), binary_path.name,
+                Path(NIMBUS_INSTALLED_DIRECTORY), select=select_nimbus_binary)
+        except (ExtractError, OSError) as exception:
+            prefetcher.discard(prefetched)
+            log.error(f'Unable to extract the Nimbus binary archive. {exception}')
             return False
 
-        src_nimbus_bn_path = Path(build_path, 'nimbus_beacon_node')
-        src_nimbus_vc_path = Path(build_path, 'nimbus_validator_client')
+        # Remove download leftovers
+        prefetcher.discard(prefetched)
 
-        if not src_nimbus_bn_path.is_file() or not src_nimbus_vc_path.is_file():
-            log.error(f'Cannot find the Nimbus binaries in the extracted archive.')
+        if sorted(path.name for path in staged.files) != sorted(nimbus_binaries):
+            staged.abort()
+            log.error('Cannot find the Nimbus binaries in the extracted archive.')
             return False
-        
-        subprocess.run(['cp', src_nimbus_bn_path, NIMBUS_INSTALLED_DIRECTORY])
-        subprocess.run(['cp', src_nimbus_vc_path, NIMBUS_INSTALLED_DIRECTORY])
 
-        # Remove extraction leftovers
-        shutil.rmtree(extract_directory)
+        # Moving the Nimbus binaries in place
+        staged.commit()
 
         # Get Nimbus version
         try:
@@ -4325,7 +4535,7 @@ $ sudo journalctl -ru {nimbus_service_name}
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(bn_query_url, headers=headers, timeout=60)
+            response = httpclient.get(bn_query_url, headers=headers, timeout=60)
         except httpx.RequestError as exception:
             last_exception = exception
 
@@ -4498,7 +4708,7 @@ $ sudo journalctl -ru {nimbus_service_name}
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(bn_query_url, headers=headers, timeout=60)
+                response = httpclient.get(bn_query_url, headers=headers, timeout=60)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nimbus beacon node.')
                 continue
@@ -4518,7 +4728,7 @@ $ sudo journalctl -ru {nimbus_service_name}
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(bn_query_url, headers=headers, timeout=60)
+                response = httpclient.get(bn_query_url, headers=headers, timeout=60)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nimbus beacon node.')
                 continue
@@ -4946,128 +5156,43 @@ Do you want to skip installing the staking-deposit-cli binary?
                 return result
         
             install_staking_deposit_binary = (result == 2)
+            if not install_staking_deposit_binary:
+                prefetcher.cancel(PREFETCH_STAKING_DEPOSIT_CLI)
 
         if install_staking_deposit_binary:
-            # Getting latest staking-deposit-cli release files
-            sdc_gh_release_url = GITHUB_REST_API_URL + SDC_LATEST_RELEASE
-            headers = {'Accept': GITHUB_API_VERSION}
-            try:
-                response = httpx.get(sdc_gh_release_url, headers=headers,
-                    follow_redirects=True)
-            except httpx.RequestError as exception:
-                log.error(f'Cannot get latest staking-deposit-cli release from Github. '
-                    f'Exception {exception}')
+            # Getting latest staking-deposit-cli release files, they might already have been
+            # prefetched
+            prefetched = run_download_dialog(
+                title='Downloading staking-deposit-cli',
+                text='Getting the latest staking-deposit-cli release files...',
+                download=lambda cancelled: prefetcher.take(PREFETCH_STAKING_DEPOSIT_CLI,
+                    cancelled=cancelled))
+            if prefetched.error is not None:
+                log.error(f'Unable to get staking-deposit-cli release files from Github. '
+                    f'{prefetched.error}')
                 return False
 
-            if response.status_code != 200:
-                log.error(f'Cannot get latest staking-deposit-cli release from Github. '
-                    f'Status code {response.status_code}')
-                return False
-            
-            release_json = response.json()
-
-            if 'assets' not in release_json:
-                log.error('No assets in Github release for staking-deposit-cli.')
-                return False
-            
-            binary_asset = None
-            checksum_asset = None
-
-            for asset in release_json['assets']:
-                if 'name' not in asset:
-                    continue
-                if 'browser_download_url' not in asset:
-                    continue
-            
-                file_name = asset['name']
-                file_url = asset['browser_download_url']
-
-                if file_name.endswith('linux-amd64.tar.gz'):
-                    binary_asset = {
-                        'file_name': file_name,
-                        'file_url': file_url
-                    }
-                elif file_name.endswith('linux-amd64.sha256'):
-                    checksum_asset = {
-                        'file_name': file_name,
-                        'file_url': file_url
-                    }
-            
-            if binary_asset is None:
-                log.error('No staking-deposit-cli binary found in Github release')
-                return False
-            
-            checksum_path = None
+            binary_path = prefetched.files['binary']
 
-            if checksum_asset is None:
+            if 'checksum' in prefetched.files:
+                log.info('Good SHA256 checksum for staking-deposit-cli binary.')
+            else:
                 log.warning('No staking-deposit-cli checksum found in Github release')
             
-            # Downloading latest staking-deposit-cli release files
-            download_path = Path(Path.home(), 'ethwizard', 'downloads')
-            download_path.mkdir(parents=True, exist_ok=True)
-
-            binary_path = Path(download_path, binary_asset['file_name'])
-            binary_hash = hashlib.sha256()
-
+            # Extracting the staking-deposit-cli binary archive
             try:
-                with open(binary_path, 'wb') as binary_file:
-                    with httpx.stream('GET', binary_asset['file_url'],
-                        follow_redirects=True) as http_stream:
-                        if http_stream.status_code != 200:
-                            log.error(f'HTTP error while downloading staking-deposit-cli binary '
-                                f'from Github. Status code {http_stream.status_code}')
-                            return False
-                        for data in http_stream.iter_bytes():
-                            binary_file.write(data)
-                            if checksum_asset is not None:
-                                binary_hash.update(data)
-            except httpx.RequestError as exception:
-                log.error(f'Exception while downloading staking-deposit-cli binary from '
-                    f'Github. {exception}')
+                staged = extract_archive(iter_file(binary_path), binary_path.name,
+                    staking_deposit_cli_path, select=strip_components(2))
+            except (ExtractError, OSError) as exception:
+                prefetcher.discard(prefetched)
+                log.error(f'Unable to extract the staking-deposit-cli binary archive. '
+                    f'{exception}')
                 return False
 
-            if checksum_asset is not None:
-                binary_hexdigest = binary_hash.hexdigest().lower()
-
-                checksum_path = Path(download_path, checksum_asset['file_name'])
+            staged.commit()
 
-                try:
-                    with open(checksum_path, 'wb') as signature_file:
-                        with httpx.stream('GET', checksum_asset['file_url'],
-                            follow_redirects=True) as http_stream:
-                            if http_stream.status_code != 200:
-                                log.error(f'HTTP error while downloading staking-deposit-cli '
-                                    f'checksum from Github. Status code {http_stream.status_code}')
-                                return False
-                            for data in http_stream.iter_bytes():
-                                signature_file.write(data)
-                except httpx.RequestError as exception:
-                    log.error(f'Exception while downloading staking-deposit-cli checksum from '
-                    f'Github. {exception}')
-                    return False
-
-                # Verify SHA256 signature
-                with open(checksum_path, 'r') as checksum_file:
-                    checksum = checksum_file.read(1024).strip().lower()
-                    if binary_hexdigest != checksum:
-                        # SHA256 checksum failed
-                        log.error(f'SHA256 checksum failed on staking-deposit-cli binary from '
-                            f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
-                            f'stop here to protect you.')
-                        return False
-                    
-                    log.info('Good SHA256 checksum for staking-deposit-cli binary.')
-            
-            # Extracting the staking-deposit-cli binary archive
-            staking_deposit_cli_path.mkdir(parents=True, exist_ok=True)
-            subprocess.run([
-                'tar', 'xvf', binary_path, '--strip-components', '2', '--directory',
-                staking_deposit_cli_path])
-            
             # Remove download leftovers
-            binary_path.unlink()
-            if checksum_path is not None:
-                checksum_path.unlink()
+            prefetcher.discard(prefetched)
 
         # Clean potential leftover keys
         if validator_keys_path.is_dir():
@@ -5691,11 +5816,15 @@ $ sudo journalctl -ru {nimbus_service_name}
 
     return public_keys
 
-def install_chrony():
+def select_chrony():
     # Prompt the user to install chrony to improve time sync
 
+    selected_value = {
+        'install': False
+    }
+
     if is_package_installed('chrony'):
-        return True
+        return selected_value
     
     result = button_dialog(
         title='Improve time synchronization',
@@ -5718,15 +5847,31 @@ Would you like to improve your time synchronization?
     ).run()
 
     if result == 2:
-        return True
+        return selected_value
 
     if not result:
         return result
     
+    selected_value['install'] = True
+    return selected_value
+
+def install_chrony_package():
+    # Install chrony. This can run in the background while dialogs are displayed so the apt
+    # output is captured instead of being written to the terminal.
+
+    if is_package_installed('chrony'):
+        return True
+
     env = os.environ.copy()
     env['DEBIAN_FRONTEND'] = 'noninteractive'
 
-    subprocess.run(['apt', '-y', 'install', 'chrony'], env=env)
+    process_result = subprocess.run(['apt', '-y', 'install', 'chrony'], env=env,
+        capture_output=True, text=True)
+
+    if process_result.returncode != 0:
+        log.error(f'Unable to install chrony. Return code {process_result.returncode}\n'
+            f'{process_result.stdout}\n{process_result.stderr}')
+        return False
 
     return True
 
@@ -5867,7 +6012,7 @@ $ sudo journalctl -ru {nimbus_service_name}
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+            response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
         except httpx.RequestError as exception:
             last_exception = exception
             
@@ -6052,7 +6197,7 @@ $ sudo journalctl -ru {service_name}
                     'accept': 'application/json'
                 }
                 try:
-                    response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+                    response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
                 except httpx.RequestError as exception:
                     log_text(f'Exception: {exception} while querying beacon node.')
                     continue
@@ -6072,7 +6217,7 @@ $ sudo journalctl -ru {service_name}
                     'accept': 'application/json'
                 }
                 try:
-                    response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+                    response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
                 except httpx.RequestError as exception:
                     log_text(f'Exception: {exception} while querying beacon node.')
                     continue
@@ -6160,35 +6305,9 @@ Connected Peers: {bn_connected_peers}
 
         network_queue_info = unknown_joining_queue
 
-        headers = {
-            'accept': 'application/json'
-        }
-
-        beaconcha_in_queue_query_url = (
-            BEACONCHA_IN_URLS[network] + BEACONCHA_VALIDATOR_QUEUE_API_URL)
-        try:
-            response = httpx.get(beaconcha_in_queue_query_url, headers=headers,
-                follow_redirects=True)
-
-            if response.status_code != 200:
-                log.error(f'Status code: {response.status_code} while querying beaconcha.in.')
-            else:
-                response_json = response.json()
-                if (
-                    response_json and
-                    'data' in response_json and
-                    'beaconchain_entering' in response_json['data']):
-
-                    validators_entering = int(response_json['data']['beaconchain_entering'])
-                    waiting_td = timedelta(days=validators_entering / 900.0)
-
-                    network_queue_info = (
-                        f'{validators_entering} validators waiting to join '
-                        f'[{humanize.naturaldelta(waiting_td)}]'
-                    )
-
-        except httpx.RequestError as exception:
-            log.error(f'Exception: {exception} while querying beaconcha.in.')
+        join_queue_info = get_join_queue_info(network, local_bn_http_base, log)
+        if join_queue_info is not None:
+            network_queue_info = join_queue_info
 
         result = progress_log_dialog(
             title='Verifying beacon node syncing status',
@@ -6314,11 +6433,13 @@ When you are done with the deposit(s), click the "I'm done" button below.
         log.error('No public key(s) found in the deposit file.')
         return False
 
-    # Verify that the deposit was done correctly using beaconcha.in API
-    validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+    # Verify that the deposit was done correctly using the local beacon node or the beaconcha.in
+    # API
+    validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+        log)
 
     if type(validator_deposits) is not list and not validator_deposits:
-        log.warning('Unable to get validator(s) deposits from beaconcha.in')
+        log.warning('Unable to get validator(s) deposits')
         validator_deposits = []
 
     skipping_deposit_check = False
@@ -6360,10 +6481,11 @@ deposit(s).
             skipping_deposit_check = True
             break
 
-        validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+        validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+            log)
 
         if type(validator_deposits) is not list and not validator_deposits:
-            log.warning('Unable to get validator(s) deposits from beaconcha.in')
+            log.warning('Unable to get validator(s) deposits')
             validator_deposits = []
     
     # Check if all the deposit(s) were done for each validator
@@ -6403,10 +6525,11 @@ deposit(s).
             skipping_deposit_check = True
             break
 
-        validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+        validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+            log)
 
         if type(validator_deposits) is not list and not validator_deposits:
-            log.warning('Unable to get validator(s) deposits from beaconcha.in')
+            log.warning('Unable to get validator(s) deposits')
             validator_deposits = []
 
     # Clean up deposit data file
@@ -1,19 +1,27 @@
 import subprocess
 import httpx
 import re
-import time
 import os
-import hashlib
-import shutil
 
 from packaging.version import parse as parse_version, Version
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import button_dialog
+from prompt_toolkit.formatted_text.html import html_escape
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.download import DownloadError
+
+from ethwizard.platforms.artifacts import download_artifact, iter_artifact, discard_artifact
+
+from ethwizard.platforms.extract import extract_archive, ExtractError, SignatureVerifier
+
+from ethwizard.platforms.headless import button_dialog
 
 from pathlib import Path
 
 from ethwizard.platforms.common import (
+    format_step_metrics,
+    run_download_dialog,
     select_fee_recipient_address,
     get_geth_running_version,
     get_geth_latest_version,
@@ -21,9 +29,17 @@ from ethwizard.platforms.common import (
     get_nethermind_latest_version,
     get_mevboost_latest_version,
     get_nimbus_latest_version,
-    get_lighthouse_latest_version
+    get_lighthouse_latest_version,
+    get_configured_relays,
+    benchmark_mev_relays,
+    format_relay_benchmark,
+    get_relays_within_budget
 )
 
+from ethwizard.platforms.releases import github_release_cache
+
+from ethwizard.platforms.probes import Probe, run_probes
+
 from ethwizard.platforms.ubuntu.common import (
     log,
     save_state,
@@ -32,7 +48,8 @@ from ethwizard.platforms.ubuntu.common import (
     is_adx_supported,
     setup_jwt_token_file,
     is_ethereum_ppa_added,
-    is_nethermind_ppa_added
+    is_nethermind_ppa_added,
+    get_keyring
 )
 
 from ethwizard.constants import (
@@ -40,6 +57,7 @@ from ethwizard.constants import (
     CTX_SELECTED_CONSENSUS_CLIENT,
     CTX_SELECTED_NETWORK,
     CTX_MEVBOOST_INSTALLED,
+    CTX_STEP_METRICS,
     NETWORK_GOERLI,
     EXECUTION_CLIENT_GETH,
     EXECUTION_CLIENT_NETHERMIND,
@@ -80,7 +98,9 @@ from ethwizard.constants import (
     NIMBUS_LATEST_RELEASE,
     NIMBUS_INSTALLED_DIRECTORY,
     BN_VERSION_EP,
-    PGP_KEY_SERVERS,
+    PROBE_PACKAGE_TIMEOUT,
+    PROBE_DETAILS_TIMEOUT,
+    RESOURCE_APT,
 )
 
 def enter_maintenance(context):
@@ -114,9 +134,22 @@ def show_dashboard(context):
     current_network = context[selected_network]
     current_mevboost_installed = context[mevboost_installed]
 
-    # Get execution client details
+    # Get execution client, consensus client and MEV-Boost details concurrently
+
+    details_probes = {
+        'execution': Probe(lambda: get_execution_client_details(current_execution_client),
+            timeout=PROBE_DETAILS_TIMEOUT, default=False),
+        'consensus': Probe(lambda: get_consensus_client_details(current_consensus_client),
+            timeout=PROBE_DETAILS_TIMEOUT, default=False)
+    }
+
+    if current_mevboost_installed:
+        details_probes['mevboost'] = Probe(get_mevboost_details,
+            timeout=PROBE_DETAILS_TIMEOUT, default=False)
+
+    all_details = run_probes(details_probes, log)
 
-    execution_client_details = get_execution_client_details(current_execution_client)
+    execution_client_details = all_details['execution']
     if not execution_client_details:
         log.error('Unable to get execution client details.')
         return False
@@ -243,9 +276,9 @@ def show_dashboard(context):
     if not execution_client_details['service']['found']:
         execution_client_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
-    # Get consensus client details
+    # Check consensus client details
 
-    consensus_client_details = get_consensus_client_details(current_consensus_client)
+    consensus_client_details = all_details['consensus']
     if not consensus_client_details:
         log.error('Unable to get consensus client details.')
         return False
@@ -352,13 +385,13 @@ def show_dashboard(context):
             not consensus_client_details['vc_service']['found']):
             consensus_client_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
-    # Get MEV-Boost details
+    # Check MEV-Boost details
 
     mevboost_details = None
 
     if current_mevboost_installed:
 
-        mevboost_details = get_mevboost_details()
+        mevboost_details = all_details['mevboost']
         if not mevboost_details:
             log.error('Unable to get MEV-Boost details.')
             return False
@@ -390,6 +423,8 @@ def show_dashboard(context):
         if not mevboost_details['service']['found']:
             mevboost_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
+    log.info(github_release_cache.format_stats())
+
     # We only need to do maintenance if one of clients or MEV-Boost needs maintenance.
 
     no_maintenance_tasks = set((MAINTENANCE_DO_NOTHING, MAINTENANCE_CHECK_AGAIN_SOON))
@@ -465,11 +500,25 @@ def show_dashboard(context):
     mb_section = ''
 
     if current_mevboost_installed:
+        mb_relays_section = ''
+
+        if mevboost_details['relays']:
+            mb_relays_section = (f'Relays ({len(get_relays_within_budget(mevboost_details["relays"]))}'
+                f' of {len(mevboost_details["relays"])} within the latency budget):\n'
+                f'{html_escape(format_relay_benchmark(mevboost_details["relays"]))}\n')
+
         mb_section = (f'\n\n<b>MEV-Boost</b> details (I: {mevboost_details["versions"]["installed"]}, '
             f'L: {mevboost_details["versions"]["latest"]})\n'
             f'Service is running: {mevboost_details["service"]["running"]}\n'
+            f'{mb_relays_section}'
             f'<b>Maintenance task</b>: {maintenance_tasks_description.get(mevboost_details["next_step"], UNKNOWN_VALUE)}')
 
+    step_metrics_section = ''
+
+    if context.get(CTX_STEP_METRICS):
+        step_metrics_section = (f'\n\n<b>Installation</b> details\n'
+            f'{html_escape(format_step_metrics(context[CTX_STEP_METRICS], slowest_count=1))}')
+
     result = button_dialog(
         title='Maintenance Dashboard',
         text=(HTML(
@@ -478,7 +527,7 @@ Here are some details about your Ethereum clients and tools.
 
 {ec_section}
 
-{cc_section}{mb_section}
+{cc_section}{mb_section}{step_metrics_section}
 
 {maintenance_message}
 
@@ -564,7 +613,8 @@ def get_mevboost_details():
         'exec': {
             'path': UNKNOWN_VALUE,
             'argv': []
-        }
+        },
+        'relays': {}
     }
 
     # Check for existing systemd service
@@ -585,12 +635,22 @@ def get_mevboost_details():
     details['service']['sub'] = service_details['SubState']
     details['service']['running'] = is_service_running(service_details)
 
-    details['versions']['installed'] = get_mevboost_installed_version()
-    details['versions']['latest'] = get_mevboost_latest_version(log)
-
     if 'ExecStart' in service_details:
         details['exec'] = parse_exec_start(service_details['ExecStart'])
 
+    # Benchmark the configured relays along with the version probes
+    relays = get_configured_relays(details['exec']['argv'])
+
+    probe_results = run_probes({
+        'installed': get_mevboost_installed_version,
+        'latest': lambda: get_mevboost_latest_version(log),
+        'relays': Probe(lambda: benchmark_mev_relays(relays, log), default={})
+    }, log)
+
+    details['versions']['installed'] = probe_results['installed']
+    details['versions']['latest'] = probe_results['latest']
+    details['relays'] = probe_results['relays']
+
     return details
 
 def get_mevboost_installed_version():
@@ -663,10 +723,13 @@ def get_execution_client_details(execution_client):
         details['service']['sub'] = service_details['SubState']
         details['service']['running'] = is_service_running(service_details)
 
-        details['versions']['installed'] = get_geth_installed_version()
-        details['versions']['running'] = get_geth_running_version(log)
-        details['versions']['available'] = get_geth_available_version()
-        details['versions']['latest'] = get_geth_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': get_geth_installed_version,
+            'running': lambda: get_geth_running_version(log),
+            'available': Probe(get_geth_available_version, timeout=PROBE_PACKAGE_TIMEOUT,
+                resource=RESOURCE_APT),
+            'latest': lambda: get_geth_latest_version(log)
+        }, log))
 
         if 'ExecStart' in service_details:
             details['exec'] = parse_exec_start(service_details['ExecStart'])
@@ -725,13 +788,26 @@ def get_execution_client_details(execution_client):
         details['service']['sub'] = service_details['SubState']
         details['service']['running'] = is_service_running(service_details)
 
-        details['versions']['installed'] = get_nethermind_installed_version()
-        details['versions']['running'] = get_nethermind_running_version(log)
-        details['versions']['available'] = get_nethermind_available_version()
-        details['versions']['latest'] = get_nethermind_latest_version(log)
+        # Both apt probes update the package lists, they share the apt resource so they do not
+        # run at the same time.
+        versions = run_probes({
+            'installed': get_nethermind_installed_version,
+            'running': lambda: get_nethermind_running_version(log),
+            'available': Probe(get_nethermind_available_version, timeout=PROBE_PACKAGE_TIMEOUT,
+                resource=RESOURCE_APT),
+            'latest': lambda: get_nethermind_latest_version(log),
+            'installed_packaged': Probe(get_nethermind_installed_package_version,
+                timeout=PROBE_PACKAGE_TIMEOUT, default=(UNKNOWN_VALUE, UNKNOWN_VALUE),
+                resource=RESOURCE_APT)
+        }, log)
+
+        details['versions']['installed'] = versions['installed']
+        details['versions']['running'] = versions['running']
+        details['versions']['available'] = versions['available']
+        details['versions']['latest'] = versions['latest']
 
         details['versions']['installed_packaged'], details['versions']['fixed_installed_package'] = (
-            get_nethermind_installed_package_version())
+            versions['installed_packaged'])
 
         if 'ExecStart' in service_details:
             details['exec'] = parse_exec_start(service_details['ExecStart'])
@@ -1052,9 +1128,11 @@ def get_consensus_client_details(consensus_client):
             if details['is_vc_merge_configured'] == UNKNOWN_VALUE:
                 details['is_vc_merge_configured'] = False
 
-        details['versions']['installed'] = get_lighthouse_installed_version()
-        details['versions']['running'] = get_lighthouse_running_version()
-        details['versions']['latest'] = get_lighthouse_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': get_lighthouse_installed_version,
+            'running': get_lighthouse_running_version,
+            'latest': lambda: get_lighthouse_latest_version(log)
+        }, log))
 
         return details
     
@@ -1109,9 +1187,11 @@ def get_consensus_client_details(consensus_client):
             
             details['is_merge_configured'] = execution_jwt_flag_found
 
-        details['versions']['installed'] = get_nimbus_installed_version()
-        details['versions']['running'] = get_nimbus_running_version()
-        details['versions']['latest'] = get_nimbus_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': get_nimbus_installed_version,
+            'running': get_nimbus_running_version,
+            'latest': lambda: get_nimbus_latest_version(log)
+        }, log))
 
         return details
 
@@ -1152,7 +1232,7 @@ def get_nimbus_running_version():
     local_bn_version_url = 'http://127.0.0.1:5052' + BN_VERSION_EP
 
     try:
-        response = httpx.get(local_bn_version_url)
+        response = httpclient.get(local_bn_version_url)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Nimbus. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1216,7 +1296,7 @@ def get_lighthouse_running_version():
     local_lighthouse_bn_version_url = 'http://127.0.0.1:5052' + BN_VERSION_EP
 
     try:
-        response = httpx.get(local_lighthouse_bn_version_url)
+        response = httpclient.get(local_lighthouse_bn_version_url)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Lighthouse. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1469,7 +1549,7 @@ def upgrade_mevboost():
     mevboost_gh_release_url = GITHUB_REST_API_URL + MEVBOOST_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(mevboost_gh_release_url, headers=headers,
+        response = httpclient.get(mevboost_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading MEV-Boost binary. {exception}')
@@ -1523,95 +1603,85 @@ def upgrade_mevboost():
     download_path = Path(Path.home(), 'ethwizard', 'downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = Path(download_path, binary_asset['file_name'])
-    binary_hash = hashlib.sha256()
-
-    try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading MEV-Boost binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-
-                archive_filename = binary_asset['file_name']
-                archive_url = binary_asset['file_url']
-                log.info(f'Downloading {archive_filename} from {archive_url} ...')
-
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-                    binary_hash.update(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading MEV-Boost binary from Github. {exception}')
-        return False
-    
     checksums_path = Path(download_path, checksums_asset['file_name'])
 
     try:
-        with open(checksums_path, 'wb') as checksums_file:
-            with httpx.stream('GET', checksums_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading MEV-Boost checksums from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                
-                archive_filename = checksums_asset['file_name']
-                archive_url = checksums_asset['file_url']
-                log.info(f'Downloading {archive_filename} from {archive_url} ...')
-
-                for data in http_stream.iter_bytes():
-                    checksums_file.write(data)
-    except httpx.RequestError as exception:
+        archive_filename = checksums_asset['file_name']
+        archive_url = checksums_asset['file_url']
+        log.info(f'Downloading {archive_filename} from {archive_url} ...')
+
+        download_artifact(checksums_asset['file_url'], checksums_path, log,
+            release_tag=release_json.get('tag_name'))
+    except DownloadError as exception:
         log.error(f'Exception while downloading MEV-Boost checksums from Github. {exception}')
         return False
 
-    # Verify checksum
+    # Find the expected checksum before streaming the archive
 
-    hash_found = False
+    checksum = None
     with open(checksums_path, 'r') as checksums_file:
         for line in checksums_file:
             result = re.search(r'(?P<hash>[a-fA-F0-9]+)\s+' +
                 re.escape(binary_asset['file_name']), line)
             if result:
-                hash_found = True
                 checksum = result.group('hash').lower()
-
-                binary_hexdigest = binary_hash.hexdigest().lower()
-
-                if checksum != binary_hexdigest:
-                    # SHA256 checksum failed
-                    log.error(f'SHA256 checksum failed on MEV-Boost binary from '
-                        f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
-                        f'stop here to protect you.')
-                    return False
-                
-                log.info('Good SHA256 checksum for MEV-Boost binary.')
-
                 break
     
-    if not hash_found:
+    if checksum is None:
         archive_filename = binary_asset['file_name']
         log.error(f'We could not find the SHA256 checksum for MEV-Boost binary '
             f'({archive_filename}) in the {checksums_filename} file. We will stop here to '
             f'protect you.')
         return False
+
+    # Downloading, hashing and extracting the MEV-Boost binary archive in a single pass
+    archive_filename = binary_asset['file_name']
+    archive_url = binary_asset['file_url']
+    log.info(f'Downloading and extracting {archive_filename} from {archive_url} ...')
+
+    try:
+        staged = run_download_dialog(
+            title='Downloading MEV-Boost',
+            text=f'Downloading and extracting {archive_filename}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(archive_url, download_path, log,
+                    release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                archive_filename, Path(MEVBOOST_INSTALLED_DIRECTORY)))
+    except DownloadError as exception:
+        log.error(f'Exception while downloading MEV-Boost binary from Github. {exception}')
+        return False
+    except (ExtractError, OSError) as exception:
+        log.error(f'Unable to extract the MEV-Boost binary archive. {exception}')
+        return False
+
+    # Verify checksum
+
+    binary_hexdigest = staged.get_hexdigest()
+
+    if checksum != binary_hexdigest:
+        # SHA256 checksum failed
+        staged.abort()
+        discard_artifact(checksums_asset['file_url'], download_path,
+            release_tag=release_json.get('tag_name'))
+        log.error(f'SHA256 checksum failed on MEV-Boost binary from '
+            f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
+            f'stop here to protect you.')
+        return False
+    
+    log.info('Good SHA256 checksum for MEV-Boost binary.')
     
     # Stopping MEV-Boost service before updating the binary
     log.info('Stopping MEV-Boost service...')
     subprocess.run(['systemctl', 'stop', MEVBOOST_SYSTEMD_SERVICE_NAME])
 
-    # Extracting the MEV-Boost binary archive
-    subprocess.run([
-        'tar', 'xvf', binary_path, '--directory', MEVBOOST_INSTALLED_DIRECTORY])
+    # Moving the verified MEV-Boost archive files in place
+    staged.commit()
     
     # Restarting Lighthouse services after updating the binary
     log.info('Starting MEV-Boost service...')
     subprocess.run(['systemctl', 'start', MEVBOOST_SYSTEMD_SERVICE_NAME])
     
     # Remove download leftovers
-    binary_path.unlink()
     checksums_path.unlink()
 
     return True
@@ -1813,7 +1883,7 @@ def upgrade_nimbus():
     nimbus_gh_release_url = GITHUB_REST_API_URL + NIMBUS_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(nimbus_gh_release_url, headers=headers,
+        response = httpclient.get(nimbus_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading Nimbus binary. {exception}')
@@ -1857,59 +1927,37 @@ def upgrade_nimbus():
     download_path = Path(Path.home(), 'ethwizard', 'downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = Path(download_path, binary_asset['file_name'])
+    # Downloading and extracting the Nimbus binaries from the archive in a single pass
+    archive_filename = binary_asset['file_name']
+    log.info(f'Downloading and extracting {archive_filename} ...')
+
+    nimbus_binaries = ['nimbus_beacon_node', 'nimbus_validator_client']
+
+    def select_nimbus_binary(name):
+        # Only keep the binaries from the build directory
+        parts = Path(name).parts
+        if len(parts) < 2 or parts[-2] != 'build' or parts[-1] not in nimbus_binaries:
+            return None
+        return parts[-1]
 
     try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Nimbus binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        staged = run_download_dialog(
+            title='Downloading Nimbus',
+            text=f'Downloading and extracting {archive_filename}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(binary_asset['file_url'], download_path, log,
+                    release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                archive_filename, Path(NIMBUS_INSTALLED_DIRECTORY),
+                select=select_nimbus_binary))
+    except DownloadError as exception:
         log.error(f'Exception while downloading Nimbus binary from Github. {exception}')
         return False
-    
-    extract_directory = download_path.joinpath('nimbus')
-    if extract_directory.is_dir():
-        shutil.rmtree(extract_directory)
-    elif extract_directory.is_file():
-        os.unlink(extract_directory)
-    extract_directory.mkdir(parents=True, exist_ok=True)
-    
-    # Extracting the Lighthouse binary archive
-    subprocess.run([
-        'tar', 'xvf', binary_path, '--directory', extract_directory])
-    
-    # Remove download leftovers
-    binary_path.unlink()
-
-    # Find the Nimbus binaries and copy them in their installed location
-    build_path = None
-
-    with os.scandir(extract_directory) as it:
-        for entry in it:
-            if entry.name.startswith('.'):
-                continue
-
-            if entry.is_dir():
-                if entry.name == 'build':
-                    build_path = entry.path
-                else:
-                    build_path = os.path.join(entry.path, 'build')
-                break
-    
-    if build_path is None:
-        log.error('Cannot find the correct directory in the extracted Nimbus archive.')
+    except (ExtractError, OSError) as exception:
+        log.error(f'Unable to extract the Nimbus binary archive. {exception}')
         return False
 
-    src_nimbus_bn_path = Path(build_path, 'nimbus_beacon_node')
-    src_nimbus_vc_path = Path(build_path, 'nimbus_validator_client')
-
-    if not src_nimbus_bn_path.is_file() or not src_nimbus_vc_path.is_file():
+    if sorted(path.name for path in staged.files) != sorted(nimbus_binaries):
+        staged.abort()
         log.error(f'Cannot find the Nimbus binaries in the extracted archive.')
         return False
     
@@ -1917,18 +1965,14 @@ def upgrade_nimbus():
     log.info('Stopping Nimbus services...')
     subprocess.run(['systemctl', 'stop', NIMBUS_SYSTEMD_SERVICE_NAME])
 
-    # Extracting the Lighthouse binary archive
+    # Moving the Nimbus binaries in place
     log.info('Updating Nimbus binaries...')
-    subprocess.run(['cp', src_nimbus_bn_path, NIMBUS_INSTALLED_DIRECTORY])
-    subprocess.run(['cp', src_nimbus_vc_path, NIMBUS_INSTALLED_DIRECTORY])
+    staged.commit()
     
     # Restarting Nimbus service after updating the binary
     log.info('Starting Nimbus services...')
     subprocess.run(['systemctl', 'start', NIMBUS_SYSTEMD_SERVICE_NAME])
 
-    # Remove extraction leftovers
-    shutil.rmtree(extract_directory)
-
     return True
 
 def upgrade_lighthouse():
@@ -1939,7 +1983,7 @@ def upgrade_lighthouse():
     lighthouse_gh_release_url = GITHUB_REST_API_URL + LIGHTHOUSE_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(lighthouse_gh_release_url, headers=headers,
+        response = httpclient.get(lighthouse_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading lighthouse binary. {exception}')
@@ -1997,35 +2041,12 @@ def upgrade_lighthouse():
     download_path = Path(Path.home(), 'ethwizard', 'downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = Path(download_path, binary_asset['file_name'])
-
-    try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Lighthouse binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
-        return False
-    
     signature_path = Path(download_path, signature_asset['file_name'])
 
     try:
-        with open(signature_path, 'wb') as signature_file:
-            with httpx.stream('GET', signature_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Lighthouse signature from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    signature_file.write(data)
-    except httpx.RequestError as exception:
+        download_artifact(signature_asset['file_url'], signature_path, log,
+            release_tag=release_json.get('tag_name'))
+    except DownloadError as exception:
         log.error(f'Exception while downloading Lighthouse signature from Github. {exception}')
         return False
 
@@ -2049,48 +2070,44 @@ def upgrade_lighthouse():
 
     # Verify PGP signature
 
-    command_line = ['gpg', '--list-keys', '--with-colons', LIGHTHOUSE_PRIME_PGP_KEY_ID]
-    process_result = subprocess.run(command_line)
-    pgp_key_found = process_result.returncode == 0
-
-    if not pgp_key_found:
-        retry_index = 0
-        retry_count = 15
-
-        key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-        log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-        command_line = ['gpg', '--keyserver', key_server, '--recv-keys',
-            LIGHTHOUSE_PRIME_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
-
-        if process_result.returncode != 0:
-            # GPG failed to download Sigma Prime's PGP key, let's wait and retry a few times
-            while process_result.returncode != 0 and retry_index < retry_count:
-                retry_index = retry_index + 1
-                delay = 5
-                log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                    f'and try again from a different server.')
-                time.sleep(delay)
-
-                key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-                command_line = ['gpg', '--keyserver', key_server, '--recv-keys',
-                    LIGHTHOUSE_PRIME_PGP_KEY_ID]
-
-                process_result = subprocess.run(command_line)
-        
-        if process_result.returncode != 0:
-            log.error(
-f'''
+    keyring = get_keyring()
+    if not keyring.ensure_key(LIGHTHOUSE_PRIME_PGP_KEY_ID, log):
+        log.error(
+'''
 We failed to download the Sigma Prime's PGP key to verify the lighthouse
-binary after {retry_count} retries.
+binary.
 '''
-            )
-            return False
+        )
+        return False
     
-    process_result = subprocess.run([
-        'gpg', '--verify', signature_path])
-    if process_result.returncode != 0:
+    # Downloading, verifying and extracting the Lighthouse binary archive in a single pass
+    archive_filename = binary_asset['file_name']
+    log.info(f'Downloading and extracting {archive_filename} ...')
+
+    verifier = SignatureVerifier(signature_path, gpg_arguments=keyring.get_gpg_arguments(),
+        log=log)
+    try:
+        staged = run_download_dialog(
+            title='Downloading Lighthouse',
+            text=f'Downloading and extracting {archive_filename}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(binary_asset['file_url'], download_path, log,
+                    release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                archive_filename, Path(LIGHTHOUSE_INSTALLED_DIRECTORY),
+                tee=[verifier.update]))
+    except DownloadError as exception:
+        verifier.cancel()
+        log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
+        return False
+    except (ExtractError, OSError) as exception:
+        verifier.cancel()
+        log.error(f'Unable to extract the Lighthouse binary archive. {exception}')
+        return False
+
+    if not verifier.verify():
+        staged.abort()
+        discard_artifact(signature_asset['file_url'], download_path,
+            release_tag=release_json.get('tag_name'))
         log.error('The lighthouse binary signature is wrong. '
             'We will stop here to protect you.')
         return False
@@ -2100,10 +2117,9 @@ binary after {retry_count} retries.
     subprocess.run(['systemctl', 'stop', LIGHTHOUSE_BN_SYSTEMD_SERVICE_NAME,
         LIGHTHOUSE_VC_SYSTEMD_SERVICE_NAME])
 
-    # Extracting the Lighthouse binary archive
+    # Moving the verified Lighthouse binary in place
     log.info('Updating Lighthouse binary...')
-    subprocess.run([
-        'tar', 'xvf', binary_path, '--directory', LIGHTHOUSE_INSTALLED_DIRECTORY])
+    staged.commit()
     
     # Restarting Lighthouse services after updating the binary
     log.info('Starting Lighthouse services...')
@@ -2111,7 +2127,6 @@ binary after {retry_count} retries.
         LIGHTHOUSE_VC_SYSTEMD_SERVICE_NAME])
 
     # Remove download leftovers
-    binary_path.unlink()
     signature_path.unlink()
 
     return True
@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import subprocess
 import re
 import httpx
@@ -20,62 +19,68 @@ from typing import Optional
 
 from ethwizard import __version__
 
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.download import download_file, DownloadError
+
+from ethwizard.platforms.progress import track_download
+
 from ethwizard.constants import (
-    STATE_FILE,
     CHOCOLATEY_DEFAULT_BIN_PATH,
     GNUPG_DOWNLOAD_URL,
-    COREINFO_DOWNLOAD_URL
+    COREINFO_DOWNLOAD_URL,
+    PGP_KEYRING_DIRECTORY
 )
 
+from ethwizard.platforms.state import StateStore
+
+from ethwizard.platforms.keyring import PGPKeyring
+
+from ethwizard.platforms.headless import is_headless, headless_exit_code
+
 log = logging.getLogger(__name__)
 
-def save_state(step_id: str, context: dict) -> bool:
-    # Save wizard state
+state_store = None
 
-    data_to_save = {
-        'step': step_id,
-        'context': context
-    }
+def get_state_store() -> Optional[StateStore]:
+    # Return the state store located in the application data directory
+
+    global state_store
 
     app_data = Path(os.getenv('LOCALAPPDATA', os.getenv('APPDATA', '')))
     if not app_data.is_dir():
-        return False
-    
+        return None
+
     app_dir = app_data.joinpath('eth-wizard')
-    app_dir.mkdir(parents=True, exist_ok=True)
-    save_file = app_dir.joinpath(STATE_FILE)
 
-    with open(str(save_file), 'w', encoding='utf8') as output_file:
-        json.dump(data_to_save, output_file)
+    if state_store is None or state_store.save_directory != app_dir:
+        state_store = StateStore(app_dir)
 
-    return True
+    return state_store
+
+def save_state(step_id: str, context: dict) -> bool:
+    # Save wizard state
+
+    store = get_state_store()
+    if store is None:
+        return False
+
+    return store.save(step_id, context)
 
 def load_state() -> Optional[dict]:
     # Load wizard state
 
-    app_data = Path(os.getenv('LOCALAPPDATA', os.getenv('APPDATA', '')))
-    if not app_data.is_dir():
-        return None
-    
-    app_dir = app_data.joinpath('eth-wizard')
-    if not app_dir.is_dir():
-        return None
-    
-    save_file = app_dir.joinpath(STATE_FILE)
-    if not save_file.is_file():
+    store = get_state_store()
+    if store is None or not store.save_directory.is_dir():
         return None
-    
-    loaded_data = None
 
-    try:
-        with open(str(save_file), 'r', encoding='utf8') as input_file:
-            loaded_data = json.load(input_file)
-    except ValueError:
-        return None
-    
-    return loaded_data
+    return store.load()
 
 def quit_app():
+    if is_headless():
+        log.info(f'Quitting eth-wizard')
+        sys.exit(headless_exit_code())
+
     print('Press enter to quit')
     input()
     
@@ -216,7 +221,7 @@ def install_gpg(base_directory):
     # Get the gnupg install URL
     gpg_installer_url = None
     try:
-        response = httpx.get(GNUPG_DOWNLOAD_URL, follow_redirects=True)
+        response = httpclient.get(GNUPG_DOWNLOAD_URL, follow_redirects=True)
         
         if response.status_code != 200:
             log.error(f'Cannot connect to GNUPG download URL {GNUPG_DOWNLOAD_URL}.\n'
@@ -249,16 +254,11 @@ def install_gpg(base_directory):
         download_installer_path.unlink()
 
     try:
-        with open(download_installer_path, 'wb') as binary_file:
-            log.info('Downloading GNUPG installer...')
-            with httpx.stream('GET', gpg_installer_url, follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'Cannot download GNUPG installer {gpg_installer_url}.\n'
-                        f'Unexpected status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        log.info('Downloading GNUPG installer...')
+        with track_download(file_name, gpg_installer_url, log) as download_progress:
+            download_file(gpg_installer_url, download_installer_path, log,
+                progress=download_progress.update)
+    except DownloadError as exception:
         log.error(f'Exception while downloading GNUPG installer. Exception {exception}')
         return False
 
@@ -291,6 +291,11 @@ def install_gpg(base_directory):
 
     return True
 
+def get_keyring(base_directory) -> PGPKeyring:
+    # Return the wizard PGP keyring, used with the gpg binary installed by install_gpg
+    return PGPKeyring(base_directory.joinpath('var', 'lib', 'ethwizard', PGP_KEYRING_DIRECTORY),
+        base_directory.joinpath('bin', 'gpg.exe'))
+
 def set_service_param(nssm_binary, service_name, param, value):
     # Configure an NSSM service parameter with a value
     if type(value) is str:
@@ -348,16 +353,11 @@ def is_adx_supported(base_directory, log):
         download_archive_path.unlink()
 
     try:
-        with open(download_archive_path, 'wb') as binary_file:
-            log.info('Downloading Coreinfo archive...')
-            with httpx.stream('GET', COREINFO_DOWNLOAD_URL, follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'Cannot download Coreinfo archive {COREINFO_DOWNLOAD_URL}.\n'
-                        f'Unexpected status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        log.info('Downloading Coreinfo archive...')
+        with track_download(file_name, COREINFO_DOWNLOAD_URL, log) as download_progress:
+            download_file(COREINFO_DOWNLOAD_URL, download_archive_path, log,
+                progress=download_progress.update)
+    except DownloadError as exception:
         log.error(f'Exception while downloading Coreinfo archive. Exception {exception}')
         return False
 
@@ -0,0 +1,218 @@
+import io
+import json
+import os
+import re
+import time
+import httpx
+
+from email.utils import parsedate_to_datetime
+
+from pathlib import Path
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.windows.common import is_stable_windows_amd64_archive
+
+from ethwizard.utils.lazy import lazy_import
+
+ElementTree = lazy_import('defusedxml.ElementTree')
+
+from ethwizard.constants import (
+    GETH_STORE_BUILDS_URL,
+    GETH_STORE_BUILDS_PARAMS,
+    GETH_STORE_WINDOWS_PREFIX,
+    GETH_BUILD_INDEX_FILE
+)
+
+# Persisted index of the stable windows amd64 builds in the Geth build store (an Azure blob
+# container). The first run lists every blob named with GETH_STORE_WINDOWS_PREFIX. The listing
+# is parsed as it streams with iterparse and the index is saved after each page along with the
+# marker of the next page, so an interrupted listing continues where it stopped.
+#
+# Blob names are listed in name order, not in release order (1.14.10 comes before 1.14.9), so
+# later runs cannot only read the last page. They list the name prefixes where a build newer
+# than the newest indexed one can appear: the next patch releases of its minor version, the
+# following minor versions and the next major version. Each of these listings is small.
+
+GETH_VERSION_PATTERN = re.compile(r'^' + re.escape(GETH_STORE_WINDOWS_PREFIX) +
+    r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)-')
+
+class GethStoreError(Exception):
+    pass
+
+class ChunkReader(io.RawIOBase):
+    # Readable file object over the chunks of a streamed response, for iterparse
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b''
+                return 0
+        length = min(len(buffer), len(self._buffer))
+        buffer[:length] = self._buffer[:length]
+        self._buffer = self._buffer[length:]
+        return length
+
+def get_build_version(name: str) -> Optional[Tuple[int, int, int]]:
+    result = GETH_VERSION_PATTERN.search(name)
+    if not result:
+        return None
+    return (int(result.group('major')), int(result.group('minor')), int(result.group('patch')))
+
+def list_builds_page(prefix: str, marker: Optional[str]) -> Tuple[Dict[str, float], Optional[str]]:
+    # List one page of blobs named with prefix, starting at marker. Return the stable windows
+    # amd64 builds found, with their last modified timestamp, and the marker of the next page.
+
+    params = GETH_STORE_BUILDS_PARAMS.copy()
+    params['prefix'] = prefix
+    if marker is not None:
+        params['marker'] = marker
+
+    builds = {}
+    next_marker = None
+
+    try:
+        with httpclient.stream('GET', GETH_STORE_BUILDS_URL, params=params,
+            follow_redirects=True) as response:
+
+            if response.status_code != 200:
+                raise GethStoreError(f'Unexpected status code {response.status_code}')
+
+            for event, element in ElementTree.iterparse(
+                io.BufferedReader(ChunkReader(response.iter_bytes())), events=('end', )):
+
+                if element.tag == 'Blob':
+                    name = (element.findtext('Name') or '').strip()
+                    if is_stable_windows_amd64_archive(name):
+                        last_modified = element.findtext('Properties/Last-Modified')
+                        try:
+                            builds[name] = parsedate_to_datetime(last_modified).timestamp()
+                        except (TypeError, ValueError):
+                            builds[name] = 0.0
+                    element.clear()
+                elif element.tag == 'NextMarker':
+                    next_marker = element.text or None
+    except httpx.HTTPError as exception:
+        raise GethStoreError(f'Exception {exception}')
+    except ElementTree.ParseError as exception:
+        raise GethStoreError(f'Unable to parse the builds listing. {exception}')
+
+    return builds, next_marker
+
+class GethBuildIndex():
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.builds = {}
+        self.marker = None
+        self.complete = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf8') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(index, dict) or not isinstance(index.get('builds'), dict):
+            return
+
+        self.builds = index['builds']
+        self.marker = index.get('marker')
+        self.complete = index.get('complete', False)
+
+    def save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf8') as index_file:
+                json.dump({
+                    'builds': self.builds,
+                    'marker': self.marker,
+                    'complete': self.complete,
+                    'updated_at': time.time()
+                }, index_file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # The index is a cache, the next run lists the store again
+            pass
+
+    def _list_prefix(self, prefix: str, marker: Optional[str] = None,
+        save_marker: bool = False) -> int:
+        # List every page for prefix and add the builds found. Return the number of builds.
+
+        found = 0
+        while True:
+            builds, marker = list_builds_page(prefix, marker)
+            self.builds.update(builds)
+            found = found + len(builds)
+
+            if save_marker:
+                self.marker = marker
+                self.save()
+
+            if marker is None:
+                return found
+
+    def refresh(self, log=None):
+        # Add the builds published since the last refresh. Raise GethStoreError on failure.
+
+        start_time = time.monotonic()
+
+        # Highest indexed version, a backport can be the newest build by date
+        versions = [version for version in map(get_build_version, self.builds)
+            if version is not None]
+        version = max(versions) if len(versions) > 0 else None
+
+        if not self.complete or version is None:
+            self._list_prefix(GETH_STORE_WINDOWS_PREFIX, self.marker, save_marker=True)
+            self.complete = True
+            self.marker = None
+        else:
+            major, minor, patch = version
+
+            self._list_prefix(f'{GETH_STORE_WINDOWS_PREFIX}{major}.{minor}.')
+
+            # Releases are sequential, keep going while the next minor version has builds
+            next_minor = minor + 1
+            while self._list_prefix(f'{GETH_STORE_WINDOWS_PREFIX}{major}.{next_minor}.') > 0:
+                next_minor = next_minor + 1
+
+            self._list_prefix(f'{GETH_STORE_WINDOWS_PREFIX}{major + 1}.')
+
+        self.save()
+
+        if log is not None:
+            log.info(f'Geth build index refreshed with {len(self.builds)} builds in '
+                f'{time.monotonic() - start_time:.2f} seconds.')
+
+    def get_latest(self) -> Optional[dict]:
+        # Newest build by last modified date, the name breaks ties like the store listing sort
+        if len(self.builds) == 0:
+            return None
+        name = max(self.builds, key=lambda name: (self.builds[name], name))
+        return {
+            'name': name,
+            'last_modified': self.builds[name]
+        }
+
+def get_latest_geth_build(base_directory: Path, log=None) -> Optional[dict]:
+    # Return the newest stable windows amd64 build in the Geth build store as a dict with its
+    # name and last modified timestamp, None when there are none. The index is kept in the
+    # wizard directory of base_directory. Raise GethStoreError when the store cannot be listed.
+
+    index = GethBuildIndex(base_directory.joinpath('var', 'lib', 'ethwizard',
+        GETH_BUILD_INDEX_FILE))
+    index.refresh(log)
+    return index.get_latest()
@@ -1,13 +1,11 @@
 import subprocess
 import time
 import httpx
-import humanize
 import re
 import os
 import shlex
 import shutil
 import json
-import hashlib
 import winreg
 import io
 
@@ -15,17 +13,9 @@ from pathlib import Path
 
 from packaging.version import parse as parse_version
 
-from yaml import safe_load
-
 from urllib.parse import urljoin, urlparse
 
-from datetime import datetime, timedelta
-
-from defusedxml import ElementTree
-
-from dateutil.parser import parse as dateparse
-
-from bs4 import BeautifulSoup
+from datetime import datetime
 
 from rfc3986 import builder as urlbuilder
 
@@ -33,6 +23,35 @@ from zipfile import ZipFile
 
 from functools import partial
 
+from ethwizard.platforms import httpclient
+
+from ethwizard.platforms.download import DownloadError, DownloadStatusError
+
+from ethwizard.platforms.artifacts import (
+    download_artifact,
+    download_assets,
+    iter_artifact,
+    discard_artifact,
+    discard_assets
+)
+
+from ethwizard.platforms.extract import (
+    extract_archive,
+    select_names,
+    strip_components,
+    ExtractError,
+    SignatureVerifier
+)
+
+from ethwizard.platforms.windows.gethstore import GethStoreError, get_latest_geth_build
+
+from ethwizard.utils.lazy import lazy_callable
+
+# Heavy dependencies only needed by a few installation paths
+safe_load = lazy_callable('yaml', 'safe_load')
+dateparse = lazy_callable('dateutil.parser', 'parse')
+BeautifulSoup = lazy_callable('bs4', 'BeautifulSoup')
+
 from ethwizard.constants import *
 
 from ethwizard.platforms.common import (
@@ -44,13 +63,15 @@ from ethwizard.platforms.common import (
     select_eth1_fallbacks,
     input_dialog_default,
     progress_log_dialog,
+    run_download_dialog,
     search_for_generated_keys,
     select_consensus_client,
     select_execution_client,
     select_keys_directory,
     select_fee_recipient_address,
     select_withdrawal_address,
-    get_bc_validator_deposits,
+    get_validator_deposits,
+    get_join_queue_info,
     test_open_ports,
     show_whats_next,
     show_public_keys,
@@ -64,15 +85,15 @@ from ethwizard.platforms.windows.common import (
     quit_app,
     get_service_details,
     get_nssm_binary,
-    is_stable_windows_amd64_archive,
     install_gpg,
+    get_keyring,
     set_service_param,
     setup_jwt_token_file,
     is_adx_supported
 )
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import button_dialog, input_dialog
+from ethwizard.platforms.headless import button_dialog, input_dialog
 
 def installation_steps(*args, **kwargs):
 
@@ -399,7 +420,7 @@ def installation_steps(*args, **kwargs):
 
         if not context[merge_ready_network]:
             if selected_eth1_fallbacks not in context:
-                context[selected_eth1_fallbacks] = select_eth1_fallbacks(context[selected_network])
+                context[selected_eth1_fallbacks] = select_eth1_fallbacks(context[selected_network], log)
                 step_sequence.save_state(step.step_id, context)
 
             if (
@@ -638,6 +659,7 @@ def installation_steps(*args, **kwargs):
         # Context variables
         selected_network = CTX_SELECTED_NETWORK
         public_keys = CTX_PUBLIC_KEYS
+        step_metrics = CTX_STEP_METRICS
 
         if not (
             test_context_variable(context, selected_network, log) and
@@ -646,7 +668,8 @@ def installation_steps(*args, **kwargs):
             # We are missing context variables, we cannot continue
             quit_app()
 
-        show_whats_next(context[selected_network], context[public_keys])
+        show_whats_next(context[selected_network], context[public_keys],
+            context.get(step_metrics))
 
         return context
     
@@ -1204,7 +1227,7 @@ Do you want to skip installing the MEV-Boost binary?
         mevboost_gh_release_url = GITHUB_REST_API_URL + MEVBOOST_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(mevboost_gh_release_url, headers=headers,
+            response = httpclient.get(mevboost_gh_release_url, headers=headers,
                 follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Exception while downloading MEV-Boost binary. {exception}')
@@ -1258,54 +1281,22 @@ Do you want to skip installing the MEV-Boost binary?
         download_path = base_directory.joinpath('downloads')
         download_path.mkdir(parents=True, exist_ok=True)
 
-        binary_path = download_path.joinpath(binary_asset['file_name'])
-        if binary_path.is_file():
-            binary_path.unlink()
-
-        binary_hash = hashlib.sha256()
-
         try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading MEV-Boost binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-
-                    archive_filename = binary_asset['file_name']
-                    archive_url = binary_asset['file_url']
-                    log.info(f'Downloading {archive_filename} from {archive_url} ...')
-
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-                        binary_hash.update(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading MEV-Boost binary from Github. {exception}')
+            files, hashes = run_download_dialog(
+                title='Downloading MEV-Boost',
+                text=f'Downloading MEV-Boost release files for {archive_filename}...',
+                download=lambda cancelled: download_assets({
+                    'binary': binary_asset,
+                    'checksums': checksums_asset
+                }, download_path, log, release_tag=release_json.get('tag_name'),
+                    cancelled=cancelled))
+        except DownloadError as exception:
+            log.error(f'Exception while downloading MEV-Boost release files from Github. {exception}')
             return False
-        
-        checksums_path = download_path.joinpath(checksums_asset['file_name'])
-        if checksums_path.is_file():
-            checksums_path.unlink()
-
-        try:
-            with open(checksums_path, 'wb') as checksums_file:
-                with httpx.stream('GET', checksums_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading MEV-Boost checksums from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    
-                    archive_filename = checksums_asset['file_name']
-                    archive_url = checksums_asset['file_url']
-                    log.info(f'Downloading {archive_filename} from {archive_url} ...')
 
-                    for data in http_stream.iter_bytes():
-                        checksums_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading MEV-Boost checksums from Github. {exception}')
-            return False
+        binary_path = files['binary']
+        binary_hash = hashes['binary']
+        checksums_path = files['checksums']
 
         # Verify checksum
 
@@ -1325,6 +1316,10 @@ Do you want to skip installing the MEV-Boost binary?
                         log.error(f'SHA256 checksum failed on MEV-Boost binary from '
                             f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
                             f'stop here to protect you.')
+                        discard_assets({
+                            'binary': binary_asset,
+                            'checksums': checksums_asset
+                        }, download_path, release_tag=release_json.get('tag_name'))
                         return False
                     
                     log.info('Good SHA256 checksum for MEV-Boost binary.')
@@ -1600,85 +1595,26 @@ Do you want to skip installing the geth binary?
     if install_geth_binary:
         # Install Geth from official website
         
-        # Get list of geth releases/builds from their store
-        next_marker = None
-        page_end_found = False
-
-        windows_builds = []
-
+        # Get the latest geth build from the build store index
         try:
             log.info('Getting geth builds...')
-            while not page_end_found:
-                params = GETH_STORE_BUILDS_PARAMS.copy()
-                if next_marker is not None:
-                    params['marker'] = next_marker
-
-                response = httpx.get(GETH_STORE_BUILDS_URL, params=params, follow_redirects=True)
-
-                if response.status_code != 200:
-                    log.error(f'Cannot connect to geth builds URL {GETH_STORE_BUILDS_URL}.\n'
-                        f'Unexpected status code {response.status_code}')
-                    return False
-                
-                builds_tree_root = ElementTree.fromstring(response.text)
-                blobs = builds_tree_root.findall('.//Blobs/Blob')
-
-                for blob in blobs:
-                    build_name = blob.find('Name').text.strip()
-                    if build_name.endswith('.asc'):
-                        continue
-
-                    if not is_stable_windows_amd64_archive(build_name):
-                        continue
-
-                    build_properties = blob.find('Properties')
-                    last_modified_date = dateparse(build_properties.find('Last-Modified').text)
-
-                    windows_builds.append({
-                        'name': build_name,
-                        'last_modified_date': last_modified_date
-                    })
-
-                next_marker = builds_tree_root.find('.//NextMarker').text
-                if next_marker is None:
-                    page_end_found = True
-
-        except httpx.RequestError as exception:
+            latest_build = get_latest_geth_build(base_directory, log)
+        except GethStoreError as exception:
             log.error(f'Cannot connect to geth builds URL {GETH_STORE_BUILDS_URL}.\n'
                 f'Exception {exception}')
             return False
 
-        if len(windows_builds) <= 0:
+        if latest_build is None:
             log.error('No geth builds found on geth store. We cannot continue.')
             return False
 
         # Download latest geth build and its signature
-        windows_builds.sort(key=lambda x: (x['last_modified_date'], x['name']), reverse=True)
-        latest_build = windows_builds[0]
 
         download_path = base_directory.joinpath('downloads')
         download_path.mkdir(parents=True, exist_ok=True)
 
-        geth_archive_path = download_path.joinpath(latest_build['name'])
-        if geth_archive_path.is_file():
-            geth_archive_path.unlink()
-
         latest_build_url = urljoin(GETH_BUILDS_BASE_URL, latest_build['name'])
 
-        try:
-            with open(geth_archive_path, 'wb') as binary_file:
-                log.info(f'Downloading geth archive {latest_build["name"]}...')
-                with httpx.stream('GET', latest_build_url, follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download geth archive {latest_build_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading geth archive. Exception {exception}')
-            return False
-
         geth_archive_sig_path = download_path.joinpath(latest_build['name'] + '.asc')
         if geth_archive_sig_path.is_file():
             geth_archive_sig_path.unlink()
@@ -1686,107 +1622,76 @@ Do you want to skip installing the geth binary?
         latest_build_sig_url = urljoin(GETH_BUILDS_BASE_URL, latest_build['name'] + '.asc')
 
         try:
-            with open(geth_archive_sig_path, 'wb') as binary_file:
-                log.info(f'Downloading geth archive signature {latest_build["name"]}.asc...')
-                with httpx.stream('GET', latest_build_sig_url,
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download geth archive signature {latest_build_sig_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
+            log.info(f'Downloading geth archive signature {latest_build["name"]}.asc...')
+            download_artifact(latest_build_sig_url, geth_archive_sig_path, log)
+        except DownloadError as exception:
             log.error(f'Exception while downloading geth archive signature. Exception {exception}')
             return False
 
         if not install_gpg(base_directory):
             return False
         
-        # Verify PGP signature
+        # Get the PGP key before streaming the archive
         gpg_binary_path = base_directory.joinpath('bin', 'gpg.exe')
 
-        command_line = [str(gpg_binary_path), '--list-keys', '--with-colons',
-            GETH_WINDOWS_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
-        pgp_key_found = process_result.returncode == 0
+        keyring = get_keyring(base_directory)
+        pgp_key_found = keyring.ensure_key(GETH_WINDOWS_PGP_KEY_ID, log)
 
         if not pgp_key_found:
-
-            retry_index = 0
-            retry_count = 15
-
-            key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-            log.info(f'Downloading Geth Windows Builder PGP key from {key_server} ...')
-            command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                '--recv-keys', GETH_WINDOWS_PGP_KEY_ID]
-            process_result = subprocess.run(command_line)
-
-            if process_result.returncode != 0:
-                # GPG failed to download Geth Windows Builder PGP key, let's wait and retry a few times
-                while process_result.returncode != 0 and retry_index < retry_count:
-                    retry_index = retry_index + 1
-                    delay = 5
-                    log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                        f'and try again from a different server.')
-                    time.sleep(delay)
-
-                    key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                    log.info(f'Downloading Geth Windows Builder PGP key from {key_server} ...')
-                    command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                        '--recv-keys', GETH_WINDOWS_PGP_KEY_ID]
-
-                    process_result = subprocess.run(command_line)
-
-            if process_result.returncode != 0:
-                log.warning(
-f'''
+            log.warning(
+'''
 We failed to download the Geth Windows Builder PGP key to verify the geth
-archive after {retry_count} retries. We will skip signature verification.
+archive. We will skip signature verification.
 '''
-                )
-            else:
-                process_result = subprocess.run([
-                    str(gpg_binary_path), '--verify', str(geth_archive_sig_path)])
-                if process_result.returncode != 0:
-                    log.error('The geth archive signature is wrong. We\'ll stop here to protect you.')
-                    return False
-        else:
-            process_result = subprocess.run([
-                str(gpg_binary_path), '--verify', str(geth_archive_sig_path)])
-            if process_result.returncode != 0:
-                log.error('The geth archive signature is wrong. We\'ll stop here to protect you.')
-                return False
-        
-        # Remove download leftovers
-        geth_archive_sig_path.unlink()        
+            )
 
-        # Unzip geth archive
+        # Downloading, verifying and extracting the geth binary in a single pass
         bin_path = base_directory.joinpath('bin')
         bin_path.mkdir(parents=True, exist_ok=True)
 
-        geth_extracted_binary = None
+        verifier = None
+        tee = []
+        if pgp_key_found:
+            verifier = SignatureVerifier(geth_archive_sig_path, gpg_binary_path,
+                gpg_arguments=keyring.get_gpg_arguments(), log=log)
+            tee.append(verifier.update)
+
+        try:
+            log.info(f'Downloading and extracting geth archive {latest_build["name"]}...')
+            staged = run_download_dialog(
+                title='Downloading Geth',
+                text=f'Downloading and extracting geth archive {latest_build["name"]}...',
+                download=lambda cancelled: extract_archive(
+                    iter_artifact(latest_build_url, download_path, log, cancelled=cancelled),
+                    latest_build['name'], bin_path,
+                    select=select_names({'geth.exe': 'geth.exe'}), tee=tee))
+        except DownloadError as exception:
+            if verifier is not None:
+                verifier.cancel()
+            log.error(f'Exception while downloading geth archive. Exception {exception}')
+            return False
+        except (ExtractError, OSError) as exception:
+            if verifier is not None:
+                verifier.cancel()
+            log.error(f'Unable to extract the geth archive. Exception {exception}')
+            return False
 
-        with ZipFile(geth_archive_path, 'r') as zip_file:
-            for name in zip_file.namelist():
-                if name.endswith('geth.exe'):
-                    geth_extracted_binary = Path(zip_file.extract(name, download_path))
+        if verifier is not None and not verifier.verify():
+            staged.abort()
+            discard_artifact(latest_build_sig_url, download_path)
+            log.error('The geth archive signature is wrong. We\'ll stop here to protect you.')
+            return False
         
         # Remove download leftovers
-        geth_archive_path.unlink()
+        geth_archive_sig_path.unlink()        
 
-        if geth_extracted_binary is None:
+        if len(staged.files) == 0:
+            staged.abort()
             log.error('The geth binary was not found in the archive. We cannot continue.')
             return False
 
-        # Move geth back into bin directory
-        target_geth_binary_path = bin_path.joinpath('geth.exe')
-        if target_geth_binary_path.is_file():
-            target_geth_binary_path.unlink()
-        
-        geth_extracted_binary.rename(target_geth_binary_path)
-
-        geth_extracted_binary.parent.rmdir()
+        # Move geth into bin directory
+        staged.commit()
 
         # Get Geth version
         if geth_path.is_file():
@@ -1999,7 +1904,7 @@ To examine your geth service logs, inspect the following file:
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+        response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Geth',
@@ -2128,7 +2033,7 @@ To examine your geth service logs, inspect the following file:
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+                response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Geth.')
                 continue
@@ -2151,7 +2056,7 @@ To examine your geth service logs, inspect the following file:
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
+                response = httpclient.post(local_geth_jsonrpc_url, json=request_json, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Geth.')
                 continue
@@ -2634,7 +2539,7 @@ To examine your Nethermind service logs, inspect the following file:
         'Content-Type': 'application/json'
     }
     try:
-        response = httpx.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers)
+        response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json, headers=headers)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Nethermind',
@@ -2778,7 +2683,7 @@ To examine your Nethermind service logs, inspect the following file:
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_nethermind_jsonrpc_url, json=request_json,
+                response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json,
                     headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nethermind.')
@@ -2802,7 +2707,7 @@ To examine your Nethermind service logs, inspect the following file:
                 'Content-Type': 'application/json'
             }
             try:
-                response = httpx.post(local_nethermind_jsonrpc_url, json=request_json,
+                response = httpclient.post(local_nethermind_jsonrpc_url, json=request_json,
                     headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nethermind.')
@@ -2849,7 +2754,7 @@ To examine your Nethermind service logs, inspect the following file:
             local_nethermind_health_url = 'http://127.0.0.1:8545/health'
 
             try:
-                response = httpx.post(local_nethermind_health_url)
+                response = httpclient.post(local_nethermind_health_url)
                 if response.status_code not in (200, 503):
                     log_text(
                         f'Status code: {response.status_code} while querying Nethermind Health.')
@@ -3082,7 +2987,7 @@ Do you want to skip installing the JRE?
         try:
             log.info('Getting JRE builds...')
 
-            response = httpx.get(ADOPTIUM_17_API_URL, params=ADOPTIUM_17_API_PARAMS,
+            response = httpclient.get(ADOPTIUM_17_API_URL, params=ADOPTIUM_17_API_PARAMS,
                 follow_redirects=True)
 
             if response.status_code != 200:
@@ -3159,50 +3064,39 @@ Do you want to skip installing the JRE?
         download_path = base_directory.joinpath('downloads')
         download_path.mkdir(parents=True, exist_ok=True)
 
-        jre_archive_path = download_path.joinpath(latest_build['name'])
-        if jre_archive_path.is_file():
-            jre_archive_path.unlink()
-
+        # Downloading, hashing and extracting the JRE archive in a single pass
         try:
-            with open(jre_archive_path, 'wb') as binary_file:
-                log.info(f'Downloading JRE archive {latest_build["name"]}...')
-                with httpx.stream('GET', latest_build['link'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download JRE archive {latest_build["link"]}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
+            log.info(f'Downloading and extracting JRE archive {latest_build["name"]}...')
+            staged = run_download_dialog(
+                title='Downloading JRE',
+                text=f'Downloading and extracting JRE archive {latest_build["name"]}...',
+                download=lambda cancelled: extract_archive(
+                    iter_artifact(latest_build['link'], download_path, log,
+                        cancelled=cancelled),
+                    latest_build['name'], jre_path, select=strip_components(1),
+                    replace_destination=True))
+        except DownloadError as exception:
             log.error(f'Exception while downloading JRE archive. Exception {exception}')
             return False
+        except (ExtractError, OSError) as exception:
+            log.error(f'Unable to extract the JRE archive. Exception {exception}')
+            return False
         
-        # Unzip JRE archive
-        archive_members = None
-
-        log.info(f'Extracting JRE archive {latest_build["name"]}...')
-        with ZipFile(jre_archive_path, 'r') as zip_file:
-            archive_members = zip_file.namelist()
-            zip_file.extractall(download_path)
-        
-        # Remove download leftovers
-        jre_archive_path.unlink()
+        # Verify checksum
+        log.info('Verifying JRE archive checksum...')
+        jre_archive_hexdigest = staged.get_hexdigest()
+        if jre_archive_hexdigest != latest_build['checksum'].lower():
+            staged.abort()
+            log.error('JRE archive checksum does not match. We will stop here to protect you.')
+            return False
 
-        if archive_members is None or len(archive_members) == 0:
+        if len(staged.files) == 0:
+            staged.abort()
             log.error('No files found in JRE archive. We cannot continue.')
             return False
         
-        # Move all those extracted files into their final destination
-        if jre_path.is_dir():
-            shutil.rmtree(jre_path)
-        jre_path.mkdir(parents=True, exist_ok=True)
-
-        archive_extracted_dir = download_path.joinpath(Path(archive_members[0]).parts[0])
-
-        with os.scandir(archive_extracted_dir) as it:
-            for diritem in it:
-                shutil.move(diritem.path, jre_path)
+        # Move the verified extracted files into their final destination
+        staged.commit()
             
         # Make sure jre was installed properly
         jre_found = False
@@ -3366,7 +3260,7 @@ Do you want to skip installing the Nimbus binary?
         nimbus_gh_release_url = GITHUB_REST_API_URL + NIMBUS_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(nimbus_gh_release_url, headers=headers,
+            response = httpclient.get(nimbus_gh_release_url, headers=headers,
                 follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Exception while downloading Nimbus binary. {exception}')
@@ -3410,74 +3304,44 @@ Do you want to skip installing the Nimbus binary?
         download_path = base_directory.joinpath('downloads')
         download_path.mkdir(parents=True, exist_ok=True)
 
-        binary_path = Path(download_path, binary_asset['file_name'])
+        # Downloading and extracting the Nimbus binaries from the archive in a single pass
+        archive_filename = binary_asset['file_name']
+        log.info(f'Downloading and extracting {archive_filename} ...')
+
+        bin_path = base_directory.joinpath('bin')
+        bin_path.mkdir(parents=True, exist_ok=True)
+
+        nimbus_binaries = ['nimbus_beacon_node.exe', 'nimbus_validator_client.exe']
+
+        def select_nimbus_binary(name):
+            # Only keep the binaries from the build directory
+            parts = Path(name).parts
+            if len(parts) < 2 or parts[-2] != 'build' or parts[-1] not in nimbus_binaries:
+                return None
+            return parts[-1]
 
         try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Nimbus binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
+            staged = run_download_dialog(
+                title='Downloading Nimbus',
+                text=f'Downloading and extracting Nimbus archive {archive_filename}...',
+                download=lambda cancelled: extract_archive(
+                    iter_artifact(binary_asset['file_url'], download_path, log,
+                        release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                    archive_filename, bin_path, select=select_nimbus_binary))
+        except DownloadError as exception:
             log.error(f'Exception while downloading Nimbus binary from Github. {exception}')
             return False
-        
-        extract_directory = download_path.joinpath('nimbus')
-        if extract_directory.is_dir():
-            shutil.rmtree(extract_directory)
-        elif extract_directory.is_file():
-            os.unlink(extract_directory)
-        extract_directory.mkdir(parents=True, exist_ok=True)
-        
-        # Extracting the Lighthouse binary archive
-        subprocess.run([
-            'tar', 'xvf', binary_path, '--directory', extract_directory])
-        
-        # Remove download leftovers
-        binary_path.unlink()
-
-        # Find the Nimbus binaries and copy them in their installed location
-        build_path = None
-
-        with os.scandir(extract_directory) as it:
-            for entry in it:
-                if entry.is_dir():
-                    if entry.name == 'build':
-                        build_path = entry.path
-                    else:
-                        build_path = os.path.join(entry.path, 'build')
-                    break
-        
-        if build_path is None:
-            log.error('Cannot find the correct directory in the extracted Nimbus archive.')
+        except (ExtractError, OSError) as exception:
+            log.error(f'Unable to extract the Nimbus binary archive. {exception}')
             return False
 
-        src_nimbus_bn_path = Path(build_path, 'nimbus_beacon_node.exe')
-        src_nimbus_vc_path = Path(build_path, 'nimbus_validator_client.exe')
-
-        if not src_nimbus_bn_path.is_file() or not src_nimbus_vc_path.is_file():
+        if sorted(path.name for path in staged.files) != sorted(nimbus_binaries):
+            staged.abort()
             log.error(f'Cannot find the Nimbus binaries in the extracted archive.')
             return False
-        
-        bin_path = base_directory.joinpath('bin')
-        bin_path.mkdir(parents=True, exist_ok=True)
 
-        dest_nimbus_bn_path = bin_path.joinpath('nimbus_beacon_node.exe')
-        dest_nimbus_vc_path = bin_path.joinpath('nimbus_validator_client.exe')
-        if dest_nimbus_bn_path.is_file():
-            dest_nimbus_bn_path.unlink()
-        if dest_nimbus_vc_path.is_file():
-            dest_nimbus_vc_path.unlink()
-
-        shutil.move(src_nimbus_bn_path, bin_path)
-        shutil.move(src_nimbus_vc_path, bin_path)
-
-        # Remove extraction leftovers
-        shutil.rmtree(extract_directory)
+        # Move the Nimbus binaries into bin directory
+        staged.commit()
 
         # Get Nimbus version
         try:
@@ -3822,7 +3686,7 @@ To examine your Nimbus service logs, inspect the following files:
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(cc_query_url, headers=headers, timeout=60)
+            response = httpclient.get(cc_query_url, headers=headers, timeout=60)
         except httpx.RequestError as exception:
             last_exception = exception
             
@@ -3985,7 +3849,7 @@ To examine your Nimbus service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(cc_query_url, headers=headers, timeout=60)
+                response = httpclient.get(cc_query_url, headers=headers, timeout=60)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nimbus.')
                 continue
@@ -4003,7 +3867,7 @@ To examine your Nimbus service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(cc_query_url, headers=headers, timeout=60)
+                response = httpclient.get(cc_query_url, headers=headers, timeout=60)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Nimbus.')
                 continue
@@ -4292,7 +4156,7 @@ Do you want to skip installing the teku binary distribution?
         teku_gh_release_url = GITHUB_REST_API_URL + TEKU_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(teku_gh_release_url, headers=headers, follow_redirects=True)
+            response = httpclient.get(teku_gh_release_url, headers=headers, follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Cannot connect to Github. Exception {exception}')
             return False
@@ -4335,11 +4199,6 @@ Do you want to skip installing the teku binary distribution?
 
         url_file_name = urlparse(zip_url).path.split('/')[-1]
 
-        teku_archive_path = download_path.joinpath(url_file_name)
-        teku_archive_hash = hashlib.sha256()
-        if teku_archive_path.is_file():
-            teku_archive_path.unlink()
-
         keep_retrying = True
 
         retry_index = 0
@@ -4353,27 +4212,30 @@ Do you want to skip installing the teku binary distribution?
             last_exception = None
             last_status_code = None
             try:
-                with open(teku_archive_path, 'wb') as binary_file:
-                    log.info(f'Downloading teku archive {url_file_name}...')
-                    with httpx.stream('GET', zip_url, follow_redirects=True) as http_stream:
-                        if http_stream.status_code != 200:
-                            log.error(f'Cannot download teku archive {zip_url}.\n'
-                                f'Unexpected status code {http_stream.status_code}')
-                            last_status_code = http_stream.status_code
-
-                            retry_index = retry_index + 1
-                            log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
-                            time.sleep(retry_delay)
-                            retry_delay = retry_delay + retry_delay_increase
-                            continue
+                # Downloading, hashing and extracting the teku archive in a single pass
+                log.info(f'Downloading and extracting teku archive {url_file_name}...')
+                staged = run_download_dialog(
+                    title='Downloading Teku',
+                    text=f'Downloading and extracting teku archive {url_file_name}...',
+                    download=lambda cancelled: extract_archive(
+                        iter_artifact(zip_url, download_path, log,
+                            release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                        url_file_name, teku_path, select=strip_components(1),
+                        replace_destination=True))
+                keep_retrying = False
+
+            except DownloadStatusError as exception:
+                log.error(f'Cannot download teku archive {zip_url}.\n'
+                    f'Unexpected status code {exception.status_code}')
+                last_status_code = exception.status_code
 
-                        for data in http_stream.iter_bytes():
-                            binary_file.write(data)
-                            teku_archive_hash.update(data)
-                    
-                    keep_retrying = False
+                retry_index = retry_index + 1
+                log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
+                time.sleep(retry_delay)
+                retry_delay = retry_delay + retry_delay_increase
+                continue
 
-            except httpx.RequestError as exception:
+            except (DownloadError, ExtractError) as exception:
                 
                 log.error(f'Exception while downloading teku archive. Exception {exception}')
                 last_exception = exception
@@ -4430,36 +4292,19 @@ is no network issue when we try to connect to the Internet.
 
         # Verify checksum
         log.info('Verifying teku archive checksum...')
-        teku_archive_hexdigest = teku_archive_hash.hexdigest()
+        teku_archive_hexdigest = staged.get_hexdigest()
         if teku_archive_hexdigest.lower() != zip_sha256.lower():
+            staged.abort()
             log.error('Teku archive checksum does not match. We will stop here to protect you.')
             return False
         
-        # Unzip teku archive
-        archive_members = None
-
-        log.info(f'Extracting teku archive {url_file_name}...')
-        with ZipFile(teku_archive_path, 'r') as zip_file:
-            archive_members = zip_file.namelist()
-            zip_file.extractall(download_path)
-        
-        # Remove download leftovers
-        teku_archive_path.unlink()
-
-        if archive_members is None or len(archive_members) == 0:
+        if len(staged.files) == 0:
+            staged.abort()
             log.error('No files found in teku archive. We cannot continue.')
             return False
         
-        # Move all those extracted files into their final destination
-        if teku_path.is_dir():
-            shutil.rmtree(teku_path)
-        teku_path.mkdir(parents=True, exist_ok=True)
-
-        archive_extracted_dir = download_path.joinpath(Path(archive_members[0]).parts[0])
-
-        with os.scandir(archive_extracted_dir) as it:
-            for diritem in it:
-                shutil.move(diritem.path, teku_path)
+        # Move the verified extracted files into their final destination
+        staged.commit()
             
         # Make sure teku was installed properly
         teku_found = False
@@ -4685,7 +4530,7 @@ To examine your teku service logs, inspect the following files:
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(teku_query_url, headers=headers)
+            response = httpclient.get(teku_query_url, headers=headers)
         except httpx.RequestError as exception:
             last_exception = exception
             
@@ -4848,7 +4693,7 @@ To examine your teku service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(teku_query_url, headers=headers)
+                response = httpclient.get(teku_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Teku.')
                 continue
@@ -4866,7 +4711,7 @@ To examine your teku service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(teku_query_url, headers=headers)
+                response = httpclient.get(teku_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Teku.')
                 continue
@@ -5145,7 +4990,7 @@ Do you want to skip installing the Lighthouse binary?
         lighthouse_gh_release_url = GITHUB_REST_API_URL + LIGHTHOUSE_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(lighthouse_gh_release_url, headers=headers,
+            response = httpclient.get(lighthouse_gh_release_url, headers=headers,
                 follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Exception while downloading Lighthouse binary. {exception}')
@@ -5203,108 +5048,83 @@ Do you want to skip installing the Lighthouse binary?
         download_path = base_directory.joinpath('downloads')
         download_path.mkdir(parents=True, exist_ok=True)
 
-        binary_path = Path(download_path, binary_asset['file_name'])
-
-        try:
-            with open(binary_path, 'wb') as binary_file:
-                with httpx.stream('GET', binary_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Lighthouse binary from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
-            log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
-            return False
-        
-        signature_path = Path(download_path, signature_asset['file_name'])
+        signature_path = download_path.joinpath(signature_asset['file_name'])
 
         try:
-            with open(signature_path, 'wb') as signature_file:
-                with httpx.stream('GET', signature_asset['file_url'],
-                    follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'HTTP error while downloading Lighthouse signature from Github. '
-                            f'Status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        signature_file.write(data)
-        except httpx.RequestError as exception:
+            download_artifact(signature_asset['file_url'], signature_path, log,
+                release_tag=release_json.get('tag_name'))
+        except DownloadError as exception:
             log.error(f'Exception while downloading Lighthouse signature from Github. {exception}')
             return False
-        
+
         if not install_gpg(base_directory):
             return False
         
-        # Verify PGP signature
+        # Get the PGP key before streaming the archive
         gpg_binary_path = base_directory.joinpath('bin', 'gpg.exe')
 
-        command_line = [str(gpg_binary_path), '--list-keys', '--with-colons',
-            LIGHTHOUSE_PRIME_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
-        pgp_key_found = process_result.returncode == 0
+        keyring = get_keyring(base_directory)
+        pgp_key_found = keyring.ensure_key(LIGHTHOUSE_PRIME_PGP_KEY_ID, log)
 
         if not pgp_key_found:
+            log.warning(
+'''
+We failed to download the Sigma Prime's PGP key to verify the Lighthouse
+archive. We will skip signature verification.
+'''
+            )
 
-            retry_index = 0
-            retry_count = 15
+        # Downloading, verifying and extracting the Lighthouse binary in a single pass
+        archive_filename = binary_asset['file_name']
+        log.info(f'Downloading and extracting {archive_filename} ...')
 
-            key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-            log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-            command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                '--recv-keys', LIGHTHOUSE_PRIME_PGP_KEY_ID]
-            process_result = subprocess.run(command_line)
+        bin_path = base_directory.joinpath('bin')
+        bin_path.mkdir(parents=True, exist_ok=True)
 
-            if process_result.returncode != 0:
-                # GPG failed to download PGP key, let's wait and retry a few times
-                while process_result.returncode != 0 and retry_index < retry_count:
-                    retry_index = retry_index + 1
-                    delay = 5
-                    log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                        f'and try again from a different server.')
-                    time.sleep(delay)
+        verifier = None
+        tee = []
+        if pgp_key_found:
+            verifier = SignatureVerifier(signature_path, gpg_binary_path,
+                gpg_arguments=keyring.get_gpg_arguments(), log=log)
+            tee.append(verifier.update)
 
-                    key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                    log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-                    command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                        '--recv-keys', LIGHTHOUSE_PRIME_PGP_KEY_ID]
+        try:
+            staged = run_download_dialog(
+                title='Downloading Lighthouse',
+                text=f'Downloading and extracting Lighthouse archive {archive_filename}...',
+                download=lambda cancelled: extract_archive(
+                    iter_artifact(binary_asset['file_url'], download_path, log,
+                        release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                    archive_filename, bin_path,
+                    select=select_names({'lighthouse.exe': 'lighthouse.exe'}), tee=tee))
+        except DownloadError as exception:
+            if verifier is not None:
+                verifier.cancel()
+            log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
+            return False
+        except (ExtractError, OSError) as exception:
+            if verifier is not None:
+                verifier.cancel()
+            log.error(f'Unable to extract the Lighthouse binary archive. {exception}')
+            return False
 
-                    process_result = subprocess.run(command_line)
+        if verifier is not None and not verifier.verify():
+            staged.abort()
+            discard_artifact(signature_asset['file_url'], download_path,
+                release_tag=release_json.get('tag_name'))
+            log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
+            return False
 
-            if process_result.returncode != 0:
-                log.warning(
-f'''
-We failed to download the Sigma Prime's PGP key to verify the Lighthouse
-archive after {retry_count} retries. We will skip signature verification.
-'''
-                )
-            else:
-                process_result = subprocess.run([
-                    str(gpg_binary_path), '--verify', str(signature_path)])
-                if process_result.returncode != 0:
-                    log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
-                    return False
-        else:
-            process_result = subprocess.run([
-                str(gpg_binary_path), '--verify', str(signature_path)])
-            if process_result.returncode != 0:
-                log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
-                return False
-        
         # Remove download leftovers
         signature_path.unlink()
 
-        bin_path = base_directory.joinpath('bin')
-        bin_path.mkdir(parents=True, exist_ok=True)
-        
-        # Extracting the Lighthouse binary archive
-        subprocess.run([
-            'tar', 'xvf', binary_path, '--directory', bin_path])
-        
-        # Remove download leftovers
-        binary_path.unlink()
+        if len(staged.files) == 0:
+            staged.abort()
+            log.error('The Lighthouse binary was not found in the archive. We cannot continue.')
+            return False
+
+        # Move the Lighthouse binary into bin directory
+        staged.commit()
 
         # Get Lighthouse version
         try:
@@ -5515,7 +5335,7 @@ To examine your Lighthouse service logs, inspect the following files:
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(cc_query_url, headers=headers)
+            response = httpclient.get(cc_query_url, headers=headers)
         except httpx.RequestError as exception:
             last_exception = exception
             
@@ -5678,7 +5498,7 @@ To examine your Lighthouse service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(cc_query_url, headers=headers)
+                response = httpclient.get(cc_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Lighthouse.')
                 continue
@@ -5696,7 +5516,7 @@ To examine your Lighthouse service logs, inspect the following files:
                 'accept': 'application/json'
             }
             try:
-                response = httpx.get(cc_query_url, headers=headers)
+                response = httpclient.get(cc_query_url, headers=headers)
             except httpx.RequestError as exception:
                 log_text(f'Exception: {exception} while querying Lighthouse.')
                 continue
@@ -7220,7 +7040,7 @@ Do you want to skip installing the staking-deposit-cli binary?
             sdc_gh_release_url = GITHUB_REST_API_URL + SDC_LATEST_RELEASE
             headers = {'Accept': GITHUB_API_VERSION}
             try:
-                response = httpx.get(sdc_gh_release_url, headers=headers, follow_redirects=True)
+                response = httpclient.get(sdc_gh_release_url, headers=headers, follow_redirects=True)
             except httpx.RequestError as exception:
                 log.error(f'Cannot get latest staking-deposit-cli release from Github. '
                     f'Exception {exception}')
@@ -7273,57 +7093,29 @@ Do you want to skip installing the staking-deposit-cli binary?
             download_path = base_directory.joinpath('downloads')
             download_path.mkdir(parents=True, exist_ok=True)
 
-            binary_path = Path(download_path, binary_asset['file_name'])
-            binary_hash = hashlib.sha256()
-
-            if binary_path.is_file():
-                binary_path.unlink()
+            assets = {'binary': binary_asset}
+            if checksum_asset is not None:
+                assets['checksum'] = checksum_asset
 
             try:
-                with open(binary_path, 'wb') as binary_file:
-                    log.info(f'Downloading staking-deposit-cli binary '
-                        f'{binary_asset["file_name"]}...')
-                    with httpx.stream('GET', binary_asset['file_url'],
-                        follow_redirects=True) as http_stream:
-                        if http_stream.status_code != 200:
-                            log.error(f'Cannot download staking-deposit-cli binary from Github '
-                                f'{binary_asset["file_url"]}.\nUnexpected status code '
-                                f'{http_stream.status_code}')
-                            return False
-                        for data in http_stream.iter_bytes():
-                            binary_file.write(data)
-                            if checksum_asset is not None:
-                                binary_hash.update(data)
-            except httpx.RequestError as exception:
-                log.error(f'Exception while downloading staking-deposit-cli binary from Github. '
+                files, hashes = run_download_dialog(
+                    title='Downloading staking-deposit-cli',
+                    text=(f'Downloading staking-deposit-cli release files for '
+                        f'{binary_asset["file_name"]}...'),
+                    download=lambda cancelled: download_assets(assets, download_path, log,
+                        release_tag=release_json.get('tag_name'), cancelled=cancelled))
+            except DownloadError as exception:
+                log.error(f'Exception while downloading staking-deposit-cli release files from Github. '
                     f'Exception {exception}')
                 return False
 
+            binary_path = files['binary']
+            binary_hash = hashes['binary']
+
             if checksum_asset is not None:
                 binary_hexdigest = binary_hash.hexdigest().lower()
 
-                checksum_path = Path(download_path, checksum_asset['file_name'])
-
-                if checksum_path.is_file():
-                    checksum_path.unlink()
-
-                try:
-                    with open(checksum_path, 'wb') as signature_file:
-                        log.info(f'Downloading staking-deposit-cli checksum '
-                            f'{checksum_asset["file_name"]}...')
-                        with httpx.stream('GET', checksum_asset['file_url'],
-                            follow_redirects=True) as http_stream:
-                            if http_stream.status_code != 200:
-                                log.error(f'Cannot download staking-deposit-cli checksum from '
-                                    f'Github {checksum_asset["file_url"]}.\nUnexpected status code '
-                                    f'{http_stream.status_code}')
-                                return False
-                            for data in http_stream.iter_bytes():
-                                signature_file.write(data)
-                except httpx.RequestError as exception:
-                    log.error(f'Exception while downloading staking-deposit-cli checksum from '
-                        f'Github. Exception {exception}')
-                    return False
+                checksum_path = files['checksum']
 
                 # Verify SHA256 signature
                 log.info('Verifying staking-deposit-cli checksum...')
@@ -7342,6 +7134,8 @@ Do you want to skip installing the staking-deposit-cli binary?
                     log.error('SHA256 checksum failed on staking-deposit-cli binary from Github. '
                         f'Expected {checksum_value} but we got {binary_hexdigest}. We will stop '
                         f'here to protect you.')
+                    discard_assets(assets, download_path,
+                        release_tag=release_json.get('tag_name'))
                     return False
             
             # Unzip staking-deposit-cli archive
@@ -7719,7 +7513,7 @@ To examine your teku service logs, inspect the following files:
 
     while keep_retrying and retry_index < retry_count:
         try:
-            response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+            response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
         except httpx.RequestError as exception:
             last_exception = exception
             
@@ -7884,7 +7678,7 @@ To examine your beacon node service logs, inspect the following files:
                     'accept': 'application/json'
                 }
                 try:
-                    response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+                    response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
                 except httpx.RequestError as exception:
                     log_text(f'Exception: {exception} while querying beacon node.')
                     continue
@@ -7902,7 +7696,7 @@ To examine your beacon node service logs, inspect the following files:
                     'accept': 'application/json'
                 }
                 try:
-                    response = httpx.get(bn_query_url, headers=headers, timeout=bn_timeout)
+                    response = httpclient.get(bn_query_url, headers=headers, timeout=bn_timeout)
                 except httpx.RequestError as exception:
                     log_text(f'Exception: {exception} while querying beacon node.')
                     continue
@@ -7993,35 +7787,9 @@ Connected Peers: {bn_connected_peers}
 
         network_queue_info = unknown_joining_queue
 
-        headers = {
-            'accept': 'application/json'
-        }
-
-        beaconcha_in_queue_query_url = (
-            BEACONCHA_IN_URLS[network] + BEACONCHA_VALIDATOR_QUEUE_API_URL)
-        try:
-            response = httpx.get(beaconcha_in_queue_query_url, headers=headers,
-                follow_redirects=True)
-
-            if response.status_code != 200:
-                log.error(f'Status code: {response.status_code} while querying beaconcha.in.')
-            else:
-                response_json = response.json()
-                if (
-                    response_json and
-                    'data' in response_json and
-                    'beaconchain_entering' in response_json['data']):
-
-                    validators_entering = int(response_json['data']['beaconchain_entering'])
-                    waiting_td = timedelta(days=validators_entering / 900.0)
-
-                    network_queue_info = (
-                        f'{validators_entering} validators waiting to join '
-                        f'[{humanize.naturaldelta(waiting_td)}]'
-                    )
-
-        except httpx.RequestError as exception:
-            log.error(f'Exception: {exception} while querying beaconcha.in.')
+        join_queue_info = get_join_queue_info(network, local_bn_http_base, log)
+        if join_queue_info is not None:
+            network_queue_info = join_queue_info
 
         result = progress_log_dialog(
             title='Verifying beacon node syncing status',
@@ -8140,11 +7908,13 @@ When you are done with the deposit(s), click the "I'm done" button below.
         log.error('No public key(s) found in the deposit file.')
         return False
 
-    # Verify that the deposit was done correctly using beaconcha.in API
-    validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+    # Verify that the deposit was done correctly using the local beacon node or the beaconcha.in
+    # API
+    validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+        log)
 
     if type(validator_deposits) is not list and not validator_deposits:
-        log.warning('Unable to get validator(s) deposits from beaconcha.in')
+        log.warning('Unable to get validator(s) deposits')
         validator_deposits = []
     
     skipping_deposit_check = False
@@ -8186,10 +7956,11 @@ deposit(s).
             skipping_deposit_check = True
             break
 
-        validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+        validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+            log)
 
         if type(validator_deposits) is not list and not validator_deposits:
-            log.warning('Unable to get validator(s) deposits from beaconcha.in')
+            log.warning('Unable to get validator(s) deposits')
             validator_deposits = []
     
     # Check if all the deposit(s) were done for each validator
@@ -8229,10 +8000,11 @@ deposit(s).
             skipping_deposit_check = True
             break
 
-        validator_deposits = get_bc_validator_deposits(network, public_keys, log)
+        validator_deposits = get_validator_deposits(network, public_keys, local_bn_http_base,
+            log)
 
         if type(validator_deposits) is not list and not validator_deposits:
-            log.warning('Unable to get validator(s) deposits from beaconcha.in')
+            log.warning('Unable to get validator(s) deposits')
             validator_deposits = []
 
     # Clean up deposit data file
@@ -8625,7 +8397,7 @@ Do you want to skip installing the prometheus binary distribution?
         prometheus_gh_release_url = GITHUB_REST_API_URL + PROMETHEUS_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(prometheus_gh_release_url, headers=headers,
+            response = httpclient.get(prometheus_gh_release_url, headers=headers,
                 follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Cannot get latest Prometheus release from Github. '
@@ -8673,22 +8445,17 @@ Do you want to skip installing the prometheus binary distribution?
         zip_url = binary_asset['file_url']
 
         prometheus_archive_path = download_path.joinpath(url_file_name)
-        prometheus_archive_hash = hashlib.sha256()
         if prometheus_archive_path.is_file():
             prometheus_archive_path.unlink()
 
         try:
-            with open(prometheus_archive_path, 'wb') as binary_file:
-                log.info(f'Downloading prometheus archive {url_file_name}...')
-                with httpx.stream('GET', zip_url, follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download prometheus archive {zip_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-                        prometheus_archive_hash.update(data)
-        except httpx.RequestError as exception:
+            log.info(f'Downloading prometheus archive {url_file_name}...')
+            run_download_dialog(
+                title='Downloading Prometheus',
+                text=f'Downloading prometheus archive {url_file_name}...',
+                download=lambda cancelled: download_artifact(zip_url, prometheus_archive_path,
+                    log, release_tag=release_json.get('tag_name'), cancelled=cancelled))
+        except DownloadError as exception:
             log.error(f'Exception while downloading prometheus archive. Exception {exception}')
             return False
         
@@ -8904,7 +8671,7 @@ To examine your prometheus service logs, inspect the following file:
         'time': datetime.now().timestamp()
     }
     try:
-        response = httpx.get(local_prometheus_query_url, params=params)
+        response = httpclient.get(local_prometheus_query_url, params=params)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Prometheus',
@@ -9029,7 +8796,7 @@ To examine your prometheus service logs, inspect the following file:
             'time': datetime.now().timestamp()
         }
         try:
-            response = httpx.get(local_prometheus_query_url, params=params)
+            response = httpclient.get(local_prometheus_query_url, params=params)
         except httpx.RequestError as exception:
             result = button_dialog(
                 title='Cannot connect to Prometheus',
@@ -9258,7 +9025,7 @@ Do you want to skip installing windows exporter?
         we_gh_release_url = GITHUB_REST_API_URL + WINDOWS_EXPORTER_LATEST_RELEASE
         headers = {'Accept': GITHUB_API_VERSION}
         try:
-            response = httpx.get(we_gh_release_url, headers=headers, follow_redirects=True)
+            response = httpclient.get(we_gh_release_url, headers=headers, follow_redirects=True)
         except httpx.RequestError as exception:
             log.error(f'Cannot get latest Windows Exporter release from Github. '
                     f'Exception {exception}')
@@ -9307,16 +9074,13 @@ Do you want to skip installing windows exporter?
         we_installer_path = download_path.joinpath(url_file_name)
 
         try:
-            with open(we_installer_path, 'wb') as binary_file:
-                log.info(f'Downloading windows exporter installer {url_file_name}...')
-                with httpx.stream('GET', installer_url, follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download windows exporter installer {installer_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-        except httpx.RequestError as exception:
+            log.info(f'Downloading windows exporter installer {url_file_name}...')
+            run_download_dialog(
+                title='Downloading Windows Exporter',
+                text=f'Downloading windows exporter installer {url_file_name}...',
+                download=lambda cancelled: download_artifact(installer_url, we_installer_path,
+                    log, release_tag=release_json.get('tag_name'), cancelled=cancelled))
+        except DownloadError as exception:
             log.error(f'Exception while downloading windows exporter installer. '
                 f'Exception {exception}')
             return False
@@ -9348,7 +9112,7 @@ Do you want to skip installing windows exporter?
     # Test Windows Exporter to see if we can read some metrics
     local_we_query_url = 'http://localhost:9182/metrics'
     try:
-        response = httpx.get(local_we_query_url)
+        response = httpclient.get(local_we_query_url)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Windows Exporter',
@@ -9461,7 +9225,7 @@ Viewer for Application with source windows_exporter.
         time.sleep(5)
 
         try:
-            response = httpx.get(local_we_query_url)
+            response = httpclient.get(local_we_query_url)
         except httpx.RequestError as exception:
             result = button_dialog(
                 title='Cannot connect to Windows Exporter',
@@ -9690,7 +9454,7 @@ Do you want to skip installing the grafana binary distribution?
         ) and retry_index < retry_count:
             try:
                 timeout_delay = base_timeout + (timeout_retry_increment * retry_index)
-                response = httpx.get(GRAFANA_DOWNLOAD_URL, params=GRAFANA_WINDOWS_PARAM,
+                response = httpclient.get(GRAFANA_DOWNLOAD_URL, params=GRAFANA_WINDOWS_PARAM,
                     timeout=timeout_delay, follow_redirects=True)
             except httpx.RequestError as exception:
                 log.error(f'Cannot connect to Grafana download page. Exception {exception}.')
@@ -9753,22 +9517,17 @@ Do you want to skip installing the grafana binary distribution?
         zip_url = archive_url
 
         grafana_archive_path = download_path.joinpath(url_file_name)
-        grafana_archive_hash = hashlib.sha256()
         if grafana_archive_path.is_file():
             grafana_archive_path.unlink()
 
         try:
-            with open(grafana_archive_path, 'wb') as binary_file:
-                log.info(f'Downloading grafana archive {url_file_name}...')
-                with httpx.stream('GET', zip_url, follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download grafana archive {zip_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        return False
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-                        grafana_archive_hash.update(data)
-        except httpx.RequestError as exception:
+            log.info(f'Downloading grafana archive {url_file_name}...')
+            grafana_archive_hash = run_download_dialog(
+                title='Downloading Grafana',
+                text=f'Downloading grafana archive {url_file_name}...',
+                download=lambda cancelled: download_artifact(zip_url, grafana_archive_path, log,
+                    segmented=True, cancelled=cancelled))
+        except DownloadError as exception:
             log.error(f'Exception while downloading grafana archive. Exception {exception}')
             return False
         
@@ -9922,42 +9681,45 @@ providers:
 '''
         )
     
+    # Dashboards are shipped as compressed package data and only loaded here
+    from ethwizard.dashboards import load_grafana_dashboard
+
     if execution_client == EXECUTION_CLIENT_GETH:
         geth_dashboard_file = grafana_dashboard_dir.joinpath('geth.json')
         with open(geth_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(GETH_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('geth'))
     elif execution_client == EXECUTION_CLIENT_NETHERMIND:
         nethermind_dashboard_file = grafana_dashboard_dir.joinpath('nethermind.json')
         with open(nethermind_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(NETHERMIND_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('nethermind'))
     
     windows_system_dashboard_file = grafana_dashboard_dir.joinpath('windows-system.json')
     with open(windows_system_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-        dashboard_file.write(WINDOWS_SYSTEM_OVERVIEW_GRAFANA_DASHBOARD)
+        dashboard_file.write(load_grafana_dashboard('windows-system'))
     
     windows_services_dashboard_file = grafana_dashboard_dir.joinpath('windows-services.json')
     with open(windows_services_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-        dashboard_file.write(WINDOWS_SERVICES_PROCESSES_GRAFANA_DASHBOARD)
+        dashboard_file.write(load_grafana_dashboard('windows-services'))
     
     if consensus_client == CONSENSUS_CLIENT_TEKU:
         teku_dashboard_file = grafana_dashboard_dir.joinpath('teku.json')
         with open(teku_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(TEKU_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('teku'))
     elif consensus_client == CONSENSUS_CLIENT_NIMBUS:
         nimbus_dashboard_file = grafana_dashboard_dir.joinpath('nimbus.json')
         with open(nimbus_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(NIMBUS_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('nimbus'))
     elif consensus_client == CONSENSUS_CLIENT_LIGHTHOUSE:
         lighthouse_summary_dashboard_file = grafana_dashboard_dir.joinpath('lighthouse-summary.json')
         with open(lighthouse_summary_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(LIGHTHOUSE_SUMMARY_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('lighthouse-summary'))
         lighthouse_vc_dashboard_file = grafana_dashboard_dir.joinpath('lighthouse-vc.json')
         with open(lighthouse_vc_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-            dashboard_file.write(LIGHTHOUSE_VC_GRAFANA_DASHBOARD)
+            dashboard_file.write(load_grafana_dashboard('lighthouse-vc'))
     
     home_dashboard_file = grafana_dashboard_dir.joinpath('home.json')
     with open(home_dashboard_file, 'w', encoding='utf8') as dashboard_file:
-        dashboard_file.write(HOME_GRAFANA_DASHBOARD)
+        dashboard_file.write(load_grafana_dashboard('home'))
 
     # Create grafana custom config file
     sample_config_content = None
@@ -10126,7 +9888,7 @@ To examine your grafana service logs, inspect the following file:
     # Test if Grafana is working properly
     local_grafana_url = 'http://localhost:3000/login'
     try:
-        response = httpx.get(local_grafana_url)
+        response = httpclient.get(local_grafana_url)
     except httpx.RequestError as exception:
         result = button_dialog(
             title='Cannot connect to Grafana',
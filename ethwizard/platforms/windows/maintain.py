@@ -4,25 +4,43 @@ import re
 import time
 import os
 import shlex
-import hashlib
-import shutil
 
 from pathlib import Path
 
 from urllib.parse import urljoin, urlparse
 
-from defusedxml import ElementTree
 
-from dateutil.parser import parse as dateparse
+from packaging.version import parse as parse_version, Version
 
-from zipfile import ZipFile
+from ethwizard.platforms import httpclient
 
-from packaging.version import parse as parse_version, Version
+from ethwizard.platforms.download import DownloadError, DownloadStatusError
+
+from ethwizard.platforms.artifacts import (
+    download_artifact,
+    download_assets,
+    iter_artifact,
+    discard_artifact,
+    discard_assets
+)
+
+from ethwizard.platforms.extract import (
+    extract_archive,
+    select_names,
+    strip_components,
+    ExtractError,
+    SignatureVerifier
+)
+
+from ethwizard.platforms.windows.gethstore import GethStoreError, get_latest_geth_build
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import button_dialog
+from prompt_toolkit.formatted_text.html import html_escape
+from ethwizard.platforms.headless import button_dialog
 
 from ethwizard.platforms.common import (
+    format_step_metrics,
+    run_download_dialog,
     select_fee_recipient_address,
     get_geth_running_version,
     get_geth_latest_version,
@@ -30,17 +48,25 @@ from ethwizard.platforms.common import (
     get_nethermind_latest_version,
     get_mevboost_latest_version,
     get_nimbus_latest_version,
-    get_lighthouse_latest_version
+    get_lighthouse_latest_version,
+    get_configured_relays,
+    benchmark_mev_relays,
+    format_relay_benchmark,
+    get_relays_within_budget
 )
 
+from ethwizard.platforms.releases import github_release_cache, ReleaseCacheError
+
+from ethwizard.platforms.probes import Probe, run_probes
+
 from ethwizard.platforms.windows.common import (
     save_state,
     log,
     quit_app,
     get_service_details,
     get_nssm_binary,
-    is_stable_windows_amd64_archive,
     install_gpg,
+    get_keyring,
     set_service_param,
     setup_jwt_token_file,
     is_adx_supported
@@ -51,6 +77,7 @@ from ethwizard.constants import (
     CTX_SELECTED_CONSENSUS_CLIENT,
     CTX_SELECTED_NETWORK,
     CTX_MEVBOOST_INSTALLED,
+    CTX_STEP_METRICS,
     CTX_SELECTED_DIRECTORY,
     EXECUTION_CLIENT_GETH,
     EXECUTION_CLIENT_NETHERMIND,
@@ -81,10 +108,10 @@ from ethwizard.constants import (
     NIMBUS_LATEST_RELEASE,
     LIGHTHOUSE_LATEST_RELEASE,
     LIGHTHOUSE_PRIME_PGP_KEY_ID,
-    GETH_STORE_BUILDS_PARAMS,
     GETH_STORE_BUILDS_URL,
     GETH_BUILDS_BASE_URL,
-    PGP_KEY_SERVERS,
+    PROBE_PACKAGE_TIMEOUT,
+    PROBE_DETAILS_TIMEOUT,
     GETH_WINDOWS_PGP_KEY_ID,
     NETWORK_GOERLI,
     CTX_EXECUTION_IMPROVED_SERVICE_TIMEOUT,
@@ -126,10 +153,22 @@ def show_dashboard(context):
     current_consensus_improved_service_timeout = context[consensus_improved_service_timeout]
     current_mevboost_installed = context[mevboost_installed]
 
-    # Get execution client details
+    # Get execution client, consensus client and MEV-Boost details concurrently
+
+    details_probes = {
+        'execution': Probe(lambda: get_execution_client_details(current_directory,
+            current_execution_client), timeout=PROBE_DETAILS_TIMEOUT, default=False),
+        'consensus': Probe(lambda: get_consensus_client_details(current_directory,
+            current_consensus_client), timeout=PROBE_DETAILS_TIMEOUT, default=False)
+    }
+
+    if current_mevboost_installed:
+        details_probes['mevboost'] = Probe(lambda: get_mevboost_details(current_directory),
+            timeout=PROBE_DETAILS_TIMEOUT, default=False)
+
+    all_details = run_probes(details_probes, log)
 
-    execution_client_details = get_execution_client_details(current_directory,
-        current_execution_client)
+    execution_client_details = all_details['execution']
     if not execution_client_details:
         log.error('Unable to get execution client details.')
         return False
@@ -239,10 +278,9 @@ def show_dashboard(context):
     if not execution_client_details['service']['found']:
         execution_client_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
-    # Get consensus client details
+    # Check consensus client details
 
-    consensus_client_details = get_consensus_client_details(current_directory,
-        current_consensus_client)
+    consensus_client_details = all_details['consensus']
     if not consensus_client_details:
         log.error('Unable to get consensus client details.')
         return False
@@ -349,13 +387,13 @@ def show_dashboard(context):
             not consensus_client_details['vc_service']['found']):
             consensus_client_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
-    # Get MEV-Boost details
+    # Check MEV-Boost details
 
     mevboost_details = None
 
     if current_mevboost_installed:
 
-        mevboost_details = get_mevboost_details(current_directory)
+        mevboost_details = all_details['mevboost']
         if not mevboost_details:
             log.error('Unable to get MEV-Boost details.')
             return False
@@ -387,6 +425,8 @@ def show_dashboard(context):
         if not mevboost_details['service']['found']:
             mevboost_details['next_step'] = MAINTENANCE_REINSTALL_CLIENT
 
+    log.info(github_release_cache.format_stats())
+
     # We only need to do maintenance if one of clients or MEV-Boost needs maintenance.
 
     no_maintenance_tasks = set((MAINTENANCE_DO_NOTHING, MAINTENANCE_CHECK_AGAIN_SOON))
@@ -462,11 +502,25 @@ def show_dashboard(context):
     mb_section = ''
 
     if current_mevboost_installed:
+        mb_relays_section = ''
+
+        if mevboost_details['relays']:
+            mb_relays_section = (f'Relays ({len(get_relays_within_budget(mevboost_details["relays"]))}'
+                f' of {len(mevboost_details["relays"])} within the latency budget):\n'
+                f'{html_escape(format_relay_benchmark(mevboost_details["relays"]))}\n')
+
         mb_section = (f'\n\n<b>MEV-Boost</b> details (I: {mevboost_details["versions"]["installed"]}, '
             f'L: {mevboost_details["versions"]["latest"]})\n'
             f'Service is running: {mevboost_details["service"]["running"]}\n'
+            f'{mb_relays_section}'
             f'<b>Maintenance task</b>: {maintenance_tasks_description.get(mevboost_details["next_step"], UNKNOWN_VALUE)}')
 
+    step_metrics_section = ''
+
+    if context.get(CTX_STEP_METRICS):
+        step_metrics_section = (f'\n\n<b>Installation</b> details\n'
+            f'{html_escape(format_step_metrics(context[CTX_STEP_METRICS], slowest_count=1))}')
+
     result = button_dialog(
         title='Maintenance Dashboard',
         text=(HTML(
@@ -475,7 +529,7 @@ Here are some details about your Ethereum clients.
 
 {ec_section}
 
-{cc_section}{mb_section}
+{cc_section}{mb_section}{step_metrics_section}
 
 {maintenance_message}
 
@@ -530,6 +584,7 @@ def get_mevboost_details(base_directory):
             'path': UNKNOWN_VALUE,
             'argv': []
         },
+        'relays': {}
     }
     
     # Check for existing service
@@ -550,12 +605,22 @@ def get_mevboost_details(base_directory):
     details['service']['parameters'] = service_details['parameters']['AppParameters']
     details['service']['running'] = is_service_running(service_details)
 
-    details['versions']['installed'] = get_mevboost_installed_version(base_directory)
-    details['versions']['latest'] = get_mevboost_latest_version(log)
-
     details['exec']['path'] = service_details['install']
     details['exec']['argv'] = shlex.split(service_details['parameters']['AppParameters'], posix=False)
 
+    # Benchmark the configured relays along with the version probes
+    relays = get_configured_relays(details['exec']['argv'])
+
+    probe_results = run_probes({
+        'installed': lambda: get_mevboost_installed_version(base_directory),
+        'latest': lambda: get_mevboost_latest_version(log),
+        'relays': Probe(lambda: benchmark_mev_relays(relays, log), default={})
+    }, log)
+
+    details['versions']['installed'] = probe_results['installed']
+    details['versions']['latest'] = probe_results['latest']
+    details['relays'] = probe_results['relays']
+
     return details
 
 def get_mevboost_installed_version(base_directory):
@@ -635,9 +700,11 @@ def get_execution_client_details(base_directory, execution_client):
         details['service']['parameters'] = service_details['parameters']['AppParameters']
         details['service']['running'] = is_service_running(service_details)
 
-        details['versions']['installed'] = get_geth_installed_version(base_directory)
-        details['versions']['running'] = get_geth_running_version(log)
-        details['versions']['latest'] = get_geth_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': lambda: get_geth_installed_version(base_directory),
+            'running': lambda: get_geth_running_version(log),
+            'latest': lambda: get_geth_latest_version(log)
+        }, log))
 
         details['exec']['path'] = service_details['install']
         details['exec']['argv'] = shlex.split(service_details['parameters']['AppParameters'], posix=False)
@@ -694,10 +761,13 @@ def get_execution_client_details(base_directory, execution_client):
         details['service']['parameters'] = service_details['parameters']['AppParameters']
         details['service']['running'] = is_service_running(service_details)
 
-        details['versions']['installed'] = get_nethermind_installed_version(base_directory)
-        details['versions']['running'] = get_nethermind_running_version(log)
-        details['versions']['available'] = get_nethermind_available_version()
-        details['versions']['latest'] = get_nethermind_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': lambda: get_nethermind_installed_version(base_directory),
+            'running': lambda: get_nethermind_running_version(log),
+            'available': Probe(get_nethermind_available_version,
+                timeout=PROBE_PACKAGE_TIMEOUT),
+            'latest': lambda: get_nethermind_latest_version(log)
+        }, log))
 
         details['exec']['path'] = service_details['install']
         details['exec']['argv'] = shlex.split(service_details['parameters']['AppParameters'], posix=False)
@@ -885,9 +955,11 @@ def get_consensus_client_details(base_directory, consensus_client):
         details['is_merge_configured'] = (
             execution_jwt_flag_found and execution_endpoint_flag_found)
 
-        details['versions']['installed'] = get_teku_installed_version(base_directory)
-        details['versions']['running'] = get_teku_running_version()
-        details['versions']['latest'] = get_teku_latest_version()
+        details['versions'].update(run_probes({
+            'installed': lambda: get_teku_installed_version(base_directory),
+            'running': get_teku_running_version,
+            'latest': get_teku_latest_version
+        }, log))
 
         return details
 
@@ -943,9 +1015,11 @@ def get_consensus_client_details(base_directory, consensus_client):
         
         details['is_merge_configured'] = execution_jwt_flag_found
 
-        details['versions']['installed'] = get_nimbus_installed_version(base_directory)
-        details['versions']['running'] = get_nimbus_running_version()
-        details['versions']['latest'] = get_nimbus_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': lambda: get_nimbus_installed_version(base_directory),
+            'running': get_nimbus_running_version,
+            'latest': lambda: get_nimbus_latest_version(log)
+        }, log))
 
         return details
 
@@ -1043,9 +1117,11 @@ def get_consensus_client_details(base_directory, consensus_client):
                 details['is_vc_merge_configured'] = True
                 break
 
-        details['versions']['installed'] = get_lighthouse_installed_version(base_directory)
-        details['versions']['running'] = get_lighthouse_running_version()
-        details['versions']['latest'] = get_lighthouse_latest_version(log)
+        details['versions'].update(run_probes({
+            'installed': lambda: get_lighthouse_installed_version(base_directory),
+            'running': get_lighthouse_running_version,
+            'latest': lambda: get_lighthouse_latest_version(log)
+        }, log))
 
         return details
 
@@ -1107,7 +1183,7 @@ def get_nimbus_running_version():
     local_nimbus_bn_version_url = 'http://127.0.0.1:5052' + BN_VERSION_EP
 
     try:
-        response = httpx.get(local_nimbus_bn_version_url)
+        response = httpclient.get(local_nimbus_bn_version_url)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Nimbus. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1186,7 +1262,7 @@ def get_lighthouse_running_version():
     local_lighthouse_bn_version_url = 'http://127.0.0.1:5052' + BN_VERSION_EP
 
     try:
-        response = httpx.get(local_lighthouse_bn_version_url)
+        response = httpclient.get(local_lighthouse_bn_version_url)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Nimbus. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1263,7 +1339,7 @@ def get_teku_running_version():
     local_teku_bn_version_url = 'http://127.0.0.1:5051' + BN_VERSION_EP
 
     try:
-        response = httpx.get(local_teku_bn_version_url)
+        response = httpclient.get(local_teku_bn_version_url)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Teku. Exception: {exception}')
         return UNKNOWN_VALUE
@@ -1299,22 +1375,12 @@ def get_teku_latest_version():
 
     log.info('Getting Teku latest version...')
 
-    teku_gh_release_url = GITHUB_REST_API_URL + TEKU_LATEST_RELEASE
-    headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(teku_gh_release_url, headers=headers,
-            follow_redirects=True)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while getting the latest stable version for Teku. {exception}')
+        release_json = github_release_cache.get_release(TEKU_LATEST_RELEASE)
+    except ReleaseCacheError as exception:
+        log.error(f'Unable to get the latest stable version for Teku. {exception}')
         return UNKNOWN_VALUE
 
-    if response.status_code != 200:
-        log.error(f'HTTP error while getting the latest stable version for Teku. '
-            f'Status code {response.status_code}')
-        return UNKNOWN_VALUE
-    
-    release_json = response.json()
-
     if 'tag_name' not in release_json or not isinstance(release_json['tag_name'], str):
         log.error(f'Unable to find tag name in Github response while getting the latest stable '
             f'version for Teku.')
@@ -1672,7 +1738,7 @@ def upgrade_mevboost(base_directory, nssm_binary):
     mevboost_gh_release_url = GITHUB_REST_API_URL + MEVBOOST_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(mevboost_gh_release_url, headers=headers,
+        response = httpclient.get(mevboost_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading MEV-Boost binary. {exception}')
@@ -1726,54 +1792,22 @@ def upgrade_mevboost(base_directory, nssm_binary):
     download_path = base_directory.joinpath('downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = download_path.joinpath(binary_asset['file_name'])
-    if binary_path.is_file():
-        binary_path.unlink()
-
-    binary_hash = hashlib.sha256()
-
     try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading MEV-Boost binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-
-                archive_filename = binary_asset['file_name']
-                archive_url = binary_asset['file_url']
-                log.info(f'Downloading {archive_filename} from {archive_url} ...')
-
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-                    binary_hash.update(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading MEV-Boost binary from Github. {exception}')
+        files, hashes = run_download_dialog(
+            title='Downloading MEV-Boost',
+            text=f'Downloading MEV-Boost release files for {archive_filename}...',
+            download=lambda cancelled: download_assets({
+                'binary': binary_asset,
+                'checksums': checksums_asset
+            }, download_path, log, release_tag=release_json.get('tag_name'),
+                cancelled=cancelled))
+    except DownloadError as exception:
+        log.error(f'Exception while downloading MEV-Boost release files from Github. {exception}')
         return False
-    
-    checksums_path = download_path.joinpath(checksums_asset['file_name'])
-    if checksums_path.is_file():
-        checksums_path.unlink()
-
-    try:
-        with open(checksums_path, 'wb') as checksums_file:
-            with httpx.stream('GET', checksums_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading MEV-Boost checksums from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                
-                archive_filename = checksums_asset['file_name']
-                archive_url = checksums_asset['file_url']
-                log.info(f'Downloading {archive_filename} from {archive_url} ...')
 
-                for data in http_stream.iter_bytes():
-                    checksums_file.write(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading MEV-Boost checksums from Github. {exception}')
-        return False
+    binary_path = files['binary']
+    binary_hash = hashes['binary']
+    checksums_path = files['checksums']
 
     # Verify checksum
 
@@ -1793,6 +1827,10 @@ def upgrade_mevboost(base_directory, nssm_binary):
                     log.error(f'SHA256 checksum failed on MEV-Boost binary from '
                         f'Github. Expected {checksum} but we got {binary_hexdigest}. We will '
                         f'stop here to protect you.')
+                    discard_assets({
+                        'binary': binary_asset,
+                        'checksums': checksums_asset
+                    }, download_path, release_tag=release_json.get('tag_name'))
                     return False
                 
                 log.info('Good SHA256 checksum for MEV-Boost binary.')
@@ -1830,85 +1868,26 @@ def upgrade_geth(base_directory, nssm_binary):
     # Upgrade the Geth client
     log.info('Upgrading Geth client...')
 
-    # Get list of geth releases/builds from their store
-    next_marker = None
-    page_end_found = False
-
-    windows_builds = []
-
+    # Get the latest geth build from the build store index
     try:
         log.info('Getting geth builds...')
-        while not page_end_found:
-            params = GETH_STORE_BUILDS_PARAMS.copy()
-            if next_marker is not None:
-                params['marker'] = next_marker
-
-            response = httpx.get(GETH_STORE_BUILDS_URL, params=params, follow_redirects=True)
-
-            if response.status_code != 200:
-                log.error(f'Cannot connect to geth builds URL {GETH_STORE_BUILDS_URL}.\n'
-                    f'Unexpected status code {response.status_code}')
-                return False
-            
-            builds_tree_root = ElementTree.fromstring(response.text)
-            blobs = builds_tree_root.findall('.//Blobs/Blob')
-
-            for blob in blobs:
-                build_name = blob.find('Name').text.strip()
-                if build_name.endswith('.asc'):
-                    continue
-
-                if not is_stable_windows_amd64_archive(build_name):
-                    continue
-
-                build_properties = blob.find('Properties')
-                last_modified_date = dateparse(build_properties.find('Last-Modified').text)
-
-                windows_builds.append({
-                    'name': build_name,
-                    'last_modified_date': last_modified_date
-                })
-
-            next_marker = builds_tree_root.find('.//NextMarker').text
-            if next_marker is None:
-                page_end_found = True
-
-    except httpx.RequestError as exception:
+        latest_build = get_latest_geth_build(base_directory, log)
+    except GethStoreError as exception:
         log.error(f'Cannot connect to geth builds URL {GETH_STORE_BUILDS_URL}.\n'
             f'Exception {exception}')
         return False
 
-    if len(windows_builds) <= 0:
+    if latest_build is None:
         log.error('No geth builds found on geth store. We cannot continue.')
         return False
 
     # Download latest geth build and its signature
-    windows_builds.sort(key=lambda x: (x['last_modified_date'], x['name']), reverse=True)
-    latest_build = windows_builds[0]
 
     download_path = base_directory.joinpath('downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    geth_archive_path = download_path.joinpath(latest_build['name'])
-    if geth_archive_path.is_file():
-        geth_archive_path.unlink()
-
     latest_build_url = urljoin(GETH_BUILDS_BASE_URL, latest_build['name'])
 
-    try:
-        with open(geth_archive_path, 'wb') as binary_file:
-            log.info(f'Downloading geth archive {latest_build["name"]}...')
-            with httpx.stream('GET', latest_build_url, follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'Cannot download geth archive {latest_build_url}.\n'
-                        f'Unexpected status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading geth archive. Exception {exception}')
-        return False
-
     geth_archive_sig_path = download_path.joinpath(latest_build['name'] + '.asc')
     if geth_archive_sig_path.is_file():
         geth_archive_sig_path.unlink()
@@ -1916,90 +1895,64 @@ def upgrade_geth(base_directory, nssm_binary):
     latest_build_sig_url = urljoin(GETH_BUILDS_BASE_URL, latest_build['name'] + '.asc')
 
     try:
-        with open(geth_archive_sig_path, 'wb') as binary_file:
-            log.info(f'Downloading geth archive signature {latest_build["name"]}.asc...')
-            with httpx.stream('GET', latest_build_sig_url,
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'Cannot download geth archive signature {latest_build_sig_url}.\n'
-                        f'Unexpected status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        log.info(f'Downloading geth archive signature {latest_build["name"]}.asc...')
+        download_artifact(latest_build_sig_url, geth_archive_sig_path, log)
+    except DownloadError as exception:
         log.error(f'Exception while downloading geth archive signature. Exception {exception}')
         return False
 
     if not install_gpg(base_directory):
         return False
     
-    # Verify PGP signature
+    # Get the PGP key before streaming the archive
     gpg_binary_path = base_directory.joinpath('bin', 'gpg.exe')
 
-    command_line = [str(gpg_binary_path), '--list-keys', '--with-colons', GETH_WINDOWS_PGP_KEY_ID]
-    process_result = subprocess.run(command_line)
-    pgp_key_found = process_result.returncode == 0
-
-    if not pgp_key_found:
-
-        retry_index = 0
-        retry_count = 15
-
-        key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-        log.info(f'Downloading Geth Windows Builder PGP key from {key_server} ...')
-        command_line = [str(gpg_binary_path), '--keyserver', key_server,
-            '--recv-keys', GETH_WINDOWS_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
-
-        if process_result.returncode != 0:
-            # GPG failed to download Geth Windows Builder PGP key, let's wait and retry a few times
-            while process_result.returncode != 0 and retry_index < retry_count:
-                retry_index = retry_index + 1
-                delay = 5
-                log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                    f'and try again from a different server.')
-                time.sleep(delay)
-
-                key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                log.info(f'Downloading Geth Windows Builder PGP key from {key_server} ...')
-                command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                    '--recv-keys', GETH_WINDOWS_PGP_KEY_ID]
-
-                process_result = subprocess.run(command_line)
-        
-        if process_result.returncode != 0:
-            log.error(
-f'''
+    keyring = get_keyring(base_directory)
+    if not keyring.ensure_key(GETH_WINDOWS_PGP_KEY_ID, log):
+        log.error(
+'''
 We failed to download the Geth Windows Builder PGP key to verify the geth
-archive after {retry_count} retries.
+archive.
 '''
-            )
-            return False
-    
-    process_result = subprocess.run([
-        str(gpg_binary_path), '--verify', str(geth_archive_sig_path)])
-    if process_result.returncode != 0:
-        log.error('The geth archive signature is wrong. We\'ll stop here to protect you.')
+        )
         return False
-    
-    # Remove download leftovers
-    geth_archive_sig_path.unlink()        
 
-    # Unzip geth archive
+    # Downloading, verifying and extracting the geth binary in a single pass
     bin_path = base_directory.joinpath('bin')
     bin_path.mkdir(parents=True, exist_ok=True)
 
-    geth_extracted_binary = None
+    verifier = SignatureVerifier(geth_archive_sig_path, gpg_binary_path,
+        gpg_arguments=keyring.get_gpg_arguments(), log=log)
 
-    with ZipFile(geth_archive_path, 'r') as zip_file:
-        for name in zip_file.namelist():
-            if name.endswith('geth.exe'):
-                geth_extracted_binary = Path(zip_file.extract(name, download_path))
+    try:
+        log.info(f'Downloading and extracting geth archive {latest_build["name"]}...')
+        staged = run_download_dialog(
+            title='Downloading Geth',
+            text=f'Downloading and extracting geth archive {latest_build["name"]}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(latest_build_url, download_path, log, cancelled=cancelled),
+                latest_build['name'], bin_path, select=select_names({'geth.exe': 'geth.exe'}),
+                tee=[verifier.update]))
+    except DownloadError as exception:
+        verifier.cancel()
+        log.error(f'Exception while downloading geth archive. Exception {exception}')
+        return False
+    except (ExtractError, OSError) as exception:
+        verifier.cancel()
+        log.error(f'Unable to extract the geth archive. Exception {exception}')
+        return False
+
+    if not verifier.verify():
+        staged.abort()
+        discard_artifact(latest_build_sig_url, download_path)
+        log.error('The geth archive signature is wrong. We\'ll stop here to protect you.')
+        return False
     
     # Remove download leftovers
-    geth_archive_path.unlink()
+    geth_archive_sig_path.unlink()        
 
-    if geth_extracted_binary is None:
+    if len(staged.files) == 0:
+        staged.abort()
         log.error('The geth binary was not found in the archive. We cannot continue.')
         return False
 
@@ -2007,14 +1960,8 @@ archive after {retry_count} retries.
     log.info('Stopping Geth service...')
     subprocess.run([str(nssm_binary), 'stop', geth_service_name])
 
-    # Move geth back into bin directory
-    target_geth_binary_path = bin_path.joinpath('geth.exe')
-    if target_geth_binary_path.is_file():
-        target_geth_binary_path.unlink()
-    
-    geth_extracted_binary.rename(target_geth_binary_path)
-
-    geth_extracted_binary.parent.rmdir()
+    # Move geth into bin directory
+    staged.commit()
 
     log.info('Starting Geth service...')
     subprocess.run([str(nssm_binary), 'start', geth_service_name])
@@ -2134,7 +2081,7 @@ def upgrade_nimbus(base_directory, nssm_binary):
     nimbus_gh_release_url = GITHUB_REST_API_URL + NIMBUS_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(nimbus_gh_release_url, headers=headers,
+        response = httpclient.get(nimbus_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading Nimbus binary. {exception}')
@@ -2178,77 +2125,49 @@ def upgrade_nimbus(base_directory, nssm_binary):
     download_path = base_directory.joinpath('downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = Path(download_path, binary_asset['file_name'])
+    # Downloading and extracting the Nimbus binaries from the archive in a single pass
+    archive_filename = binary_asset['file_name']
+    log.info(f'Downloading and extracting {archive_filename} ...')
+
+    bin_path = base_directory.joinpath('bin')
+    bin_path.mkdir(parents=True, exist_ok=True)
+
+    nimbus_binaries = ['nimbus_beacon_node.exe', 'nimbus_validator_client.exe']
+
+    def select_nimbus_binary(name):
+        # Only keep the binaries from the build directory
+        parts = Path(name).parts
+        if len(parts) < 2 or parts[-2] != 'build' or parts[-1] not in nimbus_binaries:
+            return None
+        return parts[-1]
 
     try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Nimbus binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
+        staged = run_download_dialog(
+            title='Downloading Nimbus',
+            text=f'Downloading and extracting Nimbus archive {archive_filename}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(binary_asset['file_url'], download_path, log,
+                    release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                archive_filename, bin_path, select=select_nimbus_binary))
+    except DownloadError as exception:
         log.error(f'Exception while downloading Nimbus binary from Github. {exception}')
         return False
-    
-    extract_directory = download_path.joinpath('nimbus')
-    if extract_directory.is_dir():
-        shutil.rmtree(extract_directory)
-    elif extract_directory.is_file():
-        os.unlink(extract_directory)
-    extract_directory.mkdir(parents=True, exist_ok=True)
-    
-    # Extracting the Lighthouse binary archive
-    subprocess.run([
-        'tar', 'xvf', binary_path, '--directory', extract_directory])
-    
-    # Remove download leftovers
-    binary_path.unlink()
-
-    # Find the Nimbus binaries and copy them in their installed location
-    build_path = None
-
-    with os.scandir(extract_directory) as it:
-        for entry in it:
-            if entry.is_dir():
-                if entry.name == 'build':
-                    build_path = entry.path
-                else:
-                    build_path = os.path.join(entry.path, 'build')
-                break
-    
-    if build_path is None:
-        log.error('Cannot find the correct directory in the extracted Nimbus archive.')
+    except (ExtractError, OSError) as exception:
+        log.error(f'Unable to extract the Nimbus binary archive. {exception}')
         return False
 
-    src_nimbus_bn_path = Path(build_path, 'nimbus_beacon_node.exe')
-    src_nimbus_vc_path = Path(build_path, 'nimbus_validator_client.exe')
-
-    if not src_nimbus_bn_path.is_file() or not src_nimbus_vc_path.is_file():
+    if sorted(path.name for path in staged.files) != sorted(nimbus_binaries):
+        staged.abort()
         log.error(f'Cannot find the Nimbus binaries in the extracted archive.')
         return False
-    
-    bin_path = base_directory.joinpath('bin')
-    bin_path.mkdir(parents=True, exist_ok=True)
 
     nimbus_service_name = 'nimbus'
     subprocess.run([str(nssm_binary), 'stop', nimbus_service_name])
 
     dest_nimbus_bn_path = bin_path.joinpath('nimbus_beacon_node.exe')
-    dest_nimbus_vc_path = bin_path.joinpath('nimbus_validator_client.exe')
-    if dest_nimbus_bn_path.is_file():
-        dest_nimbus_bn_path.unlink()
-    if dest_nimbus_vc_path.is_file():
-        dest_nimbus_vc_path.unlink()
-
-    shutil.move(src_nimbus_bn_path, bin_path)
-    shutil.move(src_nimbus_vc_path, bin_path)
 
-    # Remove extraction leftovers
-    shutil.rmtree(extract_directory)
+    # Move the Nimbus binaries into bin directory
+    staged.commit()
 
     # Make sure Nimbus was installed properly
     nimbus_path = dest_nimbus_bn_path
@@ -2284,7 +2203,7 @@ def upgrade_lighthouse(base_directory, nssm_binary):
     lighthouse_gh_release_url = GITHUB_REST_API_URL + LIGHTHOUSE_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(lighthouse_gh_release_url, headers=headers,
+        response = httpclient.get(lighthouse_gh_release_url, headers=headers,
             follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Exception while downloading Lighthouse binary. {exception}')
@@ -2342,117 +2261,94 @@ def upgrade_lighthouse(base_directory, nssm_binary):
     download_path = base_directory.joinpath('downloads')
     download_path.mkdir(parents=True, exist_ok=True)
 
-    binary_path = Path(download_path, binary_asset['file_name'])
-
-    try:
-        with open(binary_path, 'wb') as binary_file:
-            with httpx.stream('GET', binary_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Lighthouse binary from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    binary_file.write(data)
-    except httpx.RequestError as exception:
-        log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
-        return False
-    
-    signature_path = Path(download_path, signature_asset['file_name'])
+    signature_path = download_path.joinpath(signature_asset['file_name'])
 
     try:
-        with open(signature_path, 'wb') as signature_file:
-            with httpx.stream('GET', signature_asset['file_url'],
-                follow_redirects=True) as http_stream:
-                if http_stream.status_code != 200:
-                    log.error(f'HTTP error while downloading Lighthouse signature from Github. '
-                        f'Status code {http_stream.status_code}')
-                    return False
-                for data in http_stream.iter_bytes():
-                    signature_file.write(data)
-    except httpx.RequestError as exception:
+        download_artifact(signature_asset['file_url'], signature_path, log,
+            release_tag=release_json.get('tag_name'))
+    except DownloadError as exception:
         log.error(f'Exception while downloading Lighthouse signature from Github. {exception}')
         return False
-    
+
     if not install_gpg(base_directory):
         return False
     
-    # Verify PGP signature
+    # Get the PGP key before streaming the archive
     gpg_binary_path = base_directory.joinpath('bin', 'gpg.exe')
 
-    command_line = [str(gpg_binary_path), '--list-keys', '--with-colons',
-        LIGHTHOUSE_PRIME_PGP_KEY_ID]
-    process_result = subprocess.run(command_line)
-    pgp_key_found = process_result.returncode == 0
+    keyring = get_keyring(base_directory)
+    pgp_key_found = keyring.ensure_key(LIGHTHOUSE_PRIME_PGP_KEY_ID, log)
 
     if not pgp_key_found:
+        log.warning(
+'''
+We failed to download the Sigma Prime's PGP key to verify the Lighthouse
+archive. We will skip signature verification.
+'''
+        )
 
-        retry_index = 0
-        retry_count = 15
+    # Downloading, verifying and extracting the Lighthouse binary in a single pass
+    archive_filename = binary_asset['file_name']
+    log.info(f'Downloading and extracting {archive_filename} ...')
 
-        key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-        log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-        command_line = [str(gpg_binary_path), '--keyserver', key_server,
-            '--recv-keys', LIGHTHOUSE_PRIME_PGP_KEY_ID]
-        process_result = subprocess.run(command_line)
+    bin_path = base_directory.joinpath('bin')
+    bin_path.mkdir(parents=True, exist_ok=True)
 
-        if process_result.returncode != 0:
-            # GPG failed to download PGP key, let's wait and retry a few times
-            while process_result.returncode != 0 and retry_index < retry_count:
-                retry_index = retry_index + 1
-                delay = 5
-                log.warning(f'GPG failed to download the PGP key. We will wait {delay} seconds '
-                    f'and try again from a different server.')
-                time.sleep(delay)
+    verifier = None
+    tee = []
+    if pgp_key_found:
+        verifier = SignatureVerifier(signature_path, gpg_binary_path,
+            gpg_arguments=keyring.get_gpg_arguments(), log=log)
+        tee.append(verifier.update)
 
-                key_server = PGP_KEY_SERVERS[retry_index % len(PGP_KEY_SERVERS)]
-                log.info(f'Downloading Sigma Prime\'s PGP key from {key_server} ...')
-                command_line = [str(gpg_binary_path), '--keyserver', key_server,
-                    '--recv-keys', LIGHTHOUSE_PRIME_PGP_KEY_ID]
+    try:
+        staged = run_download_dialog(
+            title='Downloading Lighthouse',
+            text=f'Downloading and extracting Lighthouse archive {archive_filename}...',
+            download=lambda cancelled: extract_archive(
+                iter_artifact(binary_asset['file_url'], download_path, log,
+                    release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                archive_filename, bin_path,
+                select=select_names({'lighthouse.exe': 'lighthouse.exe'}), tee=tee))
+    except DownloadError as exception:
+        if verifier is not None:
+            verifier.cancel()
+        log.error(f'Exception while downloading Lighthouse binary from Github. {exception}')
+        return False
+    except (ExtractError, OSError) as exception:
+        if verifier is not None:
+            verifier.cancel()
+        log.error(f'Unable to extract the Lighthouse binary archive. {exception}')
+        return False
 
-                process_result = subprocess.run(command_line)
+    if verifier is not None and not verifier.verify():
+        staged.abort()
+        discard_artifact(signature_asset['file_url'], download_path,
+            release_tag=release_json.get('tag_name'))
+        log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
+        return False
 
-        if process_result.returncode != 0:
-            log.warning(
-f'''
-We failed to download the Sigma Prime's PGP key to verify the Lighthouse
-archive after {retry_count} retries. We will skip signature verification.
-'''
-            )
-        else:
-            process_result = subprocess.run([
-                str(gpg_binary_path), '--verify', str(signature_path)])
-            if process_result.returncode != 0:
-                log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
-                return False
-    else:
-        process_result = subprocess.run([
-            str(gpg_binary_path), '--verify', str(signature_path)])
-        if process_result.returncode != 0:
-            log.error('The Lighthouse archive signature is wrong. We\'ll stop here to protect you.')
-            return False
-    
     # Remove download leftovers
     signature_path.unlink()
 
-    bin_path = base_directory.joinpath('bin')
-    bin_path.mkdir(parents=True, exist_ok=True)
+    if len(staged.files) == 0:
+        staged.abort()
+        log.error('The Lighthouse binary was not found in the archive. We cannot continue.')
+        return False
 
     lighthouse_bn_service_name = 'lighthousebeacon'
     lighthouse_vc_service_name = 'lighthousevalidator'
     
+    log.info('Stopping Lighthouse services...')
     subprocess.run([str(nssm_binary), 'stop', lighthouse_bn_service_name])
     subprocess.run([str(nssm_binary), 'stop', lighthouse_vc_service_name])
 
-    # Extracting the Lighthouse binary archive
-    subprocess.run([
-        'tar', 'xvf', binary_path, '--directory', bin_path])
+    # Move the Lighthouse binary into bin directory
+    staged.commit()
     
+    log.info('Starting Lighthouse services...')
     subprocess.run([str(nssm_binary), 'start', lighthouse_bn_service_name])
     subprocess.run([str(nssm_binary), 'start', lighthouse_vc_service_name])
-    
-    # Remove download leftovers
-    binary_path.unlink()
 
     lighthouse_path = base_directory.joinpath('bin', 'lighthouse.exe')
 
@@ -2495,7 +2391,7 @@ def upgrade_teku(base_directory, nssm_binary):
     teku_gh_release_url = GITHUB_REST_API_URL + TEKU_LATEST_RELEASE
     headers = {'Accept': GITHUB_API_VERSION}
     try:
-        response = httpx.get(teku_gh_release_url, headers=headers, follow_redirects=True)
+        response = httpclient.get(teku_gh_release_url, headers=headers, follow_redirects=True)
     except httpx.RequestError as exception:
         log.error(f'Cannot connect to Github. Exception {exception}')
         return False
@@ -2537,11 +2433,6 @@ def upgrade_teku(base_directory, nssm_binary):
 
     url_file_name = urlparse(zip_url).path.split('/')[-1]
 
-    teku_archive_path = download_path.joinpath(url_file_name)
-    teku_archive_hash = hashlib.sha256()
-    if teku_archive_path.is_file():
-        teku_archive_path.unlink()
-
     keep_retrying = True
 
     retry_index = 0
@@ -2555,27 +2446,30 @@ def upgrade_teku(base_directory, nssm_binary):
         last_exception = None
         last_status_code = None
         try:
-            with open(teku_archive_path, 'wb') as binary_file:
-                log.info(f'Downloading teku archive {url_file_name}...')
-                with httpx.stream('GET', zip_url, follow_redirects=True) as http_stream:
-                    if http_stream.status_code != 200:
-                        log.error(f'Cannot download teku archive {zip_url}.\n'
-                            f'Unexpected status code {http_stream.status_code}')
-                        last_status_code = http_stream.status_code
-
-                        retry_index = retry_index + 1
-                        log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
-                        time.sleep(retry_delay)
-                        retry_delay = retry_delay + retry_delay_increase
-                        continue
-
-                    for data in http_stream.iter_bytes():
-                        binary_file.write(data)
-                        teku_archive_hash.update(data)
-                
-                keep_retrying = False
+            # Downloading, hashing and extracting the teku archive in a single pass
+            log.info(f'Downloading and extracting teku archive {url_file_name}...')
+            staged = run_download_dialog(
+                title='Downloading Teku',
+                text=f'Downloading and extracting teku archive {url_file_name}...',
+                download=lambda cancelled: extract_archive(
+                    iter_artifact(zip_url, download_path, log,
+                        release_tag=release_json.get('tag_name'), cancelled=cancelled),
+                    url_file_name, teku_path, select=strip_components(1),
+                    replace_destination=True))
+            keep_retrying = False
+
+        except DownloadStatusError as exception:
+            log.error(f'Cannot download teku archive {zip_url}.\n'
+                f'Unexpected status code {exception.status_code}')
+            last_status_code = exception.status_code
 
-        except httpx.RequestError as exception:
+            retry_index = retry_index + 1
+            log.info(f'We will retry in {retry_delay} seconds (retry index = {retry_index})')
+            time.sleep(retry_delay)
+            retry_delay = retry_delay + retry_delay_increase
+            continue
+
+        except (DownloadError, ExtractError) as exception:
             
             log.error(f'Exception while downloading teku archive. Exception {exception}')
             last_exception = exception
@@ -2632,39 +2526,22 @@ is no network issue when we try to connect to the Internet.
 
     # Verify checksum
     log.info('Verifying teku archive checksum...')
-    teku_archive_hexdigest = teku_archive_hash.hexdigest()
+    teku_archive_hexdigest = staged.get_hexdigest()
     if teku_archive_hexdigest.lower() != zip_sha256.lower():
+        staged.abort()
         log.error('Teku archive checksum does not match. We will stop here to protect you.')
         return False
     
-    # Unzip teku archive
-    archive_members = None
-
-    log.info(f'Extracting teku archive {url_file_name}...')
-    with ZipFile(teku_archive_path, 'r') as zip_file:
-        archive_members = zip_file.namelist()
-        zip_file.extractall(download_path)
-    
-    # Remove download leftovers
-    teku_archive_path.unlink()
-
-    if archive_members is None or len(archive_members) == 0:
+    if len(staged.files) == 0:
+        staged.abort()
         log.error('No files found in teku archive. We cannot continue.')
         return False
     
     teku_service_name = 'teku'
     subprocess.run([str(nssm_binary), 'stop', teku_service_name])
 
-    # Move all those extracted files into their final destination
-    if teku_path.is_dir():
-        shutil.rmtree(teku_path)
-    teku_path.mkdir(parents=True, exist_ok=True)
-
-    archive_extracted_dir = download_path.joinpath(Path(archive_members[0]).parts[0])
-
-    with os.scandir(archive_extracted_dir) as it:
-        for diritem in it:
-            shutil.move(diritem.path, teku_path)
+    # Move the verified extracted files into their final destination
+    staged.commit()
         
     # Make sure teku was installed properly
     teku_found = False
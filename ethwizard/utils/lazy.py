@@ -0,0 +1,52 @@
+import importlib
+
+from types import ModuleType
+
+class LazyModule(ModuleType):
+    # Module placeholder that only imports the real module on first attribute access
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+class LazyCallable():
+    # Callable placeholder for a function or a class living in a module that is expensive
+    # to import. The module is imported on the first call.
+
+    def __init__(self, module_name: str, attribute_name: str):
+        self._module_name = module_name
+        self._attribute_name = attribute_name
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = getattr(module, self._attribute_name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+def lazy_import(module_name: str) -> LazyModule:
+    # Return a placeholder for module_name that imports it when first used
+    return LazyModule(module_name)
+
+def lazy_callable(module_name: str, attribute_name: str) -> LazyCallable:
+    # Return a placeholder for module_name.attribute_name that imports it when first called
+    return LazyCallable(module_name, attribute_name)
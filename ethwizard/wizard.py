@@ -1,9 +1,16 @@
 import sys
+import argparse
 
 from ethwizard import __version__
 
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.shortcuts import button_dialog
+from ethwizard.platforms.headless import (
+    button_dialog,
+    enable_headless,
+    is_headless,
+    emit_progress,
+    HeadlessError
+)
 
 from ethwizard.platforms import (
     get_install_steps,
@@ -13,14 +20,36 @@ from ethwizard.platforms import (
     quit_app,
     get_save_state,
     get_load_state,
-    enter_maintenance
+    enter_maintenance,
+    preload_platform_modules
 )
 
-from ethwizard.platforms.common import StepSequence, is_completed_state
+def parse_arguments():
+    # Parse the command line arguments
+
+    parser = argparse.ArgumentParser(prog='eth-wizard',
+        description='Install and maintain an Ethereum validator setup.')
+    parser.add_argument('--headless', action='store_true',
+        help='Run without any dialog. Dialogs without an answer use their default.')
+    parser.add_argument('--answers', metavar='FILE',
+        help='YAML or JSON answers file, keyed by dialog title. Implies --headless.')
+    parser.add_argument('--progress', metavar='FILE',
+        help='Write the headless progress as JSON lines to this file instead of stdout.')
+
+    return parser.parse_args()
 
 def run():
     # Main entry point for the wizard.
 
+    arguments = parse_arguments()
+
+    if arguments.headless or arguments.answers is not None:
+        try:
+            enable_headless(arguments.answers, arguments.progress)
+        except (HeadlessError, OSError, ValueError) as exception:
+            print(f'Unable to start in headless mode. {exception}', file=sys.stderr)
+            sys.exit(2)
+
     platform = supported_platform()
 
     if not platform:
@@ -35,12 +64,17 @@ def run():
         show_not_su()
         quit_app(platform)
     
+    # Import the platform modules in the background while the user reads the welcome message
+    preload_platform_modules(platform)
+
     if not show_welcome():
         # User asked to quit
         quit_app(platform)
 
     self_update()
 
+    from ethwizard.platforms.common import StepSequence, is_completed_state
+
     steps = get_install_steps(platform)
     if not steps:
         # Steps were not found for the current platform
@@ -64,6 +98,11 @@ def run():
         ):
         # If the wizard was completed, enter maintenance
         if is_completed_state(saved_state):
+            if is_headless():
+                # Maintenance is not performed unattended
+                emit_progress({'event': 'completed'})
+                quit_app(platform)
+
             # Enter maintenance mode
             enter_maintenance(platform, saved_state['context'])
             quit_app(platform)
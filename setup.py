@@ -67,7 +67,90 @@ def include_requirements(target_path):
             if entry.name.endswith('.dist-info'):
                 shutil.rmtree(entry.path)
 
-def create_zipapp(for_windows=False):
+# Bootstrap for the zipapp bundles. When the bundle contains a bytecode set compiled for the
+# running Python version, it is put in front of the sources so nothing needs to be compiled at
+# launch. Otherwise, we fall back to the sources.
+ZIPAPP_MAIN = '''import os
+import sys
+import zipimport
+
+def use_precompiled_bytecode():
+    bundle_path = os.path.dirname(os.path.abspath(__file__))
+    bytecode_path = os.path.join(bundle_path, 'bytecode', sys.implementation.cache_tag)
+
+    if os.path.isdir(bundle_path):
+        if not os.path.isdir(bytecode_path):
+            return False
+    else:
+        try:
+            importer = zipimport.zipimporter(bytecode_path)
+            importer.is_package('ethwizard')
+        except (zipimport.ZipImportError, OSError):
+            return False
+
+    sys.path.insert(0, bytecode_path)
+    return True
+
+use_precompiled_bytecode()
+
+from ethwizard import wizard
+
+if __name__ == "__main__":
+    wizard.run()
+'''
+
+def get_cache_tag(python_binary):
+    process_result = subprocess.run([
+        python_binary, '-c', 'import sys; print(sys.implementation.cache_tag)'
+    ], capture_output=True, text=True)
+    if process_result.returncode != 0:
+        return None
+    return process_result.stdout.strip()
+
+def precompile_bytecode(build_path, python_binaries):
+    # Compile the package and its vendored requirements into a bytecode set for each Python
+    # binary. Each set is stored in build_path/bytecode/<cache tag> using the legacy .pyc
+    # layout that zipimport can load. Hash based .pyc files are used so that the result does
+    # not depend on file timestamps inside the archive.
+
+    bytecode_root = Path(build_path, 'bytecode')
+    if bytecode_root.is_dir():
+        shutil.rmtree(bytecode_root)
+
+    ignore_patterns = shutil.ignore_patterns('__pycache__', 'bytecode')
+
+    def ignore_build_files(directory, names):
+        # The bootstrap __main__.py stays at the archive root only, the __main__.py files of
+        # the packages are needed for python -m
+        ignored = ignore_patterns(directory, names)
+        if Path(directory) == Path(build_path) and '__main__.py' in names:
+            ignored.add('__main__.py')
+        return ignored
+
+    for python_binary in python_binaries:
+        cache_tag = get_cache_tag(python_binary)
+        if cache_tag is None:
+            print(f'Unable to find the cache tag for {python_binary}. Skipping.')
+            continue
+
+        print(f'Precompiling bytecode for {cache_tag} with {python_binary}...')
+
+        bytecode_path = Path(bytecode_root, cache_tag)
+        shutil.copytree(build_path, bytecode_path, ignore=ignore_build_files)
+
+        process_result = subprocess.run([
+            python_binary, '-m', 'compileall', '-q', '-b', '-j', '0',
+            '--invalidation-mode', 'unchecked-hash', str(bytecode_path)
+        ])
+        if process_result.returncode != 0:
+            print(f'Some files could not be compiled with {python_binary}. They will be '
+                f'loaded from source.')
+
+        # Only keep the bytecode and the data files in the bytecode set
+        for source_path in bytecode_path.rglob('*.py'):
+            source_path.unlink()
+
+def create_zipapp(for_windows=False, precompile_binaries=None):
     project_path = Path(os.getcwd())
     src_package_path = Path(project_path, 'ethwizard')
 
@@ -84,13 +167,16 @@ def create_zipapp(for_windows=False):
     build_package_path = Path(build_path, 'ethwizard')
     shutil.copytree(src_package_path, build_package_path)
 
-    # Copy __main__.py into build root
-    src_main_path = Path(src_package_path, '__main__.py')
+    # Write the bootstrap __main__.py into build root
     build_main_path = Path(build_path, '__main__.py')
-    shutil.copyfile(src_main_path, build_main_path)
+    with open(build_main_path, 'w', encoding='utf8') as main_file:
+        main_file.write(ZIPAPP_MAIN)
 
     include_requirements(build_path)
 
+    if precompile_binaries:
+        precompile_bytecode(build_path, precompile_binaries)
+
     # Bundle with zipapp
     dist_path = Path(project_path, 'dist')
     dist_path.mkdir(parents=True, exist_ok=True)
@@ -116,21 +202,113 @@ def create_zipapp(for_windows=False):
     return bundle_path
 
 
+FIRST_DIALOG_SCRIPT = '''
+from ethwizard.platforms import supported_platform
+from ethwizard import wizard
+
+supported_platform()
+'''
+
+class ImportTime(Command):
+    ''' Profile the imports done before the first dialog and enforce a time budget
+    '''
+    description = 'profile the time to first dialog and enforce a budget'
+
+    user_options = [
+        ('budget=', None, 'maximum time to first dialog in milliseconds'),
+        ('top=', None, 'number of slowest imports to display'),
+        ('runs=', None, 'number of runs, the median run is kept'),
+    ]
+
+    def initialize_options(self):
+        self.budget = None
+        self.top = 15
+        self.runs = 3
+
+    def finalize_options(self):
+        if self.budget is not None:
+            self.budget = float(self.budget)
+        self.top = int(self.top)
+        self.runs = max(1, int(self.runs))
+
+    def run(self):
+        import time
+
+        python_binary = get_python_binary()
+
+        runs = []
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            process_result = subprocess.run([
+                python_binary, '-X', 'importtime', '-c', FIRST_DIALOG_SCRIPT
+            ], capture_output=True, text=True, cwd=os.getcwd())
+            elapsed = (time.perf_counter() - start) * 1000.0
+
+            if process_result.returncode != 0:
+                print(f'Unable to profile the time to first dialog.\n{process_result.stderr}')
+                raise SystemExit(1)
+
+            runs.append((elapsed, process_result.stderr))
+
+        runs.sort(key=lambda run: run[0])
+        elapsed, importtime_output = runs[len(runs) // 2]
+
+        # Parse python -X importtime output
+        # import time: self [us] | cumulative | imported package
+        imports = []
+        for line in importtime_output.splitlines():
+            result = re.search(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)', line)
+            if result:
+                imports.append({
+                    'self': int(result.group(1)) / 1000.0,
+                    'cumulative': int(result.group(2)) / 1000.0,
+                    'depth': len(result.group(3)) // 2,
+                    'module': result.group(4)
+                })
+
+        top_level_imports = [entry for entry in imports if entry['depth'] == 0]
+        total_imports = sum(entry['cumulative'] for entry in top_level_imports)
+
+        print('Slowest imports before the first dialog (cumulative ms):')
+        for entry in sorted(imports, key=lambda entry: entry['cumulative'],
+            reverse=True)[:self.top]:
+            print(f'{entry["cumulative"]:10.1f} {entry["self"]:10.1f}  '
+                f'{"  " * entry["depth"]}{entry["module"]}')
+
+        print(f'\nTotal import time: {total_imports:.1f} ms')
+        print(f'Time to first dialog: {elapsed:.1f} ms')
+
+        if self.budget is not None:
+            if elapsed > self.budget:
+                print(f'Time to first dialog is over budget ({elapsed:.1f} ms > '
+                    f'{self.budget:.1f} ms)')
+                raise SystemExit(1)
+            print(f'Time to first dialog is within budget ({self.budget:.1f} ms)')
+
+
+PRECOMPILE_OPTION = ('precompile=', None,
+    'comma separated list of Python binaries to precompile bytecode with')
+
+def parse_precompile(value):
+    if not value:
+        return []
+    return [binary.strip() for binary in value.split(',') if binary.strip()]
+
 class Bundle(Command):
     ''' Create a bundle for release
     '''
     description = 'create a bundle for release'
 
-    user_options = []
+    user_options = [PRECOMPILE_OPTION]
 
     def initialize_options(self):
-        pass
+        self.precompile = None
 
     def finalize_options(self):
-        pass
+        self.precompile = parse_precompile(self.precompile)
 
     def run(self):
-        bundle_path = create_zipapp()
+        bundle_path = create_zipapp(precompile_binaries=self.precompile)
 
         project_path = Path(os.getcwd())
         dist_path = Path(project_path, 'dist')
@@ -157,16 +335,16 @@ class BundleWinZip(Command):
     '''
     description = 'create a Windows zipapp bundle for release'
 
-    user_options = []
+    user_options = [PRECOMPILE_OPTION]
 
     def initialize_options(self):
-        pass
+        self.precompile = None
 
     def finalize_options(self):
-        pass
+        self.precompile = parse_precompile(self.precompile)
 
     def run(self):
-        bundle_path = create_zipapp(for_windows=True)
+        bundle_path = create_zipapp(for_windows=True, precompile_binaries=self.precompile)
 
 
 class BundleWinExe(Command):
@@ -300,6 +478,15 @@ ExecuteParameters="-m ethwizard"
 
         include_requirements(archive_dir_path)
 
+        # Precompile bytecode with the embedded Python so it does not have to compile
+        # everything on each launch
+        embedded_python = archive_dir_path.joinpath('python.exe')
+        print('Precompiling bytecode with the embedded python...')
+        subprocess.run([
+            str(embedded_python), '-m', 'compileall', '-q', '-j', '0',
+            '--invalidation-mode', 'unchecked-hash', '.'
+        ], cwd=archive_dir_path)
+
         # Create archive to be used with self extracting (SFX)
         sfx_archive_path = build_path.joinpath('sfx.7z')
 
@@ -336,6 +523,7 @@ if __name__ == "__main__":
         version=version,
         cmdclass={
             'bundle': Bundle,
+            'importtime': ImportTime,
             'bundlewinexe': BundleWinExe,
             'bundlewinzip': BundleWinZip
         }
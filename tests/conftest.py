@@ -0,0 +1,93 @@
+import hashlib
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    # The client drops pooled connections when its tests end, that is not an error
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+class FileServer():
+    # Local HTTP server for the download tests. files maps a path to its bytes. Range requests
+    # are answered with If-Range checked against the ETag. A path in interrupt_after has its
+    # connection dropped after that many bytes on the next request only.
+
+    def __init__(self):
+        self.files = {}
+        self.interrupt_after = {}
+        self.requests = []
+        self._server = QuietHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}{path}'
+
+    def get_etag(self, path):
+        return '"' + hashlib.sha256(self.files[path]).hexdigest()[:16] + '"'
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+
+                data = server.files.get(self.path)
+                if data is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                etag = server.get_etag(self.path)
+                start = 0
+                status = 200
+
+                range_header = self.headers.get('Range')
+                if range_header is not None and self.headers.get('If-Range') in (None, etag):
+                    start = int(range_header.split('=')[1].split('-')[0])
+                    status = 206
+
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(data) - start))
+                if status == 206:
+                    self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+                self.end_headers()
+
+                body = data[start:]
+                interrupt_after = server.interrupt_after.pop(self.path, None)
+                if interrupt_after is not None:
+                    self.wfile.write(body[:interrupt_after])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+
+                self.wfile.write(body)
+
+        return Handler
+
+@pytest.fixture
+def file_server():
+    server = FileServer()
+    server.start()
+    yield server
+    server.stop()
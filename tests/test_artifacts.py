@@ -0,0 +1,98 @@
+import io
+import tarfile
+
+import pytest
+
+from ethwizard.platforms.artifacts import (
+    discard_artifact,
+    get_artifact_key,
+    get_artifact_store,
+    iter_artifact
+)
+
+from ethwizard.platforms.extract import ExtractError, extract_archive
+
+RELEASE_TAG = 'v1.0.0'
+ARCHIVE_PATH = '/releases/client-v1.0.0.tar.gz'
+
+def make_archive(files):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar_file:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            tar_file.addfile(info, io.BytesIO(data))
+    return archive.getvalue()
+
+def extract_release(file_server, tmp_path):
+    download_path = tmp_path.joinpath('downloads')
+    chunks = iter_artifact(file_server.url(ARCHIVE_PATH), download_path, release_tag=RELEASE_TAG)
+    return extract_archive(chunks, 'client-v1.0.0.tar.gz', tmp_path.joinpath('client'),
+        replace_destination=True)
+
+def get_store_entry(file_server, tmp_path):
+    store = get_artifact_store(tmp_path.joinpath('downloads'))
+    return store.get(get_artifact_key(file_server.url(ARCHIVE_PATH), RELEASE_TAG))
+
+def get_temp_files(tmp_path):
+    temp_directory = get_artifact_store(tmp_path.joinpath('downloads')).root.joinpath('tmp')
+    if not temp_directory.is_dir():
+        return []
+    return list(temp_directory.iterdir())
+
+@pytest.fixture
+def release_server(file_server):
+    file_server.files[ARCHIVE_PATH] = make_archive({'client/client': b'binary'})
+    return file_server
+
+def test_archive_is_stored_once_committed(release_server, tmp_path):
+    staged = extract_release(release_server, tmp_path)
+
+    assert get_store_entry(release_server, tmp_path) is None
+
+    staged.commit()
+
+    entry = get_store_entry(release_server, tmp_path)
+    assert entry['sha256'] == staged.get_hexdigest()
+    assert tmp_path.joinpath('client', 'client', 'client').read_bytes() == b'binary'
+    assert get_temp_files(tmp_path) == []
+
+    # The next extraction reads the archive from the store
+    request_count = len(release_server.requests)
+    staged = extract_release(release_server, tmp_path)
+    staged.commit()
+    assert len(release_server.requests) == request_count
+
+def test_aborted_download_is_not_stored(release_server, tmp_path):
+    staged = extract_release(release_server, tmp_path)
+    staged.abort()
+
+    assert get_store_entry(release_server, tmp_path) is None
+    assert get_temp_files(tmp_path) == []
+    assert not tmp_path.joinpath('client').exists()
+
+def test_aborted_stored_archive_is_discarded(release_server, tmp_path):
+    extract_release(release_server, tmp_path).commit()
+
+    staged = extract_release(release_server, tmp_path)
+    staged.abort()
+
+    assert get_store_entry(release_server, tmp_path) is None
+
+def test_damaged_archive_is_not_stored(file_server, tmp_path):
+    file_server.files[ARCHIVE_PATH] = b'not an archive' * 100
+
+    with pytest.raises(ExtractError):
+        extract_release(file_server, tmp_path)
+
+    assert get_store_entry(file_server, tmp_path) is None
+    assert get_temp_files(tmp_path) == []
+
+def test_discard_artifact(release_server, tmp_path):
+    extract_release(release_server, tmp_path).commit()
+
+    discard_artifact(release_server.url(ARCHIVE_PATH), tmp_path.joinpath('downloads'),
+        release_tag=RELEASE_TAG)
+
+    assert get_store_entry(release_server, tmp_path) is None
@@ -0,0 +1,91 @@
+import hashlib
+
+import pytest
+
+from ethwizard.platforms import download
+
+from ethwizard.platforms.download import (
+    DownloadError,
+    download_file,
+    get_metadata_path,
+    get_partial_path,
+    iter_download
+)
+
+FILE_PATH = '/releases/client.tar.gz'
+FILE_DATA = bytes(range(256)) * 1024
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(download, 'get_backoff_delay', lambda attempt: 0)
+
+@pytest.fixture
+def release_server(file_server):
+    file_server.files[FILE_PATH] = FILE_DATA
+    return file_server
+
+def get_range_headers(file_server):
+    return [headers.get('Range') for path, headers in file_server.requests]
+
+def test_download_file_resumes_after_interruption(release_server, tmp_path):
+    release_server.interrupt_after[FILE_PATH] = 100000
+    file_path = tmp_path.joinpath('client.tar.gz')
+
+    file_hash = download_file(release_server.url(FILE_PATH), file_path)
+
+    assert file_path.read_bytes() == FILE_DATA
+    assert file_hash.hexdigest() == hashlib.sha256(FILE_DATA).hexdigest()
+    assert get_range_headers(release_server) == [None, 'bytes=100000-']
+    assert not get_partial_path(file_path).exists()
+    assert not get_metadata_path(file_path).exists()
+
+def test_download_file_resumes_partial_file_from_earlier_run(release_server, tmp_path):
+    release_server.interrupt_after[FILE_PATH] = 100000
+    file_path = tmp_path.joinpath('client.tar.gz')
+
+    with pytest.raises(DownloadError):
+        download_file(release_server.url(FILE_PATH), file_path, attempts=1)
+
+    assert get_partial_path(file_path).stat().st_size == 100000
+
+    file_hash = download_file(release_server.url(FILE_PATH), file_path)
+
+    assert file_path.read_bytes() == FILE_DATA
+    assert file_hash.hexdigest() == hashlib.sha256(FILE_DATA).hexdigest()
+    assert get_range_headers(release_server) == [None, 'bytes=100000-']
+
+def test_download_file_starts_over_when_the_file_changed(release_server, tmp_path):
+    release_server.interrupt_after[FILE_PATH] = 100000
+    file_path = tmp_path.joinpath('client.tar.gz')
+
+    with pytest.raises(DownloadError):
+        download_file(release_server.url(FILE_PATH), file_path, attempts=1)
+
+    new_data = FILE_DATA[::-1]
+    release_server.files[FILE_PATH] = new_data
+
+    file_hash = download_file(release_server.url(FILE_PATH), file_path)
+
+    assert file_path.read_bytes() == new_data
+    assert file_hash.hexdigest() == hashlib.sha256(new_data).hexdigest()
+
+def test_iter_download_resumes_after_interruption(release_server):
+    release_server.interrupt_after[FILE_PATH] = 100000
+
+    data = b''.join(iter_download(release_server.url(FILE_PATH)))
+
+    assert data == FILE_DATA
+    assert get_range_headers(release_server) == [None, 'bytes=100000-']
+
+def test_iter_download_fails_when_the_file_changed(release_server):
+    release_server.interrupt_after[FILE_PATH] = 100000
+
+    chunks = iter_download(release_server.url(FILE_PATH))
+    next(chunks)
+
+    # The bytes already yielded belong to the old file
+    release_server.files[FILE_PATH] = FILE_DATA[::-1]
+
+    with pytest.raises(DownloadError, match='changed during the download'):
+        for data in chunks:
+            pass
@@ -0,0 +1,150 @@
+import io
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+from ethwizard.platforms.extract import (
+    ExtractError,
+    SignatureVerifier,
+    extract_archive,
+    iter_file,
+    select_names,
+    strip_components
+)
+
+def make_tar(files):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar_file:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            tar_file.addfile(info, io.BytesIO(data))
+    return archive.getvalue()
+
+def make_zip(files):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+    return archive.getvalue()
+
+def chunked(data, size=1000):
+    for position in range(0, len(data), size):
+        yield data[position:position + size]
+
+def get_staging_paths(path):
+    return [child for child in path.iterdir() if child.name.startswith('.staged-')]
+
+def test_nothing_is_installed_before_commit(tmp_path):
+    destination = tmp_path.joinpath('bin')
+    archive = make_tar({'client/client': b'binary', 'client/README.md': b'readme'})
+
+    staged = extract_archive(chunked(archive), 'client.tar.gz', destination,
+        select=select_names({'client': 'client'}))
+
+    assert not destination.exists()
+    assert [str(path) for path in staged.files] == ['client']
+    assert staged.size == len(archive)
+
+    staged.commit()
+
+    assert destination.joinpath('client').read_bytes() == b'binary'
+    assert not destination.joinpath('README.md').exists()
+    assert get_staging_paths(tmp_path) == []
+
+def test_abort_keeps_the_destination(tmp_path):
+    destination = tmp_path.joinpath('bin')
+    destination.mkdir()
+    destination.joinpath('client').write_bytes(b'old')
+
+    staged = extract_archive(chunked(make_tar({'client': b'new'})), 'client.tar.gz',
+        destination)
+    staged.abort()
+
+    assert destination.joinpath('client').read_bytes() == b'old'
+    assert get_staging_paths(tmp_path) == []
+
+def test_commit_replaces_the_destination(tmp_path):
+    destination = tmp_path.joinpath('teku')
+    destination.mkdir()
+    destination.joinpath('old.jar').write_bytes(b'old')
+
+    archive = make_zip({'teku-1.0/bin/teku': b'script', 'teku-1.0/lib/teku.jar': b'jar'})
+    staged = extract_archive(chunked(archive), 'teku-1.0.zip', destination,
+        select=strip_components(1), replace_destination=True)
+    staged.commit()
+
+    assert sorted(str(path.relative_to(destination)) for path in destination.rglob('*')
+        if path.is_file()) == ['bin/teku', 'lib/teku.jar']
+    assert get_staging_paths(tmp_path) == []
+
+def test_strip_components_counts_leading_dot():
+    select = strip_components(2)
+
+    assert select('./staking_deposit-cli-linux-amd64/deposit') == 'deposit'
+    assert select('./staking_deposit-cli-linux-amd64/') is None
+
+def test_damaged_archive_leaves_nothing_behind(tmp_path):
+    archive = make_tar({'client': b'binary' * 1000})
+
+    with pytest.raises(ExtractError):
+        extract_archive(chunked(archive[:len(archive) // 2] + b'\0' * 100), 'client.tar.gz',
+            tmp_path.joinpath('bin'))
+
+    assert get_staging_paths(tmp_path) == []
+
+def test_iter_file(tmp_path):
+    archive_path = tmp_path.joinpath('client.tar.gz')
+    archive_path.write_bytes(make_tar({'client': b'binary'}))
+
+    staged = extract_archive(iter_file(archive_path), archive_path.name,
+        tmp_path.joinpath('bin'))
+    staged.commit()
+
+    assert tmp_path.joinpath('bin', 'client').read_bytes() == b'binary'
+
+class FakeLog():
+    def __init__(self):
+        self.messages = []
+
+    def info(self, message):
+        self.messages.append(('info', message))
+
+    def error(self, message):
+        self.messages.append(('error', message))
+
+def make_fake_gpg(tmp_path, return_code):
+    # Reads the signed file from its standard input and reports like gpg on its standard error
+    script_path = tmp_path.joinpath('gpg.py')
+    script_path.write_text(
+        'import sys\n'
+        'data = sys.stdin.buffer.read()\n'
+        'sys.stderr.write(f"gpg: read {len(data)} bytes\\n")\n'
+        f'sys.exit({return_code})\n')
+    return [sys.executable, str(script_path)]
+
+@pytest.mark.parametrize('return_code, level', [(0, 'info'), (1, 'error')])
+def test_signature_verifier_output_is_captured(tmp_path, capfd, return_code, level):
+    gpg_command = make_fake_gpg(tmp_path, return_code)
+    log = FakeLog()
+
+    # The script path is passed as the gpg binary, the --verify arguments are ignored
+    verifier = SignatureVerifier(tmp_path.joinpath('client.tar.gz.asc'),
+        gpg_binary=gpg_command[0], gpg_arguments=gpg_command[1:], log=log)
+    archive = make_tar({'client': b'binary'})
+    staged = extract_archive(chunked(archive), 'client.tar.gz', tmp_path.joinpath('bin'),
+        tee=[verifier.update])
+
+    assert verifier.verify() == (return_code == 0)
+    staged.abort()
+
+    assert f'gpg: read {len(archive)} bytes' in verifier.stderr
+    assert log.messages[0][0] == level
+    assert f'gpg: read {len(archive)} bytes' in log.messages[0][1]
+
+    # Nothing reached the console
+    captured = capfd.readouterr()
+    assert captured.out == '' and captured.err == ''
@@ -0,0 +1,43 @@
+from ethwizard.platforms.prefetch import Prefetcher, PrefetchSpec
+
+from ethwizard.platforms.releases import ReleaseCacheError
+
+class FakeReleaseCache():
+    def __init__(self, release_json=None):
+        self.release_json = release_json
+        self.release_paths = []
+
+    def get_release(self, release_path):
+        self.release_paths.append(release_path)
+        if self.release_json is None:
+            raise ReleaseCacheError('HTTP error while querying Github. Status code 403')
+        return self.release_json
+
+def make_prefetcher(tmp_path, release_cache):
+    prefetcher = Prefetcher(tmp_path.joinpath('downloads'), release_cache=release_cache)
+    prefetcher.register(PrefetchSpec(
+        name='mev-boost',
+        release_path='/repos/flashbots/mev-boost/releases/latest',
+        select_assets=lambda release_json, options: {}
+    ))
+    return prefetcher
+
+def test_release_is_obtained_from_the_release_cache(tmp_path):
+    release_cache = FakeReleaseCache({'tag_name': 'v1.5.0', 'assets': []})
+    prefetcher = make_prefetcher(tmp_path, release_cache)
+
+    result = prefetcher.take('mev-boost')
+
+    assert result.error is None
+    assert result.release_json['tag_name'] == 'v1.5.0'
+    assert release_cache.release_paths == ['/repos/flashbots/mev-boost/releases/latest']
+    prefetcher.discard(result)
+
+def test_release_cache_error_fails_the_prefetch(tmp_path):
+    prefetcher = make_prefetcher(tmp_path, FakeReleaseCache())
+
+    prefetcher.start('mev-boost')
+    result = prefetcher.take('mev-boost')
+
+    assert 'Unable to get the latest mev-boost release from Github' in result.error
+    assert 'Status code 403' in result.error
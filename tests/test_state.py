@@ -0,0 +1,119 @@
+import json
+
+from ethwizard.constants import STATE_FILE, STATE_JOURNAL_FILE, WIZARD_COMPLETED_STEP_ID
+
+from ethwizard.platforms.state import StateStore
+
+def read_journal(save_directory):
+    with open(save_directory.joinpath(STATE_JOURNAL_FILE), 'r', encoding='utf8') as journal_file:
+        return [json.loads(line) for line in journal_file]
+
+def test_first_save_writes_a_snapshot(tmp_path):
+    store = StateStore(tmp_path)
+
+    assert store.save('step_1', {'network': 'mainnet'})
+
+    with open(tmp_path.joinpath(STATE_FILE), 'r', encoding='utf8') as snapshot_file:
+        assert json.load(snapshot_file) == {'step': 'step_1', 'context': {'network': 'mainnet'}}
+    assert not tmp_path.joinpath(STATE_JOURNAL_FILE).exists()
+
+def test_journal_replay(tmp_path):
+    store = StateStore(tmp_path)
+    store.save('step_1', {'network': 'mainnet', 'ports': {'eth1': 30303}})
+    store.save('step_2', {'network': 'mainnet', 'ports': {'eth1': 30303}, 'client': 'geth'})
+    store.save('step_3', {'network': 'mainnet', 'client': 'geth'})
+
+    # Only the changes are journaled
+    assert read_journal(tmp_path) == [
+        {'step': 'step_2', 'set': {'client': 'geth'}, 'unset': []},
+        {'step': 'step_3', 'set': {}, 'unset': ['ports']}
+    ]
+
+    assert StateStore(tmp_path).load() == {
+        'step': 'step_3',
+        'context': {'network': 'mainnet', 'client': 'geth'}
+    }
+
+def test_unchanged_state_is_not_journaled(tmp_path):
+    store = StateStore(tmp_path)
+    store.save('step_1', {'network': 'mainnet'})
+    store.save('step_2', {'network': 'mainnet'})
+    store.save('step_2', {'network': 'mainnet'})
+
+    assert len(read_journal(tmp_path)) == 1
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    store = StateStore(tmp_path)
+    store.save('step_1', {'network': 'mainnet'})
+    store.save('step_2', {'network': 'mainnet', 'client': 'geth'})
+
+    # Power loss in the middle of an append
+    with open(tmp_path.joinpath(STATE_JOURNAL_FILE), 'a', encoding='utf8') as journal_file:
+        journal_file.write('{"step": "step_3", "set": {"cli')
+
+    store = StateStore(tmp_path)
+    assert store.load() == {
+        'step': 'step_2',
+        'context': {'network': 'mainnet', 'client': 'geth'}
+    }
+
+    # The torn entry is truncated so the next appends can be replayed
+    store.save('step_3', {'network': 'mainnet', 'client': 'nethermind'})
+    assert StateStore(tmp_path).load() == {
+        'step': 'step_3',
+        'context': {'network': 'mainnet', 'client': 'nethermind'}
+    }
+
+def test_replay_stops_at_corrupt_journal_entry(tmp_path):
+    store = StateStore(tmp_path)
+    store.save('step_1', {'network': 'mainnet'})
+    store.save('step_2', {'network': 'mainnet', 'client': 'geth'})
+
+    with open(tmp_path.joinpath(STATE_JOURNAL_FILE), 'a', encoding='utf8') as journal_file:
+        journal_file.write('not json\n')
+        journal_file.write(json.dumps({'step': 'step_4', 'set': {}, 'unset': []}) + '\n')
+
+    assert StateStore(tmp_path).load()['step'] == 'step_2'
+
+def test_corrupt_snapshot(tmp_path):
+    tmp_path.joinpath(STATE_FILE).write_text('{"step": "step_1", "cont', encoding='utf8')
+
+    store = StateStore(tmp_path)
+    assert store.load() is None
+
+    # The next save replaces the corrupt snapshot
+    assert store.save('step_1', {'network': 'mainnet'})
+    assert StateStore(tmp_path).load() == {'step': 'step_1', 'context': {'network': 'mainnet'}}
+
+def test_snapshot_without_context_is_ignored(tmp_path):
+    tmp_path.joinpath(STATE_FILE).write_text('{"step": "step_1", "context": []}',
+        encoding='utf8')
+
+    assert StateStore(tmp_path).load() is None
+
+def test_journal_is_compacted(tmp_path):
+    store = StateStore(tmp_path, compact_threshold=3)
+    store.save('step_0', {})
+    for index in range(1, 4):
+        store.save(f'step_{index}', {'index': index})
+
+    assert not tmp_path.joinpath(STATE_JOURNAL_FILE).exists()
+    assert StateStore(tmp_path).load() == {'step': 'step_3', 'context': {'index': 3}}
+
+def test_completed_wizard_is_compacted(tmp_path):
+    store = StateStore(tmp_path)
+    store.save('step_1', {'network': 'mainnet'})
+    store.save(WIZARD_COMPLETED_STEP_ID, {'network': 'mainnet'})
+
+    assert not tmp_path.joinpath(STATE_JOURNAL_FILE).exists()
+    assert StateStore(tmp_path).load()['step'] == WIZARD_COMPLETED_STEP_ID
+
+def test_saved_context_is_a_copy(tmp_path):
+    store = StateStore(tmp_path)
+    context = {'ports': {'eth1': 30303}}
+    store.save('step_1', context)
+
+    context['ports']['eth1'] = 30304
+    store.save('step_2', context)
+
+    assert StateStore(tmp_path).load()['context'] == {'ports': {'eth1': 30304}}
@@ -0,0 +1,171 @@
+import threading
+import time
+
+from ethwizard.constants import RESOURCE_APT, WIZARD_COMPLETED_STEP_ID
+
+from ethwizard.platforms.common import (
+    Step,
+    StepError,
+    StepSequence,
+    get_step_dependencies
+)
+
+def make_step(step_id, reads=None, writes=None, interactive=True, function=None):
+    def exc_function(step, context, step_sequence):
+        if function is not None:
+            function(context)
+        context[step_id] = True
+        return context
+
+    declared_writes = None if writes is None else writes + [step_id]
+    return Step(step_id=step_id, display_name=step_id, exc_function=exc_function, reads=reads,
+        writes=declared_writes, interactive=interactive)
+
+class SavedStates():
+    def __init__(self):
+        self.states = []
+        self._lock = threading.Lock()
+
+    def __call__(self, step_id, context):
+        with self._lock:
+            self.states.append((step_id, dict(context)))
+        return True
+
+def test_undeclared_step_is_a_barrier():
+    steps = [
+        make_step('first', reads=[], writes=[]),
+        make_step('barrier'),
+        make_step('last', reads=[], writes=[], interactive=False)
+    ]
+
+    assert get_step_dependencies(steps) == [set(), {0}, {1}]
+
+def test_background_step_dependencies():
+    steps = [
+        make_step('select', reads=[], writes=['network']),
+        make_step('apt_1', reads=['network'], writes=[RESOURCE_APT], interactive=False),
+        make_step('prompt', reads=[], writes=['ports']),
+        make_step('apt_2', reads=[], writes=[RESOURCE_APT], interactive=False),
+        make_step('install', reads=['ports'], writes=[RESOURCE_APT])
+    ]
+
+    assert get_step_dependencies(steps) == [
+        set(),
+        {0},
+        {0},
+        {1},
+        {0, 1, 2, 3}
+    ]
+
+def test_background_step_overlaps_foreground_steps():
+    background_started = threading.Event()
+    foreground_done = threading.Event()
+
+    def background(context):
+        background_started.set()
+        assert foreground_done.wait(5)
+
+    def foreground(context):
+        assert background_started.wait(5)
+        foreground_done.set()
+
+    saved_states = SavedStates()
+    sequence = StepSequence(steps=[
+        make_step('select', reads=[], writes=['network']),
+        make_step('background', reads=['network'], writes=[], interactive=False,
+            function=background),
+        make_step('prompt', reads=[], writes=[], function=foreground),
+        make_step('install', reads=['background'], writes=[])
+    ], save_state=saved_states)
+
+    assert sequence.run_from_start()
+
+    step_id, context = saved_states.states[-1]
+    assert step_id == WIZARD_COMPLETED_STEP_ID
+    assert context['background'] and context['prompt'] and context['install']
+
+def test_background_writes_are_merged():
+    def background(context):
+        context['results'] = {'iops': 10.0}
+        context['ignored'] = True
+
+    saved_states = SavedStates()
+    sequence = StepSequence(steps=[
+        make_step('background', reads=[], writes=['results'], interactive=False,
+            function=background),
+        make_step('show', reads=['results'], writes=[])
+    ], save_state=saved_states)
+
+    assert sequence.run_from_start()
+
+    step_id, context = saved_states.states[-1]
+    assert context['results'] == {'iops': 10.0}
+    assert 'ignored' not in context
+
+def test_background_failure_stops_before_next_foreground_step():
+    prompt_started = threading.Event()
+    background_failed = threading.Event()
+
+    def background(context):
+        assert prompt_started.wait(5)
+        background_failed.set()
+        raise StepError('Unable to install chrony.')
+
+    def foreground(context):
+        # The failure happens while this foreground step is running
+        prompt_started.set()
+        assert background_failed.wait(5)
+        time.sleep(0.1)
+
+    saved_states = SavedStates()
+    sequence = StepSequence(steps=[
+        make_step('select', reads=[], writes=[]),
+        make_step('background', reads=[], writes=[RESOURCE_APT], interactive=False,
+            function=background),
+        make_step('prompt', reads=[], writes=[], function=foreground),
+        make_step('keys', reads=[], writes=[]),
+        make_step('deposit', reads=[RESOURCE_APT], writes=[])
+    ], save_state=saved_states)
+
+    assert not sequence.run_from_start()
+
+    saved_step_ids = [step_id for step_id, context in saved_states.states]
+    assert WIZARD_COMPLETED_STEP_ID not in saved_step_ids
+
+    # The state points to the failed step so it can be resumed
+    step_id, context = saved_states.states[-1]
+    assert step_id == 'background'
+    assert context['prompt']
+    assert 'keys' not in context
+
+def test_background_failure_while_waiting():
+    def background(context):
+        raise StepError('The MEV-Boost service is not running properly.')
+
+    saved_states = SavedStates()
+    sequence = StepSequence(steps=[
+        make_step('background', reads=[], writes=['started'], interactive=False,
+            function=background),
+        make_step('install', reads=['started'], writes=[])
+    ], save_state=saved_states)
+
+    assert not sequence.run_from_start()
+
+    step_id, context = saved_states.states[-1]
+    assert step_id == 'background'
+    assert 'install' not in context
+
+def test_run_from_step():
+    saved_states = SavedStates()
+    sequence = StepSequence(steps=[
+        make_step('first', reads=[], writes=[]),
+        make_step('background', reads=[], writes=[], interactive=False),
+        make_step('last', reads=[], writes=[])
+    ], save_state=saved_states)
+
+    assert sequence.run_from_step('background', {'first': True})
+
+    step_id, context = saved_states.states[-1]
+    assert step_id == WIZARD_COMPLETED_STEP_ID
+    assert context['first'] and context['background'] and context['last']
+    assert not sequence.run_from_step('unknown')